@@ -2,11 +2,25 @@ import cv2
 import mediapipe as mp
 import serial
 import serial.tools.list_ports
+import os
+import sys
 import time
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Controller'))
+from logsink import LogSink
+from protocol import OP_MOVE, CAP_DELTA, CommandText, DeltaEncoder, encode_command, query_capabilities
+from brokerclient import BrokerClient, PRIORITY_FOLLOWER
+
 mp_hands = mp.solutions.hands
 mp_drawing = mp.solutions.drawing_utils
 
+# 프레임마다 출력되는 로그는 카테고리별로 출력 빈도 제한 (초)
+log = LogSink(rate_limits={"Command": 0.5, "TX": 0.5, "Tracking": 0.5, "Serial TX": 1.0})
+
+# 추적 중에는 일부 관절만 바뀌므로 변경된 관절만 전송 (1초마다 전체 위치 Keyframe)
+# 펌웨어가 연결 시 Delta 명령(opcode 5) 지원을 확인한 경우에만 생성, 그 외에는 전체 위치 전송
+tx_encoder = None
+
 # ========================================================================================================
 # Serial Communication Setup
 # ========================================================================================================
@@ -81,14 +95,24 @@ def send_motor_command(arduino, motor_positions):
         return False
     
     try:
-        positions_int = [int(pos) for pos in motor_positions]
-        command = f"0,{','.join(map(str, positions_int))}*"
-        print(f"[Command] {command}")
-        arduino.write(command.encode('utf-8'))
-        print(f"[TX] {command}")
+        if isinstance(arduino, BrokerClient):
+            # 브로커가 대시보드 등 다른 소스와 중재 후 전송
+            return arduino.send_positions(motor_positions)
+        
+        if tx_encoder is None:
+            packet, command = encode_command(OP_MOVE, motor_positions), CommandText(OP_MOVE, motor_positions)
+        else:
+            packet, command = tx_encoder.encode(motor_positions)
+        if packet is None:
+            return True  # 변경 없음
+        log.debug("Command", "%s", command)
+        arduino.write(packet)
+        log.info("TX", "%s", command)
         return True
     except Exception as e:
-        print(f"[Serial TX] {e}")
+        if tx_encoder:
+            tx_encoder.reset()
+        log.error("Serial TX", "%s", e)
         return False
 
 # ========================================================================================================
@@ -97,8 +121,15 @@ def send_motor_command(arduino, motor_positions):
 # Main Program
 # ========================================================================================================
 
-# Arduino 연결
-arduino = connect_serial()
+# Arduino 연결 (브로커가 실행 중이면 포트를 직접 열지 않고 브로커에 연결)
+arduino = BrokerClient.attach("hand_follower", PRIORITY_FOLLOWER)
+if arduino:
+    print(f"[Serial] Attached to broker ({arduino.port})")
+else:
+    arduino = connect_serial()
+    if arduino and query_capabilities(arduino) & CAP_DELTA:
+        tx_encoder = DeltaEncoder(keyframe_interval=1.0)
+        print("[Serial] Delta commands enabled")
 
 # 카메라 사용 가능 여부 확인
 # for i in range(5):
@@ -191,8 +222,8 @@ with mp_hands.Hands(
                 # Arduino로 명령 전송
                 send_motor_command(arduino, motor_positions)
                 
-                print(f"Base 모터: {int(motor_positions[0])}, palm_x: {palm_x}px")
-                print(f"Upper_Arm 모터: {int(motor_positions[2])}, palm_y: {palm_y}px")
+                log.info("Tracking", "Base 모터: %d, palm_x: %dpx | Upper_Arm 모터: %d, palm_y: %dpx",
+                         int(motor_positions[0]), palm_x, int(motor_positions[2]), palm_y)
 
                 # 손바닥 중앙 위치 강조 표시
                 cv2.circle(frame, (palm_x, palm_y), 10, (0, 255, 0), -1)
@@ -232,3 +263,4 @@ if arduino:
             
 cap.release()
 cv2.destroyAllWindows()
+log.close()
@@ -1,16 +1,38 @@
 import pygame
+import os
 import sys
 import math
 import serial
+import serial.tools.list_ports
 import time
 import json
+import asyncio
 import threading
-import csv
+import numpy as np
 from datetime import datetime
 from dataclasses import dataclass
 from typing import List, Tuple, Optional
 from enum import Enum
-from queue import Queue
+from queue import Queue, Empty
+from collections import deque
+from concurrent.futures import Future, InvalidStateError
+
+from protocol import (
+    PROTOCOL_ASCII, PROTOCOL_BINARY, OP_MOVE, OP_TORQUE, OP_FEEDBACK, OP_QUERY, OP_PROTOCOL, CAP_DELTA,
+    REPLY_FEEDBACK, REPLY_POSITIONS, REPLY_PROTOCOL, REPLY_TEXT, REPLY_BUS_FEEDBACK, REPLY_BUS_POSITIONS,
+    READY_BANNER, Reply, FrameDecoder, DeltaEncoder, CommandText, encode_ascii, encode_command, encode_bus_frame,
+    parse_reply, reply_capabilities,
+)
+from telemetry import LinkTelemetry, LatencyHistogram
+from brokerclient import BrokerClient, PRIORITY_DASHBOARD
+from trajectory import Trajectory, TrajectoryStreamer, plan_trajectory, plan_path_trajectory
+from collision import CollisionChecker
+from planner import MotionPlanner
+from poselib import PoseLibrary
+from teach import TrajectoryRecorder, Recording, replay_trajectory, compress_recording, compression_error
+from logsink import LogSink, DEBUG, INFO, WARNING, ERROR
+from csvsink import CsvSink
+from sessionlog import SessionLogWriter, CSV_HEADER, NO_FEEDBACK
 
 # ========================================================================================================
 # Configuration & Constants
@@ -18,8 +40,38 @@ from queue import Queue
 
 class Config:
     """시스템 설정을 관리하는 클래스"""
-    PORT = None
+    PORT = os.environ.get("ROBOT_PORT")  # 미지정 시 자동 감지 (에뮬레이터: ROBOT_PORT=/tmp/ttyROBOT)
+    USE_BROKER = True  # 브로커(broker.py)가 실행 중이면 포트를 직접 열지 않고 브로커에 연결
     BAUD_RATE = 115200
+    SERIAL_PROTOCOL = PROTOCOL_ASCII  # PROTOCOL_BINARY: 19-byte CRC 프레임 (펌웨어 미지원 시 ASCII로 자동 복귀)
+    PROTOCOL_HANDSHAKE_TIMEOUT = 1.0
+    PORT_CACHE_FILE = 'serial_port.json'  # 마지막 연결 장치 지문 (경로, VID/PID, 시리얼 번호)
+    READY_TIMEOUT = 3.0  # 연결 후 펌웨어 준비 확인 대기 (리셋 시 setup()의 delay(2000) 포함)
+    WATCHDOG_INTERVAL = 0.5  # 연결 끊김 시 재연결 시도 주기 (실패 시 최대 WATCHDOG_MAX_BACKOFF까지 증가)
+    WATCHDOG_MAX_BACKOFF = 10.0
+    SERIAL_READ_TIMEOUT = 0.1  # 수신 스레드 블로킹 읽기 타임아웃 (종료 반응 시간)
+    TX_RATE_HZ = 50  # 위치 명령 최대 전송 주기 (최신 값만 전송)
+    DELTA_COMMANDS = True  # 변경된 관절만 전송 (opcode 5, 연결 시 펌웨어가 지원을 확인한 경우에만 사용)
+    KEYFRAME_INTERVAL = 1.0  # Delta 모드에서 전체 위치(Keyframe) 재전송 주기
+    POSITION_QUERY_TIMEOUT = 1.0  # 위치 요청(opcode 3) 응답 대기 시간
+    REQUEST_STALE_TIME = 1.0  # 타임아웃 이후 응답 유실로 간주하고 요청 슬롯을 정리하는 시간
+    TARGET_PROBE_INTERVAL = 0.1  # 피드백 스트림이 없을 때 목표 도달 지연 측정용 위치 요청 간격 (0: 요청 안 함)
+    TRAJECTORY_PROFILE = "min_jerk"  # 프리셋 이동 궤적 ("min_jerk" / "trapezoid", None: 목표 위치 즉시 전송)
+    TRAJECTORY_RATE_HZ = 50  # 궤적 스트리밍 주기 (TX_RATE_HZ 이하)
+    TRAJECTORY_MAX_VELOCITY = 200.0  # 관절 최대 속도 (ticks/s, 펌웨어 MOVING_SPEED 100 ≈ 227 ticks/s보다 느리게)
+    TRAJECTORY_MAX_ACCELERATION = 400.0  # 관절 최대 가속도 (ticks/s²)
+    COLLISION_CHECK = False  # 위치 명령/프리셋 궤적의 자기 충돌 및 테이블 충돌 검사 (collision.py 캡슐 모델)
+                             # kinematics.py 링크 치수가 공칭값이므로 실측값으로 보정한 뒤 켤 것
+    COLLISION_MARGIN = 0.5  # 캡슐 간 최소 간격 (cm)
+    MOTION_PLANNER = True  # 직선 프리셋 궤적이 충돌하면 관절 공간 RRT-Connect로 우회 경로 계획 (planner.py)
+    PLANNER_TIME_LIMIT = 0.1  # 경로 계획 시간 제한 (s)
+    POSE_LIBRARY_FILE = 'poses.jsonl'  # 자세 라이브러리 (추가 전용 로그, 없으면 custom_presets.json 가져오기)
+    REPLAY_SPEEDS = (0.25, 0.5, 1.0, 2.0, 4.0)  # Teach 재생 배속 ([ / ] 키)
+    REPLAY_LIMIT_VELOCITY = True  # 재생 시 TRAJECTORY_MAX_VELOCITY를 넘는 구간만 배속을 낮춤 (time warping)
+    REPLAY_COMPRESSION_TOLERANCE = 3.0  # 재생 전 기록 압축 허용 오차 (ticks, None: 압축 안 함, 저장 파일은 원본)
+    CONTROL_THREAD = True  # 피드백 처리/명령 실행을 렌더 루프와 분리된 고정 주기 스레드에서 실행 (False: UI 프레임마다)
+    CONTROL_RATE_HZ = 100  # 제어 루프 주기 (100~200 Hz)
+    UI_FPS = 60
     SCREEN_WIDTH = 1000
     SCREEN_HEIGHT = 720
     
@@ -30,9 +82,21 @@ class Config:
     
     MOTION_SMOOTHNESS = 0.08
     LOG_INTERVAL = 100
+    LOG_QUEUE_SIZE = 10000  # CSV 쓰기 대기 행 최대 개수 (가득 차면 새 행을 버림)
+    LOG_FLUSH_ROWS = 256  # 파일 버퍼를 비우는 행 수
+    LOG_FLUSH_INTERVAL = 0.5  # 파일 버퍼를 비우는 최대 간격 (s)
+    LOG_FORMAT = "csv"  # "binary": 열 단위 세션 로그 robot_log_*.rlog (sessionlog.py, CSV 변환 가능)
+    FEEDBACK_SAMPLE_BUFFER = 2000  # 로깅 대기 중인 피드백 샘플 최대 개수 (Passivity 모드)
 
     PASSIVITY_MODE = False
     SIMULATION_MODE = False  # DEV_MODE를 SIMULATION_MODE로 변경
+    
+    # 콘솔 로그 (카테고리별 최소 출력 간격, 초)
+    CONSOLE_LOG_LEVEL = INFO
+    CONSOLE_RATE_LIMITS = {
+        "TX": 0.2, "TX Simulated": 0.2, "RX": 0.2, "RX Positions": 0.2,
+        "Feedback Parse": 1.0, "Serial Read": 1.0, "Serial TX": 1.0, "Collision": 0.5,
+    }
 
 @dataclass
 class MotorConfig:
@@ -43,6 +107,21 @@ class MotorConfig:
     max_val: int
     default_pos: int
     
+@dataclass
+class PendingRequest:
+    """응답 대기 중인 위치 요청"""
+    future: Future
+    deadline: float
+    sent_time: float
+
+@dataclass
+class MovePlan:
+    """제어 스레드 밖에서 계획한 프리셋 이동/기록 재생 (MotorController.plan_move, plan_replay -> apply_move)"""
+    start: np.ndarray
+    target: np.ndarray
+    trajectory: Optional[Trajectory] = None  # None: 목표 위치 즉시 전송
+    rejection: Optional[str] = None  # 충돌로 거부된 경우 사유
+
 class MotorState(Enum):
     """모터 상태"""
     IDLE = "idle"
@@ -50,6 +129,26 @@ class MotorState(Enum):
     ERROR = "error"
     AT_LIMIT = "at_limit"
 
+# JointState.state 배열에 저장되는 상태 코드
+MOTOR_STATES = list(MotorState)
+STATE_CODES = {state: code for code, state in enumerate(MOTOR_STATES)}
+
+def _drain(items: deque) -> list:
+    """다른 스레드가 append하는 deque를 항목 유실 없이 모두 꺼내기"""
+    drained = []
+    while True:
+        try:
+            drained.append(items.popleft())
+        except IndexError:
+            return drained
+
+# ========================================================================================================
+# Console Log
+# ========================================================================================================
+
+# 모든 런타임 로그는 비동기 싱크를 거쳐 출력 (호출 측은 큐에 넣기만 함)
+log = LogSink(level=Config.CONSOLE_LOG_LEVEL, rate_limits=Config.CONSOLE_RATE_LIMITS)
+
 # ========================================================================================================
 # Color Schemes
 # ========================================================================================================
@@ -95,26 +194,51 @@ class UIColors:
 class SerialCommunicator:
     """시리얼 통신을 전담하는 클래스"""
     
-    def __init__(self, port: str = None, baud_rate: int = Config.BAUD_RATE):
-        self.port = port
+    ARDUINO_KEYWORDS = [
+        'Arduino', 'CH340', 'CP210', 'FTDI', 
+        'USB Serial', 'USB-SERIAL', 'ttyUSB', 'ttyACM'
+    ]
+    
+    def __init__(self, port: str = None, baud_rate: int = Config.BAUD_RATE, protocol: str = None):
+        self.requested_port = port or Config.PORT  # 지정 포트 (없으면 캐시된 장치 / 자동 감지)
+        self.port = None
         self.baud_rate = baud_rate
         self.arduino = None
-        self.is_connected = False
+        self.link_up = False  # 포트 열림 + 수신 스레드 동작
+        self.is_connected = False  # 펌웨어 준비 확인 완료
         self.running = False
         
+        # 프로토콜 방언 (연결 후 협상 결과에 따라 결정)
+        self.requested_protocol = protocol or Config.SERIAL_PROTOCOL
+        self.protocol = PROTOCOL_ASCII
+        self.capabilities = 0  # 펌웨어가 opcode 4 응답으로 확인한 기능 비트 (CAP_DELTA)
+        self.decoder = FrameDecoder(terminator=b'\n')
+        
         self.receive_queue = Queue()
         self.receive_thread = None
         
-        # 자동 포트 감지 시도
-        print(f"{Colors.CYAN}[Serial]{Colors.END} Initializing serial communication...")
+        # 위치 요청 - 응답 대응 (펌웨어는 요청 순서대로 응답하므로 FIFO)
+        self.pending_requests = deque()
+        self.request_lock = threading.Lock()  # pending_requests 보호 (전송 중에는 잡지 않음)
+        self.query_lock = threading.Lock()  # 요청 등록 + 전송 순서 유지
+        self.write_lock = threading.Lock()  # 포트 쓰기 직렬화 (전송 스케줄러/제어/watchdog/브로커 스레드의 프레임이 섞이지 않도록)
         
-        if self.port is None:
-            self.port = self._auto_detect_port()
+        # 링크 계측 (지연 히스토그램, 바이트 처리량, 큐 깊이)
+        self.telemetry = LinkTelemetry()
         
-        if self.port:
-            self._connect()
+        # 연결 준비 확인 / 재연결
+        self.ready_event = threading.Event()
+        self.protocol_event = threading.Event()
+        self.protocol_ack = None
+        self.connect_time = None  # 포트 열기 ~ 펌웨어 준비 확인 (초)
+        self.reconnects = 0
+        self.on_reconnect = None  # 재연결 후 호출 (장치 상태 재동기화)
+        self.bus_handler = None  # Bus 응답 수신 시 호출 (수신 스레드, ArmBus가 팔별로 분배)
         
-        # 연결 실패 시 자동으로 Simulation 모드로 전환
+        print(f"{Colors.CYAN}[Serial]{Colors.END} Initializing serial communication...")
+        self._open_link()
+        
+        # 연결 실패 시 자동으로 Simulation 모드로 전환 (장치가 연결되면 watchdog이 복구)
         if not self.is_connected:
             Config.SIMULATION_MODE = True
             print(f"\n{Colors.YELLOW}{'='*80}{Colors.END}")
@@ -128,6 +252,93 @@ class SerialCommunicator:
             print(f"{Colors.GREEN}[MODE]{Colors.END} {Colors.BOLD}Production Mode Activated{Colors.END}")
             print(f"{Colors.WHITE}Successfully connected to Arduino at {self.port}{Colors.END}")
             print(f"{Colors.GREEN}{'='*80}{Colors.END}\n")
+        
+        # 연결 감시 (케이블 재연결 / 핫플러그 복구)
+        self.watchdog_stop = threading.Event()
+        self.watchdog_thread = threading.Thread(target=self._watchdog_loop, daemon=True)
+        self.watchdog_thread.start()
+    
+    # ----------------------------------------------------------------------------------------------------
+    # Port Discovery
+    # ----------------------------------------------------------------------------------------------------
+    
+    def _open_link(self, reconnect: bool = False) -> bool:
+        """포트 결정 및 연결: 지정 포트 -> 캐시된 장치 -> 지문(VID/PID/시리얼) 일치 장치 -> 전체 스캔
+        
+        재연결 시에는 출력 없이 시도하고, 펌웨어 준비 응답이 없는 장치는 사용하지 않습니다.
+        """
+        verbose = not reconnect
+        if self.requested_port:
+            return self._connect(self.requested_port, require_ready=reconnect, verbose=verbose)
+        
+        fingerprint = self._load_port_fingerprint()
+        if fingerprint:
+            # 캐시된 경로를 스캔 없이 먼저 시도하고, 실패하면 지문으로 바뀐 경로를 찾음
+            if verbose:
+                print(f"{Colors.CYAN}[Serial]{Colors.END} Trying cached device {fingerprint['device']}...")
+            if self._connect(fingerprint['device'], require_ready=True, verbose=False):
+                return True
+            device = self._match_fingerprint(fingerprint)
+            if device and device != fingerprint['device'] and self._connect(device, require_ready=True, verbose=False):
+                return True
+        
+        if reconnect:
+            device = next((p.device for p in self._list_ports() if self._is_arduino_port(p)), None)
+        else:
+            device = self._auto_detect_port()
+        return bool(device) and self._connect(device, require_ready=reconnect, verbose=verbose)
+    
+    @staticmethod
+    def _list_ports() -> list:
+        try:
+            return serial.tools.list_ports.comports()
+        except Exception:
+            return []
+    
+    @classmethod
+    def _is_arduino_port(cls, port) -> bool:
+        """Arduino 관련 키워드 확인 (Windows: COM 포트, Linux/Mac: ttyUSB, ttyACM)"""
+        port_info = f"{port.device} - {port.description} - {port.manufacturer}"
+        return any(keyword.lower() in port_info.lower() for keyword in cls.ARDUINO_KEYWORDS)
+    
+    def _load_port_fingerprint(self) -> Optional[dict]:
+        """마지막으로 연결된 장치 지문 불러오기"""
+        try:
+            with open(Config.PORT_CACHE_FILE, 'r') as f:
+                fingerprint = json.load(f)
+            return fingerprint if fingerprint.get('device') else None
+        except (OSError, ValueError, AttributeError):
+            return None
+    
+    def _save_port_fingerprint(self, device: str):
+        """연결된 장치 지문 저장 (캐시된 장치와 같으면 포트 목록 조회 생략)"""
+        cached = self._load_port_fingerprint()
+        if cached and cached['device'] == device:
+            return
+        
+        fingerprint = {'device': device}
+        for port in self._list_ports():
+            if port.device == device:
+                fingerprint.update(vid=port.vid, pid=port.pid,
+                                   serial_number=port.serial_number, description=port.description)
+                break
+        try:
+            with open(Config.PORT_CACHE_FILE, 'w') as f:
+                json.dump(fingerprint, f, indent=2)
+        except OSError as e:
+            log.warning("Serial", "Could not cache device fingerprint: %s", e, color=Colors.YELLOW)
+    
+    def _match_fingerprint(self, fingerprint: dict) -> Optional[str]:
+        """VID/PID/시리얼 번호가 일치하는 장치 경로 (USB 재열거로 경로가 바뀐 경우)"""
+        if fingerprint.get('vid') is None:
+            return None
+        for port in self._list_ports():
+            if (port.vid, port.pid) != (fingerprint['vid'], fingerprint.get('pid')):
+                continue
+            if fingerprint.get('serial_number') and port.serial_number != fingerprint['serial_number']:
+                continue
+            return port.device
+        return None
     
     def _auto_detect_port(self) -> Optional[str]:
         """Arduino 포트 자동 감지 (Windows/Linux 지원)"""
@@ -139,17 +350,8 @@ class SerialCommunicator:
             arduino_ports = []
             
             for port in ports:
-                # Arduino 식별 키워드
-                arduino_keywords = [
-                    'Arduino', 'CH340', 'CP210', 'FTDI', 
-                    'USB Serial', 'USB-SERIAL', 'ttyUSB', 'ttyACM'
-                ]
-                
-                # Windows: COM 포트, Linux/Mac: ttyUSB, ttyACM
-                port_info = f"{port.device} - {port.description} - {port.manufacturer}"
-                
                 # Arduino 관련 키워드 확인
-                if any(keyword.lower() in port_info.lower() for keyword in arduino_keywords):
+                if self._is_arduino_port(port):
                     arduino_ports.append(port)
                     print(f"{Colors.GREEN}  ✓ Found:{Colors.END} {port.device}")
                     print(f"    Description: {port.description}")
@@ -186,54 +388,317 @@ class SerialCommunicator:
             print(f"{Colors.RED}[Serial]{Colors.END} Error during port detection: {e}")
             return None
     
-    def _connect(self):
-        """시리얼 포트 연결"""
+    # ----------------------------------------------------------------------------------------------------
+    # Connection
+    # ----------------------------------------------------------------------------------------------------
+    
+    def _connect(self, device: str, require_ready: bool = False, verbose: bool = True) -> bool:
+        """시리얼 포트 연결 - 고정 대기 대신 펌웨어 준비 응답을 확인한 뒤 연결 완료"""
+        start = time.monotonic()
+        try:
+            self.arduino = serial.Serial(device, self.baud_rate, timeout=Config.SERIAL_READ_TIMEOUT)
+        except Exception as e:
+            if verbose:
+                print(f"{Colors.RED}[Serial]{Colors.END} Connection failed: {e}")
+            return False
+        
+        self.port = device
+        self.protocol = PROTOCOL_ASCII
+        self.capabilities = 0
+        self.decoder = FrameDecoder(terminator=b'\n')
+        self.ready_event.clear()
+        
+        # 수신 스레드 시작
+        self.link_up = True
+        self.running = True
+        self.receive_thread = threading.Thread(target=self._receive_loop, daemon=True)
+        self.receive_thread.start()
+        
+        if not self._wait_ready():
+            if require_ready:
+                self._disconnect()
+                return False
+            if verbose:
+                print(f"{Colors.YELLOW}[Serial]{Colors.END} No readiness reply from {device}, continuing")
+        self.connect_time = time.monotonic() - start
+        
+        if self.requested_protocol == PROTOCOL_BINARY or Config.DELTA_COMMANDS:
+            self._negotiate_protocol()
+        
+        self.is_connected = True
+        if verbose:
+            print(f"{Colors.GREEN}[Serial]{Colors.END} Connected to {device} (ready in {self.connect_time * 1000:.0f} ms)")
+        self._save_port_fingerprint(device)
+        return True
+    
+    def _wait_ready(self) -> bool:
+        """펌웨어 준비 확인
+        
+        실행 중인 펌웨어는 위치 요청에 바로 응답하고, 포트 열기로 리셋된 경우 setup() 완료 후
+        "Ready" 배너(구버전 펌웨어는 대기 중이던 요청의 응답)로 확인합니다. 부트로더가 첫 요청을
+        버린 경우를 대비해 한 번 더 요청합니다. (Arduino 수신 버퍼 64B를 넘지 않도록 최대 2회)
+        """
+        query = encode_ascii(OP_QUERY, [0] * 7).encode('utf-8')
+        for _ in range(2):
+            try:
+                with self.write_lock:
+                    self.arduino.write(query)
+            except Exception:
+                return False
+            if self.ready_event.wait(Config.READY_TIMEOUT / 2):
+                return True
+            if not self.link_up:
+                return False
+        return False
+    
+    def _disconnect(self):
+        """포트 닫기 (수신 스레드 종료 대기)"""
+        self.is_connected = False
+        self.link_up = False
+        if self.receive_thread and self.receive_thread is not threading.current_thread():
+            self.receive_thread.join(timeout=1.0)
         try:
-            self.arduino = serial.Serial(self.port, self.baud_rate, timeout=1)
-            time.sleep(2)
-            self.is_connected = True
-            print(f"{Colors.GREEN}[Serial]{Colors.END} Connected to {self.port}")
+            self.arduino.close()
+        except Exception:
+            pass
+    
+    def _handle_link_lost(self, error: Exception):
+        """연결 끊김 처리 - 포트를 닫고 재연결은 watchdog에서 수행"""
+        if not self.link_up:
+            return
+        self.is_connected = False
+        self.link_up = False
+        log.error("Serial", "Connection lost (%s), waiting for device...", error, color=Colors.RED)
+        self._fail_pending_requests(ConnectionError("Serial connection lost"))
+        try:
+            self.arduino.close()
+        except Exception:
+            pass
+    
+    def _watchdog_loop(self):
+        """연결 감시 루프 (백그라운드 스레드) - 재연결 후 on_reconnect로 상태 재동기화"""
+        interval = Config.WATCHDOG_INTERVAL
+        while not self.watchdog_stop.wait(interval):
+            if self.is_connected:
+                interval = Config.WATCHDOG_INTERVAL
+                continue
             
-            # 수신 스레드 시작
-            self.running = True
-            self.receive_thread = threading.Thread(target=self._receive_loop, daemon=True)
-            self.receive_thread.start()
+            if self.receive_thread:
+                self.receive_thread.join(timeout=1.0)
+            if not self._open_link(reconnect=True):
+                interval = min(interval * 2, Config.WATCHDOG_MAX_BACKOFF)
+                continue
+            if self.watchdog_stop.is_set():
+                self._disconnect()
+                return
             
-        except Exception as e:
-            self.is_connected = False
-            print(f"{Colors.RED}[Serial]{Colors.END} Connection failed: {e}")
+            interval = Config.WATCHDOG_INTERVAL
+            self.reconnects += 1
+            Config.SIMULATION_MODE = False
+            log.info("Serial", "Reconnected to %s (ready in %.0f ms)", self.port, self.connect_time * 1000,
+                     color=Colors.GREEN)
+            if self.on_reconnect:
+                try:
+                    self.on_reconnect()
+                except Exception as e:
+                    log.error("Serial", "Resync failed: %s", e, color=Colors.RED)
+    
+    
+    def _negotiate_protocol(self):
+        """방언 협상 + 기능 확인 - 펌웨어가 응답하지 않으면 ASCII 방언, Delta 명령 미사용
+
+        응답 "Protocol:<방언>,<CAPS>"의 CAPS에 CAP_DELTA가 있어야 opcode 5를 전송합니다.
+        (CAPS 없이 응답하거나 opcode 4를 무시하는 구버전 펌웨어는 opcode 5도 처리하지 않음)
+        """
+        binary = self.requested_protocol == PROTOCOL_BINARY
+        
+        # 협상 요청은 항상 ASCII로 전송 (구버전 펌웨어는 opcode 4를 무시함)
+        # 응답은 수신 스레드가 protocol_event로 전달 (UI 루프의 큐 소비와 무관)
+        self.protocol_event.clear()
+        self.protocol_ack = None
+        with self.write_lock:
+            self.arduino.write(encode_ascii(OP_PROTOCOL, [1 if binary else 0]).encode('utf-8'))
+        acked = self.protocol_event.wait(Config.PROTOCOL_HANDSHAKE_TIMEOUT) and self.protocol_ack
+        
+        self.capabilities = reply_capabilities(self.protocol_ack) if acked else 0
+        if Config.DELTA_COMMANDS:
+            if self.capabilities & CAP_DELTA:
+                log.info("Serial", "Delta commands enabled", color=Colors.GREEN)
+            else:
+                log.warning("Serial", "Delta commands not supported by firmware, sending full positions",
+                            color=Colors.YELLOW)
+        
+        if not binary:
+            return
+        if acked and self.protocol_ack[0] == 1:
+            self.protocol = PROTOCOL_BINARY
+            self.decoder.ascii_lines = False  # 이후 응답은 모두 Binary 프레임
+            log.info("Serial", "Binary protocol enabled", color=Colors.GREEN)
+            return
+        
+        self.protocol = PROTOCOL_ASCII
+        log.warning("Serial", "Binary protocol not supported by firmware, using ASCII", color=Colors.YELLOW)
     
     def _receive_loop(self):
-        """데이터 수신 루프 (백그라운드 스레드)"""
-        while self.running and self.is_connected:
+        """데이터 수신 루프 (백그라운드 스레드)
+
+        최소 1바이트가 도착할 때까지 블로킹 읽기 후, 버퍼에 쌓인 데이터를 한 번에 읽어
+        파싱된 Reply 레코드로 큐에 넣습니다. (in_waiting 폴링 busy-spin 없음)
+        """
+        while self.running and self.link_up:
             try:
-                if self.arduino and self.arduino.in_waiting:
-                    data = self.arduino.readline().decode('utf-8').strip()
-                    if data:
-                        self.receive_queue.put(data)
+                # 블로킹 읽기 (SERIAL_READ_TIMEOUT 동안 데이터가 없으면 빈 bytes 반환)
+                try:
+                    chunk = self.arduino.read(max(1, self.arduino.in_waiting))
+                except (serial.SerialException, OSError) as e:
+                    self._handle_link_lost(e)
+                    break
+                timestamp = time.monotonic()
+                
+                if chunk:
+                    self.telemetry.on_rx(len(chunk), timestamp)
+                
+                for message in self.decoder.feed(chunk):
+                    reply = parse_reply(message, timestamp)
+                    if reply.kind in (REPLY_FEEDBACK, REPLY_POSITIONS):
+                        self.telemetry.on_position_sample(reply.values, timestamp)
+                        self.ready_event.set()
+                    elif reply.kind == REPLY_TEXT and reply.text == READY_BANNER:
+                        self.ready_event.set()
+                    elif reply.kind == REPLY_PROTOCOL:
+                        self.protocol_ack = reply.values
+                        self.protocol_event.set()
+                    elif reply.kind in (REPLY_BUS_FEEDBACK, REPLY_BUS_POSITIONS):
+                        self.ready_event.set()
+                        if self.bus_handler:
+                            self.bus_handler(reply)
+                            continue
+                    # 대기 중인 위치 요청의 응답은 큐 대신 Future로 전달
+                    if reply.kind == REPLY_POSITIONS and self._resolve_request(reply):
+                        continue
+                    self.receive_queue.put(reply)
+                
+                self.telemetry.set_queue_depth(self.receive_queue.qsize())
+                
+                if self.pending_requests:
+                    self._expire_requests(timestamp)
             except Exception as e:
-                print(f"{Colors.RED}[Serial Read]{Colors.END} {e}")
+                log.error("Serial Read", "%s", e, color=Colors.RED)
                 time.sleep(0.1)
     
+    @staticmethod
+    def _settle(future: Future, result=None, exception: Exception = None):
+        """Future 완료 처리 (이미 취소/완료된 경우 무시)"""
+        try:
+            if exception is not None:
+                future.set_exception(exception)
+            else:
+                future.set_result(result)
+        except InvalidStateError:
+            pass
+    
+    def _resolve_request(self, reply: Reply) -> bool:
+        """가장 오래된 위치 요청에 응답 전달"""
+        with self.request_lock:
+            if not self.pending_requests:
+                return False
+            request = self.pending_requests.popleft()
+        
+        # 타임아웃된 요청의 늦은 응답은 버림 (슬롯을 유지해 순서 대응을 맞춤)
+        if not request.future.done():
+            self.telemetry.on_query_reply(reply.timestamp - request.sent_time)
+            self._settle(request.future, list(reply.values))
+        return True
+    
+    def _expire_requests(self, now: float):
+        """타임아웃된 위치 요청 처리"""
+        expired = []
+        with self.request_lock:
+            for request in self.pending_requests:
+                if now >= request.deadline and not request.future.done():
+                    expired.append(request.future)
+            # 응답이 유실된 오래된 슬롯 정리
+            while self.pending_requests and now >= self.pending_requests[0].deadline + Config.REQUEST_STALE_TIME:
+                self.pending_requests.popleft()
+        
+        for future in expired:
+            self._settle(future, exception=TimeoutError("Positions reply timeout"))
+    
+    def request_positions(self, timeout: float = Config.POSITION_QUERY_TIMEOUT) -> Future:
+        """현재 위치 요청 - Positions 응답 수신 시 완료되는 Future 반환 (블로킹 없음)"""
+        future = Future()
+        now = time.monotonic()
+        request = PendingRequest(future, now + timeout, now)
+        
+        # 요청 등록과 전송 순서는 query_lock으로 맞추고, 전송은 request_lock 밖에서 수행
+        # (쓰기 실패 시 _handle_link_lost -> _fail_pending_requests가 request_lock을 다시 잡음)
+        with self.query_lock:
+            with self.request_lock:
+                self.pending_requests.append(request)
+            sent = self.send_command(OP_QUERY, [0] * 7)
+        
+        if not sent:
+            with self.request_lock:
+                if request in self.pending_requests:
+                    self.pending_requests.remove(request)
+            self._settle(future, exception=ConnectionError("Serial link unavailable"))
+        return future
+    
+    async def query_positions(self, timeout: float = Config.POSITION_QUERY_TIMEOUT) -> List[int]:
+        """asyncio용 위치 요청 (예: positions = await serial.query_positions())"""
+        return await asyncio.wrap_future(self.request_positions(timeout))
+    
     def send(self, command: str) -> bool:
-        """명령 전송"""
+        """명령 전송 (ASCII 문자열 그대로 전송)"""
+        return self._write(command.encode('utf-8'), command)
+    
+    def send_command(self, opcode: int, values: List[int]) -> bool:
+        """명령 전송 (현재 프로토콜 방언으로 인코딩)"""
+        targets = values if opcode == OP_MOVE else None
+        return self._write(encode_command(opcode, values, self.protocol), CommandText(opcode, values), targets)
+    
+    def send_positions(self, positions: List[int], encoder: Optional[DeltaEncoder] = None) -> bool:
+        """위치 명령 전송 - encoder가 있고 펌웨어가 Delta를 지원하면 변경된 관절만 전송 (주기적으로 전체 Keyframe)"""
+        if encoder is None or not self.capabilities & CAP_DELTA:
+            return self.send_command(OP_MOVE, positions)
+        
+        packet, description = encoder.encode(positions, self.protocol)
+        if packet is None:
+            return True
+        if not self._write(packet, description, positions):
+            encoder.reset()  # 장치 상태를 알 수 없으므로 다음 명령은 Keyframe
+            return False
+        return True
+    
+    def send_bus_command(self, opcode: int, arms: List[Tuple[int, List[int]]]) -> bool:
+        """여러 팔 명령을 Bus 프레임 하나로 전송 (방언과 무관하게 Binary)"""
+        description = f"Bus {opcode} arms {[arm for arm, _ in arms]}"
+        return self._write(encode_bus_frame(opcode, arms), description)
+    
+    def _write(self, packet: bytes, description, targets: Optional[List[int]] = None) -> bool:
+        """패킷 쓰기 (description은 로그 출력 시에만 문자열로 변환)"""
         if Config.SIMULATION_MODE:
-            print(f"{Colors.GRAY}[TX Simulated]{Colors.END} {command}")
+            log.info("TX Simulated", "%s", description, color=Colors.GRAY)
             return False
         
         if not self.is_connected:
             return False
         
         try:
-            self.arduino.write(command.encode('utf-8'))
-            print(f"{Colors.GREEN}[TX]{Colors.END} {command}")
+            with self.write_lock:
+                self.arduino.write(packet)
+                self.telemetry.on_tx(len(packet), targets)
+            log.info("TX", "%s", description, color=Colors.GREEN)
             return True
+        except (serial.SerialException, OSError) as e:
+            self._handle_link_lost(e)
+            return False
         except Exception as e:
-            print(f"{Colors.RED}[Serial TX]{Colors.END} {e}")
+            log.error("Serial TX", "%s", e, color=Colors.RED)
             return False
     
-    def get_received_data(self) -> Optional[str]:
-        """수신 큐에서 데이터 가져오기"""
+    def get_received_data(self) -> Optional[Reply]:
+        """수신 큐에서 파싱된 레코드 가져오기"""
         if Config.SIMULATION_MODE:
             return None
         
@@ -241,8 +706,32 @@ class SerialCommunicator:
             return self.receive_queue.get()
         return None
     
+    def drain_received(self) -> List[Reply]:
+        """수신 큐에 쌓인 레코드를 한 번에 모두 가져오기 (도착 순서)"""
+        replies = []
+        if Config.SIMULATION_MODE:
+            return replies
+        
+        while True:
+            try:
+                replies.append(self.receive_queue.get_nowait())
+            except Empty:
+                break
+        return replies
+    
+    def _fail_pending_requests(self, error: Exception):
+        """응답 대기 중인 요청 실패 처리"""
+        with self.request_lock:
+            pending = list(self.pending_requests)
+            self.pending_requests.clear()
+        for request in pending:
+            self._settle(request.future, exception=error)
+    
     def close(self):
         """연결 종료"""
+        self.watchdog_stop.set()
+        self.watchdog_thread.join(timeout=1.0)
+        
         if Config.SIMULATION_MODE:
             return
         
@@ -251,14 +740,293 @@ class SerialCommunicator:
         if self.receive_thread:
             self.receive_thread.join(timeout=1.0)
         
+        self._fail_pending_requests(ConnectionError("Serial connection closed"))
+        
         if self.arduino and self.is_connected:
             try:
                 self.arduino.close()
-                print(f"{Colors.BLUE}[Serial]{Colors.END} Connection closed")
+                log.info("Serial", "Connection closed", color=Colors.BLUE)
             except Exception as e:
-                print(f"{Colors.RED}[Serial Close]{Colors.END} {e}")
+                log.error("Serial Close", "%s", e, color=Colors.RED)
         
         self.is_connected = False
+        self.link_up = False
+
+# ========================================================================================================
+# Transmit Scheduler Class
+# ========================================================================================================
+
+class TransmitScheduler:
+    """위치 명령 전송 스케줄러 (최신 값 우선, 고정 최대 전송률)
+
+    키 반복/프리셋/추종 루프에서 들어오는 위치 명령을 관절별 최신 값으로 덮어쓰고,
+    TX_RATE_HZ 주기로 한 패킷만 전송합니다. 직전 전송 값과 같으면 전송하지 않습니다.
+    Delta 모드에서는 변경된 관절만 전송합니다. (DeltaEncoder)
+    """
+    
+    def __init__(self, serial_comm: SerialCommunicator, rate_hz: float = Config.TX_RATE_HZ, num_joints: int = 7,
+                 delta: bool = Config.DELTA_COMMANDS):
+        self.serial = serial_comm
+        self.period = 1.0 / rate_hz
+        self.encoder = DeltaEncoder(Config.KEYFRAME_INTERVAL) if delta else None
+        
+        self._cond = threading.Condition()
+        self._send_lock = threading.Lock()  # 꺼내기 + 인코딩 + 전송 직렬화 (전송 스레드 / flush / resync)
+        self._pending = [0] * num_joints
+        self._dirty = False
+        self._last_sent = None
+        self._last_send_time = 0.0
+        
+        # 통계 카운터
+        self.sent = 0
+        self.coalesced = 0
+        self.dropped = 0
+        
+        self.running = True
+        self.thread = threading.Thread(target=self._transmit_loop, daemon=True)
+        self.thread.start()
+    
+    def submit(self, positions: List[int]):
+        """전체 관절 목표 위치 등록 (전송 전이면 이전 값을 덮어씀)"""
+        positions = [int(p) for p in positions]
+        with self._cond:
+            if self._dirty:
+                self.coalesced += 1
+            elif positions == self._last_sent:
+                self.dropped += 1
+                return
+            self._pending = positions
+            self._dirty = True
+            self._cond.notify()
+    
+    def submit_joint(self, joint_index: int, position: int):
+        """단일 관절 목표 위치 등록"""
+        with self._cond:
+            base = self._pending if self._dirty or self._last_sent is None else self._last_sent
+            positions = list(base)
+        positions[joint_index] = int(position)
+        self.submit(positions)
+    
+    def _take_pending(self) -> Optional[List[int]]:
+        """전송할 값 꺼내기 (직전 전송 값과 같으면 None)"""
+        with self._cond:
+            if not self._dirty:
+                return None
+            self._dirty = False
+            if self._pending == self._last_sent:
+                self.dropped += 1
+                return None
+            return list(self._pending)
+    
+    def _transmit_pending(self):
+        """대기 중인 값 전송 - 다른 스레드의 flush()와 겹치면 DeltaEncoder 기준값과 _last_sent가
+        실제 전송 순서와 어긋나므로 _send_lock 안에서 꺼내고 전송합니다."""
+        with self._send_lock:
+            positions = self._take_pending()
+            if positions is None:
+                return
+            if self.serial.send_positions(positions, self.encoder):
+                self.sent += 1
+                with self._cond:
+                    self._last_sent = positions
+            self._last_send_time = time.monotonic()
+    
+    def _transmit_loop(self):
+        """전송 루프 (백그라운드 스레드)"""
+        while self.running:
+            with self._cond:
+                while self.running and not self._dirty:
+                    self._cond.wait()
+            
+            # 최소 전송 간격 유지 (대기 중 들어온 명령은 최신 값으로 합쳐짐)
+            delay = self._last_send_time + self.period - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            
+            self._transmit_pending()
+    
+    def flush(self):
+        """대기 중인 명령 즉시 전송"""
+        self._transmit_pending()
+    
+    def resync(self, positions: List[int]):
+        """재연결 후 목표 위치 즉시 재전송 (직전 전송 값과 같아도 전송)"""
+        with self._send_lock:
+            with self._cond:
+                self._last_sent = None
+            if self.encoder:
+                self.encoder.reset()
+        self.submit(positions)
+        self.flush()
+    
+    def get_stats(self) -> dict:
+        """전송 통계 반환"""
+        stats = {'sent': self.sent, 'coalesced': self.coalesced, 'dropped': self.dropped}
+        if self.encoder:
+            stats.update(keyframes=self.encoder.keyframes, deltas=self.encoder.deltas, bytes=self.encoder.bytes)
+        return stats
+    
+    def stop(self):
+        """스케줄러 종료 (남은 명령 전송)"""
+        with self._cond:
+            self.running = False
+            self._cond.notify()
+        self.thread.join(timeout=1.0)
+        self.flush()
+
+# ========================================================================================================
+# Joint State
+# ========================================================================================================
+
+class JointSnapshot:
+    """렌더러용 관절 상태 스냅샷 (읽기 전용 배열 뷰, JointState.publish() 시점 값)"""
+    
+    __slots__ = ('current', 'target', 'velocity', 'torque', 'state')
+    
+    def __init__(self, buffer: np.ndarray):
+        for row, name in enumerate(self.__slots__):
+            view = buffer[row]
+            view.flags.writeable = False
+            setattr(self, name, view)
+
+class JointView:
+    """관절 1개의 읽기 전용 뷰 - 기존 get_motor_info() dict와 같은 키로 접근 (프레임마다 할당 없음)"""
+    
+    __slots__ = ('index', 'name', 'min', 'max', '_snapshot')
+    
+    def __init__(self, motor: MotorConfig, snapshot: JointSnapshot):
+        self.index = motor.index
+        self.name = motor.name
+        self.min = motor.min_val
+        self.max = motor.max_val
+        self._snapshot = snapshot
+    
+    def __getitem__(self, key: str):
+        return getattr(self, key)
+    
+    @property
+    def current(self) -> float:
+        return self._snapshot.current[self.index]
+    
+    @property
+    def target(self) -> float:
+        return self._snapshot.target[self.index]
+    
+    @property
+    def angle(self) -> float:
+        # 0-1023 범위를 0-300도로 변환
+        return self._snapshot.current[self.index] / 1023.0 * 300.0
+    
+    @property
+    def velocity(self) -> float:
+        return self._snapshot.velocity[self.index]
+    
+    @property
+    def state(self) -> MotorState:
+        return MOTOR_STATES[int(self._snapshot.state[self.index])]
+    
+    @property
+    def torque_enabled(self) -> bool:
+        return bool(self._snapshot.torque[self.index])
+
+class JointState:
+    """관절 상태 배열 (목표/표시/현재 위치, 속도, 토크, 상태)
+    
+    관절별 Python 리스트 대신 고정 크기 NumPy 배열로 보관하고, UI 스무딩과 MotorConfig
+    리밋 클램프를 벡터 연산으로 처리합니다. 연산 버퍼를 미리 할당해 프레임마다 새 배열을
+    만들지 않으며, 렌더러는 publish() 시점의 읽기 전용 스냅샷만 읽습니다.
+    
+    스냅샷은 제어 스레드(publish)와 UI 스레드(read_snapshot) 사이에서 잠금 없이 전달됩니다.
+    publish()는 이중 버퍼 중 발행되지 않은 쪽에 쓴 뒤 발행 번호를 올리고, read_snapshot()은
+    발행된 버퍼를 렌더러 버퍼로 복사한 뒤 그 사이 발행 번호가 바뀌었으면 다시 복사합니다. (seqlock)
+    """
+    
+    SETTLE_TOLERANCE = 0.5  # 이 이내면 표시 위치를 목표 위치로 맞춤
+    MOVING_TOLERANCE = 2.0  # 이 이상 차이나면 MOVING 상태
+    
+    def __init__(self, motors: List[MotorConfig]):
+        count = len(motors)
+        self.min = np.array([m.min_val for m in motors], dtype=np.float64)
+        self.max = np.array([m.max_val for m in motors], dtype=np.float64)
+        self.default = np.array([m.default_pos for m in motors], dtype=np.float64)
+        
+        self.target = self.default.copy()
+        self.display = self.default.copy()  # UI 표시용 부드러운 위치
+        self.current = self.default.copy()
+        self.velocity = np.zeros(count)
+        self.torque = np.ones(count, dtype=bool)
+        self.state = np.full(count, STATE_CODES[MotorState.IDLE], dtype=np.int8)
+        
+        # 연산 버퍼
+        self._diff = np.empty(count)
+        self._abs = np.empty(count)
+        self._settled = np.empty(count, dtype=bool)
+        self._mask = np.empty(count, dtype=bool)
+        
+        # 렌더러용 스냅샷 (current, target, velocity, torque, state)
+        self._published = [np.zeros((len(JointSnapshot.__slots__), count)) for _ in range(2)]
+        self.sequence = 0  # 발행 번호 (발행된 버퍼 = _published[sequence % 2])
+        self._snapshot_buffer = np.zeros((len(JointSnapshot.__slots__), count))
+        self.snapshot = JointSnapshot(self._snapshot_buffer)
+        self.publish()
+        self.read_snapshot()
+    
+    def clamp_targets(self):
+        """목표 위치를 MotorConfig min/max 범위로 제한"""
+        np.clip(self.target, self.min, self.max, out=self.target)
+    
+    def set_state(self, index: int, state: MotorState):
+        self.state[index] = STATE_CODES[state]
+    
+    def smooth(self, smoothness: float, track_velocity: bool = True):
+        """표시 위치를 목표 위치로 부드럽게 이동하고 상태/속도 갱신"""
+        diff, distance, settled, mask = self._diff, self._abs, self._settled, self._mask
+        
+        np.subtract(self.target, self.display, out=diff)
+        np.abs(diff, out=distance)
+        np.less_equal(distance, self.SETTLE_TOLERANCE, out=settled)
+        np.multiply(diff, smoothness, out=diff)
+        np.add(self.display, diff, out=self.display)
+        np.copyto(self.display, self.target, where=settled)
+        
+        # 상태: 도착하면 MOVING -> IDLE, 이동 중이면 (AT_LIMIT 제외) MOVING
+        np.subtract(self.target, self.display, out=diff)
+        np.abs(diff, out=distance)
+        np.less(distance, self.MOVING_TOLERANCE, out=settled)
+        np.equal(self.state, STATE_CODES[MotorState.MOVING], out=mask)
+        np.logical_and(mask, settled, out=mask)
+        np.copyto(self.state, STATE_CODES[MotorState.IDLE], where=mask)
+        np.not_equal(self.state, STATE_CODES[MotorState.AT_LIMIT], out=mask)
+        np.logical_not(settled, out=settled)
+        np.logical_and(mask, settled, out=mask)
+        np.copyto(self.state, STATE_CODES[MotorState.MOVING], where=mask)
+        
+        # 속도 (Normal 모드에서만 목표까지 남은 거리 표시)
+        if track_velocity:
+            np.copyto(self.velocity, distance)
+        else:
+            self.velocity.fill(0.0)
+        
+        np.copyto(self.current, self.display)
+    
+    def publish(self):
+        """렌더러용 스냅샷 발행 (제어 스레드)"""
+        buffer = self._published[(self.sequence + 1) % 2]
+        np.copyto(buffer[0], self.current)
+        np.copyto(buffer[1], self.target)
+        np.copyto(buffer[2], self.velocity)
+        np.copyto(buffer[3], self.torque)
+        np.copyto(buffer[4], self.state)
+        self.sequence += 1
+    
+    def read_snapshot(self) -> int:
+        """발행된 최신 스냅샷을 렌더러 버퍼(snapshot)로 복사 -> 발행 번호 (UI 스레드)"""
+        while True:
+            sequence = self.sequence
+            np.copyto(self._snapshot_buffer, self._published[sequence % 2])
+            # 복사 중 다음 발행이 시작되었으면 (같은 버퍼에 쓰고 있을 수 있음) 다시 복사
+            if self.sequence == sequence:
+                return sequence
 
 # ========================================================================================================
 # Motor Controller Class
@@ -278,139 +1046,334 @@ class MotorController:
             MotorConfig(6, "Hand", 370, 695, 512),
         ]
         
-        self.current_positions = [m.default_pos for m in self.motors]
-        self.target_positions = [m.default_pos for m in self.motors]
-        self.motor_states = [MotorState.IDLE] * len(self.motors)
-        self.velocities = [0.0] * len(self.motors)
+        # 관절 상태 배열 (current/target/display_positions, velocities, torque_enabled는 이 배열의 뷰)
+        self.joints = JointState(self.motors)
+        self.joint_views = [JointView(m, self.joints.snapshot) for m in self.motors]
         self.all_torque_enabled = True
-        self.torque_enabled = [True] * len(self.motors)
         self.is_passivity_first = False
         self.passivity_initialized_motors = [False] * 7
         self.last_feedback_log_time = 0
         self.feedback_log_interval = 500
         
+        # 피드백 처리 통계 (틱마다 큐를 모두 비우고 최신 자세만 적용)
+        self.feedback_samples = deque(maxlen=Config.FEEDBACK_SAMPLE_BUFFER)  # 로깅 대기 (timestamp, values)
+        self.feedback_backlog = 0  # 직전 틱에서 비운 레코드 수
+        self.feedback_staleness = None  # 적용된 샘플의 나이 (s)
+        self.last_feedback: Optional[List[int]] = None  # 마지막으로 적용한 피드백 (Normal 모드: None)
+        self._target_probe: Optional[Future] = None  # 목표 도달 지연 측정용 위치 요청 (Normal 모드)
+        self._last_target_probe = 0.0
+        
+        # Teach Pendant 기록/재생 (Passivity 모드 피드백 샘플을 모두 기록)
+        self.recorder = TrajectoryRecorder(len(self.motors))
+        self.last_recording: Optional[Recording] = None
+        self.replay_speed = 1.0
+        
         # UI 표시용 부드러운 위치 (모든 모드에서 사용)
-        self.display_positions = [m.default_pos for m in self.motors]
         self.ui_smoothness = 0.15  # UI 부드러움 계수
         
+        # 충돌 검사 (거부된 명령은 마지막 안전한 목표 위치로 되돌림)
+        self.collision_checker = CollisionChecker(margin=Config.COLLISION_MARGIN) if Config.COLLISION_CHECK else None
+        self.motion_planner = (MotionPlanner(self.collision_checker, time_limit=Config.PLANNER_TIME_LIMIT)
+                               if self.collision_checker is not None and Config.MOTION_PLANNER else None)
+        self.last_safe_target = self.joints.target.copy()
+        self.rejected_commands = 0
+        self.pending_rejections = deque()  # UI/로그 보고 대기 중인 거부 사유
+        
         self.default_preset = [m.default_pos for m in self.motors]
-        self.custom_presets = self._load_custom_presets()
-        self.serial = SerialCommunicator()
-        self.waiting_for_positions = False
-        self.passivity_presets = []
+        # 자세 라이브러리는 UI 스레드에서 사용 (파일 쓰기는 라이브러리의 쓰기 스레드가 수행)
+        self.pose_library = PoseLibrary(Config.POSE_LIBRARY_FILE, background=True, on_error=self._on_library_error)
+        self.serial = self._open_link()
+        self.via_broker = isinstance(self.serial, BrokerClient)
+        # 브로커 사용 시 Delta 인코딩은 브로커의 전송 스케줄러가 담당
+        self.tx_scheduler = TransmitScheduler(self.serial, num_joints=len(self.motors),
+                                              delta=Config.DELTA_COMMANDS and not self.via_broker)
+        self.trajectory_streamer = TrajectoryStreamer(self.tx_scheduler.submit, Config.TRAJECTORY_RATE_HZ)
+        self.pending_preset_saves = []  # [(pose_name, tags, Future)] - Passivity 모드 자세 저장 요청 (UI 스레드)
+        self.serial.on_reconnect = self.resync_after_reconnect  # ControlLoop이 제어 스레드로 넘기도록 교체
         
         # Production 모드: 피드백 요청 중단
         if not Config.PASSIVITY_MODE and not Config.SIMULATION_MODE:
-            self.serial.send("2,0,0,0,0,0,0,0*")
+            self.serial.send_command(OP_FEEDBACK, [0])
 
-    def _load_custom_presets(self) -> dict:
-        """사용자 지정 프리셋 불러오기"""
-        try:
-            with open('custom_presets.json', 'r') as f:
-                presets = json.load(f)
-                if len(presets) > 4:
-                    presets = dict(list(presets.items())[:4])
-                return presets
-        except FileNotFoundError:
-            # 기본 Custom 프리셋
-            return {
-                "Custom 1": [512, 512, 380, 800, 700, 512, 512],
-                "Custom 2": [512, 512, 380, 800, 700, 512, 512],
-                "Custom 3": [512, 512, 380, 800, 700, 512, 512],
-                "Custom 4": [512, 512, 380, 800, 700, 512, 512],
-            }
+    # ----------------------------------------------------------------------------------------------------
+    # Joint State Views
+    # ----------------------------------------------------------------------------------------------------
+    
+    @property
+    def target_positions(self) -> np.ndarray:
+        return self.joints.target
+    
+    @target_positions.setter
+    def target_positions(self, values):
+        self.joints.target[:] = values
+    
+    @property
+    def current_positions(self) -> np.ndarray:
+        return self.joints.current
+    
+    @current_positions.setter
+    def current_positions(self, values):
+        self.joints.current[:] = values
+    
+    @property
+    def display_positions(self) -> np.ndarray:
+        return self.joints.display
+    
+    @display_positions.setter
+    def display_positions(self, values):
+        self.joints.display[:] = values
+    
+    @property
+    def velocities(self) -> np.ndarray:
+        return self.joints.velocity
+    
+    @property
+    def torque_enabled(self) -> np.ndarray:
+        return self.joints.torque
+    
+    @torque_enabled.setter
+    def torque_enabled(self, values):
+        self.joints.torque[:] = values
+    
+    def _open_link(self):
+        """브로커가 실행 중이면 브로커에 연결, 아니면 시리얼 포트를 직접 연결"""
+        if Config.USE_BROKER:
+            client = BrokerClient.attach("dashboard", PRIORITY_DASHBOARD)
+            if client:
+                Config.SIMULATION_MODE = False
+                log.info("Serial", "Attached to broker (%s)", client.port, color=Colors.GREEN)
+                return client
+        return SerialCommunicator()
+    
+    @staticmethod
+    def _on_library_error(error: Exception):
+        log.error("Preset", "Could not write pose library: %s", error, color=Colors.RED)
     
     def save_custom_preset(self, slot_index: int):
-        """현재 위치를 Custom 프리셋으로 저장 (slot_index: 0~3)"""
+        """현재 위치를 Custom 프리셋으로 저장 (slot_index: 0~3, 자세 라이브러리의 'slot' 태그 자세)"""
         if 0 <= slot_index < 4:
-            preset_name = f"Custom {slot_index + 1}"
-            if not Config.PASSIVITY_MODE:
-                self.custom_presets[preset_name] = [int(p) for p in self.target_positions.copy()]
-                with open('custom_presets.json', 'w') as f:
-                    json.dump(self.custom_presets, f, indent=2)
-                print(f"{Colors.GREEN}[Preset]{Colors.END} Saved '{preset_name}'")
-                return True
-            else:
-                # Passivity 모드에서는 즉시 현재 위치 요청
-                self.waiting_for_positions = True
-                self.passivity_presets = []
-                command = f"3,0,0,0,0,0,0,0*"  # 7개 모터
-                self.serial.send(command)
-                print(f"{Colors.YELLOW}[Preset]{Colors.END} Requesting positions for '{preset_name}'...")
-                
-                # 응답 대기 (최대 1초)
-                timeout = time.time() + 1.0
-                while time.time() < timeout:
-                    self.process_feedback()
-                    if self.passivity_presets:
-                        self.custom_presets[preset_name] = [int(p) for p in self.passivity_presets.copy()]
-                        with open('custom_presets.json', 'w') as f:
-                            json.dump(self.custom_presets, f, indent=2)
-                        print(f"{Colors.GREEN}[Preset]{Colors.END} Saved '{preset_name}' in passivity mode")
-                        self.passivity_presets = []
-                        self.waiting_for_positions = False
-                        return True
-                    time.sleep(0.01)
-                
-                self.waiting_for_positions = False
-                print(f"{Colors.RED}[Preset]{Colors.END} Failed to save preset - timeout")
-                return False
+            return self.save_pose(f"Custom {slot_index + 1}", ("slot",))
         return False
     
-    def load_default_preset(self) -> bool:
-        """Default 프리셋으로 이동 - Passivity 모드에서는 비활성화"""
-        if Config.PASSIVITY_MODE:
-            print(f"{Colors.YELLOW}[Preset]{Colors.END} Cannot load preset in passivity mode")
-            return False
-        
-        self.target_positions = [float(p) for p in self.default_preset.copy()]
-        self.send_control_command()
+    def save_pose(self, pose_name: str, tags=()) -> bool:
+        """현재 위치를 자세 라이브러리에 저장 (같은 이름은 덮어씀, UI 스레드)
+
+        목표 위치는 제어 스레드가 발행한 스냅샷에서 읽으며, 파일 쓰기는 라이브러리의 쓰기 스레드가 합니다.
+        Passivity 모드에서는 위치 요청만 보내고 즉시 반환합니다.
+        저장은 응답 수신 후 poll_preset_saves()에서 완료됩니다.
+        """
+        if not Config.PASSIVITY_MODE:
+            self.pose_library.put(pose_name, self.joints.snapshot.target, tags)
+            log.info("Preset", "Saved '%s' (%d poses)", pose_name, len(self.pose_library), color=Colors.GREEN)
+            return True
+        # Passivity 모드에서는 현재 위치 요청 (응답은 비동기로 처리)
+        future = self.serial.request_positions(Config.POSITION_QUERY_TIMEOUT)
+        self.pending_preset_saves.append((pose_name, tags, future))
+        log.info("Preset", "Requesting positions for '%s'...", pose_name, color=Colors.YELLOW)
         return True
     
-    def load_custom_preset(self, slot_index: int) -> bool:
-        """Custom 프리셋으로 이동 - Passivity 모드에서는 비활성화"""
+    def poll_preset_saves(self) -> List[Tuple[str, bool]]:
+        """완료된 Passivity 모드 자세 저장 요청 처리 - [(pose_name, success)] 반환 (UI 스레드)"""
+        completed = []
+        still_pending = []
+        
+        for pose_name, tags, future in self.pending_preset_saves:
+            if not future.done():
+                still_pending.append((pose_name, tags, future))
+                continue
+            
+            try:
+                positions = future.result()
+            except Exception as e:
+                log.error("Preset", "Failed to save preset - %s", e, color=Colors.RED)
+                completed.append((pose_name, False))
+                continue
+            
+            self.pose_library.put(pose_name, positions[:len(self.motors)], tags)
+            log.info("Preset", "Saved '%s' in passivity mode", pose_name, color=Colors.GREEN)
+            completed.append((pose_name, True))
+        
+        self.pending_preset_saves = still_pending
+        return completed
+    
+    def nearest_pose(self) -> Optional[Tuple[str, float]]:
+        """현재 위치(발행된 스냅샷)에서 가장 가까운 저장 자세 -> (이름, 거리 ticks)"""
+        nearest = self.pose_library.nearest(self.joints.snapshot.current)
+        if not nearest:
+            return None
+        pose, distance = nearest[0]
+        return pose.name, distance
+    
+    def preset_positions(self, slot_index: Optional[int] = None) -> Optional[List[int]]:
+        """프리셋 위치 (None: Default, 0~3: Custom 슬롯) - Passivity 모드에서는 None (UI 스레드)"""
         if Config.PASSIVITY_MODE:
-            print(f"{Colors.YELLOW}[Preset]{Colors.END} Cannot load preset in passivity mode")
-            return False
+            log.warning("Preset", "Cannot load preset in passivity mode", color=Colors.YELLOW)
+            return None
         
+        if slot_index is None:
+            return self.default_preset
         if 0 <= slot_index < 4:
             preset_name = f"Custom {slot_index + 1}"
-            if preset_name in self.custom_presets:
-                self.target_positions = [float(p) for p in self.custom_presets[preset_name].copy()]
-                self.send_control_command()
-                return True
-        return False
+            # 저장하지 않은 슬롯은 Default 위치
+            if preset_name in self.pose_library:
+                return self.pose_library[preset_name]
+            return self.default_preset
+        return None
+    
+    def begin_move(self) -> np.ndarray:
+        """진행 중인 궤적을 멈추고 새 궤적의 출발 위치 반환 (제어 스레드)
+        
+        진행 중인 궤적이 있으면 마지막으로 전송한 지점에서 새 궤적을 시작합니다.
+        """
+        start = self.trajectory_streamer.cancel()
+        if start is None:
+            return self.target_positions.copy()
+        np.copyto(self.last_safe_target, start)
+        return start
+    
+    def plan_move(self, start, positions: List[int]) -> MovePlan:
+        """프리셋 이동 계획 - 동기화된 궤적 생성, 충돌 검사, 필요 시 우회 경로 계획 (제어 스레드 외부)
+        
+        컨트롤러 상태는 바꾸지 않으므로 UI 스레드에서 실행하고, 결과만 apply_move()로 제어 스레드에 넘깁니다.
+        """
+        target = np.clip(np.asarray(positions, dtype=np.float64), self.joints.min, self.joints.max)  # 소프트웨어 엔드스탑
+        if Config.TRAJECTORY_PROFILE is None or Config.SIMULATION_MODE:
+            return MovePlan(start, target)
+        
+        trajectory = plan_trajectory(start, target, Config.TRAJECTORY_RATE_HZ,
+                                     Config.TRAJECTORY_MAX_VELOCITY, Config.TRAJECTORY_MAX_ACCELERATION,
+                                     Config.TRAJECTORY_PROFILE)
+        # 궤적 전체 샘플을 한 번에 검사 (충돌 시 우회 경로 계획, 실패하면 출발 위치 유지)
+        if self.collision_checker is not None:
+            hit = self.collision_checker.first_collision(trajectory.positions)
+            if hit is not None and self.motion_planner is not None:
+                trajectory = self._plan_around(start, target, hit[1]) or trajectory
+                hit = self.collision_checker.first_collision(trajectory.positions)
+            if hit is not None:
+                index, reason = hit
+                return MovePlan(start, target, rejection=f"Preset rejected: {reason} at "
+                                                         f"{(index + 1) * trajectory.period:.2f} s")
+        return MovePlan(start, target, trajectory)
+    
+    def apply_move(self, plan: MovePlan) -> bool:
+        """계획된 프리셋 이동 적용 - 목표 위치 설정 후 궤적 스트리밍 (제어 스레드)
+        
+        target_positions는 최종 목표 위치를 가리킵니다.
+        """
+        self.target_positions = plan.target
+        if plan.rejection is not None:
+            self._reject_command(plan.rejection, plan.start)
+            return False
+        if plan.trajectory is None:
+            return self.send_control_command()
+        
+        trajectory = plan.trajectory
+        np.copyto(self.last_safe_target, self.target_positions)
+        self.trajectory_streamer.play(trajectory)
+        log.info("Trajectory", "%s: %.2f s (%d ticks @ %d Hz)", trajectory.profile, trajectory.duration,
+                 len(trajectory), Config.TRAJECTORY_RATE_HZ, color=Colors.CYAN)
+        return True
+    
+    def _plan_around(self, start, target, reason: str):
+        """직선 궤적이 충돌할 때 우회 경로 궤적 (실패 시 None)"""
+        result = self.motion_planner.plan(start, target)
+        if result is None:
+            log.warning("Planner", "No collision-free path around %s", reason, color=Colors.YELLOW)
+            return None
+        log.info("Planner", "Path around %s: %d waypoints in %.1f ms%s", reason, len(result.waypoints),
+                 result.planning_time * 1000, " (cached)" if result.cached else "", color=Colors.CYAN)
+        return plan_path_trajectory(result.waypoints, Config.TRAJECTORY_RATE_HZ, Config.TRAJECTORY_MAX_VELOCITY,
+                                    Config.TRAJECTORY_MAX_ACCELERATION, Config.TRAJECTORY_PROFILE)
+    
+    def toggle_recording(self) -> Optional[Recording]:
+        """Teach 기록 시작/종료 -> 종료 시 Recording (시작 시 또는 샘플 부족 시 None)"""
+        if not self.recorder.recording:
+            self.recorder.start()
+            log.info("Teach", "Recording started%s", "" if Config.PASSIVITY_MODE else " (waiting for passivity mode)",
+                     color=Colors.CYAN)
+            return None
+        recording = self.recorder.stop()
+        if recording is None:
+            log.warning("Teach", "Recording stopped: not enough samples", color=Colors.YELLOW)
+            return None
+        log.info("Teach", "Recorded %d samples, %.2f s (%.1f Hz, dropped %d)", len(recording), recording.duration,
+                 recording.sample_rate, self.recorder.dropped, color=Colors.GREEN)
+        self.last_recording = recording
+        if Config.REPLAY_COMPRESSION_TOLERANCE is not None:
+            self.last_recording = compress_recording(recording, Config.REPLAY_COMPRESSION_TOLERANCE)
+            log.info("Teach", "Compressed to %d keyframes (%.1fx, max error %.1f ticks)", len(self.last_recording),
+                     len(recording) / len(self.last_recording),
+                     compression_error(recording, self.last_recording).max(), color=Colors.CYAN)
+        return recording
+    
+    def change_replay_speed(self, step: int) -> float:
+        """재생 배속을 REPLAY_SPEEDS에서 한 단계 변경"""
+        speeds = Config.REPLAY_SPEEDS
+        index = min(range(len(speeds)), key=lambda i: abs(speeds[i] - self.replay_speed))
+        self.replay_speed = speeds[min(max(index + step, 0), len(speeds) - 1)]
+        return self.replay_speed
+    
+    def plan_replay(self, start, recording: Recording, speed: float) -> MovePlan:
+        """기록 재생 계획 - 현재 위치에서 기록 시작 자세로 접근한 뒤 speed 배속으로 재생 (제어 스레드 외부)
+        
+        재샘플링과 전체 궤적 충돌 검사는 UI 스레드에서 하고, 결과만 apply_move()로 제어 스레드에 넘깁니다.
+        """
+        max_velocity = Config.TRAJECTORY_MAX_VELOCITY if Config.REPLAY_LIMIT_VELOCITY else None
+        trajectory = replay_trajectory(recording, Config.TRAJECTORY_RATE_HZ, speed, max_velocity,
+                                       start, Config.TRAJECTORY_MAX_ACCELERATION)
+        target = np.asarray(trajectory.commands[-1], dtype=np.float64)
+        if self.collision_checker is not None:
+            hit = self.collision_checker.first_collision(trajectory.positions)
+            if hit is not None:
+                index, reason = hit
+                return MovePlan(start, target, rejection=f"Replay rejected: {reason} at "
+                                                         f"{(index + 1) * trajectory.period:.2f} s")
+        log.info("Teach", "Replay x%.2f: %.2f s (recorded %.2f s)", speed, trajectory.duration,
+                 recording.duration, color=Colors.CYAN)
+        if Config.SIMULATION_MODE:
+            return MovePlan(start, target)
+        return MovePlan(start, target, trajectory)
+    
+    def _stop_trajectory(self):
+        """진행 중인 궤적 중단 - 목표 위치를 마지막으로 전송한 궤적 지점으로 되돌림"""
+        setpoint = self.trajectory_streamer.cancel()
+        if setpoint is not None:
+            self.target_positions = setpoint
+            np.copyto(self.last_safe_target, self.target_positions)
     
     def toggle_torque(self, motor_index: int):
         """개별 모터 토크 토글"""
         self.torque_enabled[motor_index] = not self.torque_enabled[motor_index]
         self.send_torque_command()
         status = "ON" if self.torque_enabled[motor_index] else "OFF"
-        print(f"{Colors.CYAN}[Torque]{Colors.END} M{motor_index+1} ({self.motors[motor_index].name}): {status}")
+        log.info("Torque", "M%d (%s): %s", motor_index + 1, self.motors[motor_index].name, status, color=Colors.CYAN)
     
     def toggle_all_torque(self) -> bool:
         """모든 모터 토크 토글"""
+        self._stop_trajectory()
         new_state = not self.all_torque_enabled
         self.all_torque_enabled = new_state
         self.torque_enabled = [new_state] * len(self.motors)
         self.send_torque_command()
 
         Config.PASSIVITY_MODE = not new_state
+        self.last_feedback = None
         if Config.PASSIVITY_MODE:
             self.is_passivity_first = True
             self.passivity_initialized_motors = [False] * 7
             # Passivity 모드 시작: 피드백 요청 시작
-            self.serial.send("2,1,0,0,0,0,0,0*")
-            print(f"{Colors.GREEN}[Feedback]{Colors.END} Feedback enabled (Passivity Mode)")
+            self.serial.send_command(OP_FEEDBACK, [1])
+            log.info("Feedback", "Feedback enabled (Passivity Mode)", color=Colors.GREEN)
         else:
             self.is_passivity_first = False
             self.passivity_initialized_motors = [False] * 7
+            np.copyto(self.last_safe_target, self.target_positions)  # 손으로 옮겨 둔 자세에서 다시 시작
             # Normal 모드 복귀: 피드백 요청 중단
-            self.serial.send("2,0,0,0,0,0,0,0*")
-            print(f"{Colors.YELLOW}[Feedback]{Colors.END} Feedback disabled (Normal Mode)")
+            self.serial.send_command(OP_FEEDBACK, [0])
+            log.info("Feedback", "Feedback disabled (Normal Mode)", color=Colors.YELLOW)
         
         status = "enabled" if new_state else "disabled"
-        print(f"{Colors.YELLOW}[Torque]{Colors.END} ALL motors torque {status}")
+        log.info("Torque", "ALL motors torque %s", status, color=Colors.YELLOW)
         
         return new_state
     
@@ -422,6 +1385,8 @@ class MotorController:
         if not (0 <= motor_index < len(self.motors)):
             return False
         
+        # 수동 조작은 진행 중인 프리셋 궤적을 중단하고 현재 궤적 지점에서 이어서 이동
+        self._stop_trajectory()
         motor = self.motors[motor_index]
         old_target = self.target_positions[motor_index]
         
@@ -432,176 +1397,201 @@ class MotorController:
         
         if new_target == old_target:
             if new_target == motor.max_val or new_target == motor.min_val:
-                self.motor_states[motor_index] = MotorState.AT_LIMIT
+                self.joints.set_state(motor_index, MotorState.AT_LIMIT)
             return False
         
         self.target_positions[motor_index] = new_target
         
         if new_target == motor.max_val or new_target == motor.min_val:
-            self.motor_states[motor_index] = MotorState.AT_LIMIT
+            self.joints.set_state(motor_index, MotorState.AT_LIMIT)
         else:
-            self.motor_states[motor_index] = MotorState.MOVING
+            self.joints.set_state(motor_index, MotorState.MOVING)
         
         return True
     
+    def jog(self, motor_index: int, direction: str, step_size: int) -> bool:
+        """키 조작 1회: 목표 위치 변경 후 전송 (충돌로 거부되면 False)"""
+        if not self.update_target(motor_index, direction, step_size):
+            return False
+        return self.send_control_command()
+    
     def update_positions(self):
         """현재 위치를 목표 위치로 부드럽게 이동 (UI용)"""
+        # 모든 모드에서 display_positions를 target_positions로 부드럽게 이동 (current_positions 동기화 포함)
+        self.joints.smooth(self.ui_smoothness, track_velocity=not Config.PASSIVITY_MODE)
+        self.joints.publish()
+
+    def send_control_command(self) -> bool:
+        """위치 제어 명령 전송 (TransmitScheduler를 통해 최신 값만 전송)
         
-        # 모든 모드에서 display_positions를 target_positions로 부드럽게 이동
-        for i in range(len(self.motors)):
-            diff = self.target_positions[i] - self.display_positions[i]
-            
-            if abs(diff) > 0.5:
-                # 부드러운 전환
-                self.display_positions[i] += diff * self.ui_smoothness
-            else:
-                self.display_positions[i] = self.target_positions[i]
-            
-            # 모터 상태 업데이트
-            if abs(self.display_positions[i] - self.target_positions[i]) < 2:
-                if self.motor_states[i] == MotorState.MOVING:
-                    self.motor_states[i] = MotorState.IDLE
-            else:
-                if self.motor_states[i] != MotorState.AT_LIMIT:
-                    self.motor_states[i] = MotorState.MOVING
+        충돌하는 목표 위치는 전송하지 않고 마지막 안전한 목표 위치로 되돌립니다.
+        """
+        if Config.PASSIVITY_MODE:
+            return False
+        self.joints.clamp_targets()  # 소프트웨어 엔드스탑
+        if self.collision_checker is not None:
+            hit = self.collision_checker.first_collision(self.target_positions)
+            if hit is not None:
+                self._reject_command(f"Command rejected: {hit[1]}", self.last_safe_target)
+                return False
+        np.copyto(self.last_safe_target, self.target_positions)
+        if Config.SIMULATION_MODE:
+            return True
+        self.tx_scheduler.submit(self.target_positions)
+        return True
+    
+    def _reject_command(self, message: str, restore):
+        """충돌로 거부된 명령 기록 후 목표 위치 복원"""
+        rejected = [int(p) for p in self.target_positions]
+        self.target_positions = restore
+        self.rejected_commands += 1
+        self.pending_rejections.append(message)
+        log.warning("Collision", "%s (target %s, rejected %d)", message, rejected, self.rejected_commands,
+                    color=Colors.YELLOW)
+    
+    def take_rejections(self) -> List[str]:
+        """UI/로그 보고 대기 중인 거부 사유를 모두 가져오기"""
+        return _drain(self.pending_rejections)
+    
+    def resync_after_reconnect(self):
+        """재연결 후 장치 상태 복원 (ControlLoop.post()로 제어 스레드에서 실행)
         
-        # current_positions를 display_positions와 동기화 (UI용)
-        self.current_positions = self.display_positions.copy()
-
-    def send_control_command(self):
-        """위치 제어 명령 전송"""
-        if Config.PASSIVITY_MODE or Config.SIMULATION_MODE:
-            return
-        positions = [int(pos) for pos in self.target_positions]
-        command = f"0,{','.join(map(str, positions))}*"
-        self.serial.send(command)
+        펌웨어가 리셋되었을 수 있으므로 목표 위치, 토크, 피드백 모드를 다시 전송합니다.
+        Passivity 모드에서는 목표 위치 대신 피드백으로 다시 동기화합니다.
+        """
+        if Config.PASSIVITY_MODE:
+            self.passivity_initialized_motors = [False] * 7
+            self.is_passivity_first = True
+        else:
+            # 궤적 진행 중이면 마지막 궤적 지점으로 복원 (이후 틱은 스트리머가 이어서 전송)
+            setpoint = self.trajectory_streamer.setpoint()
+            self.tx_scheduler.resync(setpoint if setpoint is not None else self.target_positions)
+        self.send_torque_command()
+        self.serial.send_command(OP_FEEDBACK, [1 if Config.PASSIVITY_MODE else 0])
+        log.info("Serial", "Device state resynchronized", color=Colors.GREEN)
     
     def send_torque_command(self):
         """토크 제어 명령 전송"""
         if Config.SIMULATION_MODE:
-            print(f"{Colors.GRAY}[Torque Simulated]{Colors.END} Torque command skipped")
+            log.info("Torque Simulated", "Torque command skipped", color=Colors.GRAY)
             return
         torque_values = [1 if enabled else 0 for enabled in self.torque_enabled]
-        command = f"1,{','.join(map(str, torque_values))}*"
-        self.serial.send(command)
+        self.serial.send_command(OP_TORQUE, torque_values)
+    
+    def _probe_targets(self):
+        """피드백 스트림이 없는 동안 도달 확인 대기 중인 위치 명령이 있으면 위치 요청 (목표 도달 지연 측정)
+        
+        응답은 수신 스레드에서 telemetry.on_position_sample()로 기록되므로 결과는 기다리지 않습니다.
+        """
+        if not Config.TARGET_PROBE_INTERVAL or not self.serial.is_connected:
+            return
+        if self._target_probe is not None and not self._target_probe.done():
+            return
+        telemetry = self.serial.telemetry
+        now = time.monotonic()
+        last_sample = telemetry.last_position_time
+        if last_sample is not None and now - last_sample < Config.TARGET_PROBE_INTERVAL:
+            return
+        if now - self._last_target_probe < Config.TARGET_PROBE_INTERVAL or not telemetry.targets_outstanding():
+            return
+        self._last_target_probe = now
+        self._target_probe = self.serial.request_positions(Config.POSITION_QUERY_TIMEOUT)
     
     def process_feedback(self):
-        """피드백 데이터 처리"""
+        """피드백 데이터 처리
+        
+        수신 큐를 틱마다 모두 비우고, 피드백은 가장 최신 자세만 상태에 적용합니다.
+        중간 샘플은 로깅용으로 feedback_samples에 보관합니다. (take_feedback_samples)
+        """
         # Simulation 모드에서는 처리하지 않음
         if Config.SIMULATION_MODE:
             return
         
+        replies = self.serial.drain_received()
+        self.feedback_backlog = len(replies)
+        
         # Normal 모드에서는 수신 버퍼만 비우고 처리하지 않음
-        if not Config.PASSIVITY_MODE and not self.waiting_for_positions:
-            while self.serial.get_received_data() is not None:
-                pass
+        if not Config.PASSIVITY_MODE:
+            self._probe_targets()
             return
         
-        data = self.serial.get_received_data()
-        if data:
-            try:
-                if data.startswith("Positions:"):
-                    parts = data[len("Positions:"):].split(',')
-                    positions = [int(p) for p in parts]
-                    
-                    if self.waiting_for_positions:
-                        # 프리셋 저장용 위치 수신
-                        self.passivity_presets = positions
-                        print(f"{Colors.CYAN}[RX Positions]{Colors.END} Received positions for preset save")
-                    else:
-                        print(f"{Colors.CYAN}[RX Positions]{Colors.END} {positions}")
-                
-                elif data.startswith("Feedback:"):
-                    # Passivity 모드에서만 피드백 처리
-                    if not Config.PASSIVITY_MODE:
-                        return
-                    
-                    parts = data[len("Feedback:"):].split(',')
-                    
-                    if len(parts) < len(self.motors):
-                        print(f"{Colors.RED}[Feedback Parse]{Colors.END} Incomplete data: {len(parts)}/7 motors")
-                        return
-                    
-                    # 모든 모터 데이터 파싱
-                    new_positions = []
-                    parse_success = True
-                    
-                    for i in range(len(self.motors)):
-                        try:
-                            new_pos = float(parts[i])
-                            new_positions.append(new_pos)
-                        except (ValueError, IndexError) as e:
-                            print(f"{Colors.RED}[Feedback Parse]{Colors.END} Motor {i+1}: {e}")
-                            parse_success = False
-                            break
-                    
-                    if not parse_success:
-                        return
-                    
-                    # Passivity 모드: 실시간 피드백 처리
-                    for i in range(len(self.motors)):
-                        if not self.passivity_initialized_motors[i]:
-                            # 첫 수신 데이터로 동기화
-                            self.target_positions[i] = new_positions[i]
-                            self.display_positions[i] = new_positions[i]
-                            self.current_positions[i] = new_positions[i]
-                            self.passivity_initialized_motors[i] = True
-                            print(f"{Colors.GREEN}[Passivity Init]{Colors.END} Motor {i+1} synced: {new_positions[i]:.1f}")
-                        else:
-                            # 목표 위치만 업데이트 (UI는 부드럽게 따라감)
-                            self.target_positions[i] = new_positions[i]
-                        
-                        self.motor_states[i] = MotorState.IDLE
-                    
-                    # 로그 출력 제어
-                    current_time = pygame.time.get_ticks()
-                    if current_time - self.last_feedback_log_time >= self.feedback_log_interval:
-                        pos_str = ', '.join([f"M{i+1}:{int(p)}" for i, p in enumerate(new_positions)])
-                        print(f"{Colors.CYAN}[RX Feedback]{Colors.END} {pos_str}")
-                        self.last_feedback_log_time = current_time
-                    
-                    # 모든 모터 초기화 완료 확인
-                    if self.is_passivity_first and all(self.passivity_initialized_motors):
-                        self.is_passivity_first = False
-                        print(f"{Colors.GREEN}[Passivity Mode]{Colors.END} All motors synchronized")
-                
-                else:
-                    # 기타 메시지 (Normal 모드에서도 출력 가능)
-                    print(f"{Colors.CYAN}[RX]{Colors.END} {data}")
-            except Exception as e:
-                print(f"{Colors.RED}[Feedback Parse]{Colors.END} {e}")
-    
-    def get_motor_info(self, motor_index: int) -> dict:
-        """모터 정보 반환"""
-        motor = self.motors[motor_index]
-        
-        # 항상 display_positions 사용 (부드러운 UI)
-        current_pos = self.display_positions[motor_index]
+        latest = None
+        for reply in replies:
+            if reply.kind == REPLY_FEEDBACK:
+                if len(reply.values) < len(self.motors):
+                    log.error("Feedback Parse", "Incomplete data: %d/7 motors", len(reply.values), color=Colors.RED)
+                    continue
+                self.feedback_samples.append((reply.timestamp, reply.values[:len(self.motors)]))
+                if self.recorder.recording:
+                    self.recorder.append(reply.timestamp, reply.values)
+                latest = reply
+            
+            elif reply.kind == REPLY_POSITIONS:
+                # 요청에 대응되지 않은 위치 응답 (요청 응답은 Future로 전달됨)
+                log.info("RX Positions", "%s", reply.values, color=Colors.CYAN)
+            
+            else:
+                # 기타 메시지
+                log.info("RX", "%s", reply.text, color=Colors.CYAN)
         
-        # 각도 계산 (0-1023 범위를 0-300도로 변환)
-        angle = (current_pos / 1023.0) * 300.0
+        if latest is None:
+            return
         
-        # Velocity 계산 (Normal 모드에서만)
-        velocity = 0
-        if not Config.PASSIVITY_MODE:
-            velocity = abs(self.target_positions[motor_index] - self.display_positions[motor_index])
-        
-        return {
-            'index': motor_index,
-            'name': motor.name,
-            'current': current_pos,
-            'target': self.target_positions[motor_index],
-            'min': motor.min_val,
-            'max': motor.max_val,
-            'angle': angle,
-            'state': self.motor_states[motor_index],
-            'velocity': velocity,
-            'torque_enabled': self.torque_enabled[motor_index]
-        }
+        try:
+            self._apply_feedback(latest)
+        except Exception as e:
+            log.error("Feedback Parse", "%s", e, color=Colors.RED)
+    
+    def _apply_feedback(self, reply: Reply):
+        """최신 피드백 샘플을 상태에 적용 (Passivity 모드)"""
+        self.feedback_staleness = time.monotonic() - reply.timestamp
+        self.serial.telemetry.on_feedback_applied(self.feedback_backlog, self.feedback_staleness)
+        
+        # 수신 스레드에서 이미 정수로 파싱됨
+        self.last_feedback = reply.values[:len(self.motors)]
+        new_positions = np.asarray(self.last_feedback, dtype=np.float64)
+        
+        # 첫 수신 데이터로 동기화 (표시 위치도 즉시 이동)
+        if not all(self.passivity_initialized_motors):
+            for i in range(len(self.motors)):
+                if not self.passivity_initialized_motors[i]:
+                    self.display_positions[i] = new_positions[i]
+                    self.current_positions[i] = new_positions[i]
+                    self.passivity_initialized_motors[i] = True
+                    log.info("Passivity Init", "Motor %d synced: %.1f", i + 1, new_positions[i], color=Colors.GREEN)
+        
+        # Passivity 모드: 목표 위치만 업데이트 (UI는 부드럽게 따라감)
+        np.copyto(self.joints.target, new_positions)
+        self.joints.state.fill(STATE_CODES[MotorState.IDLE])
+        
+        # 로그 출력 제어
+        current_time = pygame.time.get_ticks()
+        if current_time - self.last_feedback_log_time >= self.feedback_log_interval:
+            pos_str = ', '.join([f"M{i+1}:{int(p)}" for i, p in enumerate(new_positions)])
+            log.info("RX Feedback", "%s (backlog %d, age %.1f ms)", pos_str,
+                     self.feedback_backlog, self.feedback_staleness * 1000.0, color=Colors.CYAN)
+            self.last_feedback_log_time = current_time
+        
+        # 모든 모터 초기화 완료 확인
+        if self.is_passivity_first and all(self.passivity_initialized_motors):
+            self.is_passivity_first = False
+            log.info("Passivity Mode", "All motors synchronized", color=Colors.GREEN)
+    
+    def take_feedback_samples(self) -> List[Tuple[float, List[int]]]:
+        """로깅 대기 중인 피드백 샘플 (timestamp, values)을 모두 가져오기"""
+        return _drain(self.feedback_samples)
+    
+    def read_snapshot(self) -> int:
+        """제어 루프가 발행한 최신 관절 상태를 렌더러용 스냅샷으로 가져오기 (UI 스레드, 프레임마다 1회)"""
+        return self.joints.read_snapshot()
+    
+    def get_motor_info(self, motor_index: int) -> JointView:
+        """모터 정보 반환 (read_snapshot() 시점 스냅샷의 읽기 전용 뷰, 기존 dict와 같은 키)"""
+        return self.joint_views[motor_index]
     
     def are_all_torque_enabled(self) -> bool:
         """모든 모터 토크 활성화 여부"""
-        return all(self.torque_enabled)
+        return bool(self.joints.torque.all())
     
     def is_connected(self) -> bool:
         """시리얼 연결 상태 확인"""
@@ -609,63 +1599,339 @@ class MotorController:
     
     def shutdown(self):
         """컨트롤러 종료"""
-        print(f"{Colors.YELLOW}[Controller]{Colors.END} Shutting down motors...")
+        log.info("Controller", "Shutting down motors...", color=Colors.YELLOW)
         
         # 피드백 요청 중단
-        self.serial.send("2,0,0,0,0,0,0,0*")
+        self.serial.send_command(OP_FEEDBACK, [0])
         
-        # 기본 위치로 복귀
+        # 진행 중인 궤적 중단 후 기본 위치로 복귀
+        self.trajectory_streamer.stop()
         if not Config.PASSIVITY_MODE:
-            self.target_positions = [m.default_pos for m in self.motors]
+            np.copyto(self.joints.target, self.joints.default)
             self.send_control_command()
         
+        # 남은 위치 명령 전송 후 스케줄러 종료
+        self.tx_scheduler.stop()
+        stats = self.tx_scheduler.get_stats()
+        log.info("TX Stats", "sent: %d, coalesced: %d, dropped: %d, keyframes: %d, deltas: %d",
+                 stats['sent'], stats['coalesced'], stats['dropped'],
+                 stats.get('keyframes', 0), stats.get('deltas', 0), color=Colors.CYAN)
+        
+        # 남은 자세 라이브러리 쓰기 완료
+        self.pose_library.close()
+        
         # Serial 연결 종료
         self.serial.close()
         
-        print(f"{Colors.GREEN}[Controller]{Colors.END} Motors reset to default positions")
+        log.info("Controller", "Motors reset to default positions", color=Colors.GREEN)
+
+# ========================================================================================================
+# Control Loop
+# ========================================================================================================
+
+class ControlLoop:
+    """MotorController를 소유하는 고정 주기 제어 스레드 (렌더 루프와 분리)
+    
+    틱마다 피드백 처리, 표시 위치 스무딩 후 관절 상태 스냅샷을 발행합니다. UI의 명령(목표 위치 변경,
+    토크 등)은 call()/submit()으로 큐에 넣으면 틱 사이 대기 중에 바로 제어 스레드에서 실행되므로,
+    느린 프레임(글꼴 렌더링 등)이 명령 전송이나 피드백 처리를 늦추지 않습니다. 화면은 발행된 스냅샷만
+    잠금 없이 읽습니다. (JointState.read_snapshot)
+    느린 작업은 제어 스레드에서 실행하지 않습니다: 프리셋 이동 계획(충돌 검사, 우회 경로 계획)과 기록 재생
+    계획(재샘플링, 충돌 검사)은 move_to()/replay()를 호출한 스레드에서 하고 결과 궤적만 넘기며, 자세 라이브러리 파일 쓰기는 라이브러리의
+    쓰기 스레드가 담당합니다.
+    
+    threaded=False이면 스레드를 만들지 않고 UI 루프가 프레임마다 step()을 호출합니다. (기존 동작)
+    """
+    
+    def __init__(self, controller: MotorController, rate_hz: float = Config.CONTROL_RATE_HZ,
+                 threaded: bool = Config.CONTROL_THREAD):
+        self.controller = controller
+        self.rate_hz = rate_hz if threaded else Config.UI_FPS
+        self.period = 1.0 / self.rate_hz
+        self.threaded = threaded
+        
+        self._commands = Queue()  # (fn, args, Future), None: 종료
+        
+        # 지터 통계
+        self.ticks = 0
+        self.late_ticks = 0  # 예정 시각보다 반 주기 이상 늦게 시작한 틱
+        self.skipped_ticks = 0  # 한 주기 이상 밀려 건너뛴 틱
+        self.overruns = 0  # 처리 시간이 주기를 넘은 틱
+        self.commands = 0
+        self.errors = 0
+        self.lateness = LatencyHistogram()  # 예정 시각 대비 틱 시작 지연
+        self.tick_time = LatencyHistogram()  # 틱 처리 시간
+        
+        # UI 스무딩 계수는 60 fps 프레임 기준 -> 제어 주기에 맞게 환산 (같은 시간에 같은 비율로 수렴)
+        if threaded:
+            controller.ui_smoothness = 1.0 - (1.0 - controller.ui_smoothness) ** (Config.UI_FPS / self.rate_hz)
+        
+        # 재연결 후 상태 복원은 watchdog 스레드가 아니라 제어 루프에서 실행
+        controller.serial.on_reconnect = lambda: self.post(controller.resync_after_reconnect)
+        
+        self.running = True
+        self.thread = None
+        if threaded:
+            self.thread = threading.Thread(target=self._control_loop, name="control", daemon=True)
+            self.thread.start()
+    
+    def submit(self, fn, *args) -> Future:
+        """명령을 제어 스레드에서 실행하도록 등록 -> 결과 Future (스레드가 없으면 즉시 실행)"""
+        future = Future()
+        if self.thread is not None and self.running:
+            self._commands.put((fn, args, future))
+        else:
+            self._execute(fn, args, future)
+        return future
+    
+    def post(self, fn, *args) -> Future:
+        """다른 스레드(watchdog 등)의 명령을 제어 루프 큐에 등록 -> 결과 Future (기다리지 않음)
+        
+        submit()과 달리 스레드가 없어도 즉시 실행하지 않고 다음 step()에서 실행합니다.
+        """
+        future = Future()
+        self._commands.put((fn, args, future))
+        return future
+    
+    def call(self, fn, *args):
+        """명령을 제어 스레드에서 실행하고 결과 반환 (예외는 호출 측으로 전달)"""
+        return self.submit(fn, *args).result()
+    
+    def call_with_targets(self, fn, *args) -> Tuple[object, np.ndarray]:
+        """명령을 제어 스레드에서 실행하고 (결과, 실행 직후 목표 위치 복사본) 반환
+        
+        UI는 제어 스레드가 쓰는 목표 위치 배열을 직접 읽지 않고 이 복사본을 표시/로깅에 씁니다.
+        """
+        return self.call(self._with_targets, fn, args)
+    
+    def _with_targets(self, fn, args):
+        return fn(*args), self.controller.joints.target.copy()
+    
+    def move_to(self, positions: List[int]) -> Optional[np.ndarray]:
+        """프리셋 위치로 이동 -> 적용된 목표 위치 (거부되면 None)
+        
+        출발 위치 확인과 적용만 제어 스레드에서, 계획은 호출 스레드에서 실행합니다.
+        """
+        controller = self.controller
+        start = self.call(controller.begin_move)
+        return self._apply_move(controller.plan_move(start, positions))
+    
+    def replay(self, recording: Optional[Recording] = None) -> Optional[np.ndarray]:
+        """기록 재생 (None: 마지막 기록) -> 재생 후 목표 위치 (기록이 없거나 거부되면 None)
+        
+        move_to()와 같이 재샘플링/충돌 검사는 호출 스레드에서, 적용만 제어 스레드에서 실행합니다.
+        """
+        controller = self.controller
+        recording = recording or controller.last_recording
+        if Config.PASSIVITY_MODE or recording is None:
+            return None
+        start = self.call(controller.begin_move)
+        return self._apply_move(controller.plan_replay(start, recording, controller.replay_speed))
+    
+    def _apply_move(self, plan: MovePlan) -> Optional[np.ndarray]:
+        moved, targets = self.call_with_targets(self.controller.apply_move, plan)
+        return targets if moved else None
+    
+    def load_preset(self, slot_index: Optional[int] = None) -> Optional[np.ndarray]:
+        """프리셋으로 이동 (None: Default, 0~3: Custom 슬롯) -> 목표 위치 (실패 시 None) - Passivity 모드에서는 비활성화"""
+        positions = self.controller.preset_positions(slot_index)
+        return self.move_to(positions) if positions is not None else None
+    
+    def _execute(self, fn, args, future: Future):
+        self.commands += 1
+        try:
+            future.set_result(fn(*args))
+        except Exception as e:
+            log.error("Control", "%s failed: %s", getattr(fn, '__name__', fn), e, color=Colors.RED)
+            future.set_exception(e)
+    
+    def _run_commands(self):
+        """대기 중인 명령 모두 실행"""
+        while True:
+            try:
+                command = self._commands.get_nowait()
+            except Empty:
+                return
+            if command is not None:
+                self._execute(*command)
+    
+    def step(self):
+        """제어 틱 1회: 대기 명령 -> 피드백 처리 -> 표시 위치 갱신 및 스냅샷 발행"""
+        self._run_commands()
+        controller = self.controller
+        controller.process_feedback()
+        controller.update_positions()
+    
+    def _control_loop(self):
+        """고정 주기 제어 루프 (백그라운드 스레드)
+        
+        다음 틱까지는 명령 큐를 기다리며 들어온 명령을 바로 실행하고, 틱은 절대 시각 기준으로
+        예약해 처리 시간이 누적 지연으로 번지지 않게 합니다.
+        """
+        next_tick = time.monotonic()
+        while self.running:
+            delay = next_tick - time.monotonic()
+            if delay > 0:
+                try:
+                    command = self._commands.get(timeout=delay)
+                except Empty:
+                    continue
+                if command is not None:
+                    self._execute(*command)
+                continue
+            
+            start = time.monotonic()
+            lateness = start - next_tick
+            try:
+                self.step()
+            except Exception as e:
+                self.errors += 1
+                log.error("Control", "Tick failed: %s", e, color=Colors.RED)
+            elapsed = time.monotonic() - start
+            
+            self.ticks += 1
+            self.lateness.add(lateness)
+            self.tick_time.add(elapsed)
+            if lateness > 0.5 * self.period:
+                self.late_ticks += 1
+            if elapsed > self.period:
+                self.overruns += 1
+            
+            # 한 주기 이상 밀렸으면 밀린 틱을 몰아서 실행하지 않고 건너뜀
+            next_tick += self.period
+            behind = int((time.monotonic() - next_tick) / self.period)
+            if behind > 0:
+                self.skipped_ticks += behind
+                next_tick += behind * self.period
+    
+    def get_stats(self) -> dict:
+        """제어 루프 지터 통계 (lateness_ms: 예정 시각 대비 시작 지연, tick_ms: 틱 처리 시간)"""
+        return {'rate_hz': self.rate_hz, 'threaded': self.threaded, 'ticks': self.ticks, 'late': self.late_ticks,
+                'skipped': self.skipped_ticks, 'overruns': self.overruns, 'commands': self.commands,
+                'errors': self.errors, 'lateness_ms': self.lateness.percentiles((50, 99, 100)),
+                'tick_ms': self.tick_time.percentiles((50, 99, 100))}
+    
+    def status_line(self) -> str:
+        """대시보드 한 줄 요약"""
+        if not self.threaded:
+            return "Control: UI loop"
+        lateness = self.lateness.percentiles((99, 100))
+        
+        def fmt(value):
+            return "-" if value is None else f"{value:.1f}"
+        
+        return (f"Control {self.rate_hz:.0f} Hz | jitter p99/max {fmt(lateness['p99'])}/{fmt(lateness['p100'])} ms | "
+                f"late {self.late_ticks} skip {self.skipped_ticks}")
+    
+    def stop(self):
+        """제어 스레드 종료 (남은 명령은 호출 스레드에서 실행)"""
+        self.running = False
+        if self.thread is not None:
+            self._commands.put(None)
+            self.thread.join(timeout=1.0)
+        self._run_commands()
 
 # ========================================================================================================
 # Data Logger Class
 # ========================================================================================================
 
 class DataLogger:
-    """모터 데이터 로깅"""
+    """모터 데이터 로깅 (CsvSink 백그라운드 쓰기 스레드로 일괄 기록)
+    
+    UI 스레드는 (벽시계 시각, 위치, 이벤트)를 큐에 넣기만 하고, 시각 문자열 변환과 파일 쓰기는
+    쓰기 스레드가 LOG_FLUSH_ROWS행 / LOG_FLUSH_INTERVAL초 단위로 처리합니다.
+    LOG_FORMAT = "binary"이면 (monotonic ns, 목표 위치, 피드백 위치, 이벤트) 고정 폭 행을
+    세션 로그(SessionLogWriter)에 기록합니다. 피드백을 받지 않은 행의 피드백 열은 NO_FEEDBACK입니다.
+    """
+    
+    HEADER = CSV_HEADER
     
     def __init__(self, filename: str = None):
+        binary = Config.LOG_FORMAT == "binary"
         if filename is None:
-            filename = f"robot_log_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+            filename = f"robot_log_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{'rlog' if binary else 'csv'}"
         
         self.filename = filename
         self.last_log_time = 0
         self.enabled = True
+        self.sink = None
+        self.session = None
         
         try:
-            with open(self.filename, 'w', newline='') as f:
-                writer = csv.writer(f)
-                writer.writerow(['Timestamp:  ','M1_Pos', 'M2_Pos', 'M3_Pos', 'M4_Pos', 'M5_Pos', 'M6_Pos', 'Event'])
-            print(f"{Colors.GREEN}[Logger]{Colors.END} Log file created: {self.filename}")
+            if binary:
+                self.session = SessionLogWriter(self.filename, flush_interval=Config.LOG_FLUSH_INTERVAL)
+                self._no_feedback = [NO_FEEDBACK] * self.session.joints
+            else:
+                self.sink = CsvSink(self.filename, self.HEADER, self._format_row, Config.LOG_QUEUE_SIZE,
+                                    Config.LOG_FLUSH_ROWS, Config.LOG_FLUSH_INTERVAL, on_error=self._on_error)
+            log.info("Logger", "Log file created: %s", self.filename, color=Colors.GREEN)
         except Exception as e:
-            print(f"{Colors.RED}[Logger Error]{Colors.END} Could not create log file: {e}")
+            log.error("Logger Error", "Could not create log file: %s", e, color=Colors.RED)
             self.enabled = False
     
-    def log(self, positions: List[float], event: str = ""):
-        """데이터 로깅"""
+    @staticmethod
+    def _format_row(item) -> list:
+        """(벽시계 시각, 위치, 이벤트) -> CSV 행 (쓰기 스레드)"""
+        wall_time, positions, event = item
+        timestamp = datetime.fromtimestamp(wall_time).strftime('%H:%M:%S.%f')[:-3]
+        return [timestamp] + [int(pos) for pos in positions] + [event]
+    
+    @staticmethod
+    def _on_error(error: Exception):
+        # 로깅 실패 시 콘솔 출력만
+        log.error("Logger Write Error", "%s", error, color=Colors.RED)
+    
+    def log(self, positions: List[float], event: str = "", feedback: Optional[List[int]] = None):
+        """데이터 로깅 (positions: 목표 위치, feedback: 세션 로그의 피드백 열, 없으면 NO_FEEDBACK)"""
         current_time = pygame.time.get_ticks()
         
         if not self.enabled or (current_time - self.last_log_time) < Config.LOG_INTERVAL:
             return
         
         self.last_log_time = current_time
-        timestamp = datetime.now().strftime('%H:%M:%S.%f')[:-3]
+        if self.session is not None:
+            self.session.append(time.monotonic_ns(), positions, self._no_feedback if feedback is None else feedback, event)
+            return
+        # 위치 배열은 계속 갱신되므로 값을 복사해서 넘김
+        self.sink.put((time.time(), [float(pos) for pos in positions], event))
+    
+    def log_samples(self, samples: List[Tuple[float, List[int]]], event: str = "Feedback"):
+        """수신 샘플 일괄 로깅 (LOG_INTERVAL 제한 없음, 수신 시각 기준 타임스탬프)"""
+        if not self.enabled or not samples:
+            return
         
-        try:
-            with open(self.filename, 'a', newline='') as f:
-                writer = csv.writer(f)
-                row = [timestamp] + [int(pos) for pos in positions] + [event]
-                writer.writerow(row)
-        except Exception as e:
-            # 로깅 실패 시 콘솔 출력만
-            print(f"{Colors.RED}[Logger Write Error]{Colors.END} {e}")
+        if self.session is not None:
+            # Passivity 모드에서는 목표 위치 = 피드백 위치
+            append = self.session.append
+            for timestamp, positions in samples:
+                append(int(timestamp * 1e9), positions, positions, event)
+            return
+        
+        # monotonic 수신 시각 -> 벽시계 시각
+        offset = time.time() - time.monotonic()
+        put = self.sink.put
+        for timestamp, positions in samples:
+            put((timestamp + offset, positions, event))
+    
+    def get_stats(self) -> dict:
+        """기록 통계 반환 (파일을 만들지 못했으면 빈 dict)"""
+        writer = self.session or self.sink
+        return writer.get_stats() if writer else {}
+    
+    def close(self):
+        """남은 행을 모두 쓰고 파일 닫기"""
+        if self.session is not None:
+            self.session.close()
+            stats = self.session.get_stats()
+            log.info("Logger", "written: %d, dropped: %d, chunks: %d, %d bytes", stats['written'], stats['dropped'],
+                     stats['chunks'], stats['bytes'], color=Colors.CYAN)
+            return
+        if self.sink is None:
+            return
+        self.sink.close()
+        stats = self.sink.get_stats()
+        log.info("Logger", "written: %d, dropped: %d, batches: %d, flushes: %d, max queue: %d", stats['written'],
+                 stats['dropped'], stats['batches'], stats['flushes'], stats['max_depth'], color=Colors.CYAN)
 
 # ========================================================================================================
 # UI Renderer Class
@@ -677,6 +1943,7 @@ class UIRenderer:
     def __init__(self, screen):
         self.screen = screen
         self._init_fonts()
+        self._log_lines = {}  # (LogRecord, 최대 폭) -> 렌더링된 줄 (화면에 남아 있는 줄만 보관)
         
     def _init_fonts(self):
         """폰트 초기화"""
@@ -868,7 +2135,7 @@ class UIRenderer:
         return button_rect
     
     def draw_preset_panel(self, x, y, width, height, default_preset: List[int], 
-                          custom_presets: dict, active_preset: Optional[str]):
+                          pose_library: PoseLibrary, active_preset: Optional[str]):
         """프리셋 패널 - 하단 정리 버전"""
         panel_rect = pygame.Rect(x, y, width, height)
         self.draw_shadow(panel_rect, 3, 150)
@@ -880,7 +2147,7 @@ class UIRenderer:
         title = self.font_small.render("Quick Presets", True, UIColors.ACCENT_DARK)
         self.screen.blit(title, (x + inner_padding, y + 10))
         
-        save_hint = self.font_tiny.render("Ctrl+F2-F5: Save", True, UIColors.TEXT_GRAY)
+        save_hint = self.font_tiny.render("Ctrl+F2-F5: Save  F6: New pose", True, UIColors.TEXT_GRAY)
         self.screen.blit(save_hint, (x + inner_padding, y + 28))
         
         # 프리셋 버튼들
@@ -973,6 +2240,51 @@ class UIRenderer:
         
         return button_rects
     
+    def draw_log_panel(self, x, y, width, height, records):
+        """최근 로그 패널 (콘솔 로그 링 버퍼)"""
+        panel_rect = pygame.Rect(x, y, width, height)
+        self.draw_shadow(panel_rect, 3, 150)
+        self.draw_rounded_rect(UIColors.PANEL_BG, panel_rect, radius=10, border_width=1, border_color=UIColors.BORDER_COLOR)
+        
+        inner_padding = 12
+        
+        title = self.font_small.render("Recent Log", True, UIColors.ACCENT_DARK)
+        self.screen.blit(title, (x + inner_padding, y + 8))
+        
+        level_colors = {DEBUG: UIColors.TEXT_LIGHT, INFO: UIColors.TEXT_GRAY,
+                        WARNING: UIColors.WARNING_ORANGE, ERROR: UIColors.ERROR_RED}
+        
+        line_y = y + 30
+        max_width = width - inner_padding * 2
+        cached, self._log_lines = self._log_lines, {}
+        for record in records:
+            if line_y + 12 > y + height - 4:
+                break
+            # 바뀌지 않은 줄은 이전 프레임의 Surface 재사용
+            key = (record, max_width)
+            line = cached.get(key)
+            if line is None:
+                text = self._fit_text(self.font_tiny, f"[{record.category}] {record.message}", max_width)
+                line = self.font_tiny.render(text, True, level_colors.get(record.level, UIColors.TEXT_GRAY))
+            self._log_lines[key] = line
+            
+            self.screen.blit(line, (x + inner_padding, line_y))
+            line_y += 14
+    
+    @staticmethod
+    def _fit_text(font, text: str, max_width: int) -> str:
+        """폭에 맞게 자른 텍스트 ("..." 포함) - 자를 위치는 font.size() 이분 탐색으로 찾음"""
+        if font.size(text)[0] <= max_width:
+            return text
+        lo, hi = 0, len(text)  # text[:lo] + "..."는 들어가고, text[:hi] + "..."는 넘침
+        while hi - lo > 1:
+            mid = (lo + hi) // 2
+            if font.size(text[:mid] + "...")[0] <= max_width:
+                lo = mid
+            else:
+                hi = mid
+        return text[:lo] + "..."
+    
     def draw_control_panel(self, panel_y: int, status_msg: str, is_connected: bool, is_logging: bool, log_filename: str):
         """하단 제어 패널"""
         # 패널 크기 및 위치 정의
@@ -1104,6 +2416,7 @@ class RobotControlApp:
         pygame.display.set_caption("Manipulator Robot Control System")
         
         self.controller = MotorController()
+        self.control = ControlLoop(self.controller)  # 이후 controller 명령은 self.control을 거쳐 실행
         self.renderer = UIRenderer(self.screen)
         self.logger = DataLogger()
         
@@ -1115,6 +2428,11 @@ class RobotControlApp:
         self.action_text = "System Ready"
         self.active_preset = None
         
+        # 링크 계측 요약 (0.5초마다 갱신)
+        self.telemetry_text = ""
+        self.last_telemetry_update = 0
+        self.nearest_pose_text = ""  # 현재 위치에서 가장 가까운 저장 자세
+        
         self.key_mapping = {
             pygame.K_q: (0, "increase"), pygame.K_a: (0, "decrease"),
             pygame.K_w: (1, "increase"), pygame.K_s: (1, "decrease"),
@@ -1144,7 +2462,7 @@ class RobotControlApp:
                 
                 # 1. 통합 토크 버튼 클릭 체크 (항상 활성)
                 if self.torque_button_rect_cache and self.torque_button_rect_cache.collidepoint(mouse_pos):
-                    new_state = self.controller.toggle_all_torque()
+                    new_state = self.control.call(self.controller.toggle_all_torque)
                     self.action_text = f"ALL Motors Torque: {'ON' if new_state else 'OFF'}"
                     # if not new_state:
                     #     self.action_text += " (Passivity Mode)"
@@ -1161,21 +2479,23 @@ class RobotControlApp:
                             mods = pygame.key.get_mods()
                             
                             if preset_type == 'default':
-                                if self.controller.load_default_preset():
+                                targets = self.control.load_preset()
+                                if targets is not None:
                                     self.active_preset = 'Default'
                                     self.action_text = f"Loaded preset: Default"
-                                    self.logger.log(self.controller.target_positions, "Preset: Default")
+                                    self.logger.log(targets, "Preset: Default")
                             
                             elif preset_type == 'custom':
                                 if mods & pygame.KMOD_CTRL:
                                     self.controller.save_custom_preset(preset_index)
                                     self.action_text = f"Saved preset: {preset_name}"
-                                    self.logger.log(self.controller.target_positions, f"Saved: {preset_name}")
+                                    self.logger.log(self.controller.pose_library[preset_name], f"Saved: {preset_name}")
                                 else:
-                                    if self.controller.load_custom_preset(preset_index):
+                                    targets = self.control.load_preset(preset_index)
+                                    if targets is not None:
                                         self.active_preset = preset_name
                                         self.action_text = f"Loaded preset: {preset_name}"
-                                        self.logger.log(self.controller.target_positions, f"Preset: {preset_name}")
+                                        self.logger.log(targets, f"Preset: {preset_name}")
                 else:
                     # Passivity 모드: 저장만 가능
                     for preset_data in self.preset_rects_cache:
@@ -1188,8 +2508,7 @@ class RobotControlApp:
                             
                             if preset_type == 'custom' and (mods & pygame.KMOD_CTRL):
                                 if self.controller.save_custom_preset(preset_index):
-                                    self.action_text = f"Saved preset: {preset_name} (Passivity)"
-                                    self.logger.log(self.controller.target_positions, f"Saved: {preset_name}")
+                                    self.action_text = f"Saving preset: {preset_name}..."
                                 else:
                                     self.action_text = f"Failed to save preset: {preset_name}"
                             else:
@@ -1199,15 +2518,55 @@ class RobotControlApp:
                 if event.key == pygame.K_ESCAPE:
                     self.running = False
                 
+                elif event.key == pygame.K_p:
+                    # 링크 계측 결과 파일 저장
+                    filename = f"link_stats_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+                    try:
+                        self.controller.serial.telemetry.dump(filename)
+                        self.action_text = f"Link stats saved: {filename}"
+                        log.info("Telemetry", "Saved %s", filename, color=Colors.CYAN)
+                    except Exception as e:
+                        log.error("Telemetry", "%s", e, color=Colors.RED)
+                
                 elif event.key == pygame.K_l:
                     self.logger.enabled = not self.logger.enabled
                     status = "enabled" if self.logger.enabled else "disabled"
                     self.action_text = f"Logging {status}"
-                    print(f"{Colors.CYAN}[Logger]{Colors.END} {status}")
+                    log.info("Logger", status, color=Colors.CYAN)
+                
+                # F6: 현재 자세를 자세 라이브러리에 새 이름으로 저장 (Passivity 모드 포함)
+                elif event.key == pygame.K_F6:
+                    pose_name = self.controller.pose_library.next_name()
+                    if self.controller.save_pose(pose_name, ("taught",)):
+                        self.action_text = (f"Saving pose: {pose_name}..." if Config.PASSIVITY_MODE
+                                            else f"Saved pose: {pose_name}")
+                        if not Config.PASSIVITY_MODE:
+                            self.logger.log(self.controller.pose_library[pose_name], f"Saved: {pose_name}")
+                
+                # F7: Teach 기록 시작/종료 (Passivity 모드에서 손으로 움직인 궤적)
+                elif event.key == pygame.K_F7:
+                    recording = self.control.call(self.controller.toggle_recording)
+                    if self.controller.recorder.recording:
+                        self.action_text = "Recording..."
+                    elif recording is not None:
+                        filename = f"teach_{datetime.now().strftime('%Y%m%d_%H%M%S')}.npz"
+                        try:
+                            recording.save(filename)
+                        except Exception as e:
+                            log.error("Teach", "%s", e, color=Colors.RED)
+                        self.action_text = f"Recorded {len(recording)} samples ({recording.duration:.1f} s): {filename}"
+                    else:
+                        self.action_text = "Recording stopped (no samples)"
+                
+                # [ / ]: 재생 배속
+                elif event.key in (pygame.K_LEFTBRACKET, pygame.K_RIGHTBRACKET):
+                    speed = self.control.call(self.controller.change_replay_speed,
+                                              1 if event.key == pygame.K_RIGHTBRACKET else -1)
+                    self.action_text = f"Replay speed: x{speed:g}"
                 
                 # T 키로 전체 토크 토글 (항상 활성)
                 elif event.key == pygame.K_z and not (pygame.key.get_mods() & (pygame.KMOD_CTRL | pygame.KMOD_SHIFT)):
-                    new_state = self.controller.toggle_all_torque()
+                    new_state = self.control.call(self.controller.toggle_all_torque)
                     self.action_text = f"ALL Motors Torque: {'ON' if new_state else 'OFF'}"
                     # if not new_state:
                     #     self.action_text += " (Passivity Mode)"
@@ -1216,10 +2575,21 @@ class RobotControlApp:
                 elif not Config.PASSIVITY_MODE:
                     # F1: Default 프리셋
                     if event.key == pygame.K_F1:
-                        if self.controller.load_default_preset():
+                        targets = self.control.load_preset()
+                        if targets is not None:
                             self.active_preset = 'Default'
                             self.action_text = f"Loaded preset: Default"
-                            self.logger.log(self.controller.target_positions, "Preset: Default")
+                            self.logger.log(targets, "Preset: Default")
+                    
+                    # F8: 마지막 기록 재생
+                    elif event.key == pygame.K_F8:
+                        targets = self.control.replay()
+                        if targets is not None:
+                            self.active_preset = None
+                            self.action_text = f"Replaying x{self.controller.replay_speed:g}"
+                            self.logger.log(targets, "Replay")
+                        elif self.controller.last_recording is None:
+                            self.action_text = "Nothing recorded (F7 in passivity mode)"
                     
                     # F2-F5: Custom 프리셋 (로드)
                     elif event.key in [pygame.K_F2, pygame.K_F3, pygame.K_F4, pygame.K_F5]:
@@ -1228,10 +2598,11 @@ class RobotControlApp:
                         preset_name = f"Custom {slot_index + 1}"
                         
                         if not (mods & pygame.KMOD_CTRL):
-                            if self.controller.load_custom_preset(slot_index):
+                            targets = self.control.load_preset(slot_index)
+                            if targets is not None:
                                 self.active_preset = preset_name
                                 self.action_text = f"Loaded preset: {preset_name}"
-                                self.logger.log(self.controller.target_positions, f"Preset: {preset_name}")
+                                self.logger.log(targets, f"Preset: {preset_name}")
                     
                     # 모터 제어 키 (일반 모드에서만)
                     elif event.key in self.key_mapping and event.key not in self.keys_pressed:
@@ -1240,10 +2611,10 @@ class RobotControlApp:
                         mods = pygame.key.get_mods()
                         step_size = Config.SLOW_STEP_SIZE if mods & pygame.KMOD_SHIFT else Config.FAST_STEP_SIZE
                         
-                        if self.controller.update_target(motor_index, direction, step_size):
-                            self.controller.send_control_command()
-                            motor_info = self.controller.get_motor_info(motor_index)
-                            self.action_text = f"M{motor_index+1} ({motor_info['name']}): {int(motor_info['target'])}"
+                        moved, targets = self.control.call_with_targets(self.controller.jog, motor_index, direction, step_size)
+                        if moved:
+                            motor = self.controller.motors[motor_index]
+                            self.action_text = f"M{motor_index+1} ({motor.name}): {int(targets[motor_index])}"
                             self.active_preset = None
                         
                         self.keys_pressed[event.key] = True
@@ -1258,8 +2629,7 @@ class RobotControlApp:
                             preset_name = f"Custom {slot_index + 1}"
                             
                             if self.controller.save_custom_preset(slot_index):
-                                self.action_text = f"Saved preset: {preset_name} (Passivity)"
-                                self.logger.log(self.controller.target_positions, f"Saved: {preset_name}")
+                                self.action_text = f"Saving preset: {preset_name}..."
                             else:
                                 self.action_text = f"Failed to save preset: {preset_name}"
                     else:
@@ -1281,16 +2651,42 @@ class RobotControlApp:
                     mods = pygame.key.get_mods()
                     step_size = Config.SLOW_STEP_SIZE if mods & pygame.KMOD_SHIFT else Config.FAST_STEP_SIZE
                     
-                    if self.controller.update_target(motor_index, direction, step_size):
-                        self.controller.send_control_command()
+                    # 결과를 기다리지 않음 (거부 사유는 update()에서 보고)
+                    self.control.submit(self.controller.jog, motor_index, direction, step_size)
                     
                     self.last_command_time[key] = current_time + Config.KEY_REPEAT_INTERVAL
     
     def update(self):
-        """상태 업데이트"""
-        self.controller.process_feedback()
-        self.controller.update_positions() # 시뮬레이션 모드에서만 부드러운 움직임 적용
-        self.logger.log(self.controller.current_positions)
+        """상태 업데이트 (피드백 처리/스무딩은 제어 루프가 담당, 여기서는 결과만 가져옴)"""
+        if not self.control.threaded:
+            self.control.step()
+        self.controller.read_snapshot()
+        self.logger.log_samples(self.controller.take_feedback_samples())
+        
+        # Passivity 모드 프리셋 저장 완료 처리 (위치 응답 수신 후)
+        for preset_name, success in self.controller.poll_preset_saves():
+            if success:
+                self.action_text = f"Saved preset: {preset_name} (Passivity)"
+                self.logger.log(self.controller.pose_library[preset_name], f"Saved: {preset_name}",
+                                feedback=self.controller.last_feedback)
+            else:
+                self.action_text = f"Failed to save preset: {preset_name}"
+        
+        # 충돌로 거부된 명령 보고
+        for message in self.controller.take_rejections():
+            self.action_text = message
+            self.logger.log(self.controller.joints.snapshot.target, message)
+        
+        current_time = pygame.time.get_ticks()
+        if current_time - self.last_telemetry_update >= 500:
+            self.telemetry_text = (f"{self.controller.serial.telemetry.status_line()} | "
+                                   f"{self.control.status_line()}")
+            nearest = self.controller.nearest_pose()
+            self.nearest_pose_text = f" | Nearest pose: {nearest[0]} ({nearest[1]:.0f})" if nearest else ""
+            self.last_telemetry_update = current_time
+        # Passivity 모드는 log_samples()가 수신 샘플을 모두 기록하므로 주기 행을 남기지 않음
+        if not Config.PASSIVITY_MODE:
+            self.logger.log(self.controller.joints.snapshot.target, feedback=self.controller.last_feedback)
     
     def render(self):
         """화면 렌더링"""
@@ -1320,11 +2716,16 @@ class RobotControlApp:
         passivity_text = f"Passivity: {Config.PASSIVITY_MODE}"
         
         subtitle = self.renderer.font_tiny.render(
-            f"7-DOF Control System | {mode_text} | {passivity_text}", 
+            f"7-DOF Control System | {mode_text} | {passivity_text}{self.nearest_pose_text}", 
             True, UIColors.TEXT_GRAY
         )
         self.screen.blit(subtitle, (PADDING, PADDING + 35))
         
+        # 링크 계측 요약 (우측 정렬, P 키로 파일 저장)
+        if self.telemetry_text:
+            telemetry = self.renderer.font_tiny.render(self.telemetry_text, True, UIColors.TEXT_GRAY)
+            self.screen.blit(telemetry, (Config.SCREEN_WIDTH - PADDING - telemetry.get_width(), PADDING + 35))
+        
         # ===== 2. 모터 게이지 섹션 (2열 4행) =====
         gauge_start_x = PADDING
         gauge_start_y = PADDING + 60
@@ -1357,7 +2758,7 @@ class RobotControlApp:
         self.preset_rects_cache = self.renderer.draw_preset_panel(
             right_panel_x, preset_y, RIGHT_PANEL_WIDTH, PRESET_PANEL_HEIGHT, 
             self.controller.default_preset,
-            self.controller.custom_presets, 
+            self.controller.pose_library, 
             self.active_preset
         )
         
@@ -1365,6 +2766,14 @@ class RobotControlApp:
         # 모터 게이지 영역의 실제 높이 계산
         motor_section_bottom = gauge_start_y + 4 * GAUGE_HEIGHT + 3 * SPACING
         
+        # 3-3. 최근 로그 패널 (프리셋 패널 아래 남는 공간)
+        log_y = preset_y + PRESET_PANEL_HEIGHT + SPACING
+        if motor_section_bottom - log_y >= 60:
+            self.renderer.draw_log_panel(
+                right_panel_x, log_y, RIGHT_PANEL_WIDTH, motor_section_bottom - log_y,
+                log.recent(5)
+            )
+        
         # 하단 패널 위치 (모터 섹션과 충분한 간격)
         panel_y = motor_section_bottom + SPACING + 5  # 여유 5px 추가
         
@@ -1388,7 +2797,7 @@ class RobotControlApp:
             self.handle_events()
             self.update()
             self.render()
-            self.clock.tick(60)
+            self.clock.tick(Config.UI_FPS)
         
         self.shutdown()
     
@@ -1397,7 +2806,17 @@ class RobotControlApp:
         print(f"{Colors.YELLOW}[System]{Colors.END} Shutting down...")
         self.action_text = "System Shutdown"
         
+        # 제어 스레드 종료 후 컨트롤러 종료는 UI 스레드에서 실행
+        self.control.stop()
+        stats = self.control.get_stats()
+        log.info("Control Stats", "ticks: %d @ %.0f Hz, late: %d, skipped: %d, overruns: %d, lateness p99: %.1f ms",
+                 stats['ticks'], stats['rate_hz'], stats['late'], stats['skipped'], stats['overruns'],
+                 stats['lateness_ms']['p99'] or 0.0, color=Colors.CYAN)
         self.controller.shutdown()
+        self.logger.close()
+        
+        # 남은 콘솔 로그 출력 후 종료
+        log.close()
         
         pygame.quit()
         sys.exit()
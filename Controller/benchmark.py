@@ -0,0 +1,1576 @@
+import os
+import json
+import pty
+import sys
+import time
+import tty
+import argparse
+import threading
+import math
+import tempfile
+import statistics
+from queue import Queue
+
+import serial
+
+from emulator import SYNC_TIMEOUT, ArduinoEmulator
+from protocol import (
+    PROTOCOL_ASCII, PROTOCOL_BINARY, OP_MOVE, OP_TORQUE, OP_FEEDBACK, OP_QUERY, OP_PROTOCOL, READY_BANNER,
+    REPLY_FEEDBACK, DeltaEncoder, FrameDecoder, encode_ascii, encode_command,
+)
+
+# ========================================================================================================
+# Stand-in Devices (pty)
+# ========================================================================================================
+
+class FeedbackFeeder:
+    """별도 프로세스에서 Feedback 라인을 일정 주기로 쓰는 pty 장치 (rate=0: 최대 속도)"""
+
+    def __init__(self, rate: float, duration: float):
+        master_fd, slave_fd = pty.openpty()
+        tty.setraw(slave_fd)
+        self.port = os.ttyname(slave_fd)
+        self._slave_fd = slave_fd
+        self.pid = os.fork()
+        if self.pid == 0:
+            self._run(master_fd, rate, duration + 3.0)
+        os.close(master_fd)
+
+    @staticmethod
+    def _run(master_fd, rate, duration):
+        line = b"Feedback:512,512,380,800,700,512,512\r\n"
+        burst = line * 64
+        interval = 1.0 / rate if rate > 0 else 0.0
+        end = time.monotonic() + duration
+        next_time = time.monotonic()
+        try:
+            while time.monotonic() < end:
+                if interval:
+                    os.write(master_fd, line)
+                    next_time += interval
+                    time.sleep(max(0.0, next_time - time.monotonic()))
+                else:
+                    os.write(master_fd, burst)
+        except OSError:
+            pass
+        os._exit(0)
+
+    def close(self):
+        os.close(self._slave_fd)
+        os.kill(self.pid, 9)
+        os.waitpid(self.pid, 0)
+
+# ========================================================================================================
+# Benchmarks
+# ========================================================================================================
+
+def _legacy_receive_loop(port, queue, stop):
+    """기존 SerialCommunicator._receive_loop (in_waiting busy-spin + readline)"""
+    while not stop.is_set():
+        try:
+            if port.in_waiting:
+                data = port.readline().decode('utf-8').strip()
+                if data:
+                    queue.put(data)
+        except Exception:
+            time.sleep(0.1)
+
+def _measure_reader(get_message, duration: float):
+    """60 fps UI 루프처럼 큐를 비우면서 CPU 사용률과 메시지 수 측정"""
+    # 연결 대기 중 쌓인 메시지 제외
+    while get_message() is not None:
+        pass
+
+    messages = 0
+    cpu_start = time.process_time()
+    start = time.perf_counter()
+    while time.perf_counter() - start < duration:
+        while get_message() is not None:
+            messages += 1
+        time.sleep(1 / 60)
+    elapsed = time.perf_counter() - start
+    cpu = (time.process_time() - cpu_start) / elapsed * 100.0
+    return cpu, messages / elapsed
+
+def bench_reader(rate: float, duration: float):
+    """수신 스레드 비교: 기존 busy-spin vs 블로킹 벌크 읽기 (CPU %, messages/s)"""
+    from auto import SerialCommunicator
+
+    print(f"{'reader':<8} {'cpu %':>7} {'msg/s':>10}")
+
+    # 1. 기존 방식
+    feeder = FeedbackFeeder(rate, duration)
+    port = serial.Serial(feeder.port, 115200, timeout=1)
+    queue, stop = Queue(), threading.Event()
+    thread = threading.Thread(target=_legacy_receive_loop, args=(port, queue, stop), daemon=True)
+    thread.start()
+    cpu, msg_rate = _measure_reader(lambda: None if queue.empty() else queue.get(), duration)
+    stop.set()
+    thread.join(timeout=1.0)
+    port.close()
+    feeder.close()
+    print(f"{'legacy':<8} {cpu:>7.1f} {msg_rate:>10.0f}")
+
+    # 2. 현재 SerialCommunicator
+    feeder = FeedbackFeeder(rate, duration + 2.0)
+    comm = SerialCommunicator(port=feeder.port)
+    cpu, msg_rate = _measure_reader(comm.get_received_data, duration)
+    comm.close()
+    feeder.close()
+    print(f"{'current':<8} {cpu:>7.1f} {msg_rate:>10.0f}")
+
+def _wait_reply(port, decoder, timeout=1.0):
+    """응답 메시지 1개 대기 (부팅 배너 제외)"""
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        messages = [m for m in decoder.feed(port.read(max(1, port.in_waiting))) if m != READY_BANNER]
+        if messages:
+            return messages[0]
+    return None
+
+def bench_protocol(count: int, baud_rate: int, latency: float):
+    """ASCII / Binary 방언 비교: 프레임 크기, 에뮬레이터 처리량(cmd/s), 왕복 지연, 분할 도착 프레임 처리"""
+    sample = [512, 512, 380, 800, 700, 512, 512]
+
+    print(f"{'dialect':<8} {'bytes':>6} {'link cmd/s':>11} {'emu cmd/s':>10} "
+          f"{'rtt p50 ms':>11} {'rtt p99 ms':>11}")
+
+    for dialect in (PROTOCOL_ASCII, PROTOCOL_BINARY):
+        device = ArduinoEmulator(baud_rate=baud_rate, latency=latency).start()
+        port = serial.Serial(device.port, baud_rate or 115200, timeout=0.01)
+        decoder = FrameDecoder(terminator=b'\n')
+
+        # 방언 협상 (실제 SerialCommunicator와 동일한 절차)
+        port.write(encode_ascii(OP_PROTOCOL, [1 if dialect == PROTOCOL_BINARY else 0]).encode('utf-8'))
+        _wait_reply(port, decoder)
+
+        frame_bytes = len(encode_command(OP_MOVE, sample, dialect))
+
+        # 처리량: 위치 명령 연속 전송 후 디바이스 디코딩 완료까지
+        packets = [encode_command(OP_MOVE, [(v + i) % 1024 for v in sample], dialect) for i in range(count)]
+        start_commands = device.commands
+        start = time.perf_counter()
+        for packet in packets:
+            port.write(packet)
+        while device.commands - start_commands < count and time.perf_counter() - start < 30:
+            time.sleep(0.001)
+        throughput = (device.commands - start_commands) / (time.perf_counter() - start)
+
+        # 왕복 지연: 위치 요청 -> 응답 디코딩
+        rtts = []
+        query = encode_command(OP_QUERY, [0] * 7, dialect)
+        for _ in range(min(count, 500)):
+            t0 = time.perf_counter()
+            port.write(query)
+            if _wait_reply(port, decoder) is not None:
+                rtts.append((time.perf_counter() - t0) * 1000.0)
+        rtts.sort()
+
+        link_rate = baud_rate / 10 / frame_bytes  # 8N1 = 10 bit/byte
+        p50 = statistics.median(rtts) if rtts else float('nan')
+        p99 = rtts[int(len(rtts) * 0.99) - 1] if rtts else float('nan')
+        print(f"{dialect:<8} {frame_bytes:>6} {link_rate:>11.0f} {throughput:>10.0f} {p50:>11.3f} {p99:>11.3f}")
+
+        port.close()
+        device.stop()
+
+    # 분할 도착: 0xAA 뒤에서 나뉘어 도착하는 Binary 프레임 (USB 패킷 분할)
+    # abort: 0xAA만 보내고 끊긴 뒤 SYNC_TIMEOUT이 지나 다음 프레임 전송 (끊긴 프레임만 버려져야 함)
+    # stray = 버린 프레임의 나머지가 ASCII 명령으로 처리된 횟수 (0이어야 함)
+    print(f"\n{'arrival':<10} {'frames':>7} {'applied':>8} {'dropped':>8} {'stray':>6}")
+    for name, gap, abort in (("split 1ms", 0.001, False), ("split 10ms", 0.010, False),
+                             ("abort", SYNC_TIMEOUT * 2.5, True)):
+        device = ArduinoEmulator(baud_rate=baud_rate, latency=latency).start()
+        port = serial.Serial(device.port, baud_rate or 115200, timeout=0.01)
+        decoder = FrameDecoder(terminator=b'\n')
+        port.write(encode_ascii(OP_PROTOCOL, [1]).encode('utf-8'))
+        _wait_reply(port, decoder)
+        
+        frames = 10
+        applied = 0
+        start_commands = device.commands
+        for i in range(frames):
+            target = [(v + 16 + i) % 1024 for v in sample]
+            packet = encode_command(OP_MOVE, target, PROTOCOL_BINARY)
+            port.write(packet[:1])
+            time.sleep(gap)
+            port.write(packet if abort else packet[1:])
+            if _wait_applied(device, target, timeout=0.5):
+                applied += 1
+        stray = device.commands - start_commands - applied
+        print(f"{name:<10} {frames:>7} {applied:>8} {device.receiver.dropped:>8} {stray:>6}")
+        
+        port.close()
+        device.stop()
+
+def _wait_applied(device, target, timeout=10.0) -> bool:
+    """에뮬레이터가 위치 명령을 처리할 때까지 대기"""
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        if [int(g) for g in device.goal] == target:
+            return True
+        time.sleep(0.001)
+    return False
+
+def bench_connect(boot_delay: float, trials: int):
+    """연결 후 첫 명령 처리까지의 시간 (cold / warm start, 재연결)
+    
+    - legacy : 포트 열기 (장치 리셋) -> 고정 2 s 대기 -> 명령
+    - cold   : 포트 스캔 + 포트 열기 (장치 리셋) -> 준비 확인 -> 명령
+    - warm   : 캐시된 장치 지문 (스캔 없음), 장치 실행 중 -> 준비 확인 -> 명령
+    - reconnect : 장치 재시작 -> watchdog 재연결 -> 목표 위치 재동기화
+    """
+    from auto import Config, SerialCommunicator
+    
+    workdir = tempfile.mkdtemp()
+    link = os.path.join(workdir, "ttyROBOT")
+    Config.PORT = None
+    Config.PORT_CACHE_FILE = os.path.join(workdir, "serial_port.json")
+    target = [600, 600, 400, 700, 600, 600, 500]
+    results = {name: [] for name in ("legacy", "cold", "warm", "reconnect")}
+    
+    def first_command(device, start, send):
+        send(OP_MOVE, target)
+        return (time.perf_counter() - start) * 1000.0 if _wait_applied(device, target) else float('nan')
+    
+    for _ in range(trials):
+        # legacy: 고정 대기
+        device = ArduinoEmulator(boot_delay=boot_delay, link=link)
+        start = time.perf_counter()
+        device.start()
+        port = serial.Serial(link, 115200, timeout=0.1)
+        time.sleep(2)
+        results["legacy"].append(first_command(
+            device, start, lambda op, values: port.write(encode_command(op, values))))
+        port.close()
+        device.stop()
+        
+        # cold: 캐시 없음, 포트 스캔 + 리셋된 장치
+        if os.path.exists(Config.PORT_CACHE_FILE):
+            os.remove(Config.PORT_CACHE_FILE)
+        device = ArduinoEmulator(boot_delay=boot_delay, link=link)
+        start = time.perf_counter()
+        SerialCommunicator._list_ports()  # _auto_detect_port()의 스캔 비용 (pty는 목록에 없음)
+        device.start()
+        comm = SerialCommunicator(port=link)
+        results["cold"].append(first_command(device, start, comm.send_command))
+        comm.close()
+        device.stop()
+        
+        # warm: 캐시된 장치, 실행 중인 장치
+        device = ArduinoEmulator(link=link).start()
+        time.sleep(0.05)
+        start = time.perf_counter()
+        comm = SerialCommunicator()
+        results["warm"].append(first_command(device, start, comm.send_command))
+        
+        # reconnect: 장치 재시작 후 watchdog 복구
+        comm.on_reconnect = lambda: comm.send_command(OP_MOVE, target)
+        device.stop()
+        while comm.is_connected:
+            time.sleep(0.001)
+        device = ArduinoEmulator(boot_delay=boot_delay, link=link)
+        start = time.perf_counter()
+        device.start()
+        ok = _wait_applied(device, target, timeout=boot_delay + 15.0)
+        results["reconnect"].append((time.perf_counter() - start) * 1000.0 if ok else float('nan'))
+        comm.close()
+        device.stop()
+    
+    print(f"\nboot delay {boot_delay:.1f} s, {trials} trials")
+    print(f"{'start':<10} {'first cmd p50 ms':>17} {'max ms':>9}")
+    for name, samples in results.items():
+        print(f"{name:<10} {statistics.median(samples):>17.0f} {max(samples):>9.0f}")
+
+def bench_unplug(trials: int, timeout: float):
+    """위치 요청 중 장치 분리: request_positions() 호출이 멈추지 않고 Future가 실패로 끝나는지 확인
+    
+    - unplug : 위치 요청을 1 ms 간격으로 보내는 중 에뮬레이터 종료 (pty 닫힘, 수신/송신 중 먼저 감지한 쪽이 처리)
+    - write  : 포트 쓰기가 SerialException을 던지도록 바꿔 송신 경로에서 연결 끊김 처리 (USB 분리 직후)
+    hung은 timeout 안에 반환되지 않은 호출 수 (0이어야 함)
+    """
+    from auto import Config, SerialCommunicator
+    
+    Config.PORT = None
+    Config.PORT_CACHE_FILE = os.path.join(tempfile.mkdtemp(), "serial_port.json")
+    
+    def failing_write(data):
+        raise serial.SerialException("device disconnected")
+    
+    print(f"{'scenario':<8} {'trials':>6} {'hung':>5} {'failed':>7} {'answered':>9} {'call max ms':>12}")
+    for scenario in ("unplug", "write"):
+        hung = failed = answered = 0
+        call_max = 0.0
+        for _ in range(trials):
+            device = ArduinoEmulator().start()
+            comm = SerialCommunicator(port=device.port)
+            futures = []
+            calls = []
+            stop = threading.Event()
+            
+            def query_loop():
+                while not stop.is_set():
+                    start = time.perf_counter()
+                    futures.append(comm.request_positions(timeout))
+                    calls.append(time.perf_counter() - start)
+                    time.sleep(0.001)
+            
+            thread = threading.Thread(target=query_loop, daemon=True)
+            thread.start()
+            time.sleep(0.05)
+            if scenario == "unplug":
+                device.stop()
+            else:
+                comm.arduino.write = failing_write
+            time.sleep(0.05)
+            stop.set()
+            thread.join(timeout=timeout + 1.0)
+            if thread.is_alive():
+                hung += 1
+            for future in futures:
+                try:
+                    future.result(timeout=timeout + 1.0)
+                    answered += 1
+                except Exception:
+                    failed += 1
+            call_max = max([call_max] + calls)
+            comm.close()
+            device.stop()
+        print(f"{scenario:<8} {trials:>6} {hung:>5} {failed:>7} {answered:>9} {call_max * 1000:>12.2f}")
+
+def bench_bus(duration: float, rate: float, baud_rate: int):
+    """다중 팔 버스: 팔 1/2/4개 (링크 1~2개), Bus 프레임 묶음 전송 vs 팔마다 프레임 1개
+    
+    모든 팔의 목표 위치를 매 주기 변경하면서 링크 처리량, 에뮬레이터가 처리한 팔 명령 수,
+    팔별 피드백(20 ms 주기 Bus 피드백) 분배율을 측정합니다.
+    """
+    from auto import Config, SerialCommunicator
+    from bus import ArmBus
+    from protocol import bus_frame_size
+    
+    Config.PORT = None
+    Config.PORT_CACHE_FILE = os.path.join(tempfile.mkdtemp(), "serial_port.json")
+    
+    print(f"{'arms':>4} {'links':>5} {'mode':<8} {'B/tick':>7} {'frames/s':>9} {'arm cmd/s':>10} "
+          f"{'applied/s':>10} {'TX kB/s':>8} {'fb/arm/s':>9} {'link max tick/s':>16}")
+    
+    for num_arms, num_links in ((1, 1), (2, 1), (4, 1), (4, 2)):
+        for batch in (False, True):
+            per_link = num_arms // num_links
+            devices = [ArduinoEmulator(baud_rate=baud_rate, arms=per_link).start() for _ in range(num_links)]
+            links = [SerialCommunicator(port=device.port) for device in devices]
+            bus = ArmBus(rate_hz=rate, batch=batch)
+            names = []
+            for link_index, link in enumerate(links):
+                for arm_id in range(per_link):
+                    names.append(f"arm{link_index}.{arm_id}")
+                    bus.add_arm(names[-1], link, arm_id)
+            bus.set_torque(True)
+            bus.set_feedback(True)
+            time.sleep(0.2)
+            
+            start_frames, start_cmds = bus.frames, bus.arm_commands
+            start_applied = sum(device.arm_commands for device in devices)
+            start_bytes = sum(link.telemetry.tx_bytes.total for link in links)
+            start_fb = {name: bus.arms[name].feedback_count for name in names}
+            start = time.perf_counter()
+            tick = 0
+            while time.perf_counter() - start < duration:
+                tick += 1
+                for index, name in enumerate(names):
+                    offset = (tick + index * 7) % 200
+                    bus.set_targets(name, [412 + offset, 512, 380, 800, 700, 512 - offset // 2, 512])
+                time.sleep(0.5 / rate)
+            bus.flush()
+            time.sleep(0.1)
+            elapsed = time.perf_counter() - start
+            
+            frames = (bus.frames - start_frames) / elapsed
+            cmds = (bus.arm_commands - start_cmds) / elapsed
+            applied = (sum(device.arm_commands for device in devices) - start_applied) / elapsed
+            tx_rate = (sum(link.telemetry.tx_bytes.total for link in links) - start_bytes) / elapsed
+            fb = statistics.mean((bus.arms[name].feedback_count - start_fb[name]) / elapsed for name in names)
+            tick_bytes = bus_frame_size(per_link) if batch else per_link * bus_frame_size(1)
+            link_max = baud_rate / 10 / tick_bytes  # 링크(8N1)당 최대 주기
+            
+            print(f"{num_arms:>4} {num_links:>5} {'batched' if batch else 'per-arm':<8} {tick_bytes:>7} "
+                  f"{frames:>9.0f} {cmds:>10.0f} {applied:>10.0f} {tx_rate / 1000:>8.2f} {fb:>9.1f} {link_max:>16.0f}")
+            
+            bus.set_feedback(False)
+            bus.stop()
+            for link in links:
+                link.close()
+            for device in devices:
+                device.stop()
+
+def _jog_session(duration: float):
+    """키보드 조그: 50 ms 키 반복으로 관절 1개씩 이동, 2 s 조작 / 1 s 정지 반복 (관절 한 바퀴마다 방향 반전)"""
+    positions = [512, 512, 380, 800, 700, 512, 512]
+    t = 0.0
+    while t < duration:
+        joint = int(t // 3) % 7
+        if t % 3 < 2:
+            positions[joint] += 3 if int(t // 21) % 2 == 0 else -3
+        yield t, list(positions)
+        t += 0.05
+
+def _follower_session(duration: float):
+    """얼굴/손 추종: 30 fps로 M1(Base), M3(Upper_Arm)만 변경"""
+    positions = [512, 512, 380, 800, 700, 512, 512]
+    t = 0.0
+    while t < duration:
+        positions[0] = int(512 + 200 * math.sin(t * 0.8))
+        positions[2] = int(380 + 80 * math.sin(t * 1.3))
+        yield t, list(positions)
+        t += 1.0 / 30
+
+def bench_delta(duration: float):
+    """전체 위치 명령 vs Delta 명령 (변경된 관절만, 1 s 주기 Keyframe): 세션별 바이트/s
+    
+    Delta 스트림을 에뮬레이터에 그대로 전송하여 최종 목표 위치가 전체 명령과 같은지 확인합니다.
+    """
+    print(f"{'session':<9} {'dialect':<8} {'full B/s':>9} {'delta B/s':>10} {'saved':>7} "
+          f"{'keyframes':>10} {'deltas':>7} {'final match':>12}")
+    
+    for name, session in (("jog", _jog_session), ("follower", _follower_session)):
+        for dialect in (PROTOCOL_ASCII, PROTOCOL_BINARY):
+            encoder = DeltaEncoder(keyframe_interval=1.0)
+            full_bytes = 0
+            packets = []
+            last = None
+            for t, positions in session(duration):
+                if positions != last:  # TransmitScheduler와 동일하게 변경 없는 명령은 생략
+                    full_bytes += len(encode_command(OP_MOVE, positions, dialect))
+                    last = positions
+                packet, _ = encoder.encode(positions, dialect, now=t)
+                if packet is not None:
+                    packets.append(packet)
+            
+            # 에뮬레이터에 Delta 스트림 재생 -> 최종 목표 위치 확인
+            device = ArduinoEmulator(baud_rate=0).start()
+            port = serial.Serial(device.port, 115200, timeout=0.01)
+            port.write(encode_ascii(OP_PROTOCOL, [1 if dialect == PROTOCOL_BINARY else 0]).encode('utf-8'))
+            _wait_reply(port, FrameDecoder(terminator=b'\n'))
+            for packet in packets:
+                port.write(packet)
+            match = _wait_applied(device, last, timeout=5.0)
+            port.close()
+            device.stop()
+            
+            saved = 100.0 * (1 - encoder.bytes / full_bytes)
+            print(f"{name:<9} {dialect:<8} {full_bytes / duration:>9.0f} {encoder.bytes / duration:>10.0f} "
+                  f"{saved:>6.0f}% {encoder.keyframes:>10} {encoder.deltas:>7} {str(match):>12}")
+
+def bench_feedback(duration: float, interval: float, fps: float, stall: float):
+    """Passivity 모드 피드백 처리: 틱당 1개 처리(legacy) vs 틱마다 모두 비우고 최신 자세 적용
+    
+    UI 루프(fps)가 1초마다 stall초 동안 멈추는 상황에서 적용된 샘플의 나이(staleness)와
+    틱당 처리한 레코드 수(backlog)를 측정합니다.
+    """
+    import emulator
+    from auto import Config, MotorController
+    from telemetry import LatencyHistogram
+    
+    emulator.FEEDBACK_INTERVAL = interval
+    Config.PORT_CACHE_FILE = os.path.join(tempfile.mkdtemp(), "serial_port.json")
+    
+    print(f"feedback every {interval * 1000:.0f} ms, UI {fps:.0f} fps, {stall * 1000:.0f} ms stall per second")
+    print(f"{'mode':<8} {'age p50 ms':>11} {'age p99 ms':>11} {'age max ms':>11} {'backlog max':>12} {'RXQ end':>8}")
+    
+    for mode in ("legacy", "drain"):
+        device = emulator.ArduinoEmulator(wander=50.0).start()
+        Config.PORT = device.port
+        Config.PASSIVITY_MODE = True
+        controller = MotorController()
+        controller.serial.send_command(OP_FEEDBACK, [1])
+        controller.serial.send_command(OP_TORQUE, [0])
+        
+        ages = LatencyHistogram()
+        backlog_max = 0
+        start = time.perf_counter()
+        next_stall = start + 1.0
+        while time.perf_counter() - start < duration:
+            now = time.monotonic()
+            if mode == "legacy":
+                # 기존 process_feedback(): 틱당 레코드 1개
+                reply = controller.serial.get_received_data()
+                if reply is not None and reply.kind == REPLY_FEEDBACK:
+                    ages.add(now - reply.timestamp)
+                backlog_max = max(backlog_max, controller.serial.receive_queue.qsize())
+            else:
+                controller.process_feedback()
+                controller.take_feedback_samples()
+                if controller.feedback_staleness is not None and controller.feedback_backlog:
+                    ages.add(controller.feedback_staleness)
+                backlog_max = max(backlog_max, controller.feedback_backlog)
+            
+            if time.perf_counter() >= next_stall:
+                time.sleep(stall)
+                next_stall += 1.0
+            time.sleep(1.0 / fps)
+        
+        summary = ages.percentiles((50, 99, 100))
+        print(f"{mode:<8} {summary['p50']:>11.1f} {summary['p99']:>11.1f} {summary['p100']:>11.1f} "
+              f"{backlog_max:>12} {controller.serial.receive_queue.qsize():>8}")
+        
+        controller.serial.send_command(OP_FEEDBACK, [0])
+        controller.tx_scheduler.stop()
+        controller.serial.close()
+        device.stop()
+    Config.PASSIVITY_MODE = False
+
+def _broker_worker(mode: str, address, index: int, duration: float, poll: float, results):
+    """브로커 클라이언트 프로세스: 피드백 수신 지연 (브로커 수신 시각 -> 클라이언트 도착)"""
+    from multiprocessing.connection import Client
+    from brokerclient import BROKER_AUTHKEY, BrokerClient, PRIORITY_FOLLOWER
+    
+    latencies = []
+    if mode == "shm":
+        client = BrokerClient(f"bench{index}", PRIORITY_FOLLOWER, address=address)
+        client.send_command(OP_FEEDBACK, [1])
+        results.put(None)  # 준비 완료
+        end = time.monotonic() + duration
+        while time.monotonic() < end:
+            for reply in client.drain_received():
+                latencies.append(time.monotonic() - reply.timestamp)
+            time.sleep(poll)
+        client.close()
+    else:
+        # 비교용: 브로커가 피드백을 텍스트로 다시 직렬화해 각 연결로 전송
+        conn = Client(address, authkey=BROKER_AUTHKEY)
+        conn.send(('hello', f"bench{index}", PRIORITY_FOLLOWER))
+        conn.recv()
+        conn.send(('cmd', OP_FEEDBACK, [1]))
+        results.put(None)
+        end = time.monotonic() + duration
+        while time.monotonic() < end:
+            if not conn.poll(0.1):
+                continue
+            message = conn.recv()
+            if message[0] == 'text':
+                _, text, timestamp = message
+                [int(v) for v in text.partition(':')[2].split(',')]
+                latencies.append(time.monotonic() - timestamp)
+        conn.send(('bye',))
+        conn.close()
+    results.put(latencies)
+
+def bench_broker(duration: float, interval: float, poll: float):
+    """시리얼 브로커 피드백 배포 지연: 공유 메모리 vs 클라이언트별 텍스트 재전송 (클라이언트 1/2/4/8개)
+    
+    broker CPU는 브로커와 에뮬레이터가 함께 실행되는 벤치마크 프로세스 기준입니다.
+    """
+    import multiprocessing
+    import emulator
+    from broker import SerialBroker
+    from auto import Config
+    
+    emulator.FEEDBACK_INTERVAL = interval
+    Config.PORT_CACHE_FILE = os.path.join(tempfile.mkdtemp(), "serial_port.json")
+    context = multiprocessing.get_context("spawn")
+    device = emulator.ArduinoEmulator(wander=50.0).start()
+    
+    print(f"feedback every {interval * 1000:.0f} ms, shm poll {poll * 1000:.1f} ms")
+    print(f"{'mode':<6} {'clients':>7} {'samples/s/client':>17} {'p50 ms':>8} {'p99 ms':>8} {'max ms':>8} "
+          f"{'broker CPU %':>13}")
+    
+    for mode in ("shm", "text"):
+        for clients in (1, 2, 4, 8):
+            broker = SerialBroker(port=device.port, address=('127.0.0.1', 0),
+                                  board_name=f"robot_arm_bench_{os.getpid()}", text_fanout=(mode == "text"))
+            results = context.Queue()
+            workers = [context.Process(target=_broker_worker,
+                                       args=(mode, broker.listener.address, i, duration, poll, results))
+                       for i in range(clients)]
+            for worker in workers:
+                worker.start()
+            for _ in workers:
+                results.get(timeout=30)  # 모든 클라이언트 준비 대기
+            cpu_start = time.process_time()
+            latencies = []
+            for _ in workers:
+                latencies.extend(results.get(timeout=duration + 30))
+            cpu = (time.process_time() - cpu_start) / duration * 100.0
+            for worker in workers:
+                worker.join()
+            broker.stop()
+            
+            latencies = sorted(l * 1000.0 for l in latencies)
+            rate = len(latencies) / clients / duration
+            p50 = latencies[len(latencies) // 2]
+            p99 = latencies[int(len(latencies) * 0.99) - 1]
+            print(f"{mode:<6} {clients:>7} {rate:>17.0f} {p50:>8.2f} {p99:>8.2f} {latencies[-1]:>8.2f} {cpu:>13.1f}")
+    device.stop()
+
+def _legacy_joint_frame(target, display, states, motors, smoothness=0.15):
+    """이전 MotorController: 리스트 순회 update_positions() + 모터별 get_motor_info() dict"""
+    from auto import MotorState
+    
+    for i in range(len(target)):
+        diff = target[i] - display[i]
+        if abs(diff) > 0.5:
+            display[i] += diff * smoothness
+        else:
+            display[i] = target[i]
+        if abs(display[i] - target[i]) < 2:
+            if states[i] == MotorState.MOVING:
+                states[i] = MotorState.IDLE
+        elif states[i] != MotorState.AT_LIMIT:
+            states[i] = MotorState.MOVING
+    current = display.copy()
+    infos = []
+    for i, motor in enumerate(motors):
+        infos.append({
+            'index': i, 'name': motor.name, 'current': current[i], 'target': target[i],
+            'min': motor.min_val, 'max': motor.max_val, 'angle': current[i] / 1023.0 * 300.0,
+            'state': states[i], 'velocity': abs(target[i] - display[i]), 'torque_enabled': True,
+        })
+    return infos
+
+def bench_joints(frames: int):
+    """관절 상태 프레임 처리: 리스트 + dict vs JointState 배열 + 읽기 전용 뷰 (팔 1/4/16개)
+    
+    프레임 = 스무딩/상태 갱신 + 렌더러가 관절마다 current/target/state/angle을 읽는 과정
+    """
+    import tracemalloc
+    from auto import MotorConfig, MotorState, JointState, JointView
+    
+    arm = [MotorConfig(0, "Base", 0, 1023, 512), MotorConfig(1, "Shoulder", 180, 845, 512),
+           MotorConfig(2, "Upper_Arm", 165, 1023, 380), MotorConfig(3, "Elbow", 512, 1023, 800),
+           MotorConfig(4, "forearm", 512, 1023, 700), MotorConfig(5, "Wrist", 0, 1023, 512),
+           MotorConfig(6, "Hand", 370, 695, 512)]
+    
+    print(f"{'arms':>4} {'joints':>6} {'mode':<8} {'us/frame':>9} {'peak B/frame':>15}")
+    for arms in (1, 4, 16):
+        motors = [MotorConfig(a * 7 + m.index, m.name, m.min_val, m.max_val, m.default_pos)
+                  for a in range(arms) for m in arm]
+        goals = [[m.default_pos + (100 if (k + m.index) % 3 else -100) for m in motors] for k in range(8)]
+        
+        # legacy
+        target = [float(m.default_pos) for m in motors]
+        display = list(target)
+        states = [MotorState.IDLE] * len(motors)
+        
+        def legacy(k):
+            if k % 30 == 0:
+                target[:] = goals[(k // 30) % len(goals)]
+            for info in _legacy_joint_frame(target, display, states, motors):
+                info['current'], info['target'], info['state'], info['angle']
+        
+        # JointState
+        joints = JointState(motors)
+        views = [JointView(m, joints.snapshot) for m in motors]
+        
+        def arrays(k):
+            if k % 30 == 0:
+                joints.target[:] = goals[(k // 30) % len(goals)]
+            joints.smooth(0.15)
+            joints.publish()
+            joints.read_snapshot()
+            for view in views:
+                view['current'], view['target'], view['state'], view['angle']
+        
+        for name, frame in (("list", legacy), ("arrays", arrays)):
+            for k in range(100):
+                frame(k)
+            start = time.perf_counter()
+            for k in range(frames):
+                frame(k)
+            elapsed = time.perf_counter() - start
+            
+            # 프레임 중 일시적으로 할당되는 메모리 (peak - 시작 시점)
+            tracemalloc.start()
+            transient = 0
+            for k in range(frames, frames + 200):
+                tracemalloc.reset_peak()
+                base = tracemalloc.get_traced_memory()[0]
+                frame(k)
+                transient = max(transient, tracemalloc.get_traced_memory()[1] - base)
+            tracemalloc.stop()
+            print(f"{arms:>4} {len(motors):>6} {name:<8} {elapsed / frames * 1e6:>9.1f} {transient:>15}")
+
+def _track_move(device, goal, start_move, timeout=10.0):
+    """이동 중 서보 위치 샘플링 -> 관절별 도착 시각 (목표 ±1 tick 이내에 들어온 마지막 진입 시각, s)"""
+    arrival = [None] * len(goal)
+    start = time.perf_counter()
+    start_move()
+    while time.perf_counter() - start < timeout:
+        now = time.perf_counter() - start
+        present = list(device.present)
+        for i, (p, g) in enumerate(zip(present, goal)):
+            if abs(p - g) <= 1.0:
+                if arrival[i] is None:
+                    arrival[i] = now
+            else:
+                arrival[i] = None
+        if all(a is not None for a in arrival) and now - max(arrival) > 0.3:
+            break
+        time.sleep(0.002)
+    return arrival
+
+def bench_trajectory(rate: float, ticks: int):
+    """프리셋 이동: 목표 위치 즉시 전송 vs 동기화 궤적 스트리밍 (사다리꼴 / 최소 저크)
+    
+    - 에뮬레이터(MOVING_SPEED 100)에서 관절별 도착 시각의 차이(spread)와 전체 이동 시간
+    - 틱당 스트리밍 비용: 미리 계산된 행 조회 vs 틱마다 프로파일 계산
+    """
+    import numpy as np
+    from auto import Config, SerialCommunicator, TransmitScheduler
+    from trajectory import PROFILES, PROFILE_MIN_JERK, TrajectoryStreamer, plan_trajectory, _min_jerk_scaling
+    
+    home = [512, 512, 380, 800, 700, 512, 512]
+    preset = [300, 700, 600, 600, 900, 200, 400]
+    vmax, amax = Config.TRAJECTORY_MAX_VELOCITY, Config.TRAJECTORY_MAX_ACCELERATION
+    
+    print(f"{'mode':<10} {'first s':>8} {'last s':>7} {'spread ms':>10}")
+    for mode in ("jump",) + PROFILES:
+        device = ArduinoEmulator().start()
+        comm = SerialCommunicator(port=device.port)
+        tx = TransmitScheduler(comm, rate_hz=rate)
+        streamer = TrajectoryStreamer(tx.submit, rate)
+        moves = []
+        for start, goal in ((home, preset), (preset, home)):
+            if mode == "jump":
+                move = lambda goal=goal: tx.submit(goal)
+            else:
+                trajectory = plan_trajectory(start, goal, rate, vmax, amax, mode)
+                move = lambda trajectory=trajectory: streamer.play(trajectory)
+            arrival = _track_move(device, goal, move)
+            moving = [a for a, s, g in zip(arrival, start, goal) if s != g and a is not None]
+            moves.append((max(moving), max(moving) - min(moving), min(moving)))
+        streamer.stop()
+        tx.stop()
+        comm.close()
+        device.stop()
+        last = statistics.mean(m[0] for m in moves)
+        spread = statistics.mean(m[1] for m in moves)
+        first = statistics.mean(m[2] for m in moves)
+        print(f"{mode:<10} {first:>8.2f} {last:>7.2f} {spread * 1000:>10.0f}")
+    
+    # 틱당 비용
+    start, goal = np.array(home, dtype=np.float64), np.array(preset, dtype=np.float64)
+    trajectory = plan_trajectory(home, preset, rate, vmax, amax, PROFILE_MIN_JERK)
+    n = len(trajectory)
+    
+    def precomputed(k):
+        return trajectory.commands[min(k % (n + 10), n - 1)]
+    
+    def on_the_fly(k):
+        tau = np.array([min(k % (n + 10) + 1, n) / n])
+        return np.rint(start + _min_jerk_scaling(tau)[0] * (goal - start)).astype(np.int64).tolist()
+    
+    print(f"\n{'profile':<10} {'plan us':>8} {'ticks':>6}")
+    for profile in PROFILES:
+        begin = time.perf_counter()
+        for _ in range(1000):
+            plan_trajectory(home, preset, rate, vmax, amax, profile)
+        print(f"{profile:<10} {(time.perf_counter() - begin) / 1000 * 1e6:>8.1f} "
+              f"{len(plan_trajectory(home, preset, rate, vmax, amax, profile)):>6}")
+    
+    print(f"\n{'per tick':<12} {'us/tick':>8}")
+    for name, tick in (("precomputed", precomputed), ("on-the-fly", on_the_fly)):
+        begin = time.perf_counter()
+        for k in range(ticks):
+            tick(k)
+        print(f"{name:<12} {(time.perf_counter() - begin) / ticks * 1e6:>8.2f}")
+
+def bench_kinematics(count: int):
+    """정기구학: 자세마다 DH 행렬을 만들어 곱하는 루프 vs KinematicChain 일괄 평가 (배치 크기별 us/자세)"""
+    import numpy as np
+    from kinematics import KinematicChain, dh_transform
+    
+    chain = KinematicChain()
+    rng = np.random.default_rng(0)
+    
+    def loop(angles):
+        poses = []
+        for q in angles:
+            transform = chain.base
+            for joint, theta in zip(chain.joints, q):
+                transform = transform @ dh_transform(joint.a, joint.alpha, joint.d, theta)
+            poses.append(transform @ chain.tool)
+        return np.array(poses)
+    
+    print(f"{'batch':>7} {'loop us/pose':>13} {'batched us/pose':>16} {'speedup':>8} {'max err':>9}")
+    for batch in (1, 10, 100, 1000, 10000):
+        angles = chain.ticks_to_angles(chain.sample_ticks(batch, rng))
+        rounds = max(1, count // batch)
+        loop_rounds = max(1, min(rounds, 2000 // batch))
+        
+        start = time.perf_counter()
+        for _ in range(loop_rounds):
+            expected = loop(angles)
+        loop_us = (time.perf_counter() - start) / (loop_rounds * batch) * 1e6
+        
+        start = time.perf_counter()
+        for _ in range(rounds):
+            poses = chain.forward(angles)
+        batched_us = (time.perf_counter() - start) / (rounds * batch) * 1e6
+        
+        error = float(np.abs(poses - expected).max())
+        print(f"{batch:>7} {loop_us:>13.2f} {batched_us:>16.3f} {loop_us / batched_us:>7.0f}x {error:>9.1e}")
+    
+    points = chain.workspace(100000, rng)
+    lo, hi = points.min(axis=0), points.max(axis=0)
+    print(f"\nworkspace (100k samples, cm): x {lo[0]:.1f} ~ {hi[0]:.1f}, y {lo[1]:.1f} ~ {hi[1]:.1f}, "
+          f"z {lo[2]:.1f} ~ {hi[2]:.1f}")
+
+def bench_ik(count: int):
+    """역기구학 (DLS): 기본 자세에서 시작 vs 직전 해에서 시작 (검출 프레임마다 움직이는 목표 추적)
+    
+    - random : 도달 가능한 무작위 목표 (무작위 tick의 FK)
+    - track  : 테이블 위 반지름 8 cm 원 궤적, 30 fps 검출 프레임 (프레임당 약 0.8 cm 이동)
+    """
+    import numpy as np
+    from kinematics import IKSolver
+    
+    solver = IKSolver()
+    chain = solver.chain
+    rng = np.random.default_rng(0)
+    home = np.array([512, 512, 380, 800, 700, 512, 512], dtype=np.float64)
+    
+    random_targets = chain.positions(chain.sample_ticks(count, rng))
+    angle = np.arange(count) * (2 * math.pi * 0.5 / 30)
+    track_targets = np.stack([30 + 8 * np.cos(angle), 15 + 8 * np.sin(angle), np.full(count, 8.0)], axis=1)
+    
+    print(f"{'targets':<8} {'seed':<6} {'p50 ms':>7} {'p99 ms':>7} {'max ms':>7} {'iters':>6} "
+          f"{'solved':>7} {'err p50 cm':>11} {'in limits':>10}")
+    for name, targets in (("random", random_targets), ("track", track_targets)):
+        for seed_mode in ("home", "warm"):
+            seed = home.copy()
+            times, iterations, errors = [], [], []
+            solved, in_limits = 0, True
+            for target in targets:
+                start = time.perf_counter()
+                result = solver.solve(target, seed if seed_mode == "warm" else home)
+                times.append((time.perf_counter() - start) * 1000.0)
+                iterations.append(result.iterations)
+                errors.append(result.error)
+                solved += result.converged
+                in_limits &= bool(np.all((chain.min_ticks <= result.ticks[:6]) & (result.ticks[:6] <= chain.max_ticks)))
+                if result.converged:
+                    seed = result.ticks.astype(np.float64)
+            times.sort()
+            print(f"{name:<8} {seed_mode:<6} {times[len(times) // 2]:>7.2f} {times[int(len(times) * 0.99)]:>7.2f} "
+                  f"{times[-1]:>7.2f} {statistics.median(iterations):>6.0f} {solved / len(targets) * 100:>6.1f}% "
+                  f"{statistics.median(errors):>11.3f} {str(in_limits):>10}")
+    
+    # 일괄 풀이 (IK 격자 등)
+    seeds = chain.ticks_to_angles(np.broadcast_to(home, (count, 7)))
+    start = time.perf_counter()
+    _, _, errors, _ = solver.solve_angles(random_targets, seeds)
+    elapsed = time.perf_counter() - start
+    print(f"\nbatched solve_angles: {count} targets in {elapsed * 1000:.1f} ms "
+          f"({elapsed / count * 1e6:.1f} us/target, {np.mean(errors <= solver.tolerance) * 100:.1f}% solved)")
+
+def bench_ikgrid(count: int, path: str):
+    """IK 격자 조회 vs 온라인 IK 풀이: 지연, 보간 오차, 도달 가능 판정 일치율
+    
+    격자 파일이 없으면 먼저 빌드합니다. (python ikgrid.py와 같은 설정)
+    """
+    import numpy as np
+    from ikgrid import IKGrid, TABLE_WIDTH_CM, TABLE_HEIGHT_CM
+    from kinematics import IKSolver
+    
+    solver = IKSolver()
+    chain = solver.chain
+    if not os.path.exists(path):
+        start = time.perf_counter()
+        IKGrid.build(solver).save(path)
+        print(f"built {path} in {time.perf_counter() - start:.1f} s")
+    start = time.perf_counter()
+    grid = IKGrid.open(path)
+    print(f"grid {grid.nx} x {grid.ny} x {grid.nz}, {os.path.getsize(path) / 1024:.0f} KiB, "
+          f"open {(time.perf_counter() - start) * 1000:.2f} ms")
+    
+    rng = np.random.default_rng(0)
+    targets = np.column_stack([rng.uniform(0, TABLE_WIDTH_CM, count), rng.uniform(0, TABLE_HEIGHT_CM, count),
+                               rng.uniform(grid.heights[0], grid.heights[-1], count)])
+    home = np.array([512, 512, 380, 800, 700, 512, 512], dtype=np.float64)
+    
+    lookup_times, solve_times, warm_times = [], [], []
+    lookup_errors, both, lookup_only, solve_only = [], 0, 0, 0
+    for target in targets:
+        start = time.perf_counter()
+        ticks, reachable = grid.lookup(*target)
+        lookup_times.append((time.perf_counter() - start) * 1e6)
+        
+        start = time.perf_counter()
+        result = solver.solve(target, home)
+        solve_times.append((time.perf_counter() - start) * 1e6)
+        
+        if result.converged:
+            seed = result.ticks + rng.integers(-15, 16, size=7)  # 직전 프레임의 해 (목표 약 1 cm 이동)
+            start = time.perf_counter()
+            solver.solve(target, seed)
+            warm_times.append((time.perf_counter() - start) * 1e6)
+        
+        if reachable:
+            lookup_errors.append(float(np.linalg.norm(chain.positions(np.rint(ticks)) - target)))
+        both += reachable and result.converged
+        lookup_only += reachable and not result.converged
+        solve_only += result.converged and not reachable
+    
+    print(f"\n{'method':<18} {'p50 us':>8} {'p99 us':>8}")
+    for name, times in (("grid lookup", lookup_times), ("solve (home seed)", solve_times),
+                        ("solve (warm)", warm_times)):
+        times.sort()
+        print(f"{name:<18} {times[len(times) // 2]:>8.1f} {times[int(len(times) * 0.99)]:>8.1f}")
+    
+    lookup_errors.sort()
+    print(f"\nlookup error (cm): p50 {lookup_errors[len(lookup_errors) // 2]:.3f}, "
+          f"p99 {lookup_errors[int(len(lookup_errors) * 0.99)]:.3f}, max {lookup_errors[-1]:.3f}")
+    print(f"reachability: both {both}, grid only {lookup_only}, solver only {solve_only} (of {count})")
+
+def bench_collision(count: int):
+    """캡슐 충돌 검사: 단일 명령 / 프리셋 궤적 / 대량 자세 일괄 검사 비용과 무작위 자세의 충돌 비율"""
+    import numpy as np
+    from collision import CollisionChecker
+    from trajectory import plan_trajectory
+    
+    checker = CollisionChecker()
+    chain = checker.chain
+    rng = np.random.default_rng(0)
+    poses = chain.sample_ticks(count, rng)
+    
+    print(f"{'case':<22} {'batch':>6} {'us/check':>9} {'us/pose':>8} {'50 Hz budget':>13}")
+    trajectory = plan_trajectory([512, 512, 380, 800, 700, 512, 512], [300, 700, 600, 600, 900, 200, 400],
+                                 50, 200, 400)
+    cases = (("single command", poses[:1]), ("preset trajectory", trajectory.positions),
+             ("bulk", poses))
+    for name, batch in cases:
+        rounds = max(1, 20000 // len(batch))
+        start = time.perf_counter()
+        for _ in range(rounds):
+            checker.first_collision(batch)
+        per_check = (time.perf_counter() - start) / rounds * 1e6
+        print(f"{name:<22} {len(batch):>6} {per_check:>9.1f} {per_check / len(batch):>8.2f} "
+              f"{per_check / 20000 * 100:>12.2f}%")
+    
+    self_hits, table_hits = checker.check(poses)
+    print(f"\nrandom poses in collision: {np.mean(self_hits.any(axis=1) | table_hits.any(axis=1)) * 100:.1f}% "
+          f"(self {np.mean(self_hits.any(axis=1)) * 100:.1f}%, table {np.mean(table_hits.any(axis=1)) * 100:.1f}%)")
+
+def bench_planner(count: int):
+    """관절 공간 경로 계획 (RRT-Connect): 테이블 도달 자세 간 이동 / 직선이 충돌하는 무작위 자세 쌍
+
+    - reach  : 테이블 위 무작위 목표 (IK 해) 사이 이동, 직선 경로가 막힌 경우만 계획
+    - random : 충돌 없는 무작위 자세 쌍 중 직선 경로가 충돌하는 쌍
+    - 같은 쌍 재계획 (캐시) 및 KD-트리 vs 전수 비교 최근접 탐색 비용
+    """
+    import numpy as np
+    from kdtree import KDTree
+    from kinematics import IKSolver
+    from planner import MotionPlanner
+    
+    planner = MotionPlanner(rng=np.random.default_rng(0))
+    chain = planner.chain
+    rng = np.random.default_rng(1)
+    solver = IKSolver(chain)
+    home = np.array([512, 512, 380, 800, 700, 512, 512], dtype=np.float64)
+    
+    reach_poses = []
+    while len(reach_poses) < count + 1:
+        target = rng.uniform((0.0, 0.0, 2.0), (60.0, 45.0, 16.0))
+        result = solver.solve(target, home)
+        if result.converged and planner.valid(result.ticks):
+            reach_poses.append(result.ticks.astype(np.float64))
+    poses = chain.sample_ticks(50 * count, rng)
+    poses = poses[~planner.checker.collides(poses)]
+    random_pairs = [(a, b) for a, b in zip(poses[0::2], poses[1::2]) if not planner.segment_free(a, b)][:count]
+    
+    print(f"{'pairs':<7} {'direct':>7} {'planned':>8} {'p50 ms':>7} {'p99 ms':>7} {'max ms':>7} {'failed':>7} "
+          f"{'raw wp':>7} {'wp':>5} {'length':>7}")
+    for name, pairs in (("reach", list(zip(reach_poses[:-1], reach_poses[1:]))), ("random", random_pairs)):
+        direct, times, raw, waypoints, lengths, failed = 0, [], [], [], [], 0
+        for start, goal in pairs:
+            planner.clear_cache()
+            result = planner.plan(start, goal)
+            if result is None:
+                failed += 1
+                continue
+            if result.direct:
+                direct += 1
+                continue
+            times.append(result.planning_time * 1000.0)
+            raw.append(result.raw_waypoints)
+            waypoints.append(len(result.waypoints))
+            lengths.append(result.length / np.linalg.norm(goal[:6] - start[:6]))
+        times.sort()
+        if times:
+            print(f"{name:<7} {direct:>7} {len(times):>8} {times[len(times) // 2]:>7.1f} "
+                  f"{times[int(len(times) * 0.99)]:>7.1f} {times[-1]:>7.1f} {failed:>7} {statistics.mean(raw):>7.1f} "
+                  f"{statistics.mean(waypoints):>5.1f} {statistics.mean(lengths):>6.2f}x")
+        else:
+            print(f"{name:<7} {direct:>7} {0:>8} {'-':>7} {'-':>7} {'-':>7} {failed:>7}")
+    
+    # 캐시: 같은 쌍 (역방향 포함) 재계획
+    cached = []
+    for start, goal in random_pairs[:50]:
+        planner.plan(start, goal)
+        result = planner.plan(goal, start)
+        if result is not None and result.cached:
+            cached.append(result.planning_time * 1000.0)
+    if cached:
+        print(f"\ncached replan (reverse direction): p50 {statistics.median(cached):.2f} ms, max {max(cached):.2f} ms")
+    
+    # 최근접 탐색: KD-트리 vs 전수 비교
+    print(f"\n{'points':>7} {'kd-tree us':>11} {'linear us':>10}")
+    for size in (256, 2048, 16384):
+        points = chain.sample_ticks(size, rng)
+        queries = chain.sample_ticks(500, rng)
+        tree = KDTree(points)
+        start = time.perf_counter()
+        for query in queries:
+            tree.nearest(query)
+        tree_us = (time.perf_counter() - start) / len(queries) * 1e6
+        start = time.perf_counter()
+        for query in queries:
+            diff = points - query
+            np.argmin(np.einsum('ij,ij->i', diff, diff))
+        linear_us = (time.perf_counter() - start) / len(queries) * 1e6
+        print(f"{size:>7} {tree_us:>11.1f} {linear_us:>10.1f}")
+
+def bench_poselib(count: int):
+    """자세 라이브러리: 저장 1회 비용 (전체 JSON 재작성 vs 추가 전용 로그), 로드, 최근접 자세 탐색"""
+    import numpy as np
+    from kinematics import KinematicChain
+    from poselib import PoseLibrary
+    
+    rng = np.random.default_rng(0)
+    chain = KinematicChain()
+    poses = np.rint(np.hstack([chain.sample_ticks(count, rng), rng.uniform(370, 695, (count, 1))])).astype(int)
+    workdir = tempfile.mkdtemp()
+    
+    # 기존 방식: 저장할 때마다 custom_presets.json 전체 재작성
+    presets = {}
+    path = os.path.join(workdir, "custom_presets.json")
+    start = time.perf_counter()
+    for i, ticks in enumerate(poses):
+        presets[f"Pose {i:05d}"] = ticks.tolist()
+        with open(path, 'w') as f:
+            json.dump(presets, f, indent=2)
+    rewrite_ms = (time.perf_counter() - start) / count * 1000.0
+    
+    library = PoseLibrary(os.path.join(workdir, "poses.jsonl"), legacy_path=None)
+    start = time.perf_counter()
+    for i, ticks in enumerate(poses):
+        library.put(f"Pose {i:05d}", ticks, ("bench",))
+    append_ms = (time.perf_counter() - start) / count * 1000.0
+    start = time.perf_counter()
+    library = PoseLibrary(library.path, legacy_path=None)
+    load_ms = (time.perf_counter() - start) * 1000.0
+    
+    print(f"save {count} poses: rewrite JSON {rewrite_ms:.3f} ms/save (last {os.path.getsize(path) / 1024:.0f} KiB), "
+          f"append log {append_ms:.3f} ms/save")
+    print(f"load {len(library)} poses: {load_ms:.1f} ms")
+    
+    queries = np.hstack([chain.sample_ticks(500, rng), np.full((500, 1), 512.0)])
+    library.nearest(queries[0])  # 인덱스 빌드
+    start = time.perf_counter()
+    for query in queries:
+        library.nearest(query)
+    tree_us = (time.perf_counter() - start) / len(queries) * 1e6
+    start = time.perf_counter()
+    for query in queries:
+        min(library.poses(), key=lambda pose: sum((a - b) ** 2 for a, b in zip(pose.ticks, query)))
+    scan_us = (time.perf_counter() - start) / len(queries) * 1e6
+    print(f"nearest pose: kd-tree {tree_us:.1f} us, python scan {scan_us:.1f} us")
+
+def bench_teach(duration: float, fps: float):
+    """Teach Pendant: Passivity 피드백 기록 (레코더 vs LOG_INTERVAL 로깅) 및 배속 재생 궤적
+
+    - 에뮬레이터가 20 ms마다 보내는 Feedback 중 기록된 샘플 수 / 샘플 간격
+    - 배속별 재생 시간, 관절 최대 속도 (속도 제한 time warping 적용 전후), 궤적 생성 비용
+    """
+    import numpy as np
+    import emulator
+    from auto import Config, MotorController
+    from teach import TrajectoryRecorder, replay_trajectory
+    
+    Config.PORT_CACHE_FILE = os.path.join(tempfile.mkdtemp(), "serial_port.json")
+    device = emulator.ArduinoEmulator(wander=50.0).start()
+    Config.PORT = device.port
+    Config.PASSIVITY_MODE = True
+    controller = MotorController()
+    controller.serial.send_command(OP_FEEDBACK, [1])
+    controller.serial.send_command(OP_TORQUE, [0])
+    time.sleep(0.5)
+    controller.process_feedback()
+    
+    sent_before = device.feedback_sent
+    controller.recorder.start()
+    logged, last_log = 0, 0.0
+    end = time.monotonic() + duration
+    while time.monotonic() < end:
+        controller.process_feedback()
+        controller.take_feedback_samples()
+        now = time.monotonic()
+        if now - last_log >= Config.LOG_INTERVAL / 1000.0:
+            logged += 1
+            last_log = now
+        time.sleep(1.0 / fps)
+    time.sleep(0.1)
+    controller.process_feedback()
+    recording = controller.recorder.stop()
+    sent = device.feedback_sent - sent_before
+    
+    controller.serial.send_command(OP_FEEDBACK, [0])
+    controller.tx_scheduler.stop()
+    controller.trajectory_streamer.stop()
+    controller.serial.close()
+    device.stop()
+    Config.PASSIVITY_MODE = False
+    
+    gaps = np.diff(recording.times) * 1000.0
+    print(f"feedback sent {sent}, recorded {len(recording)} ({len(recording) / max(sent, 1) * 100:.1f}%), "
+          f"LOG_INTERVAL logger {logged} rows")
+    print(f"sample gap p50 {np.median(gaps):.1f} ms, max {gaps.max():.1f} ms, UI {fps:.0f} fps")
+    
+    recorder = TrajectoryRecorder(7, capacity=1024)
+    samples = [(i * 0.02, [512] * 7) for i in range(100000)]
+    start = time.perf_counter()
+    recorder.start()
+    for timestamp, values in samples:
+        recorder.append(timestamp, values)
+    recorder.stop()
+    print(f"append cost {(time.perf_counter() - start) / len(samples) * 1e6:.2f} us/sample "
+          f"(grown to {len(recorder._times)} rows)")
+    
+    # 읽기 1회에 Feedback 3개가 함께 도착 (같은 수신 시각): 모두 기록되고 시각이 나뉘어야 함
+    recorder.start()
+    for i in range(0, 300, 3):
+        for k in range(3):
+            recorder.append((i + 2) * 0.02, [512 + i + k] * 7)
+    batched = recorder.stop()
+    batched_gaps = np.diff(batched.times) * 1000.0
+    print(f"batched reads (3 samples/read): recorded {len(batched)}/300, "
+          f"gap min {batched_gaps.min():.1f} ms, max {batched_gaps.max():.1f} ms")
+    
+    rate, vmax = Config.TRAJECTORY_RATE_HZ, Config.TRAJECTORY_MAX_VELOCITY
+    print(f"\n{'speed':>6} {'expected s':>11} {'replay s':>9} {'vmax t/s':>9} {'warped s':>9} {'vmax t/s':>9} "
+          f"{'build ms':>9}")
+    for speed in Config.REPLAY_SPEEDS:
+        plain = replay_trajectory(recording, rate, speed)
+        start = time.perf_counter()
+        warped = replay_trajectory(recording, rate, speed, vmax)
+        build_ms = (time.perf_counter() - start) * 1000.0
+        print(f"{speed:>6g} {recording.duration / speed:>11.2f} {plain.duration:>9.2f} "
+              f"{np.abs(plain.velocities()).max():>9.0f} {warped.duration:>9.2f} "
+              f"{np.abs(warped.velocities()).max():>9.0f} {build_ms:>9.2f}")
+
+def _synthetic_teach_recording(duration: float, rng):
+    """손으로 움직인 Passivity 기록 모사: 무작위 자세 사이 최소 저크 이동 + 정지 구간, 50 Hz, ±1 tick 잡음"""
+    import numpy as np
+    from teach import Recording
+    from trajectory import _min_jerk_scaling
+    
+    times = np.arange(0.0, duration, 0.02)
+    values = np.empty((len(times), 7))
+    pose = np.array([512, 512, 380, 800, 700, 512, 512], dtype=np.float64)
+    t = 0.0
+    while t < duration:
+        move, hold = rng.uniform(0.8, 2.5), rng.uniform(0.3, 1.5)
+        goal = pose.copy()
+        joints = rng.choice(7, size=rng.integers(1, 4), replace=False)  # 한 번에 1~3개 관절만 움직임
+        goal[joints] = np.clip(goal[joints] + rng.uniform(-150, 150, len(joints)), 200, 900)
+        segment = (times >= t) & (times < t + move)
+        values[segment] = pose + _min_jerk_scaling((times[segment] - t) / move)[:, None] * (goal - pose)
+        rest = (times >= t + move) & (times < t + move + hold)
+        values[rest] = goal
+        pose, t = goal, t + move + hold
+    noisy = np.rint(values + rng.integers(-1, 2, values.shape))
+    return Recording(times, noisy.astype(np.int16))
+
+def bench_compress(duration: float):
+    """Teach 기록 압축 (시간 매개 RDP): Keyframe 수, 최대 오차, 재생 시 전송 바이트 (Delta 인코딩 기준)"""
+    import numpy as np
+    from auto import Config
+    from protocol import DeltaEncoder
+    from teach import compress_recording, compression_error, replay_trajectory
+    
+    rng = np.random.default_rng(0)
+    recording = _synthetic_teach_recording(duration, rng)
+    rate = Config.TRAJECTORY_RATE_HZ
+    
+    def replay_bytes(rec):
+        encoder = DeltaEncoder(Config.KEYFRAME_INTERVAL)
+        trajectory = replay_trajectory(rec, rate)
+        packets = 0
+        for k, command in enumerate(trajectory.commands):
+            packet, _ = encoder.encode(command, now=k / rate)
+            packets += packet is not None
+        return encoder.bytes, packets
+    
+    def npz_size(rec):
+        path = os.path.join(tempfile.mkdtemp(), "teach.npz")
+        rec.save(path)
+        return os.path.getsize(path)
+    
+    raw_bytes, raw_packets = replay_bytes(recording)
+    print(f"recording: {len(recording)} samples, {recording.duration:.0f} s, {npz_size(recording) / 1024:.1f} KiB npz")
+    print(f"{'tolerance':>9} {'keyframes':>10} {'ratio':>7} {'max err':>8} {'ms':>6} {'replay B':>9} {'packets':>8} "
+          f"{'bytes saved':>12} {'npz KiB':>8}")
+    print(f"{'raw':>9} {len(recording):>10} {1.0:>6.1f}x {0.0:>8.1f} {0.0:>6.1f} {raw_bytes:>9} {raw_packets:>8} "
+          f"{'-':>12} {npz_size(recording) / 1024:>8.1f}")
+    for tolerance in (1.0, 2.0, 3.0, 5.0):
+        start = time.perf_counter()
+        compressed = compress_recording(recording, tolerance)
+        elapsed = (time.perf_counter() - start) * 1000.0
+        error = compression_error(recording, compressed).max()
+        replay, packets = replay_bytes(compressed)
+        print(f"{tolerance:>9g} {len(compressed):>10} {len(recording) / len(compressed):>6.1f}x {error:>8.1f} "
+              f"{elapsed:>6.1f} {replay:>9} {packets:>8} {(1 - replay / raw_bytes) * 100:>11.1f}% "
+              f"{npz_size(compressed) / 1024:>8.1f}")
+
+def bench_control(duration: float, interval: float, fps: float, stall: float):
+    """제어 루프: UI 프레임마다 실행(ui-loop) vs 고정 주기 제어 스레드 (100/200 Hz)
+    
+    UI 루프(fps)가 1초마다 stall초 동안 멈추는 Passivity 모드 세션에서 제어 틱 간격,
+    적용된 피드백 샘플의 나이, UI -> 제어 루프 명령 왕복 시간을 측정합니다.
+    """
+    import emulator
+    from auto import Config, MotorController, ControlLoop
+    from telemetry import LatencyHistogram
+    
+    emulator.FEEDBACK_INTERVAL = interval
+    Config.PORT_CACHE_FILE = os.path.join(tempfile.mkdtemp(), "serial_port.json")
+    
+    print(f"feedback every {interval * 1000:.0f} ms, UI {fps:.0f} fps, {stall * 1000:.0f} ms stall per second")
+    print(f"{'mode':<10} {'gap p50':>8} {'gap p99':>8} {'gap max':>8} {'age p50':>8} {'age p99':>8} {'age max':>8} "
+          f"{'call us':>8} {'late':>5} {'skip':>5}")
+    
+    for mode, rate, threaded in (("ui-loop", fps, False), ("thread", 100, True), ("thread", 200, True)):
+        device = emulator.ArduinoEmulator(wander=50.0).start()
+        Config.PORT = device.port
+        Config.PASSIVITY_MODE = True
+        controller = MotorController()
+        controller.serial.send_command(OP_FEEDBACK, [1])
+        controller.serial.send_command(OP_TORQUE, [0])
+        
+        loop = ControlLoop(controller, rate, threaded)
+        gaps = LatencyHistogram(window=100000)
+        calls = LatencyHistogram()
+        last_step = [None]
+        step = loop.step
+        
+        def timed_step():
+            now = time.monotonic()
+            if last_step[0] is not None:
+                gaps.add(now - last_step[0])
+            last_step[0] = now
+            step()
+        loop.step = timed_step
+        
+        start = time.perf_counter()
+        next_stall = start + 1.0
+        while time.perf_counter() - start < duration:
+            if not loop.threaded:
+                loop.step()
+            controller.read_snapshot()
+            controller.take_feedback_samples()
+            sent = time.perf_counter()
+            loop.call(controller.nearest_pose)
+            calls.add(time.perf_counter() - sent)
+            
+            if time.perf_counter() >= next_stall:
+                time.sleep(stall)
+                next_stall += 1.0
+            time.sleep(1.0 / fps)
+        
+        loop.stop()
+        gap = gaps.percentiles((50, 99, 100))
+        age = controller.serial.telemetry.feedback_staleness.percentiles((50, 99, 100))
+        stats = loop.get_stats()
+        label = mode if not threaded else f"{mode}@{rate}"
+        print(f"{label:<10} {gap['p50']:>8.1f} {gap['p99']:>8.1f} {gap['p100']:>8.1f} {age['p50']:>8.1f} "
+              f"{age['p99']:>8.1f} {age['p100']:>8.1f} {calls.percentiles((50,))['p50'] * 1000:>8.0f} "
+              f"{stats['late']:>5} {stats['skipped']:>5}")
+        
+        controller.serial.send_command(OP_FEEDBACK, [0])
+        controller.tx_scheduler.stop()
+        controller.trajectory_streamer.stop()
+        controller.serial.close()
+        device.stop()
+    Config.PASSIVITY_MODE = False
+
+def bench_logger(rows: int):
+    """CSV 로깅: 행마다 파일 열기/닫기(legacy) vs CsvSink 백그라운드 일괄 쓰기
+    
+    호출 측 행당 비용(us)과 모든 행이 파일에 기록될 때까지의 처리량(rows/s)을 측정합니다.
+    sink는 큐가 가득 차면 호출 측이 대기하는 방식(block=True)으로 최대 지속 처리량을 잽니다.
+    """
+    import csv
+    from auto import DataLogger
+    from csvsink import CsvSink
+    from telemetry import LatencyHistogram
+    
+    directory = tempfile.mkdtemp()
+    positions = [512.0, 512.0, 380.0, 800.0, 700.0, 512.0, 512.0]
+    items = [(time.time() + k * 0.01, positions, "Feedback") for k in range(rows)]
+    
+    print(f"{rows} rows")
+    print(f"{'mode':<18} {'caller p50 us':>14} {'caller p99 us':>14} {'rows/s':>10} {'dropped':>8} {'flushes':>8}")
+    
+    # legacy: DataLogger.log()가 행마다 파일을 열고 csv.writer를 만든 뒤 닫음
+    path = os.path.join(directory, "legacy.csv")
+    caller = LatencyHistogram(window=rows)
+    start = time.perf_counter()
+    for item in items:
+        sent = time.perf_counter()
+        with open(path, 'a', newline='') as f:
+            csv.writer(f).writerow(DataLogger._format_row(item))
+        caller.add(time.perf_counter() - sent)
+    elapsed = time.perf_counter() - start
+    summary = caller.percentiles((50, 99))
+    print(f"{'open/row':<18} {summary['p50'] * 1000:>14.1f} {summary['p99'] * 1000:>14.1f} {rows / elapsed:>10.0f} "
+          f"{0:>8} {rows:>8}")
+    
+    for flush_rows, batch_rows, queue_size in ((1, 1, 10000), (256, 1024, 10000), (256, 1024, 1000)):
+        path = os.path.join(directory, f"sink_{flush_rows}_{batch_rows}_{queue_size}.csv")
+        sink = CsvSink(path, DataLogger.HEADER, DataLogger._format_row, queue_size, flush_rows,
+                       batch_rows=batch_rows)
+        caller = LatencyHistogram(window=rows)
+        start = time.perf_counter()
+        for item in items:
+            sent = time.perf_counter()
+            sink.put(item, block=True)
+            caller.add(time.perf_counter() - sent)
+        sink.close()
+        elapsed = time.perf_counter() - start
+        stats = sink.get_stats()
+        with open(path) as f:
+            assert sum(1 for _ in f) == rows + 1
+        summary = caller.percentiles((50, 99))
+        label = f"sink b{batch_rows} q{queue_size}"
+        print(f"{label:<18} {summary['p50'] * 1000:>14.1f} {summary['p99'] * 1000:>14.1f} {rows / elapsed:>10.0f} "
+              f"{stats['dropped']:>8} {stats['flushes']:>8}")
+
+def bench_sessionlog(rows: int):
+    """세션 로그: CSV(CsvSink) vs 열 단위 바이너리 (SessionLogWriter / SessionLog)
+    
+    기록 시 호출 측 행당 비용, 파일 크기, 전체 읽기(정수 배열로 파싱), 중간 1초 구간 조회,
+    바이너리 -> CSV 변환 시간을 비교합니다. (5 ms 간격 피드백 세션)
+    """
+    import csv
+    import numpy as np
+    from datetime import datetime
+    from auto import DataLogger
+    from csvsink import CsvSink
+    from sessionlog import SessionLogWriter, SessionLog
+    from telemetry import LatencyHistogram
+    
+    directory = tempfile.mkdtemp()
+    rng = np.random.default_rng(0)
+    ticks = (512 + np.cumsum(rng.integers(-2, 3, size=(rows, 7)), axis=0)).clip(0, 1023).tolist()
+    events = ["Feedback" if k % 50 else "Preset: Default" for k in range(rows)]
+    period_ns = 5_000_000
+    
+    def timed_writes(put):
+        caller = LatencyHistogram(window=rows)
+        start = time.perf_counter()
+        for k in range(rows):
+            sent = time.perf_counter()
+            put(k)
+            caller.add(time.perf_counter() - sent)
+        return caller.percentiles((50, 99)), start
+    
+    # CSV (DataLogger 기본 형식)
+    csv_path = os.path.join(directory, "session.csv")
+    sink = CsvSink(csv_path, DataLogger.HEADER, DataLogger._format_row, queue_size=rows + 1)
+    wall_start = time.time()
+    csv_caller, start = timed_writes(lambda k: sink.put((wall_start + k * period_ns / 1e9, ticks[k], events[k])))
+    sink.close()
+    csv_write = time.perf_counter() - start
+    
+    # 바이너리 세션 로그
+    rlog_path = os.path.join(directory, "session.rlog")
+    writer = SessionLogWriter(rlog_path, max_pending=rows // 4096 + 2)
+    base = writer.start_ns
+    rlog_caller, start = timed_writes(lambda k: writer.append(base + k * period_ns, ticks[k], ticks[k], events[k]))
+    writer.close()
+    rlog_write = time.perf_counter() - start
+    assert writer.get_stats()['written'] == rows
+    
+    # 전체 읽기 (정수 배열까지)
+    start = time.perf_counter()
+    with open(csv_path, newline='') as f:
+        reader = csv.reader(f)
+        next(reader)
+        parsed = np.array([[int(v) for v in row[1:8]] for row in reader], dtype=np.int16)
+    csv_read = time.perf_counter() - start
+    assert len(parsed) == rows
+    
+    start = time.perf_counter()
+    with SessionLog(rlog_path) as session:
+        records = session.read_all()
+    rlog_read = time.perf_counter() - start
+    assert len(records) == rows and np.array_equal(records.feedback, parsed)
+    
+    # 중간 1초 구간 조회
+    middle = rows * period_ns / 2e9
+    first, last = (datetime.fromtimestamp(wall_start + t).strftime('%H:%M:%S.%f')[:-3]
+                   for t in (middle, middle + 1.0))
+    start = time.perf_counter()
+    selected = []
+    with open(csv_path, newline='') as f:
+        reader = csv.reader(f)
+        next(reader)
+        for row in reader:
+            if row[0] >= last:
+                break
+            if row[0] >= first:
+                selected.append([int(v) for v in row[1:8]])
+    csv_range = time.perf_counter() - start
+    
+    with SessionLog(rlog_path) as session:
+        start = time.perf_counter()
+        window = session.range(session.seconds(middle), session.seconds(middle + 1.0))
+        rlog_range = time.perf_counter() - start
+        
+        start = time.perf_counter()
+        session.to_csv(os.path.join(directory, "converted.csv"))
+        convert = time.perf_counter() - start
+    
+    print(f"{rows} rows, 1 s window = {len(window)} rows (CSV scan found {len(selected)})")
+    print(f"{'format':<8} {'put p50 us':>11} {'put p99 us':>11} {'write s':>8} {'size KiB':>9} {'B/row':>6} "
+          f"{'read ms':>8} {'1s range ms':>12}")
+    for name, caller, write, path, read, window_time in (
+            ("csv", csv_caller, csv_write, csv_path, csv_read, csv_range),
+            ("rlog", rlog_caller, rlog_write, rlog_path, rlog_read, rlog_range)):
+        size = os.path.getsize(path)
+        print(f"{name:<8} {caller['p50'] * 1000:>11.2f} {caller['p99'] * 1000:>11.2f} {write:>8.2f} "
+              f"{size / 1024:>9.0f} {size / rows:>6.1f} {read * 1000:>8.1f} {window_time * 1000:>12.3f}")
+    print(f"rlog -> csv conversion: {convert:.2f} s ({rows / convert:.0f} rows/s)")
+
+def main():
+    parser = argparse.ArgumentParser(description="Serial link benchmarks")
+    sub = parser.add_subparsers(dest="bench", required=True)
+
+    p_protocol = sub.add_parser("protocol", help="ASCII vs binary dialect throughput/latency")
+    p_protocol.add_argument("--count", type=int, default=5000)
+    p_protocol.add_argument("--baud", type=int, default=115200, help="modelled baud rate (0: unlimited)")
+    p_protocol.add_argument("--latency", type=float, default=0.001, help="emulator one-way latency (s)")
+
+    p_reader = sub.add_parser("reader", help="receive thread CPU usage and messages/s")
+    p_reader.add_argument("--rate", type=float, default=50.0, help="feedback lines/s (0: flood)")
+    p_reader.add_argument("--duration", type=float, default=5.0)
+
+    p_connect = sub.add_parser("connect", help="time-to-first-command on cold/warm start and reconnect")
+    p_connect.add_argument("--boot-delay", type=float, default=2.0, help="emulated setup() delay after reset (s)")
+    p_connect.add_argument("--trials", type=int, default=3)
+    
+    p_unplug = sub.add_parser("unplug", help="device unplug during position queries (no hang, futures fail)")
+    p_unplug.add_argument("--trials", type=int, default=5)
+    p_unplug.add_argument("--timeout", type=float, default=0.5, help="position query timeout (s)")
+    
+    p_bus = sub.add_parser("bus", help="multi-arm bus throughput (1/2/4 arms, batched vs per-arm frames)")
+    p_bus.add_argument("--duration", type=float, default=3.0)
+    p_bus.add_argument("--rate", type=float, default=100.0, help="bus tick rate (Hz)")
+    p_bus.add_argument("--baud", type=int, default=115200, help="modelled baud rate")
+    
+    p_delta = sub.add_parser("delta", help="full vs delta-encoded position commands (jog / follower sessions)")
+    p_delta.add_argument("--duration", type=float, default=30.0, help="simulated session length (s)")
+    
+    p_feedback = sub.add_parser("feedback", help="passivity feedback staleness: one-per-tick vs drain-all")
+    p_feedback.add_argument("--duration", type=float, default=5.0)
+    p_feedback.add_argument("--interval", type=float, default=0.005, help="emulated feedback interval (s)")
+    p_feedback.add_argument("--fps", type=float, default=60.0, help="UI loop rate")
+    p_feedback.add_argument("--stall", type=float, default=0.2, help="UI stall once per second (s)")
+    
+    p_broker = sub.add_parser("broker", help="serial broker feedback fan-out latency (shared memory vs text)")
+    p_broker.add_argument("--duration", type=float, default=3.0)
+    p_broker.add_argument("--interval", type=float, default=0.005, help="emulated feedback interval (s)")
+    p_broker.add_argument("--poll", type=float, default=0.0005, help="client shared memory poll interval (s)")
+    
+    p_joints = sub.add_parser("joints", help="joint state frame cost: python lists vs NumPy arrays")
+    p_joints.add_argument("--frames", type=int, default=20000)
+    
+    p_trajectory = sub.add_parser("trajectory", help="preset moves: immediate target vs synchronised trajectories")
+    p_trajectory.add_argument("--rate", type=float, default=50.0, help="streaming rate (Hz)")
+    p_trajectory.add_argument("--ticks", type=int, default=100000, help="ticks for the per-tick cost measurement")
+    
+    p_kinematics = sub.add_parser("kinematics", help="forward kinematics: per-pose loop vs batched NumPy chain")
+    p_kinematics.add_argument("--count", type=int, default=100000, help="poses evaluated per batch size")
+    
+    p_ik = sub.add_parser("ik", help="damped-least-squares IK: home seed vs warm start")
+    p_ik.add_argument("--count", type=int, default=1000, help="targets per case")
+    
+    p_ikgrid = sub.add_parser("ikgrid", help="precomputed IK grid lookup vs online solve")
+    p_ikgrid.add_argument("--count", type=int, default=2000, help="random table targets")
+    p_ikgrid.add_argument("--grid", default="ik_grid.bin", help="grid file (built if missing)")
+    
+    p_collision = sub.add_parser("collision", help="capsule self/table collision check cost")
+    p_collision.add_argument("--count", type=int, default=10000, help="random poses for the bulk case")
+    
+    p_planner = sub.add_parser("planner", help="RRT-Connect planning time and path quality")
+    p_planner.add_argument("--count", type=int, default=200, help="pose pairs per case")
+    
+    p_poselib = sub.add_parser("poselib", help="pose library save/load/nearest-pose cost")
+    p_poselib.add_argument("--count", type=int, default=2000, help="stored poses")
+    
+    p_teach = sub.add_parser("teach", help="teach-pendant recording coverage and speed-scaled replay")
+    p_teach.add_argument("--duration", type=float, default=5.0, help="recording time (s)")
+    p_teach.add_argument("--fps", type=float, default=60.0, help="UI loop rate")
+    
+    p_compress = sub.add_parser("compress", help="taught-motion compression ratio, error and replay bytes")
+    p_compress.add_argument("--duration", type=float, default=120.0, help="synthetic recording length (s)")
+    
+    p_control = sub.add_parser("control", help="control loop: per-frame vs fixed-rate thread under UI stalls")
+    p_control.add_argument("--duration", type=float, default=5.0)
+    p_control.add_argument("--interval", type=float, default=0.005, help="emulated feedback interval (s)")
+    p_control.add_argument("--fps", type=float, default=60.0, help="UI loop rate")
+    p_control.add_argument("--stall", type=float, default=0.2, help="UI stall once per second (s)")
+    
+    p_logger = sub.add_parser("logger", help="CSV logging: open per row vs background batched writer")
+    p_logger.add_argument("--rows", type=int, default=20000)
+    
+    p_sessionlog = sub.add_parser("sessionlog", help="session log: CSV vs columnar binary (write, read, range)")
+    p_sessionlog.add_argument("--rows", type=int, default=200000)
+    
+    args = parser.parse_args()
+    if args.bench == "protocol":
+        bench_protocol(args.count, args.baud, args.latency)
+    elif args.bench == "reader":
+        bench_reader(args.rate, args.duration)
+    elif args.bench == "connect":
+        bench_connect(args.boot_delay, args.trials)
+    elif args.bench == "unplug":
+        bench_unplug(args.trials, args.timeout)
+    elif args.bench == "bus":
+        bench_bus(args.duration, args.rate, args.baud)
+    elif args.bench == "delta":
+        bench_delta(args.duration)
+    elif args.bench == "feedback":
+        bench_feedback(args.duration, args.interval, args.fps, args.stall)
+    elif args.bench == "broker":
+        bench_broker(args.duration, args.interval, args.poll)
+    elif args.bench == "joints":
+        bench_joints(args.frames)
+    elif args.bench == "trajectory":
+        bench_trajectory(args.rate, args.ticks)
+    elif args.bench == "kinematics":
+        bench_kinematics(args.count)
+    elif args.bench == "ik":
+        bench_ik(args.count)
+    elif args.bench == "ikgrid":
+        bench_ikgrid(args.count, args.grid)
+    elif args.bench == "collision":
+        bench_collision(args.count)
+    elif args.bench == "planner":
+        bench_planner(args.count)
+    elif args.bench == "poselib":
+        bench_poselib(args.count)
+    elif args.bench == "teach":
+        bench_teach(args.duration, args.fps)
+    elif args.bench == "compress":
+        bench_compress(args.duration)
+    elif args.bench == "control":
+        bench_control(args.duration, args.interval, args.fps, args.stall)
+    elif args.bench == "logger":
+        bench_logger(args.rows)
+    elif args.bench == "sessionlog":
+        bench_sessionlog(args.rows)
+
+if __name__ == "__main__":
+    sys.exit(main())
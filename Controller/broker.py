@@ -0,0 +1,303 @@
+import os
+import sys
+import time
+import argparse
+import threading
+from queue import Empty
+from multiprocessing.connection import Listener
+from typing import Dict, List, Optional
+
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+from auto import Colors, SerialCommunicator, TransmitScheduler, log
+from brokerclient import BROKER_ADDRESS, BROKER_AUTHKEY, BOARD_NAME, FeedbackBoard
+from collision import CollisionChecker
+from protocol import OP_MOVE, OP_TORQUE, OP_FEEDBACK, REPLY_FEEDBACK, REPLY_POSITIONS
+
+# ========================================================================================================
+# Command Arbitration
+# ========================================================================================================
+
+class Source:
+    """브로커에 연결된 명령 소스 (대시보드, 추종 스크립트, 작업 스크립트)"""
+
+    def __init__(self, name: str, priority: int, conn):
+        self.name = name
+        self.priority = priority
+        self.conn = conn
+        self.send_lock = threading.Lock()
+        self.last_command = float('-inf')
+        self.wants_feedback = False
+        self.accepted = 0
+        self.rejected = 0
+        self.collisions = 0
+
+    def send(self, message: tuple):
+        try:
+            with self.send_lock:
+                self.conn.send(message)
+        except (OSError, EOFError, ValueError):
+            pass
+
+class CommandArbiter:
+    """우선순위 기반 명령 중재
+
+    lease 시간 안에 명령을 보낸 소스 중 우선순위가 가장 높은 소스가 팔을 점유합니다.
+    같은 우선순위끼리는 마지막 명령이 적용되며, 전체 토크 OFF는 항상 허용합니다.
+    """
+
+    def __init__(self, lease: float = 0.5):
+        self.lease = lease
+        self.lock = threading.Lock()
+        self.owner: Optional[Source] = None
+
+    def claim(self, source: Source, opcode: int, values: List[int], now: float) -> bool:
+        with self.lock:
+            owner = self.owner
+            available = (owner is None or owner is source or source.priority >= owner.priority
+                         or now - owner.last_command > self.lease)
+            safety = opcode == OP_TORQUE and not any(values)  # 토크 해제는 우선순위와 무관
+            if not (available or safety):
+                source.rejected += 1
+                return False
+            source.last_command = now
+            source.accepted += 1
+            if available:
+                self.owner = source
+            return True
+
+    def release(self, source: Source):
+        with self.lock:
+            if self.owner is source:
+                self.owner = None
+
+# ========================================================================================================
+# Serial Broker
+# ========================================================================================================
+
+class SerialBroker:
+    """시리얼 포트를 단독으로 소유하고 여러 프로세스에 공유하는 브로커
+
+    - 명령: 클라이언트 연결(multiprocessing.connection)로 수신 -> 중재 -> 충돌 검사 -> 전송 스케줄러
+    - 피드백: 수신 즉시 공유 메모리 링 버퍼(FeedbackBoard)에 기록
+    - 재연결: 마지막 목표 위치, 토크, 피드백 모드를 다시 전송
+    """
+
+    def __init__(self, port: Optional[str] = None, address=BROKER_ADDRESS, authkey: bytes = BROKER_AUTHKEY,
+                 board_name: str = BOARD_NAME, lease: float = 0.5, text_fanout: bool = False,
+                 collision_check: bool = False):
+        self.board = FeedbackBoard.create(board_name)
+        self.board_name = board_name
+        self.serial = SerialCommunicator(port=port)
+        self.tx_scheduler = TransmitScheduler(self.serial)
+        self.arbiter = CommandArbiter(lease)
+        self.collision_checker = CollisionChecker() if collision_check else None
+        self.text_fanout = text_fanout  # 비교용: 피드백을 각 클라이언트 연결로 재전송
+
+        self.sources: Dict[int, Source] = {}
+        self.sources_lock = threading.Lock()
+        self.last_targets: Optional[List[int]] = None
+        self.last_torque: Optional[List[int]] = None
+        self.feedback_on = False
+        self.published = 0
+
+        self.serial.on_reconnect = self._resync_after_reconnect
+        self.board.set_link(self.serial.is_connected)
+
+        self.running = True
+        self.listener = Listener(address, authkey=authkey)
+        self.accept_thread = threading.Thread(target=self._accept_loop, daemon=True)
+        self.accept_thread.start()
+        self.publish_thread = threading.Thread(target=self._publish_loop, daemon=True)
+        self.publish_thread.start()
+        log.info("Broker", "Listening on %s:%d (feedback board: %s)", address[0], address[1], board_name,
+                 color=Colors.GREEN)
+
+    # ----------------------------------------------------------------------------------------------------
+    # Clients
+    # ----------------------------------------------------------------------------------------------------
+
+    def _accept_loop(self):
+        while self.running:
+            try:
+                conn = self.listener.accept()
+            except (OSError, EOFError):
+                if self.running:
+                    continue
+                break
+            except Exception as e:  # 인증 실패 등
+                log.warning("Broker", "Rejected connection: %s", e, color=Colors.YELLOW)
+                continue
+            threading.Thread(target=self._serve, args=(conn,), daemon=True).start()
+
+    def _serve(self, conn):
+        """클라이언트 1개 처리 (명령 수신 스레드)"""
+        try:
+            _, name, priority = conn.recv()
+        except (OSError, EOFError, ValueError):
+            conn.close()
+            return
+        source = Source(name, priority, conn)
+        with self.sources_lock:
+            self.sources[id(source)] = source
+        source.send(('welcome', self.board_name))
+        log.info("Broker", "Client attached: %s (priority %d)", name, priority, color=Colors.GREEN)
+
+        try:
+            while self.running:
+                message = conn.recv()
+                if message[0] == 'cmd':
+                    self._handle_command(source, message[1], message[2])
+                elif message[0] == 'query':
+                    self._handle_query(source, message[1], message[2])
+                elif message[0] == 'bye':
+                    break
+        except (OSError, EOFError, TypeError):  # TypeError: stop()에서 연결을 닫은 경우
+            pass
+
+        with self.sources_lock:
+            self.sources.pop(id(source), None)
+        self.arbiter.release(source)
+        if source.wants_feedback:
+            source.wants_feedback = False
+            self._update_feedback_mode()
+        conn.close()
+        log.info("Broker", "Client detached: %s (accepted %d, rejected %d, collisions %d)",
+                 name, source.accepted, source.rejected, source.collisions, color=Colors.CYAN)
+
+    def _handle_command(self, source: Source, opcode: int, values: List[int]):
+        # 피드백 모드는 점유와 무관하게 요청한 클라이언트가 하나라도 있으면 ON
+        if opcode == OP_FEEDBACK:
+            source.wants_feedback = bool(values and values[0])
+            self._update_feedback_mode()
+            return
+
+        if not self.arbiter.claim(source, opcode, values, time.monotonic()):
+            owner = self.arbiter.owner
+            source.send(('rejected', opcode, owner.name if owner else None))
+            return
+
+        if opcode == OP_MOVE:
+            # 모든 소스의 위치 명령을 전송 전에 검사 (충돌 시 거부 후 알림)
+            if self.collision_checker is not None:
+                hit = self.collision_checker.first_collision(values)
+                if hit is not None:
+                    source.collisions += 1
+                    source.send(('collision', opcode, hit[1]))
+                    log.warning("Collision", "%s: command rejected (%s)", source.name, hit[1], color=Colors.YELLOW)
+                    return
+            self.last_targets = list(values)
+            self.tx_scheduler.submit(values)
+        else:
+            if opcode == OP_TORQUE:
+                self.last_torque = list(values)
+            self.serial.send_command(opcode, values)
+
+    def _handle_query(self, source: Source, request_id: int, timeout: float):
+        def reply(future):
+            try:
+                source.send(('positions', request_id, list(future.result()), None))
+            except Exception as e:
+                source.send(('positions', request_id, None, str(e)))
+        self.serial.request_positions(timeout).add_done_callback(reply)
+
+    def _update_feedback_mode(self):
+        with self.sources_lock:
+            wanted = any(source.wants_feedback for source in self.sources.values())
+        if wanted != self.feedback_on:
+            self.feedback_on = wanted
+            self.serial.send_command(OP_FEEDBACK, [1 if wanted else 0])
+
+    # ----------------------------------------------------------------------------------------------------
+    # Feedback Fan-out
+    # ----------------------------------------------------------------------------------------------------
+
+    def _publish_loop(self):
+        """수신 레코드를 공유 메모리에 기록 (블로킹 대기, 폴링 없음)"""
+        while self.running:
+            try:
+                reply = self.serial.receive_queue.get(timeout=0.2)
+            except Empty:
+                self.board.set_link(self.serial.is_connected)
+                continue
+            if reply.kind in (REPLY_FEEDBACK, REPLY_POSITIONS):
+                self.board.publish(reply.kind, reply.values, reply.timestamp)
+                self.published += 1
+                if self.text_fanout:
+                    with self.sources_lock:
+                        sources = list(self.sources.values())
+                    text = f"{reply.kind}:{','.join(map(str, reply.values))}"
+                    for source in sources:
+                        source.send(('text', text, reply.timestamp))
+            else:
+                log.info("RX", "%s", reply.text, color=Colors.CYAN)
+
+    def _resync_after_reconnect(self):
+        """재연결 후 장치 상태 복원 (watchdog 스레드에서 호출)"""
+        self.board.set_link(True)
+        if self.last_targets:
+            self.tx_scheduler.resync(self.last_targets)
+        if self.last_torque:
+            self.serial.send_command(OP_TORQUE, self.last_torque)
+        self.serial.send_command(OP_FEEDBACK, [1 if self.feedback_on else 0])
+        log.info("Broker", "Device state resynchronized", color=Colors.GREEN)
+
+    # ----------------------------------------------------------------------------------------------------
+    # Lifecycle
+    # ----------------------------------------------------------------------------------------------------
+
+    def status_line(self) -> str:
+        owner = self.arbiter.owner
+        with self.sources_lock:
+            clients = ", ".join(f"{s.name}({s.priority})" for s in self.sources.values()) or "-"
+        return (f"clients: {clients} | owner: {owner.name if owner else '-'} | "
+                f"published: {self.published} | {self.serial.telemetry.status_line()}")
+
+    def stop(self):
+        self.running = False
+        try:
+            self.listener.close()
+        except OSError:
+            pass
+        with self.sources_lock:
+            sources = list(self.sources.values())
+        for source in sources:
+            try:
+                source.conn.close()
+            except OSError:
+                pass
+        if self.feedback_on:
+            self.serial.send_command(OP_FEEDBACK, [0])
+        self.tx_scheduler.stop()
+        self.serial.close()
+        self.publish_thread.join(timeout=1.0)
+        self.board.set_link(False)
+        self.board.close()
+
+# ========================================================================================================
+# Main
+# ========================================================================================================
+
+def main():
+    parser = argparse.ArgumentParser(description="Serial port broker shared by dashboard, followers and vision")
+    parser.add_argument("--port", default=None, help="serial port (default: ROBOT_PORT / cached / auto-detect)")
+    parser.add_argument("--listen", type=int, default=BROKER_ADDRESS[1], help="local TCP port for clients")
+    parser.add_argument("--lease", type=float, default=0.5, help="command ownership lease (s)")
+    parser.add_argument("--collision-check", action="store_true",
+                        help="reject colliding position commands (needs calibrated link dimensions)")
+    args = parser.parse_args()
+
+    broker = SerialBroker(args.port, (BROKER_ADDRESS[0], args.listen), lease=args.lease,
+                          collision_check=args.collision_check)
+    try:
+        while True:
+            time.sleep(5.0)
+            log.info("Broker", "%s", broker.status_line(), color=Colors.CYAN)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        broker.stop()
+        log.close()
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,307 @@
+import os
+import sys
+import struct
+import asyncio
+import threading
+import itertools
+from multiprocessing import AuthenticationError, shared_memory
+from multiprocessing.connection import Client
+from concurrent.futures import Future, InvalidStateError
+from typing import List, Optional, Tuple
+
+from protocol import OP_MOVE, REPLY_FEEDBACK, REPLY_POSITIONS, Reply
+from telemetry import LinkTelemetry
+
+# ========================================================================================================
+# Broker Settings
+# ========================================================================================================
+
+# 브로커(broker.py)는 로컬 TCP 포트로 명령을 받고, 피드백은 공유 메모리로 배포합니다.
+BROKER_ADDRESS = ('127.0.0.1', int(os.environ.get("ROBOT_BROKER_PORT", 47810)))
+BROKER_AUTHKEY = b'robot-arm-broker'
+BOARD_NAME = "robot_arm_feedback"
+
+# 명령 소스 우선순위 (높을수록 우선, 최근 명령이 있는 상위 소스가 팔을 점유)
+PRIORITY_FOLLOWER = 10   # 얼굴/손 추종
+PRIORITY_TASK = 20       # Pick-and-Place 등 자동 작업
+PRIORITY_DASHBOARD = 30  # 대시보드 수동 조작
+
+# ========================================================================================================
+# Shared Memory Feedback Board
+# ========================================================================================================
+
+class FeedbackBoard:
+    """공유 메모리 피드백 링 버퍼 (단일 작성자: 브로커, 다수 독자: 클라이언트)
+
+    [HEADER][SLOT x N] 구조이며, 각 슬롯은 seqlock으로 보호됩니다.
+    작성 중에는 seq = 2 * index + 1, 작성 완료 후 seq = 2 * index + 2 입니다.
+    독자는 seq가 기대값과 같고 읽는 동안 바뀌지 않은 슬롯만 사용합니다.
+    """
+
+    MAGIC = 0x52424642  # "RBFB"
+    VERSION = 1
+    NUM_VALUES = 7
+
+    _HEADER = struct.Struct("<IHHQB15x")   # magic, version, slots, head, link_up
+    _SLOT = struct.Struct("<QdB3x7i")      # seq, timestamp, kind, values
+    _SEQ = struct.Struct("<Q")
+    _HEAD_OFFSET = 8
+    _LINK_OFFSET = 16
+
+    KIND_CODES = {REPLY_FEEDBACK: 0, REPLY_POSITIONS: 1}
+    KIND_NAMES = {code: kind for kind, code in KIND_CODES.items()}
+
+    def __init__(self, shm: shared_memory.SharedMemory, owner: bool):
+        self.shm = shm
+        self.buf = shm.buf
+        self.owner = owner
+        magic, version, self.slots, self._head, _ = self._HEADER.unpack_from(self.buf, 0)
+        if magic != self.MAGIC or version != self.VERSION:
+            raise ValueError(f"Unknown feedback board layout in {shm.name}")
+
+    @classmethod
+    def create(cls, name: str = BOARD_NAME, slots: int = 1024) -> 'FeedbackBoard':
+        """브로커 측: 공유 메모리 생성 (이전 실행에서 남은 블록은 제거)"""
+        size = cls._HEADER.size + slots * cls._SLOT.size
+        try:
+            shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        except FileExistsError:
+            stale = shared_memory.SharedMemory(name=name)
+            stale.close()
+            stale.unlink()
+            shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        shm.buf[:size] = bytes(size)
+        cls._HEADER.pack_into(shm.buf, 0, cls.MAGIC, cls.VERSION, slots, 0, 0)
+        return cls(shm, owner=True)
+
+    @classmethod
+    def attach(cls, name: str = BOARD_NAME) -> 'FeedbackBoard':
+        """클라이언트 측: 기존 공유 메모리 연결
+
+        독자 프로세스 종료 시 resource_tracker가 브로커의 블록을 삭제하지 않도록 추적하지 않습니다.
+        """
+        if sys.version_info >= (3, 13):
+            shm = shared_memory.SharedMemory(name=name, track=False)
+        else:
+            register = shared_memory.resource_tracker.register
+            shared_memory.resource_tracker.register = lambda *args: None
+            try:
+                shm = shared_memory.SharedMemory(name=name)
+            finally:
+                shared_memory.resource_tracker.register = register
+        return cls(shm, owner=False)
+
+    # ----------------------------------------------------------------------------------------------------
+    # Writer (Broker)
+    # ----------------------------------------------------------------------------------------------------
+
+    def publish(self, kind: str, values: List[int], timestamp: float):
+        """샘플 1개 기록 (수신 시각은 time.monotonic() 기준)"""
+        index = self._head
+        offset = self._HEADER.size + (index % self.slots) * self._SLOT.size
+        self._SEQ.pack_into(self.buf, offset, 2 * index + 1)
+        padded = (list(values) + [0] * self.NUM_VALUES)[:self.NUM_VALUES]
+        self._SLOT.pack_into(self.buf, offset, 2 * index + 1, timestamp, self.KIND_CODES[kind], *padded)
+        self._SEQ.pack_into(self.buf, offset, 2 * index + 2)
+        self._head = index + 1
+        self._SEQ.pack_into(self.buf, self._HEAD_OFFSET, self._head)
+
+    def set_link(self, link_up: bool):
+        self.buf[self._LINK_OFFSET] = 1 if link_up else 0
+
+    # ----------------------------------------------------------------------------------------------------
+    # Reader (Clients)
+    # ----------------------------------------------------------------------------------------------------
+
+    def head(self) -> int:
+        """지금까지 기록된 샘플 수"""
+        return self._SEQ.unpack_from(self.buf, self._HEAD_OFFSET)[0]
+
+    def link_up(self) -> bool:
+        return bool(self.buf[self._LINK_OFFSET])
+
+    def read_since(self, cursor: int) -> Tuple[List[Reply], int, int]:
+        """cursor 이후 샘플 읽기 -> (replies, 새 cursor, 유실된 샘플 수)"""
+        head = self.head()
+        dropped = 0
+        if head - cursor > self.slots:
+            dropped = head - self.slots - cursor
+            cursor = head - self.slots
+
+        replies = []
+        for index in range(cursor, head):
+            offset = self._HEADER.size + (index % self.slots) * self._SLOT.size
+            seq, timestamp, kind, *values = self._SLOT.unpack_from(self.buf, offset)
+            if seq != 2 * index + 2 or self._SEQ.unpack_from(self.buf, offset)[0] != seq:
+                dropped += 1  # 읽는 동안 덮어쓰기됨
+                continue
+            replies.append(Reply(self.KIND_NAMES[kind], values, None, timestamp))
+        return replies, head, dropped
+
+    def close(self):
+        self.buf = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+# ========================================================================================================
+# Broker Client
+# ========================================================================================================
+
+class BrokerClient:
+    """브로커에 연결하는 클라이언트 (SerialCommunicator와 같은 송신/수신 인터페이스)
+
+    명령은 브로커 연결로 전송되고 브로커가 우선순위에 따라 중재합니다. 피드백은
+    공유 메모리 링 버퍼에서 직접 읽습니다. 재연결 시 장치 상태 복원은 브로커가 담당합니다.
+    """
+
+    def __init__(self, name: str, priority: int = PRIORITY_FOLLOWER,
+                 address=BROKER_ADDRESS, authkey: bytes = BROKER_AUTHKEY):
+        self.name = name
+        self.priority = priority
+        self.conn = Client(address, authkey=authkey)
+        self.conn.send(('hello', name, priority))
+        _, board_name = self.conn.recv()
+        self.board = FeedbackBoard.attach(board_name)
+        self.port = f"broker {address[0]}:{address[1]}"
+
+        self.cursor = self.board.head()  # 연결 이후 샘플부터 읽음
+        self.dropped = 0
+        self.rejected = 0  # 상위 우선순위 소스 점유로 거부된 명령 수
+        self.owner = None  # 마지막 거부 시점의 점유 소스
+        self.collisions = 0  # 브로커의 충돌 검사로 거부된 위치 명령 수
+        self.collision_reason = None
+        self.closed = False
+        self.on_reconnect = None  # 브로커가 재연결 후 상태를 복원하므로 호출되지 않음
+
+        self.telemetry = LinkTelemetry()
+        self._send_lock = threading.Lock()
+        self._request_ids = itertools.count(1)
+        self._requests = {}  # request id -> Future
+
+        self.receive_thread = threading.Thread(target=self._receive_loop, daemon=True)
+        self.receive_thread.start()
+
+    @classmethod
+    def attach(cls, name: str, priority: int = PRIORITY_FOLLOWER, **kwargs) -> Optional['BrokerClient']:
+        """브로커가 실행 중이면 연결, 아니면 None"""
+        try:
+            return cls(name, priority, **kwargs)
+        except (OSError, EOFError, FileNotFoundError, ValueError, AuthenticationError):
+            return None
+
+    @property
+    def is_connected(self) -> bool:
+        return not self.closed and self.board.link_up()
+
+    # ----------------------------------------------------------------------------------------------------
+    # Commands
+    # ----------------------------------------------------------------------------------------------------
+
+    def _send(self, message: tuple) -> bool:
+        if self.closed:
+            return False
+        try:
+            with self._send_lock:
+                self.conn.send(message)
+            return True
+        except (OSError, EOFError, ValueError, AuthenticationError):
+            self.closed = True
+            return False
+
+    def send_command(self, opcode: int, values: List[int]) -> bool:
+        """명령 전송 (브로커가 우선순위 확인 후 장치로 전달)
+
+        실제 프레임(방언, Delta, 합쳐진 명령)은 브로커가 만들므로 바이트 수는 기록하지 않고
+        패킷 수와 목표 도달 지연만 계측합니다. (링크 처리량은 브로커 상태 출력 참고)
+        """
+        values = [int(v) for v in values]
+        if not self._send(('cmd', opcode, values)):
+            return False
+        self.telemetry.on_tx(0, values if opcode == OP_MOVE else None)
+        return True
+
+    def send_positions(self, positions: List[int], encoder=None) -> bool:
+        """위치 명령 전송 (Delta 인코딩은 브로커의 전송 스케줄러가 담당)"""
+        return self.send_command(OP_MOVE, positions)
+
+    def request_positions(self, timeout: float = 1.0) -> Future:
+        """현재 위치 요청 - Positions 응답 수신 시 완료되는 Future 반환"""
+        future = Future()
+        request_id = next(self._request_ids)
+        self._requests[request_id] = future
+        if not self._send(('query', request_id, timeout)):
+            self._requests.pop(request_id, None)
+            future.set_exception(ConnectionError("Broker unavailable"))
+        return future
+
+    async def query_positions(self, timeout: float = 1.0) -> List[int]:
+        return await asyncio.wrap_future(self.request_positions(timeout))
+
+    # ----------------------------------------------------------------------------------------------------
+    # Feedback
+    # ----------------------------------------------------------------------------------------------------
+
+    def drain_received(self) -> List[Reply]:
+        """마지막 호출 이후 공유 메모리에 기록된 샘플을 모두 가져오기"""
+        if self.closed:
+            return []
+        replies, self.cursor, dropped = self.board.read_since(self.cursor)
+        self.dropped += dropped
+        for reply in replies:
+            self.telemetry.on_position_sample(reply.values, reply.timestamp)
+        return replies
+
+    def latest(self) -> Optional[Reply]:
+        """가장 최근 샘플 (cursor는 변경하지 않음)"""
+        if self.closed:
+            return None
+        head = self.board.head()
+        if head == 0:
+            return None
+        replies, _, _ = self.board.read_since(head - 1)
+        return replies[-1] if replies else None
+
+    def _receive_loop(self):
+        """브로커 응답 수신 (위치 요청 응답, 거부/충돌 알림)"""
+        while not self.closed:
+            try:
+                message = self.conn.recv()
+            except (OSError, EOFError):
+                break
+            if message[0] == 'positions':
+                _, request_id, values, error = message
+                future = self._requests.pop(request_id, None)
+                if future is None:
+                    continue
+                try:
+                    if values is None:
+                        future.set_exception(TimeoutError(error or "Position query failed"))
+                    else:
+                        future.set_result(values)
+                except InvalidStateError:
+                    pass
+            elif message[0] == 'rejected':
+                self.rejected += 1
+                self.owner = message[2]
+            elif message[0] == 'collision':
+                self.collisions += 1
+                self.collision_reason = message[2]
+        self.closed = True
+        for future in self._requests.values():
+            try:
+                future.set_exception(ConnectionError("Broker connection closed"))
+            except InvalidStateError:
+                pass
+        self._requests.clear()
+
+    def close(self):
+        """연결 종료"""
+        if not self.closed:
+            self._send(('bye',))
+        self.closed = True
+        try:
+            self.conn.close()
+        except OSError:
+            pass
+        self.board.close()
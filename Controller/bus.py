@@ -0,0 +1,285 @@
+import time
+import threading
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+
+from protocol import (OP_MOVE, OP_TORQUE, OP_FEEDBACK, OP_QUERY, OP_RELEASE, MAX_BUS_ARMS, NUM_VALUES,
+                      POSITION_LIMITS)
+
+# ========================================================================================================
+# Arm
+# ========================================================================================================
+
+DEFAULT_POSITIONS = [512, 512, 380, 800, 700, 512, 512]
+
+class Arm:
+    """버스 위의 팔 하나 (목표 위치, 팔별 피드백 스트림)
+
+    Dynamixel ID는 arm_id * 10 + 1~7 입니다. (Leader-follower.ino: 0 -> ID 1~7, 1 -> ID 11~17)
+    """
+
+    def __init__(self, name: str, link, arm_id: int, positions: Optional[List[int]] = None,
+                 history: int = 256):
+        self.name = name
+        self.link = link
+        self.arm_id = arm_id
+
+        self.targets = [int(p) for p in (positions or DEFAULT_POSITIONS)]
+        self.dirty = False
+        self.last_sent = None
+
+        # 피드백 스트림 (수신 스레드에서 기록)
+        self.feedback = deque(maxlen=history)  # (timestamp, positions)
+        self.positions = None
+        self.feedback_time = None
+        self.feedback_count = 0
+
+    @property
+    def motor_ids(self) -> List[int]:
+        return [self.arm_id * 10 + j + 1 for j in range(NUM_VALUES)]
+
+    def on_feedback(self, positions: List[int], timestamp: float):
+        self.positions = positions
+        self.feedback_time = timestamp
+        self.feedback_count += 1
+        self.feedback.append((timestamp, positions))
+
+    def latest_feedback(self) -> Optional[Tuple[float, List[int]]]:
+        """가장 최근 피드백 (timestamp, positions)"""
+        return (self.feedback_time, self.positions) if self.positions is not None else None
+
+# ========================================================================================================
+# Arm Bus
+# ========================================================================================================
+
+class ArmBus:
+    """여러 팔을 하나 이상의 시리얼 링크로 제어하는 버스 관리자
+
+    팔별 목표 위치는 최신 값으로 덮어쓰고, 전송 주기마다 링크별로 변경된 팔들의 명령을
+    Bus 프레임 하나로 묶어 전송합니다. (팔 N개 = 프레임 1개, 헤더/CRC/쓰기 호출은 링크당 1회)
+    링크에서 수신한 Bus 피드백은 팔 번호로 각 Arm에 분배합니다.
+
+    위치 명령을 받은 펌웨어는 호스트 제어로 전환되고 호스트 프레임이 끊기면 미러링으로 돌아가므로,
+    명령한 팔은 keepalive 간격마다 마지막 목표를 재전송합니다. (release()로 해제)
+
+    link는 SerialCommunicator (send_bus_command, bus_handler) 입니다.
+    """
+
+    def __init__(self, rate_hz: float = 50, batch: bool = True, keepalive: float = 1.0):
+        self.period = 1.0 / rate_hz
+        self.batch = batch  # False: 팔마다 프레임 1개 (비교용)
+        self.keepalive = keepalive  # 0: 재전송 안 함
+
+        self.arms: Dict[str, Arm] = {}
+        self.links = []
+        self._routes = {}  # link -> {arm_id: Arm}
+
+        self._cond = threading.Condition()
+        self._dirty = False
+        self._last_send_time = 0.0
+
+        # 통계 카운터
+        self.frames = 0
+        self.arm_commands = 0
+        self.coalesced = 0
+        self.keepalives = 0
+        self.unknown_arms = 0
+
+        self.running = True
+        self.thread = threading.Thread(target=self._transmit_loop, daemon=True)
+        self.thread.start()
+
+    # ----------------------------------------------------------------------------------------------------
+    # Topology
+    # ----------------------------------------------------------------------------------------------------
+
+    def add_arm(self, name: str, link, arm_id: int, positions: Optional[List[int]] = None) -> Arm:
+        """링크에 팔 등록 (같은 링크의 팔 번호는 중복 불가)"""
+        if name in self.arms:
+            raise ValueError(f"Arm '{name}' already registered")
+
+        routes = self._routes.get(link)
+        if routes is None:
+            routes = self._routes[link] = {}
+            self.links.append(link)
+            link.bus_handler = lambda reply, link=link: self._route(link, reply)
+        if arm_id in routes:
+            raise ValueError(f"Arm {arm_id} already registered on this link")
+
+        arm = Arm(name, link, arm_id, positions)
+        with self._cond:
+            self.arms[name] = arm
+            routes[arm_id] = arm
+        return arm
+
+    def _arms_by_link(self, arms=None) -> Dict[object, List[Arm]]:
+        grouped = {}
+        for arm in (self.arms.values() if arms is None else arms):
+            grouped.setdefault(arm.link, []).append(arm)
+        return grouped
+
+    # ----------------------------------------------------------------------------------------------------
+    # Commands
+    # ----------------------------------------------------------------------------------------------------
+
+    def set_targets(self, name: str, positions: List[int]):
+        """팔 전체 관절 목표 위치 등록 (POSITION_LIMITS로 제한, 전송 전이면 이전 값을 덮어씀)"""
+        positions = [min(max(int(p), lo), hi) for p, (lo, hi) in zip(positions, POSITION_LIMITS)]
+        with self._cond:
+            arm = self.arms[name]
+            if arm.dirty:
+                self.coalesced += 1
+            arm.targets = positions
+            arm.dirty = True
+            self._dirty = True
+            self._cond.notify()
+
+    def set_joint(self, name: str, joint_index: int, position: int):
+        """팔의 단일 관절 목표 위치 등록"""
+        with self._cond:
+            positions = list(self.arms[name].targets)
+        positions[joint_index] = int(position)
+        self.set_targets(name, positions)
+
+    def set_torque(self, enabled: bool, names: Optional[List[str]] = None):
+        """팔별 토크 ON/OFF (링크당 프레임 1개, 위치 명령은 토크를 켜지 않음)"""
+        self._broadcast(OP_TORQUE, [1 if enabled else 0], names)
+
+    def set_feedback(self, enabled: bool, names: Optional[List[str]] = None):
+        """Bus 피드백 스트림 ON/OFF"""
+        self._broadcast(OP_FEEDBACK, [1 if enabled else 0], names)
+
+    def release(self, names: Optional[List[str]] = None):
+        """호스트 제어 해제 (Leader-follower.ino: 리더 -> 팔로워 미러링 재개, keepalive 중단)"""
+        with self._cond:
+            for arm in (self.arms.values() if names is None else [self.arms[name] for name in names]):
+                arm.last_sent = None
+        self._broadcast(OP_RELEASE, [0], names)
+
+    def request_positions(self):
+        """모든 링크에 위치 요청 (응답은 피드백과 같은 경로로 분배)"""
+        for link, arms in self._arms_by_link().items():
+            link.send_bus_command(OP_QUERY, [(arm.arm_id, [0]) for arm in arms])
+
+    def _broadcast(self, opcode: int, values: List[int], names: Optional[List[str]] = None):
+        selected = None if names is None else [self.arms[name] for name in names]
+        for link, arms in self._arms_by_link(selected).items():
+            for start in range(0, len(arms), MAX_BUS_ARMS):
+                link.send_bus_command(opcode, [(arm.arm_id, values) for arm in arms[start:start + MAX_BUS_ARMS]])
+
+    # ----------------------------------------------------------------------------------------------------
+    # Transmit
+    # ----------------------------------------------------------------------------------------------------
+
+    def _take_pending(self) -> Dict[object, List[Tuple[Arm, List[int]]]]:
+        """링크별 전송할 (arm, targets) 꺼내기 (직전 전송 값과 같은 팔은 제외)"""
+        pending = {}
+        with self._cond:
+            self._dirty = False
+            for arm in self.arms.values():
+                if not arm.dirty:
+                    continue
+                arm.dirty = False
+                if arm.targets == arm.last_sent:
+                    continue
+                pending.setdefault(arm.link, []).append((arm, arm.targets))
+        return pending
+
+    def _take_keepalive(self) -> Dict[object, List[Tuple[Arm, List[int]]]]:
+        """링크별 마지막으로 전송한 (arm, targets) (호스트 제어 중인 팔)"""
+        pending = {}
+        with self._cond:
+            for arm in self.arms.values():
+                if arm.last_sent is not None:
+                    pending.setdefault(arm.link, []).append((arm, arm.last_sent))
+        return pending
+
+    def flush(self):
+        """대기 중인 명령 즉시 전송 (링크당 Bus 프레임 1개)"""
+        self._send(self._take_pending())
+
+    def _send(self, pending: Dict[object, List[Tuple[Arm, List[int]]]]):
+        for link, entries in pending.items():
+            step = MAX_BUS_ARMS if self.batch else 1
+            for start in range(0, len(entries), step):
+                chunk = entries[start:start + step]
+                if link.send_bus_command(OP_MOVE, [(arm.arm_id, targets) for arm, targets in chunk]):
+                    self.frames += 1
+                    self.arm_commands += len(chunk)
+                    for arm, targets in chunk:
+                        arm.last_sent = targets
+        self._last_send_time = time.monotonic()
+
+    def _transmit_loop(self):
+        """전송 루프 (백그라운드 스레드)"""
+        while self.running:
+            with self._cond:
+                while self.running and not self._dirty:
+                    if not self.keepalive:
+                        self._cond.wait()
+                        continue
+                    idle = time.monotonic() - self._last_send_time
+                    if idle < self.keepalive:
+                        self._cond.wait(self.keepalive - idle)
+                        continue
+                    break
+                keepalive = not self._dirty
+            if not self.running:
+                break
+
+            if keepalive:
+                # 명령 없이 keepalive 간격 경과: 호스트 제어 유지
+                pending = self._take_keepalive()
+                if pending:
+                    self.keepalives += 1
+                    self._send(pending)
+                else:
+                    self._last_send_time = time.monotonic()
+                continue
+
+            # 최소 전송 간격 유지 (대기 중 들어온 명령은 팔별 최신 값으로 합쳐짐)
+            delay = self._last_send_time + self.period - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+
+            if self.running:
+                self.flush()
+
+    # ----------------------------------------------------------------------------------------------------
+    # Feedback
+    # ----------------------------------------------------------------------------------------------------
+
+    def _route(self, link, reply):
+        """Bus 응답을 팔별 피드백으로 분배 (수신 스레드)"""
+        routes = self._routes.get(link, {})
+        for arm_id, positions in reply.values:
+            arm = routes.get(arm_id)
+            if arm is None:
+                self.unknown_arms += 1
+                continue
+            arm.on_feedback(positions, reply.timestamp)
+
+    # ----------------------------------------------------------------------------------------------------
+    # Lifecycle
+    # ----------------------------------------------------------------------------------------------------
+
+    def get_stats(self) -> dict:
+        """전송/수신 통계 반환"""
+        return {
+            'frames': self.frames,
+            'arm_commands': self.arm_commands,
+            'coalesced': self.coalesced,
+            'keepalives': self.keepalives,
+            'feedback': {name: arm.feedback_count for name, arm in self.arms.items()},
+            'unknown_arms': self.unknown_arms,
+        }
+
+    def stop(self):
+        """버스 종료 (남은 명령 전송)"""
+        with self._cond:
+            self.running = False
+            self._cond.notify()
+        self.thread.join(timeout=1.0)
+        self.flush()
+        for link in self.links:
+            link.bus_handler = None
@@ -0,0 +1,124 @@
+import numpy as np
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+from kinematics import KinematicChain
+
+# ========================================================================================================
+# Collision Model
+# ========================================================================================================
+
+@dataclass
+class Capsule:
+    """링크 캡슐: FK 좌표계 start_frame 원점 ~ end_frame 원점 선분 + 반지름 (cm)"""
+    name: str
+    start_frame: int
+    end_frame: int
+    radius: float
+    table_check: bool = True  # 베이스처럼 테이블에 놓인 링크는 제외
+
+# KinematicChain.forward(frames=True) 좌표계: 0 베이스, 1 ~ 6 관절 M1 ~ M6 이후, 7 그리퍼 끝
+# 반지름은 AX-12A 브래킷 폭 기준 공칭값입니다.
+ARM_CAPSULES = [
+    Capsule("Base", 0, 1, 4.0, table_check=False),
+    Capsule("Upper_Arm", 2, 3, 2.5),
+    Capsule("Forearm", 4, 5, 2.5),
+    Capsule("Hand", 6, 7, 1.5),
+]
+
+# 인접하지 않은 링크 쌍만 검사 (인접 링크는 관절에서 항상 맞닿음)
+SELF_COLLISION_PAIRS = [("Base", "Forearm"), ("Base", "Hand"), ("Upper_Arm", "Hand")]
+
+# ========================================================================================================
+# Geometry
+# ========================================================================================================
+
+def segment_distances(p1: np.ndarray, q1: np.ndarray, p2: np.ndarray, q2: np.ndarray) -> np.ndarray:
+    """선분 p1-q1과 p2-q2 사이의 최단 거리 (..., 3) -> (...)
+
+    Ericson, Real-Time Collision Detection 5.1.9의 벡터화 버전입니다.
+    """
+    d1, d2, r = q1 - p1, q2 - p2, p1 - p2
+    a = np.maximum(np.einsum('...i,...i->...', d1, d1), 1e-12)
+    e = np.maximum(np.einsum('...i,...i->...', d2, d2), 1e-12)
+    b = np.einsum('...i,...i->...', d1, d2)
+    c = np.einsum('...i,...i->...', d1, r)
+    f = np.einsum('...i,...i->...', d2, r)
+
+    denom = a * e - b * b
+    s = np.where(denom > 1e-12, np.clip((b * f - c * e) / np.maximum(denom, 1e-12), 0.0, 1.0), 0.0)
+    t = (b * s + f) / e
+    s = np.where(t < 0.0, np.clip(-c / a, 0.0, 1.0), np.where(t > 1.0, np.clip((b - c) / a, 0.0, 1.0), s))
+    t = np.clip(t, 0.0, 1.0)
+
+    closest = (p1 + d1 * s[..., None]) - (p2 + d2 * t[..., None])
+    return np.sqrt(np.einsum('...i,...i->...', closest, closest))
+
+# ========================================================================================================
+# Collision Checker
+# ========================================================================================================
+
+class CollisionChecker:
+    """캡슐 기반 자기 충돌 / 테이블 충돌 검사 (N개 자세 일괄)
+
+    자기 충돌: 인접하지 않은 캡슐 쌍의 선분 거리 < 반지름 합 + margin
+    테이블 충돌: 캡슐의 가장 낮은 점 (끝점 z - 반지름) < table_height + table_margin
+    """
+
+    def __init__(self, chain: Optional[KinematicChain] = None, capsules: List[Capsule] = None,
+                 pairs: List[Tuple[str, str]] = None, table_height: float = 0.0, margin: float = 0.5,
+                 table_margin: float = 0.0):
+        self.chain = chain or KinematicChain()
+        self.capsules = list(capsules or ARM_CAPSULES)
+        self.table_height = table_height
+        self.margin = margin
+        self.table_margin = table_margin
+
+        index = {capsule.name: i for i, capsule in enumerate(self.capsules)}
+        self.pairs = [(index[a], index[b]) for a, b in (pairs or SELF_COLLISION_PAIRS)]
+        self._starts = np.array([c.start_frame for c in self.capsules])
+        self._ends = np.array([c.end_frame for c in self.capsules])
+        self._radii = np.array([c.radius for c in self.capsules])
+        self._pair_a = np.array([a for a, _ in self.pairs], dtype=np.int64)
+        self._pair_b = np.array([b for _, b in self.pairs], dtype=np.int64)
+        self._pair_clearance = self._radii[self._pair_a] + self._radii[self._pair_b] + margin
+        self._table_capsules = np.array([i for i, c in enumerate(self.capsules) if c.table_check], dtype=np.int64)
+
+    def segments(self, ticks) -> Tuple[np.ndarray, np.ndarray]:
+        """tick (N, J) -> 캡슐 선분 끝점 (N, C, 3), (N, C, 3)"""
+        frames = self.chain.forward_ticks(np.atleast_2d(np.asarray(ticks, dtype=np.float64)), frames=True)
+        origins = frames[:, :, :3, 3]
+        return origins[:, self._starts], origins[:, self._ends]
+
+    def check(self, ticks) -> Tuple[np.ndarray, np.ndarray]:
+        """충돌 검사 -> (자기 충돌 (N, P) bool, 테이블 충돌 (N, C) bool)"""
+        starts, ends = self.segments(ticks)
+        distances = segment_distances(starts[:, self._pair_a], ends[:, self._pair_a],
+                                      starts[:, self._pair_b], ends[:, self._pair_b])
+        self_hits = distances < self._pair_clearance
+
+        table_hits = np.zeros(starts.shape[:2], dtype=bool)
+        lowest = np.minimum(starts[:, self._table_capsules, 2], ends[:, self._table_capsules, 2])
+        table_hits[:, self._table_capsules] = (lowest - self._radii[self._table_capsules]
+                                               < self.table_height + self.table_margin)
+        return self_hits, table_hits
+
+    def collides(self, ticks) -> np.ndarray:
+        """자세별 충돌 여부 (N,) bool"""
+        self_hits, table_hits = self.check(ticks)
+        return self_hits.any(axis=1) | table_hits.any(axis=1)
+
+    def first_collision(self, ticks) -> Optional[Tuple[int, str]]:
+        """자세 배열 (궤적 등)에서 첫 충돌 -> (인덱스, 원인) / 없으면 None"""
+        self_hits, table_hits = self.check(ticks)
+        hits = self_hits.any(axis=1) | table_hits.any(axis=1)
+        if not hits.any():
+            return None
+        index = int(np.argmax(hits))
+        return index, self._describe(self_hits[index], table_hits[index])
+
+    def _describe(self, self_hits: np.ndarray, table_hits: np.ndarray) -> str:
+        reasons = [f"{self.capsules[a].name}-{self.capsules[b].name}"
+                   for (a, b), hit in zip(self.pairs, self_hits) if hit]
+        reasons += [f"{capsule.name}-Table" for capsule, hit in zip(self.capsules, table_hits) if hit]
+        return ", ".join(reasons)
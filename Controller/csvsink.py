@@ -0,0 +1,164 @@
+import csv
+import time
+import threading
+from queue import Queue, Empty, Full
+from typing import Callable, Iterable, Optional, Sequence
+
+# ========================================================================================================
+# CSV Sink
+# ========================================================================================================
+
+class CsvSink:
+    """CSV 행 비동기 기록기 (크기 제한 큐 + 일괄 쓰기 스레드)
+
+    호출 측은 행(또는 format_row로 변환할 항목)을 큐에 넣기만 하고, 파일은 세션 동안 한 번만 연 채
+    쓰기 스레드가 큐에 쌓인 행을 한 번에 writerows로 씁니다. 파일 버퍼는 flush_rows행이 쌓이거나
+    마지막 flush 후 flush_interval초가 지나면 비웁니다.
+    큐가 가득 차면 새 행은 버리고 dropped로 집계합니다. (호출 측을 막지 않음, block=True 제외)
+    쓰기 오류는 on_error(예외)로 알리고 해당 일괄 행은 버립니다.
+    """
+
+    def __init__(self, path: str, header: Optional[Sequence] = None,
+                 format_row: Optional[Callable[[object], Sequence]] = None, queue_size: int = 10000,
+                 flush_rows: int = 256, flush_interval: float = 0.5, batch_rows: int = 1024,
+                 on_error: Optional[Callable[[Exception], None]] = None):
+        self.path = path
+        self.format_row = format_row
+        self.on_error = on_error
+        self.flush_rows = max(1, flush_rows)
+        self.flush_interval = flush_interval
+        self.batch_rows = max(1, batch_rows)
+
+        self._file = open(path, 'w', newline='')
+        self._writer = csv.writer(self._file)
+        if header is not None:
+            self._writer.writerow(header)
+            self._file.flush()
+
+        self._queue = Queue(maxsize=queue_size)
+        self._unflushed = 0
+        self._last_flush = time.monotonic()
+
+        # 통계 카운터
+        self.queued = 0
+        self.written = 0
+        self.dropped = 0
+        self.batches = 0
+        self.flushes = 0
+        self.errors = 0
+        self.max_depth = 0
+
+        self.running = True
+        self.thread = threading.Thread(target=self._write_loop, name="csv-sink", daemon=True)
+        self.thread.start()
+
+    # ----------------------------------------------------------------------------------------------------
+    # Hot Path
+    # ----------------------------------------------------------------------------------------------------
+
+    def put(self, row, block: bool = False) -> bool:
+        """행 등록 (큐가 가득 차면 버리고 False, block=True면 자리가 날 때까지 대기)"""
+        if not self.running:
+            return False
+        try:
+            self._queue.put(row, block)
+        except Full:
+            self.dropped += 1
+            return False
+        self.queued += 1
+        return True
+
+    def put_many(self, rows: Iterable, block: bool = False) -> int:
+        """여러 행 등록 -> 등록된 행 수"""
+        return sum(self.put(row, block) for row in rows)
+
+    # ----------------------------------------------------------------------------------------------------
+    # Writer Thread
+    # ----------------------------------------------------------------------------------------------------
+
+    def _write_loop(self):
+        """쓰기 루프 (백그라운드 스레드) - 종료 요청 후에도 남은 행을 모두 쓰고 닫음"""
+        closing = False
+        while not closing:
+            timeout = max(0.0, self._last_flush + self.flush_interval - time.monotonic()) if self._unflushed else None
+            try:
+                item = self._queue.get(timeout=timeout)
+            except Empty:
+                self._flush()
+                continue
+
+            batch = []
+            while True:
+                if item is None:
+                    closing = True
+                else:
+                    batch.append(item)
+                if closing or len(batch) >= self.batch_rows:
+                    break
+                try:
+                    item = self._queue.get_nowait()
+                except Empty:
+                    break
+
+            depth = self._queue.qsize() + len(batch)
+            if depth > self.max_depth:
+                self.max_depth = depth
+            if batch:
+                self._write(batch)
+            if self._unflushed >= self.flush_rows or time.monotonic() - self._last_flush >= self.flush_interval:
+                self._flush()
+
+        self._flush()
+        self._file.close()
+
+    def _write(self, batch: list):
+        try:
+            if self.format_row is not None:
+                batch = [self.format_row(item) for item in batch]
+            self._writer.writerows(batch)
+        except Exception as e:
+            self.dropped += len(batch)
+            self._error(e)
+            return
+        self.written += len(batch)
+        self.batches += 1
+        self._unflushed += len(batch)
+
+    def _flush(self):
+        if self._unflushed:
+            try:
+                self._file.flush()
+            except Exception as e:
+                self._error(e)
+            self.flushes += 1
+            self._unflushed = 0
+        self._last_flush = time.monotonic()
+
+    def _error(self, error: Exception):
+        self.errors += 1
+        if self.on_error is not None:
+            try:
+                self.on_error(error)
+            except Exception:
+                pass
+
+    # ----------------------------------------------------------------------------------------------------
+    # Reporting
+    # ----------------------------------------------------------------------------------------------------
+
+    @property
+    def depth(self) -> int:
+        return self._queue.qsize()
+
+    def get_stats(self) -> dict:
+        """기록 통계 반환"""
+        return {'queued': self.queued, 'written': self.written, 'dropped': self.dropped, 'batches': self.batches,
+                'flushes': self.flushes, 'errors': self.errors, 'depth': self.depth, 'max_depth': self.max_depth}
+
+    def close(self, timeout: float = 5.0):
+        """남은 행을 모두 쓰고 파일 닫기"""
+        if not self.running:
+            return
+        self.running = False
+        self._queue.put(None)  # 쓰기 스레드가 계속 비우므로 큐가 가득 차도 곧 자리가 남
+        self.thread.join(timeout=timeout)
@@ -0,0 +1,462 @@
+import os
+import pty
+import sys
+import time
+import tty
+import heapq
+import math
+import select
+import argparse
+import threading
+from typing import List, Optional, Tuple, Union
+
+from protocol import (
+    OP_MOVE, OP_TORQUE, OP_FEEDBACK, OP_QUERY, OP_PROTOCOL, OP_MOVE_DELTA, OP_RELEASE, REPLY_FLAG, CAP_DELTA,
+    READY_BANNER,
+    FRAME_SYNC1, FRAME_SYNC2, FRAME_SYNC_DELTA, FRAME_SIZE, DELTA_MAX_VALUES, NUM_VALUES, POSITION_LIMITS,
+    Frame, BusFrame, FrameDecoder, apply_delta, crc16_ccitt, encode_binary, encode_bus_frame, parse_ascii_command,
+)
+
+# ========================================================================================================
+# Emulator Constants (robot.ino)
+# ========================================================================================================
+
+DEFAULT_POSITIONS = [512, 512, 380, 800, 700, 512, 512]
+
+FEEDBACK_INTERVAL = 0.020   # loop()의 delay(20)
+MOVING_SPEED = 100          # setup()의 MOVING_SPEED
+SERVO_UPDATE_INTERVAL = 0.005
+SYNC_TIMEOUT = 0.020        # SYNC_TIMEOUT_MS (두 번째 동기 바이트 / 버린 프레임 뒤 조용한 구간)
+STREAM_TIMEOUT = 1.0        # Serial.setTimeout() 기본값 (readBytes / readStringUntil)
+HOST_CONTROL_TIMEOUT = 3.0  # Leader-follower.ino HOST_CONTROL_TIMEOUT_MS
+
+# AX-12A: MOVING_SPEED 1 unit = 0.111 rpm, 1023 ticks = 300°
+TICKS_PER_SPEED_UNIT = 0.111 * 360.0 / 60.0 * (1023.0 / 300.0)
+MAX_SPEED_TICKS = 1023 * TICKS_PER_SPEED_UNIT  # MOVING_SPEED 0 = 최대 속도
+
+# ========================================================================================================
+# Firmware Receiver (robot.ino receiveSerial)
+# ========================================================================================================
+
+class FirmwareReceiver:
+    """robot.ino receiveSerial()의 바이트 단위 모델
+
+    호스트 FrameDecoder와 달리 바이트마다 도착 시각을 받아 펌웨어의 대기 시간을 그대로 적용합니다.
+    - 0xAA 뒤 두 번째 동기 바이트는 SYNC_TIMEOUT까지 기다리고, 그 안에 오지 않으면 프레임을 버림
+    - 버린 프레임은 다음 0xAA 또는 SYNC_TIMEOUT 동안 조용할 때까지 버림 (dropFrame)
+    - 프레임 밖에서 숫자로 시작하지 않는 바이트는 버림, 숫자는 '*'까지 ASCII 명령 (readStringUntil)
+    - readBytes / readStringUntil은 바이트 사이 STREAM_TIMEOUT이 지나면 받은 만큼만 반환
+    """
+
+    IDLE, SYNC, FRAME, DELTA, ASCII, DROP = range(6)
+
+    def __init__(self):
+        self.state = self.IDLE
+        self.buffer = bytearray()
+        self.deadline = 0.0
+        self.crc_errors = 0
+        self.dropped = 0
+
+    def feed(self, data: bytes, start: float, byte_time: float) -> List[Tuple[float, Union[str, Frame]]]:
+        """바이트 i가 start + (i + 1) * byte_time에 도착한다고 보고 완성된 (시각, 메시지) 목록 반환"""
+        messages = []
+        for i, byte in enumerate(data):
+            at = start + (i + 1) * byte_time
+            messages += self.expire(at)
+            self._byte(byte, at, messages)
+        return messages
+
+    def expire(self, now: float) -> List[Tuple[float, Union[str, Frame]]]:
+        """NOW까지 지난 대기 시간 처리 (다음 바이트가 오지 않아도 펌웨어는 시간 초과 후 진행)"""
+        messages = []
+        while self.state != self.IDLE and now > self.deadline:
+            if self.state == self.ASCII:
+                # readStringUntil() 시간 초과: 받은 부분을 그대로 파싱
+                messages.append((self.deadline, self.buffer.decode('utf-8', errors='replace')))
+                self.state = self.IDLE
+            elif self.state == self.DROP:
+                self.state = self.IDLE
+            else:
+                self._drop(self.deadline)
+        return messages
+
+    def _drop(self, at: float):
+        self.dropped += 1
+        self.state = self.DROP
+        self.deadline = at + SYNC_TIMEOUT
+
+    def _byte(self, byte: int, at: float, messages: list):
+        state = self.state
+        if state == self.IDLE or state == self.DROP:
+            if byte == FRAME_SYNC1:
+                self.state = self.SYNC
+                self.deadline = at + SYNC_TIMEOUT
+            elif state == self.IDLE and 0x30 <= byte <= 0x39:
+                self.state = self.ASCII
+                self.buffer = bytearray([byte])
+                self.deadline = at + STREAM_TIMEOUT
+            elif state == self.DROP:
+                self.deadline = at + SYNC_TIMEOUT
+            return
+
+        if state == self.SYNC:
+            if byte == FRAME_SYNC2 or byte == FRAME_SYNC_DELTA:
+                self.state = self.FRAME if byte == FRAME_SYNC2 else self.DELTA
+                self.buffer = bytearray([FRAME_SYNC1, byte])
+                self.deadline = at + STREAM_TIMEOUT
+            else:
+                # peek()만 했으므로 이 바이트는 dropFrame()이 다시 봄
+                self._drop(at)
+                self._byte(byte, at, messages)
+            return
+
+        if state == self.ASCII:
+            if byte == ord('*'):
+                messages.append((at, self.buffer.decode('utf-8', errors='replace')))
+                self.state = self.IDLE
+            else:
+                self.buffer.append(byte)
+                self.deadline = at + STREAM_TIMEOUT
+            return
+
+        buf = self.buffer
+        buf.append(byte)
+        self.deadline = at + STREAM_TIMEOUT
+        if state == self.DELTA:
+            if len(buf) < 3:
+                return
+            mask = buf[2]
+            count = bin(mask).count('1')
+            if mask >> NUM_VALUES or not 0 < count <= DELTA_MAX_VALUES:
+                self._drop(at)
+                return
+            size = 3 + 2 * count + 2
+        else:
+            size = FRAME_SIZE
+        if len(buf) < size:
+            return
+
+        if crc16_ccitt(memoryview(buf)[2:size - 2]) != (buf[size - 2] | (buf[size - 1] << 8)):
+            self.crc_errors += 1
+            self._drop(at)
+            return
+        values = [buf[i] | (buf[i + 1] << 8) for i in range(3, size - 2, 2)]
+        if state == self.DELTA:
+            messages.append((at, Frame(OP_MOVE_DELTA, [buf[2], *values])))
+        else:
+            messages.append((at, Frame(buf[2], values)))
+        self.state = self.IDLE
+
+# ========================================================================================================
+# Arduino Emulator
+# ========================================================================================================
+
+class ArduinoEmulator:
+    """robot.ino 프로토콜을 구현하는 pty 기반 Arduino 에뮬레이터
+
+    - opcode 0/1/2/3/4/5 (ASCII / Binary 방언 모두 지원, 수신은 FirmwareReceiver로 바이트 단위 처리)
+    - setup() 완료 후 "Ready" 배너 출력
+    - arms > 1: 한 버스의 여러 팔 (Bus 프레임, 팔 0은 단일 팔 명령으로도 제어)
+    - Bus 위치 명령 후 호스트 제어 상태 (opcode 6 또는 호스트 프레임 없이 3 s 경과 시 해제)
+    - Passivity 모드에서 20 ms 주기 Feedback 출력
+    - 서보 속도(MOVING_SPEED), 시리얼 전송 시간(baud rate), 고정 지연(latency) 모델링
+    """
+
+    def __init__(self, moving_speed: int = MOVING_SPEED, baud_rate: int = 115200,
+                 latency: float = 0.001, boot_delay: float = 0.0, wander: float = 0.0,
+                 link: Optional[str] = None, arms: int = 1):
+        self.master_fd, slave_fd = pty.openpty()
+        tty.setraw(slave_fd)
+        self._slave_fd = slave_fd
+        self.port = os.ttyname(slave_fd)
+        self.link = link
+        if link:
+            if os.path.lexists(link):
+                os.remove(link)
+            os.symlink(self.port, link)
+
+        self.speed_ticks = (moving_speed * TICKS_PER_SPEED_UNIT) if moving_speed > 0 else MAX_SPEED_TICKS
+        self.byte_time = 10.0 / baud_rate if baud_rate > 0 else 0.0  # 8N1
+        self.latency = latency
+        self.boot_delay = boot_delay
+        self.wander = wander
+
+        # 단일 팔: robot.ino 수신 루틴 (바이트 단위 도착 / 대기 시간), 다중 팔: Bus 프레임까지 디코딩
+        self.receiver = FirmwareReceiver() if arms == 1 else None
+        self.decoder = FrameDecoder(terminator=b'*')
+        self.arms = arms
+        self.goals = [[float(p) for p in DEFAULT_POSITIONS] for _ in range(arms)]
+        self.presents = [[float(p) for p in DEFAULT_POSITIONS] for _ in range(arms)]
+        self.torques = [True] * arms
+        self.passivity_mode = False
+        self.bus_feedback = False
+        self.host_control = False  # Leader-follower.ino hostControl (False: 리더 -> 팔로워 미러링)
+        self._last_host_frame = 0.0
+        self.binary_replies = False
+
+        # 지연 이벤트 큐 (time, seq, callback, args)
+        self._events = []
+        self._seq = 0
+        self._rx_free_at = 0.0
+        self._tx_free_at = 0.0
+
+        # 통계
+        self.commands = 0
+        self.arm_commands = 0
+        self.bytes_rx = 0
+        self.bytes_tx = 0
+        self.feedback_sent = 0
+
+        self.running = False
+        self.thread = None
+
+    # 팔 0 (단일 팔 명령 대상)
+    @property
+    def goal(self) -> List[float]:
+        return self.goals[0]
+
+    @property
+    def present(self) -> List[float]:
+        return self.presents[0]
+
+    @property
+    def torque(self) -> bool:
+        return self.torques[0]
+
+    # ----------------------------------------------------------------------------------------------------
+    # Lifecycle
+    # ----------------------------------------------------------------------------------------------------
+
+    def start(self) -> "ArduinoEmulator":
+        """백그라운드 스레드로 실행"""
+        self.running = True
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        """에뮬레이터 종료"""
+        self.running = False
+        if self.thread:
+            self.thread.join(timeout=1.0)
+        for fd in (self._slave_fd, self.master_fd):
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+        if self.link and os.path.islink(self.link):
+            os.remove(self.link)
+
+    def run(self):
+        """메인 루프 (robot.ino의 setup() + loop())"""
+        self.running = True
+        start = time.monotonic()
+
+        # setup(): delay(2000) 동안 수신 데이터는 버퍼에 남음
+        if self.boot_delay > 0:
+            time.sleep(self.boot_delay)
+        self._write(f"{READY_BANNER}\r\n".encode('utf-8'))
+
+        last_update = start
+        next_feedback = time.monotonic()
+
+        while self.running:
+            now = time.monotonic()
+            wake = now + SERVO_UPDATE_INTERVAL
+            if self._events:
+                wake = min(wake, self._events[0][0])
+            if self.passivity_mode or self.bus_feedback:
+                wake = min(wake, next_feedback)
+            if self.receiver and self.receiver.state != FirmwareReceiver.IDLE:
+                wake = min(wake, self.receiver.deadline)
+
+            try:
+                readable, _, _ = select.select([self.master_fd], [], [], max(0.0, wake - now))
+                if readable:
+                    self._on_receive(os.read(self.master_fd, 4096))
+            except OSError:
+                break
+
+            now = time.monotonic()
+            if self.receiver:
+                for at, message in self.receiver.expire(now):
+                    self._schedule(at + self.latency, self._handle_message, message)
+            if self.host_control and now - self._last_host_frame > HOST_CONTROL_TIMEOUT:
+                self.host_control = False
+            self._update_servos(now - last_update, now - start)
+            last_update = now
+
+            while self._events and self._events[0][0] <= now:
+                _, _, callback, args = heapq.heappop(self._events)
+                callback(*args)
+
+            if (self.passivity_mode or self.bus_feedback) and now >= next_feedback:
+                if self.passivity_mode:
+                    self._report("Feedback", OP_FEEDBACK)
+                if self.bus_feedback:
+                    self._report_bus(OP_FEEDBACK)
+                self.feedback_sent += 1
+                next_feedback = max(next_feedback + FEEDBACK_INTERVAL, now)
+            elif not (self.passivity_mode or self.bus_feedback):
+                next_feedback = now
+
+    # ----------------------------------------------------------------------------------------------------
+    # Serial Link Model
+    # ----------------------------------------------------------------------------------------------------
+
+    def _schedule(self, at: float, callback, *args):
+        self._seq += 1
+        heapq.heappush(self._events, (at, self._seq, callback, args))
+
+    def _on_receive(self, data: bytes):
+        """수신 바이트를 전송 시간 + 지연 후 처리하도록 예약"""
+        self.bytes_rx += len(data)
+        now = time.monotonic()
+        start = max(now, self._rx_free_at)
+        self._rx_free_at = start + len(data) * self.byte_time
+        if self.receiver:
+            for at, message in self.receiver.feed(data, start, self.byte_time):
+                self._schedule(at + self.latency, self._handle_message, message)
+            return
+        for message in self.decoder.feed(data):
+            self._schedule(self._rx_free_at + self.latency, self._handle_message, message)
+
+    def _write(self, data: bytes):
+        """송신 바이트를 전송 시간 + 지연 후 pty에 쓰도록 예약"""
+        now = time.monotonic()
+        self._tx_free_at = max(now, self._tx_free_at) + len(data) * self.byte_time
+        if self._tx_free_at + self.latency <= now:
+            self._flush(data)
+        else:
+            self._schedule(self._tx_free_at + self.latency, self._flush, data)
+
+    def _flush(self, data: bytes):
+        try:
+            os.write(self.master_fd, data)
+            self.bytes_tx += len(data)
+        except OSError:
+            pass
+
+    # ----------------------------------------------------------------------------------------------------
+    # Firmware Behaviour
+    # ----------------------------------------------------------------------------------------------------
+
+    def _handle_message(self, message):
+        """receiveSerial() / handleCommand()"""
+        if isinstance(message, BusFrame):
+            self._handle_bus_frame(message)
+            return
+        if isinstance(message, Frame):
+            frame = message
+        else:
+            try:
+                frame = parse_ascii_command(message)
+            except ValueError:
+                return
+        self.commands += 1
+        c, n = frame.opcode, frame.values
+
+        if c == OP_MOVE:
+            self._move(0, n)
+        elif c == OP_MOVE_DELTA:
+            self._move(0, apply_delta(self.goal, n))
+        elif c == OP_TORQUE:
+            if n[0] in (0, 1):
+                self.torques[0] = n[0] == 1
+        elif c == OP_QUERY:
+            self._report("Positions", OP_QUERY)
+        elif c == OP_FEEDBACK:
+            if n[0] in (0, 1):
+                self.passivity_mode = n[0] == 1
+        elif c == OP_PROTOCOL:
+            self.binary_replies = n[0] == 1
+            self._write(f"Protocol:{int(self.binary_replies)},{CAP_DELTA}\r\n".encode('utf-8'))
+
+    def _handle_bus_frame(self, frame: BusFrame):
+        """Bus 프레임 (팔별 명령, 범위 밖 팔 번호는 무시)"""
+        self.commands += 1
+        self._last_host_frame = time.monotonic()
+        for arm, n in frame.arms:
+            if arm >= self.arms:
+                continue
+            self.arm_commands += 1
+            if frame.opcode == OP_MOVE:
+                self._set_goal(arm, n)  # Leader-follower.ino: 관절 리밋으로 constrain, 토크는 opcode 1로만 변경
+                self.host_control = True
+            elif frame.opcode == OP_RELEASE:
+                self.host_control = False
+            elif frame.opcode == OP_TORQUE and n[0] in (0, 1):
+                self.torques[arm] = n[0] == 1
+            elif frame.opcode == OP_FEEDBACK and n[0] in (0, 1):
+                self.bus_feedback = n[0] == 1
+        if frame.opcode == OP_QUERY:
+            self._report_bus(OP_QUERY)
+
+    def _move(self, arm: int, values: List[int]):
+        """moveMotor() - 목표 위치 설정 (소프트웨어 엔드스탑), 토크 ON"""
+        self._set_goal(arm, values)
+        self.torques[arm] = True
+
+    def _set_goal(self, arm: int, values: List[int]):
+        """목표 위치 설정 (소프트웨어 엔드스탑, 토크 상태 유지)"""
+        self.goals[arm][:] = [float(min(max(v, lo), hi)) for v, (lo, hi) in zip(values, POSITION_LIMITS)]
+
+    def _update_servos(self, dt: float, elapsed: float):
+        """서보 위치 적분 (토크 ON: 목표로 이동, OFF: 수동 조작 시뮬레이션)"""
+        step = self.speed_ticks * dt
+        for arm in range(self.arms):
+            goal, present = self.goals[arm], self.presents[arm]
+            if self.torques[arm]:
+                for i in range(len(goal)):
+                    diff = goal[i] - present[i]
+                    present[i] = goal[i] if abs(diff) <= step else present[i] + math.copysign(step, diff)
+            elif self.wander > 0:
+                for i, (lo, hi) in enumerate(POSITION_LIMITS):
+                    offset = self.wander * math.sin(elapsed * (0.5 + 0.1 * i) + arm)
+                    present[i] = min(max(goal[i] + offset, lo), hi)
+
+    def read_positions(self, arm: int = 0) -> List[int]:
+        """readMotorPos()"""
+        return [int(round(p)) for p in self.presents[arm]]
+
+    def _report(self, command: str, opcode: int):
+        """reportPositions()"""
+        positions = self.read_positions()
+        if self.binary_replies:
+            self._write(encode_binary(REPLY_FLAG | opcode, positions))
+        else:
+            self._write(f"{command}:{','.join(map(str, positions))}\r\n".encode('utf-8'))
+
+    def _report_bus(self, opcode: int):
+        """reportBus() - 모든 팔의 위치를 Bus 프레임 하나로 전송"""
+        positions = [(arm, self.read_positions(arm)) for arm in range(self.arms)]
+        self._write(encode_bus_frame(REPLY_FLAG | opcode, positions))
+
+# ========================================================================================================
+# Main
+# ========================================================================================================
+
+def main():
+    parser = argparse.ArgumentParser(description="robot.ino pty emulator")
+    parser.add_argument("--speed", type=int, default=MOVING_SPEED, help="AX-12A MOVING_SPEED (0: max)")
+    parser.add_argument("--baud", type=int, default=115200, help="modelled baud rate (0: unlimited)")
+    parser.add_argument("--latency", type=float, default=0.001, help="one-way latency in seconds")
+    parser.add_argument("--boot-delay", type=float, default=0.0, help="setup() delay in seconds")
+    parser.add_argument("--wander", type=float, default=0.0, help="passive joint motion amplitude (ticks)")
+    parser.add_argument("--link", default=None, help="symlink path for the pty (e.g. /tmp/ttyROBOT)")
+    parser.add_argument("--arms", type=int, default=1, help="arms on the bus (IDs arm*10 + 1..7)")
+    args = parser.parse_args()
+
+    emulator = ArduinoEmulator(args.speed, args.baud, args.latency, args.boot_delay, args.wander,
+                               args.link, args.arms)
+    print(f"[Emulator] Listening on {emulator.link or emulator.port}", flush=True)
+    try:
+        emulator.run()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        emulator.stop()
+        print(f"[Emulator] Stopped (commands: {emulator.commands}, rx: {emulator.bytes_rx} B, tx: {emulator.bytes_tx} B)")
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,241 @@
+import sys
+import time
+import struct
+import argparse
+import numpy as np
+from typing import List, Optional, Sequence, Tuple
+
+from kinematics import IKSolver
+
+# ========================================================================================================
+# Grid Settings
+# ========================================================================================================
+
+# main/main.py와 같은 테이블 크기 (cm)
+TABLE_WIDTH_CM = 60.0
+TABLE_HEIGHT_CM = 45.0
+
+GRID_FILE = 'ik_grid.bin'
+GRID_STEP = 1.0                           # 격자 간격 (cm)
+GRASP_HEIGHTS = (2.0, 5.0, 8.0, 12.0, 16.0)  # 테이블 윗면 기준 그리퍼 끝 높이 (cm)
+
+INTERPOLATION_TOLERANCE = 0.5  # 셀 중심 보간 오차 허용치 (cm)
+
+FLAG_REACHABLE = 0x01  # IK 수렴 (오차 <= tolerance)
+FLAG_CELL = 0x02       # 이 점에서 시작하는 (x, y) 셀의 보간 오차 <= INTERPOLATION_TOLERANCE
+FLAG_LAYER = 0x04      # 이 점에서 다음 높이 층까지의 셀의 보간 오차 <= INTERPOLATION_TOLERANCE
+
+# ========================================================================================================
+# IK Grid
+# ========================================================================================================
+
+class IKGrid:
+    """테이블 격자점 IK 결과 조회 테이블 (메모리 맵 파일)
+
+    파일 구조: [HEADER][heights: float32 x NZ][ticks: uint16 (NZ, NY, NX, J)][flags: uint8 (NZ, NY, NX)]
+    조회는 (x, y) 쌍선형 보간 + 높이 방향 선형 보간이며, 주변 격자점이 모두 도달 가능하고 셀 보간이
+    검증된 경우(FLAG_CELL / FLAG_LAYER)에만 reachable입니다. 이웃 격자점의 해가 다른 자세 분기에 있으면
+    관절값 보간이 엉뚱한 위치를 가리키므로, 빌드 시 셀 중심의 보간 결과를 FK로 확인합니다.
+    격자 간 관절값이 연속이 되도록 빌드 시 이웃 격자점의 해에서 시작(warm start)해 풉니다.
+    """
+
+    MAGIC = b'IKGD'
+    VERSION = 1
+    _HEADER = struct.Struct("<4sHHHHHffff")  # magic, version, nx, ny, nz, joints, x0, y0, step, tolerance
+
+    def __init__(self, heights: np.ndarray, ticks: np.ndarray, flags: np.ndarray, x0: float, y0: float,
+                 step: float, tolerance: float):
+        self.heights = np.asarray(heights, dtype=np.float64)
+        self.ticks = ticks
+        self.flags = flags
+        self.x0, self.y0, self.step = x0, y0, step
+        self.tolerance = tolerance
+        self.nz, self.ny, self.nx, self.num_joints = ticks.shape
+
+    # ----------------------------------------------------------------------------------------------------
+    # Build (Offline)
+    # ----------------------------------------------------------------------------------------------------
+
+    @classmethod
+    def build(cls, solver: Optional[IKSolver] = None, width: float = TABLE_WIDTH_CM,
+              height: float = TABLE_HEIGHT_CM, step: float = GRID_STEP,
+              heights: Sequence[float] = GRASP_HEIGHTS, verbose: bool = False) -> 'IKGrid':
+        """격자 전체 IK 풀이
+
+        각 높이에서 첫 행은 왼쪽 이웃의 해로, 이후 행은 한 행 전체를 이전 행의 해에서 시작해 일괄로 풉니다.
+        수렴하지 못한 점은 fallback 자세에서 일괄로 다시 풉니다.
+        """
+        solver = solver or IKSolver()
+        chain = solver.chain
+        xs = np.arange(0.0, width + step / 2, step)
+        ys = np.arange(0.0, height + step / 2, step)
+        joints = chain.num_joints
+        ticks = np.zeros((len(heights), len(ys), len(xs), joints), dtype=np.uint16)
+        flags = np.zeros((len(heights), len(ys), len(xs)), dtype=np.uint8)
+        seed = chain.ticks_to_angles(solver.fallback_ticks[0])
+
+        for k, z in enumerate(heights):
+            start = time.perf_counter()
+            previous = None
+            for j, y in enumerate(ys):
+                targets = np.stack([xs, np.full(len(xs), y), np.full(len(xs), z)], axis=1)
+                if previous is None:
+                    row, errors = [], []
+                    for target in targets:
+                        angles, _, error, _ = solver.solve_angles(target, seed)
+                        seed = angles[0]
+                        row.append(seed)
+                        errors.append(error[0])
+                    angles, errors = np.array(row), np.array(errors)
+                else:
+                    angles, _, errors, _ = solver.solve_angles(targets, previous)
+
+                for fallback in solver.fallback_ticks:
+                    failed = np.flatnonzero(errors > solver.tolerance)
+                    if not len(failed):
+                        break
+                    retry, _, retry_errors, _ = solver.solve_angles(targets[failed], chain.ticks_to_angles(fallback))
+                    better = retry_errors < errors[failed]
+                    angles[failed[better]] = retry[better]
+                    errors[failed[better]] = retry_errors[better]
+
+                row_ticks = np.clip(np.rint(chain.angles_to_ticks(angles)), chain.min_ticks, chain.max_ticks)
+                ticks[k, j] = row_ticks
+                flags[k, j] = np.where(errors <= solver.tolerance, FLAG_REACHABLE, 0)
+                previous = angles
+            seed = chain.ticks_to_angles(ticks[k, 0, 0].astype(np.float64))
+            if verbose:
+                print(f"z = {z:5.1f} cm: {np.mean(flags[k] & FLAG_REACHABLE) * 100:5.1f}% reachable "
+                      f"({time.perf_counter() - start:.1f} s)")
+
+        heights = np.asarray(heights, dtype=np.float64)
+        flags |= cls._interpolation_flags(chain, ticks, flags, xs, ys, heights)
+        return cls(heights, ticks, flags, 0.0, 0.0, step, solver.tolerance)
+
+    @staticmethod
+    def _interpolation_flags(chain, ticks: np.ndarray, flags: np.ndarray, xs: np.ndarray, ys: np.ndarray,
+                             heights: np.ndarray) -> np.ndarray:
+        """셀 중심에서 보간한 관절값의 FK 위치가 셀 중심과 가까운지 확인 (FLAG_CELL / FLAG_LAYER)"""
+        values = ticks.astype(np.float64)
+        reachable = (flags & FLAG_REACHABLE).astype(bool)
+        result = np.zeros_like(flags)
+        cx, cy = (xs[:-1] + xs[1:]) / 2, (ys[:-1] + ys[1:]) / 2
+
+        # (x, y) 셀: 각 높이 층에서 네 모서리 평균
+        center = (values[:, :-1, :-1] + values[:, :-1, 1:] + values[:, 1:, :-1] + values[:, 1:, 1:]) / 4
+        ok = reachable[:, :-1, :-1] & reachable[:, :-1, 1:] & reachable[:, 1:, :-1] & reachable[:, 1:, 1:]
+        target = np.stack(np.broadcast_arrays(cx[None, None, :], cy[None, :, None], heights[:, None, None]), axis=-1)
+        error = np.linalg.norm(chain.positions(center.reshape(-1, values.shape[-1])).reshape(target.shape) - target,
+                               axis=-1)
+        result[:, :-1, :-1] |= np.where(ok & (error <= INTERPOLATION_TOLERANCE), FLAG_CELL, 0).astype(np.uint8)
+
+        # 높이 방향 셀: 위/아래 층 (x, y) 셀 중심의 평균
+        if len(heights) > 1:
+            layer_center = (center[:-1] + center[1:]) / 2
+            layer_ok = ok[:-1] & ok[1:]
+            layer_target = (target[:-1] + target[1:]) / 2
+            error = np.linalg.norm(chain.positions(layer_center.reshape(-1, values.shape[-1]))
+                                   .reshape(layer_target.shape) - layer_target, axis=-1)
+            result[:-1, :-1, :-1] |= np.where(layer_ok & (error <= INTERPOLATION_TOLERANCE),
+                                              FLAG_LAYER, 0).astype(np.uint8)
+        return result
+
+    def save(self, path: str = GRID_FILE):
+        header = self._HEADER.pack(self.MAGIC, self.VERSION, self.nx, self.ny, self.nz, self.num_joints,
+                                   self.x0, self.y0, self.step, self.tolerance)
+        with open(path, 'wb') as f:
+            f.write(header)
+            f.write(self.heights.astype('<f4').tobytes())
+            f.write(np.ascontiguousarray(self.ticks, dtype='<u2').tobytes())
+            f.write(np.ascontiguousarray(self.flags, dtype=np.uint8).tobytes())
+
+    @classmethod
+    def open(cls, path: str = GRID_FILE) -> 'IKGrid':
+        """격자 파일을 메모리 맵으로 열기 (필요한 페이지만 읽음)"""
+        with open(path, 'rb') as f:
+            magic, version, nx, ny, nz, joints, x0, y0, step, tolerance = cls._HEADER.unpack(
+                f.read(cls._HEADER.size))
+        if magic != cls.MAGIC or version != cls.VERSION:
+            raise ValueError(f"Unknown IK grid file: {path}")
+
+        offset = cls._HEADER.size
+        heights = np.fromfile(path, dtype='<f4', count=nz, offset=offset)
+        offset += 4 * nz
+        ticks = np.memmap(path, dtype='<u2', mode='r', offset=offset, shape=(nz, ny, nx, joints))
+        offset += ticks.nbytes
+        flags = np.memmap(path, dtype=np.uint8, mode='r', offset=offset, shape=(nz, ny, nx))
+        # memmap 서브클래스는 슬라이스마다 부가 비용이 있으므로 같은 메모리의 ndarray 뷰로 조회
+        return cls(heights, np.asarray(ticks), np.asarray(flags), x0, y0, step, tolerance)
+
+    # ----------------------------------------------------------------------------------------------------
+    # Lookup (Runtime)
+    # ----------------------------------------------------------------------------------------------------
+
+    def _cell(self, value: float, origin: float, count: int) -> Tuple[int, float]:
+        """격자 인덱스와 셀 내부 비율 (범위 밖이면 가장자리 셀로 제한)"""
+        u = min(max((value - origin) / self.step, 0.0), count - 1.0)
+        i = min(int(u), count - 2)
+        return i, u - i
+
+    def _layer(self, z: float) -> Tuple[int, float]:
+        """높이 층 인덱스와 층 사이 비율"""
+        heights = self.heights
+        if len(heights) == 1 or z <= heights[0]:
+            return 0, 0.0
+        if z >= heights[-1]:
+            return len(heights) - 2, 1.0
+        k = int(np.searchsorted(heights, z, side='right')) - 1
+        return k, (z - heights[k]) / (heights[k + 1] - heights[k])
+
+    def lookup(self, x: float, y: float, z: float) -> Tuple[np.ndarray, bool]:
+        """테이블 좌표 (cm) -> (보간된 관절 tick (J,) float, reachable)"""
+        i, fx = self._cell(x, self.x0, self.nx)
+        j, fy = self._cell(y, self.y0, self.ny)
+        k, fz = self._layer(z)
+        k1 = min(k + 1, self.nz - 1)
+
+        corners = self.ticks[k:k1 + 1, j:j + 2, i:i + 2].astype(np.float64)  # (1|2, 2, 2, J)
+        flags = self.flags[k:k1 + 1, j:j + 2, i:i + 2]
+
+        rows = corners[:, :, 0] + fx * (corners[:, :, 1] - corners[:, :, 0])
+        planar = rows[:, 0] + fy * (rows[:, 1] - rows[:, 0])
+        ticks = planar[0] if len(planar) == 1 else planar[0] + fz * (planar[1] - planar[0])
+
+        inside = (self.x0 <= x <= self.x0 + (self.nx - 1) * self.step
+                  and self.y0 <= y <= self.y0 + (self.ny - 1) * self.step
+                  and self.heights[0] <= z <= self.heights[-1])
+        cell = flags[:, 0, 0]
+        valid = bool((flags & FLAG_REACHABLE).all() and (cell & FLAG_CELL).all())
+        if 0.0 < fz < 1.0:
+            valid = valid and bool(cell[0] & FLAG_LAYER)
+        return ticks, inside and valid
+
+    def reachable(self, x: float, y: float, z: float) -> bool:
+        return self.lookup(x, y, z)[1]
+
+    def coverage(self) -> List[float]:
+        """높이별 보간 가능한 셀 비율 (FLAG_CELL)"""
+        return [float(np.mean(self.flags[k, :-1, :-1] & FLAG_CELL > 0)) for k in range(self.nz)]
+
+# ========================================================================================================
+# Main
+# ========================================================================================================
+
+def main():
+    parser = argparse.ArgumentParser(description="Precompute the IK lookup grid over the table")
+    parser.add_argument("--output", default=GRID_FILE)
+    parser.add_argument("--step", type=float, default=GRID_STEP, help="grid spacing (cm)")
+    parser.add_argument("--heights", type=float, nargs='+', default=list(GRASP_HEIGHTS),
+                        help="grasp heights above the table (cm)")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    grid = IKGrid.build(step=args.step, heights=sorted(args.heights), verbose=True)
+    grid.save(args.output)
+    coverage = ", ".join(f"{z:g} cm {c * 100:.0f}%" for z, c in zip(grid.heights, grid.coverage()))
+    print(f"interpolable cells: {coverage}")
+    print(f"{grid.nx} x {grid.ny} x {grid.nz} points, {grid.num_joints} joints -> {args.output} "
+          f"({time.perf_counter() - start:.1f} s)")
+
+if __name__ == "__main__":
+    sys.exit(main())
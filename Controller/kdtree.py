@@ -0,0 +1,168 @@
+import heapq
+import numpy as np
+from typing import List, Optional, Tuple
+
+# ========================================================================================================
+# KD-Tree
+# ========================================================================================================
+
+class KDTree:
+    """관절 벡터 최근접 탐색용 KD-트리 (정적, NumPy)
+
+    분할 축은 노드 안에서 값의 범위가 가장 넓은 축이며, 중앙값으로 나눕니다.
+    리프는 leaf_size개 이하의 점을 연속 구간으로 가지며 리프 안의 거리는 한 번에 계산합니다.
+    points 행 순서가 곧 반환 인덱스입니다.
+    """
+
+    def __init__(self, points, leaf_size: int = 64):
+        self.points = np.atleast_2d(np.asarray(points, dtype=np.float64))
+        self.leaf_size = max(1, leaf_size)
+
+        # 노드 배열 (split_dim < 0이면 리프, [lo, hi)는 정렬된 점 구간)
+        self._split_dim: List[int] = []
+        self._split_value: List[float] = []
+        self._children: List[Tuple[int, int]] = []
+        self._range: List[Tuple[int, int]] = []
+
+        self._order = np.arange(len(self.points))
+        if len(self.points):
+            self._build(0, len(self.points))
+        self._sorted = self.points[self._order]
+
+    def __len__(self) -> int:
+        return len(self.points)
+
+    def _build(self, lo: int, hi: int) -> int:
+        node = len(self._split_dim)
+        self._split_dim.append(-1)
+        self._split_value.append(0.0)
+        self._children.append((-1, -1))
+        self._range.append((lo, hi))
+        if hi - lo <= self.leaf_size:
+            return node
+
+        indices = self._order[lo:hi]
+        values = self.points[indices]
+        dim = int(np.argmax(values.max(axis=0) - values.min(axis=0)))
+        mid = (hi - lo) // 2
+        partition = np.argpartition(values[:, dim], mid)
+        self._order[lo:hi] = indices[partition]
+
+        self._split_dim[node] = dim
+        self._split_value[node] = float(self.points[self._order[lo + mid], dim])
+        left = self._build(lo, lo + mid)
+        right = self._build(lo + mid, hi)
+        self._children[node] = (left, right)
+        return node
+
+    def query(self, point, k: int = 1) -> Tuple[np.ndarray, np.ndarray]:
+        """가장 가까운 k개 점 -> (거리 (k,), 인덱스 (k,)), 가까운 순 (점이 k개보다 적으면 전부)"""
+        point = np.asarray(point, dtype=np.float64)
+        k = min(k, len(self.points))
+        best: List[Tuple[float, int]] = []  # (-거리², 인덱스) 최대 힙
+        if k <= 0:
+            return np.zeros(0), np.zeros(0, dtype=np.int64)
+
+        # 분할면까지의 축별 거리로 하한을 누적 (Arya & Mount 증분 거리)
+        coords = point.tolist()
+        stack = [(0, 0.0, [0.0] * len(coords))]  # (노드, 노드 영역까지의 거리² 하한, 축별 거리)
+        while stack:
+            node, bound, offsets = stack.pop()
+            if len(best) == k and bound >= -best[0][0]:
+                continue
+            dim = self._split_dim[node]
+            if dim < 0:
+                lo, hi = self._range[node]
+                diff = self._sorted[lo:hi] - point
+                distances = np.einsum('ij,ij->i', diff, diff)
+                if k == 1:
+                    candidates = (int(np.argmin(distances)),)
+                else:
+                    candidates = np.argsort(distances)[:k]
+                for j in candidates:
+                    d2 = float(distances[j])
+                    if len(best) < k:
+                        heapq.heappush(best, (-d2, int(self._order[lo + j])))
+                    elif d2 < -best[0][0]:
+                        heapq.heapreplace(best, (-d2, int(self._order[lo + j])))
+                    else:
+                        break
+                continue
+            delta = coords[dim] - self._split_value[node]
+            left, right = self._children[node]
+            near, far = (left, right) if delta < 0.0 else (right, left)
+            far_offsets = offsets.copy()
+            far_offsets[dim] = delta * delta
+            stack.append((far, bound - offsets[dim] + delta * delta, far_offsets))
+            stack.append((near, bound, offsets))
+
+        best.sort(reverse=True)
+        distances = np.sqrt([-d2 for d2, _ in best])
+        return distances, np.array([i for _, i in best], dtype=np.int64)
+
+    def nearest(self, point) -> Tuple[float, int]:
+        """가장 가까운 점 -> (거리, 인덱스)"""
+        distances, indices = self.query(point, 1)
+        return float(distances[0]), int(indices[0])
+
+# ========================================================================================================
+# Incremental KD-Tree
+# ========================================================================================================
+
+class IncrementalKDTree:
+    """점을 계속 추가하며 최근접 탐색 (RRT 트리 성장 등)
+
+    정적 KDTree와 아직 트리에 넣지 않은 최근 점 버퍼로 나누어, 버퍼는 전수 비교하고 버퍼가 트리의
+    rebuild_ratio배를 넘으면 전체를 다시 빌드합니다. (추가 비용은 분할 상환 O(log n))
+    수백 개 이하에서는 NumPy 전수 비교가 트리 탐색보다 빠르므로 min_rebuild개부터 트리를 만듭니다.
+    점은 미리 할당한 배열에 저장되며 용량이 차면 두 배로 늘립니다.
+    """
+
+    def __init__(self, dims: int, capacity: int = 1024, leaf_size: int = 64, min_rebuild: int = 256,
+                 rebuild_ratio: float = 0.5):
+        self.dims = dims
+        self.leaf_size = leaf_size
+        self.min_rebuild = min_rebuild
+        self.rebuild_ratio = rebuild_ratio
+        self._points = np.empty((max(1, capacity), dims))
+        self._count = 0
+        self._tree: Optional[KDTree] = None
+        self._indexed = 0  # 트리에 들어간 점 수 (앞에서부터)
+        self.rebuilds = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    @property
+    def points(self) -> np.ndarray:
+        return self._points[:self._count]
+
+    def add(self, point) -> int:
+        """점 추가 -> 인덱스"""
+        if self._count == len(self._points):
+            grown = np.empty((2 * len(self._points), self.dims))
+            grown[:self._count] = self._points[:self._count]
+            self._points = grown
+        self._points[self._count] = point
+        self._count += 1
+        pending = self._count - self._indexed
+        if pending >= max(self.min_rebuild, self.rebuild_ratio * self._indexed):
+            self._tree = KDTree(self._points[:self._count].copy(), self.leaf_size)
+            self._indexed = self._count
+            self.rebuilds += 1
+        return self._count - 1
+
+    def nearest(self, point) -> Tuple[float, int]:
+        """가장 가까운 점 -> (거리, 인덱스), 비어 있으면 (inf, -1)"""
+        point = np.asarray(point, dtype=np.float64)
+        best_distance, best_index = np.inf, -1
+        if self._tree is not None:
+            best_distance, best_index = self._tree.nearest(point)
+        if self._count > self._indexed:
+            diff = self._points[self._indexed:self._count] - point
+            distances = np.einsum('ij,ij->i', diff, diff)
+            j = int(np.argmin(distances))
+            distance = float(np.sqrt(distances[j]))
+            if distance < best_distance:
+                best_distance, best_index = distance, self._indexed + j
+        return best_distance, best_index
@@ -0,0 +1,272 @@
+import math
+import numpy as np
+from dataclasses import dataclass
+from typing import List, Optional
+
+# ========================================================================================================
+# Arm Description
+# ========================================================================================================
+
+# AX-12A: 0 ~ 1023 ticks = 0 ~ 300°
+TICKS_PER_RADIAN = 1023.0 / math.radians(300.0)
+
+@dataclass
+class JointSpec:
+    """관절 1개의 DH 파라미터 (표준 DH: Rz(θ) · Tz(d) · Tx(a) · Rx(α), 길이 단위 cm)
+
+    θ = direction * (tick - zero_tick) / TICKS_PER_RADIAN + theta_offset
+    """
+    name: str
+    a: float
+    alpha: float
+    d: float
+    theta_offset: float = 0.0
+    direction: int = 1
+    zero_tick: int = 512
+    min_tick: int = 0      # MotorConfig와 같은 소프트웨어 엔드스탑
+    max_tick: int = 1023
+
+# M1 ~ M6 기구 체인 (M7 Hand는 그리퍼 개폐로 체인에 포함하지 않음)
+# Base 요, Shoulder 피치, Upper_Arm 롤, Elbow 피치, forearm 롤, Wrist 피치 배치이며, 모든 관절이 512 tick일 때
+# 팔이 수직으로 선 자세입니다. 링크 길이는 공칭값이므로 조립한 팔에 맞게 측정값으로 바꿔 사용합니다.
+ARM_JOINTS = [
+    JointSpec("Base", a=0.0, alpha=-math.pi / 2, d=9.5, min_tick=0, max_tick=1023),
+    JointSpec("Shoulder", a=0.0, alpha=math.pi / 2, d=0.0, min_tick=180, max_tick=845),
+    JointSpec("Upper_Arm", a=0.0, alpha=-math.pi / 2, d=12.0, min_tick=165, max_tick=1023),
+    JointSpec("Elbow", a=0.0, alpha=math.pi / 2, d=0.0, min_tick=512, max_tick=1023),
+    JointSpec("forearm", a=0.0, alpha=-math.pi / 2, d=12.0, min_tick=512, max_tick=1023),
+    JointSpec("Wrist", a=0.0, alpha=math.pi / 2, d=0.0, min_tick=0, max_tick=1023),
+]
+HAND_LENGTH = 10.0  # Wrist 축 ~ 그리퍼 끝 (cm)
+
+# 로봇 베이스 위치 (테이블 좌표계, cm): main.py의 테이블 좌표 (x: 0 ~ 60, y: 0 ~ 45) + 테이블 윗면 기준 높이 z
+# 베이스는 테이블 가까운 변의 중앙 바로 바깥에 있고, 로봇 정면(+x)이 테이블 +y 방향을 향합니다.
+BASE_POSITION = (30.0, -8.0, 0.0)
+BASE_YAW = math.pi / 2
+
+# ========================================================================================================
+# Homogeneous Transforms
+# ========================================================================================================
+
+def translation(x: float, y: float, z: float) -> np.ndarray:
+    transform = np.eye(4)
+    transform[:3, 3] = (x, y, z)
+    return transform
+
+def rotation_z(theta: float) -> np.ndarray:
+    c, s = math.cos(theta), math.sin(theta)
+    transform = np.eye(4)
+    transform[:2, :2] = ((c, -s), (s, c))
+    return transform
+
+def rotation_x(alpha: float) -> np.ndarray:
+    c, s = math.cos(alpha), math.sin(alpha)
+    transform = np.eye(4)
+    transform[1:3, 1:3] = ((c, -s), (s, c))
+    return transform
+
+def dh_transform(a: float, alpha: float, d: float, theta: float = 0.0) -> np.ndarray:
+    """표준 DH 변환 Rz(θ) · Tz(d) · Tx(a) · Rx(α)"""
+    return rotation_z(theta) @ translation(a, 0.0, d) @ rotation_x(alpha)
+
+# ========================================================================================================
+# Kinematic Chain
+# ========================================================================================================
+
+class KinematicChain:
+    """벡터화된 정기구학 (FK)
+
+    관절마다 θ와 무관한 부분 Tz(d) · Tx(a) · Rx(α)를 생성 시 한 번 계산해 두고, 평가 시에는 Rz(θ)를
+    곱하는 대신 고정 변환의 앞 두 행만 cos/sin으로 섞습니다. 관절 배열은 (J,) 또는 (N, J)이며
+    N개 자세를 한 번에 계산합니다. 관절 수보다 열이 많으면 (예: Hand 포함 7개 tick) 앞 J개만 사용합니다.
+    """
+
+    def __init__(self, joints: List[JointSpec] = None, base: Optional[np.ndarray] = None,
+                 tool: Optional[np.ndarray] = None):
+        self.joints = list(joints or ARM_JOINTS)
+        self.num_joints = len(self.joints)
+        if base is None:
+            base = translation(*BASE_POSITION) @ rotation_z(BASE_YAW)
+        if tool is None:
+            tool = translation(0.0, 0.0, HAND_LENGTH)
+        self.base = np.asarray(base, dtype=np.float64)
+        self.tool = np.asarray(tool, dtype=np.float64)
+
+        # 관절별 고정 변환 캐시 (J, 4, 4)
+        self._fixed = np.stack([translation(j.a, 0.0, j.d) @ rotation_x(j.alpha) for j in self.joints])
+        self._offset = np.array([j.theta_offset for j in self.joints])
+        self._direction = np.array([j.direction for j in self.joints], dtype=np.float64)
+        self._zero = np.array([j.zero_tick for j in self.joints], dtype=np.float64)
+        self.min_ticks = np.array([j.min_tick for j in self.joints], dtype=np.float64)
+        self.max_ticks = np.array([j.max_tick for j in self.joints], dtype=np.float64)
+
+    # ----------------------------------------------------------------------------------------------------
+    # Tick <-> Angle
+    # ----------------------------------------------------------------------------------------------------
+
+    def ticks_to_angles(self, ticks) -> np.ndarray:
+        """AX-12A tick -> DH 관절각 (rad)"""
+        ticks = np.asarray(ticks, dtype=np.float64)[..., :self.num_joints]
+        return self._direction * (ticks - self._zero) / TICKS_PER_RADIAN + self._offset
+
+    def angles_to_ticks(self, angles) -> np.ndarray:
+        """DH 관절각 (rad) -> AX-12A tick (실수, 반올림/제한 없음)"""
+        angles = np.asarray(angles, dtype=np.float64)
+        return (angles - self._offset) * TICKS_PER_RADIAN * self._direction + self._zero
+
+    def angle_limits(self):
+        """tick 제한에 대응하는 관절각 범위 (lower, upper)"""
+        a, b = self.ticks_to_angles(self.min_ticks), self.ticks_to_angles(self.max_ticks)
+        return np.minimum(a, b), np.maximum(a, b)
+
+    # ----------------------------------------------------------------------------------------------------
+    # Forward Kinematics
+    # ----------------------------------------------------------------------------------------------------
+
+    def forward(self, angles, frames: bool = False) -> np.ndarray:
+        """관절각 -> 툴(그리퍼 끝) 자세 (4, 4) / (N, 4, 4)
+
+        frames=True: 베이스, 각 관절 좌표계, 툴을 모두 반환 (..., J + 2, 4, 4)
+        (frames[..., i, :3, 2]는 관절 i + 1의 회전축, frames[..., i, :3, 3]은 그 원점)
+        """
+        angles = np.asarray(angles, dtype=np.float64)
+        single = angles.ndim == 1
+        angles = np.atleast_2d(angles)[:, :self.num_joints]
+        count = len(angles)
+        c, s = np.cos(angles), np.sin(angles)
+
+        transform = np.broadcast_to(self.base, (count, 4, 4))
+        chain = [transform] if frames else None
+        link = np.empty((count, 4, 4))
+        for i, fixed in enumerate(self._fixed):
+            # Rz(θ) @ fixed: 0/1행만 회전, 2/3행은 그대로
+            ci, si = c[:, i, None], s[:, i, None]
+            link[:, 0] = ci * fixed[0] - si * fixed[1]
+            link[:, 1] = si * fixed[0] + ci * fixed[1]
+            link[:, 2] = fixed[2]
+            link[:, 3] = fixed[3]
+            transform = transform @ link
+            if frames:
+                chain.append(transform)
+        transform = transform @ self.tool
+
+        if frames:
+            chain.append(transform)
+            result = np.stack(chain, axis=1)
+        else:
+            result = transform
+        return result[0] if single else result
+
+    def forward_ticks(self, ticks, frames: bool = False) -> np.ndarray:
+        """AX-12A tick -> 툴 자세 (forward와 같은 형태)"""
+        return self.forward(self.ticks_to_angles(ticks), frames)
+
+    def positions(self, ticks) -> np.ndarray:
+        """AX-12A tick -> 그리퍼 끝 위치 (3,) / (N, 3) (테이블 좌표계, cm)"""
+        return self.forward_ticks(ticks)[..., :3, 3]
+
+    # ----------------------------------------------------------------------------------------------------
+    # Workspace
+    # ----------------------------------------------------------------------------------------------------
+
+    def sample_ticks(self, count: int, rng: Optional[np.random.Generator] = None) -> np.ndarray:
+        """tick 제한 안에서 균일하게 뽑은 관절 자세 (count, J)"""
+        rng = rng or np.random.default_rng()
+        return rng.uniform(self.min_ticks, self.max_ticks, size=(count, self.num_joints))
+
+    def workspace(self, count: int = 100000, rng: Optional[np.random.Generator] = None) -> np.ndarray:
+        """작업 공간 샘플 (count, 3) - 도달 가능 영역 분석용"""
+        return self.positions(self.sample_ticks(count, rng))
+
+# ========================================================================================================
+# Inverse Kinematics
+# ========================================================================================================
+
+@dataclass
+class IKResult:
+    """역기구학 결과 (ticks는 seed와 같은 길이, 체인에 없는 관절은 seed 값 유지)"""
+    ticks: np.ndarray
+    position: np.ndarray
+    error: float
+    iterations: int
+    converged: bool
+
+class IKSolver:
+    """감쇠 최소제곱 (Damped Least Squares) 위치 역기구학
+
+    dq = Jᵀ (J Jᵀ + λ² I)⁻¹ e 를 반복하며, 매 반복 관절각을 tick 제한 범위로 투영합니다.
+    야코비안은 FK의 관절 좌표계에서 한 번에 계산합니다. (J[:, i] = zᵢ × (p - oᵢ))
+    현재 자세에서 시작(warm start)하므로 검출 프레임마다 목표가 조금씩 움직이는 경우 수 회 반복으로 수렴합니다.
+    fallback 자세들도 같은 배치로 함께 풀어, warm start가 수렴하지 못해도 반복 횟수가 늘지 않습니다.
+    """
+
+    def __init__(self, chain: Optional[KinematicChain] = None, damping: float = 0.5, tolerance: float = 0.1,
+                 max_iterations: int = 50, max_step: float = 0.3, fallback_ticks=None):
+        self.chain = chain or KinematicChain()
+        self.damping = damping            # λ (cm)
+        self.tolerance = tolerance        # 위치 오차 허용치 (cm)
+        self.max_iterations = max_iterations
+        self.max_step = max_step          # 반복당 관절 최대 변화량 (rad)
+        self.lower, self.upper = self.chain.angle_limits()
+        if fallback_ticks is None:
+            fallback_ticks = [[512, 512, 380, 800, 700, 512], [512, 600, 512, 800, 512, 700]]
+        self.fallback_ticks = np.atleast_2d(np.asarray(fallback_ticks, dtype=np.float64))
+
+    def jacobian(self, frames: np.ndarray) -> np.ndarray:
+        """FK 좌표계 (N, J + 2, 4, 4) -> 위치 야코비안 (N, 3, J) (cm/rad)"""
+        joints = self.chain.num_joints
+        tip = frames[:, -1, :3, 3]
+        axes = frames[:, :joints, :3, 2]
+        origins = frames[:, :joints, :3, 3]
+        return np.cross(axes, tip[:, None, :] - origins).transpose(0, 2, 1)
+
+    def solve_angles(self, targets, seeds, stop_on_any: bool = False):
+        """일괄 풀이: targets (N, 3), seeds (N, J) 관절각 -> (angles, positions, errors, iterations)
+
+        stop_on_any=True: 한 행이라도 수렴하면 종료 (같은 목표를 여러 seed로 푸는 경우)
+        """
+        targets = np.atleast_2d(np.asarray(targets, dtype=np.float64))
+        angles = np.clip(np.atleast_2d(np.asarray(seeds, dtype=np.float64)).copy(), self.lower, self.upper)
+        angles = np.broadcast_to(angles, (len(targets), self.chain.num_joints)).copy()
+        damping = np.eye(3) * self.damping ** 2
+        iterations = np.zeros(len(targets), dtype=np.int64)
+
+        for _ in range(self.max_iterations):
+            frames = self.chain.forward(angles, frames=True)
+            error = targets - frames[:, -1, :3, 3]
+            active = np.einsum('ij,ij->i', error, error) > self.tolerance ** 2
+            if not active.any() or (stop_on_any and not active.all()):
+                break
+            jacobian = self.jacobian(frames)
+            system = jacobian @ jacobian.transpose(0, 2, 1) + damping
+            step = (jacobian.transpose(0, 2, 1) @ np.linalg.solve(system, error[:, :, None]))[:, :, 0]
+            scale = np.minimum(1.0, self.max_step / np.maximum(np.abs(step).max(axis=1), 1e-12))
+            angles += step * (scale * active)[:, None]
+            np.clip(angles, self.lower, self.upper, out=angles)
+            iterations += active
+
+        positions = self.chain.forward(angles)[:, :3, 3]
+        return angles, positions, np.linalg.norm(targets - positions, axis=1), iterations
+
+    def solve(self, target, seed_ticks) -> IKResult:
+        """테이블 좌표 (x, y, z) cm -> AX-12A tick (tick 제한 안, 정수)
+
+        seed_ticks: 현재 자세 (MotorController.target_positions 등, Hand 포함 7개 가능)
+        """
+        seed_ticks = np.asarray(seed_ticks, dtype=np.float64)
+        target = np.asarray(target, dtype=np.float64)
+        joints = self.chain.num_joints
+        seeds = self.chain.ticks_to_angles(np.vstack([seed_ticks[:joints], self.fallback_ticks]))
+        targets = np.broadcast_to(target, (len(seeds), 3))
+
+        # 수렴한 행 중 warm start 우선, 없으면 오차가 가장 작은 행
+        angles, _, errors, iterations = self.solve_angles(targets, seeds, stop_on_any=True)
+        converged = errors <= self.tolerance
+        best = int(np.argmax(converged)) if converged.any() else int(np.argmin(errors))
+
+        ticks = seed_ticks.copy()
+        chain_ticks = np.rint(self.chain.angles_to_ticks(angles[best]))
+        ticks[:joints] = np.clip(chain_ticks, self.chain.min_ticks, self.chain.max_ticks)
+        position = self.chain.positions(ticks)
+        error = float(np.linalg.norm(target - position))
+        return IKResult(ticks.astype(np.int64), position, error, int(iterations.max()), bool(converged[best]))
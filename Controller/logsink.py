@@ -0,0 +1,131 @@
+import sys
+import time
+import threading
+from collections import deque, namedtuple
+from queue import SimpleQueue, Empty
+from typing import Dict, List, Optional
+
+# ========================================================================================================
+# Log Levels
+# ========================================================================================================
+
+DEBUG = 10
+INFO = 20
+WARNING = 30
+ERROR = 40
+
+LEVEL_NAMES = {DEBUG: "DEBUG", INFO: "INFO", WARNING: "WARN", ERROR: "ERROR"}
+
+# 레벨별 기본 태그 색상 (auto.py의 Colors와 동일한 ANSI 코드)
+LEVEL_COLORS = {DEBUG: '\033[90m', INFO: '\033[96m', WARNING: '\033[93m', ERROR: '\033[91m'}
+COLOR_END = '\033[0m'
+
+LogRecord = namedtuple("LogRecord", ["timestamp", "level", "category", "message"])
+
+# ========================================================================================================
+# Log Sink
+# ========================================================================================================
+
+class LogSink:
+    """레벨/카테고리 기반 비동기 로거
+
+    호출 측(UI 루프, 시리얼 스레드)은 레벨 확인 후 큐에 넣기만 하고, 문자열 포맷팅,
+    카테고리별 출력 빈도 제한, 콘솔 출력, 링 버퍼 저장은 백그라운드 스레드에서 처리합니다.
+    기존 콘솔 출력 형식 "[Category] message"를 그대로 유지합니다.
+    """
+
+    def __init__(self, level: int = INFO, rate_limits: Optional[Dict[str, float]] = None,
+                 ring_size: int = 200, stream=None):
+        self.level = level
+        self.rate_limits = dict(rate_limits or {})  # category -> 최소 출력 간격 (초)
+        self.stream = stream or sys.stdout
+        self.ring = deque(maxlen=ring_size)
+
+        self._queue = SimpleQueue()
+        self._last_emit: Dict[str, float] = {}
+        self._suppressed: Dict[str, int] = {}
+        self.suppressed_total = 0
+
+        self.running = True
+        self.thread = threading.Thread(target=self._sink_loop, daemon=True)
+        self.thread.start()
+
+    # ----------------------------------------------------------------------------------------------------
+    # Hot Path
+    # ----------------------------------------------------------------------------------------------------
+
+    def log(self, level: int, category: str, message: str, *args, color: Optional[str] = None):
+        """로그 등록 (message % args 포맷팅은 싱크 스레드에서 수행)"""
+        if level < self.level:
+            return
+        self._queue.put((time.monotonic(), level, category, message, args, color))
+
+    def debug(self, category: str, message: str, *args, color: Optional[str] = None):
+        self.log(DEBUG, category, message, *args, color=color)
+
+    def info(self, category: str, message: str, *args, color: Optional[str] = None):
+        self.log(INFO, category, message, *args, color=color)
+
+    def warning(self, category: str, message: str, *args, color: Optional[str] = None):
+        self.log(WARNING, category, message, *args, color=color)
+
+    def error(self, category: str, message: str, *args, color: Optional[str] = None):
+        self.log(ERROR, category, message, *args, color=color)
+
+    # ----------------------------------------------------------------------------------------------------
+    # Sink Thread
+    # ----------------------------------------------------------------------------------------------------
+
+    def _sink_loop(self):
+        """출력 루프 (백그라운드 스레드)"""
+        while self.running or not self._queue.empty():
+            try:
+                item = self._queue.get(timeout=0.1)
+            except Empty:
+                continue
+            if item is None:
+                continue
+            self._emit(*item)
+
+    def _emit(self, timestamp, level, category, message, args, color):
+        # 카테고리별 출력 빈도 제한 (ERROR는 제한하지 않음)
+        interval = self.rate_limits.get(category)
+        if interval and level < ERROR:
+            if timestamp - self._last_emit.get(category, float('-inf')) < interval:
+                self._suppressed[category] = self._suppressed.get(category, 0) + 1
+                self.suppressed_total += 1
+                return
+            self._last_emit[category] = timestamp
+
+        try:
+            text = message % args if args else message
+        except (TypeError, ValueError):
+            text = f"{message} {args}"
+
+        suppressed = self._suppressed.pop(category, 0)
+        if suppressed:
+            text = f"{text} (+{suppressed} suppressed)"
+
+        self.ring.append(LogRecord(timestamp, level, category, text))
+
+        tag_color = color or LEVEL_COLORS.get(level, '')
+        try:
+            self.stream.write(f"{tag_color}[{category}]{COLOR_END} {text}\n")
+            self.stream.flush()
+        except Exception:
+            pass
+
+    # ----------------------------------------------------------------------------------------------------
+    # Reporting
+    # ----------------------------------------------------------------------------------------------------
+
+    def recent(self, count: int = 10, min_level: int = DEBUG) -> List[LogRecord]:
+        """링 버퍼의 최근 로그 (대시보드 표시용)"""
+        records = [r for r in list(self.ring) if r.level >= min_level]
+        return records[-count:]
+
+    def close(self, timeout: float = 1.0):
+        """남은 로그를 모두 출력하고 종료"""
+        self.running = False
+        self._queue.put(None)
+        self.thread.join(timeout=timeout)
@@ -0,0 +1,274 @@
+import math
+import time
+import numpy as np
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+from collision import CollisionChecker
+from kdtree import IncrementalKDTree
+
+# ========================================================================================================
+# Plan Result
+# ========================================================================================================
+
+@dataclass
+class PlanResult:
+    """계획된 경로 (waypoints[0] = 출발, waypoints[-1] = 목표, 경유점 사이는 충돌 없는 직선)"""
+    waypoints: np.ndarray  # (K, 입력 tick 수), Hand 등 체인 밖 관절은 경로 길이에 비례해 보간
+    planning_time: float   # s
+    iterations: int        # RRT 반복 수 (직선 경로 / 캐시는 0)
+    nodes: int             # 두 트리의 노드 수
+    raw_waypoints: int     # 단축 전 경유점 수
+    direct: bool = False   # 직선 경로가 충돌 없음
+    cached: bool = False   # 캐시된 경로 재사용
+
+    @property
+    def length(self) -> float:
+        """관절 공간 경로 길이 (ticks)"""
+        return float(np.linalg.norm(np.diff(self.waypoints, axis=0), axis=1).sum())
+
+# ========================================================================================================
+# Motion Planner
+# ========================================================================================================
+
+class MotionPlanner:
+    """관절 공간 RRT-Connect 경로 계획 (CollisionChecker 캡슐 모델 기준)
+
+    - 두 트리(출발/목표)를 번갈아 확장하고, 확장한 점을 향해 다른 트리를 충돌 직전까지 한 번에 잇습니다.
+    - 최근접 노드는 IncrementalKDTree로 찾습니다.
+    - 선분 검사는 resolution tick 간격 샘플을 CollisionChecker로 일괄 검사합니다.
+    - 결과는 greedy + 무작위 단축(shortcut)으로 경유점을 줄인 뒤 반환하고, (출발, 목표) 쌍별로 캐시합니다.
+    """
+
+    def __init__(self, checker: Optional[CollisionChecker] = None, step: float = 120.0, resolution: float = 8.0,
+                 max_iterations: int = 2000, time_limit: float = 0.1, shortcut_iterations: int = 40,
+                 cache_size: int = 32, cache_resolution: float = 4.0, rng: Optional[np.random.Generator] = None):
+        self.checker = checker or CollisionChecker()
+        self.chain = self.checker.chain
+        self.joints = self.chain.num_joints
+        self.step = step                        # 확장 1회 최대 이동 (ticks, 유클리드)
+        self.resolution = resolution            # 선분 검사 간격 (ticks, 관절별 최대)
+        self.max_iterations = max_iterations
+        self.time_limit = time_limit            # 계획 시간 제한 (s, 단축 포함)
+        self.shortcut_iterations = shortcut_iterations
+        self.cache_size = cache_size
+        self.cache_resolution = cache_resolution  # 캐시 키 양자화 (ticks)
+        self.rng = rng or np.random.default_rng()
+
+        self._cache: OrderedDict = OrderedDict()
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    # ----------------------------------------------------------------------------------------------------
+    # Collision Queries
+    # ----------------------------------------------------------------------------------------------------
+
+    def _samples(self, a: np.ndarray, b: np.ndarray) -> np.ndarray:
+        """a -> b 선분 샘플 (a 제외, b 포함) (n, J)"""
+        count = max(1, math.ceil(float(np.abs(b - a).max()) / self.resolution))
+        fractions = np.arange(1, count + 1, dtype=np.float64) / count
+        return a + fractions[:, None] * (b - a)
+
+    def valid(self, ticks) -> bool:
+        return not self.checker.collides(np.asarray(ticks, dtype=np.float64)[:self.joints])[0]
+
+    def segment_free(self, a: np.ndarray, b: np.ndarray) -> bool:
+        return not self.checker.collides(self._samples(a, b)).any()
+
+    def _advance(self, a: np.ndarray, b: np.ndarray) -> Tuple[np.ndarray, bool]:
+        """a -> b 직선을 따라 충돌 직전 샘플까지 이동 -> (도달 지점, b 도달 여부)"""
+        samples = self._samples(a, b)
+        hits = self.checker.collides(samples)
+        if not hits.any():
+            return b, True
+        first = int(np.argmax(hits))
+        return (samples[first - 1] if first > 0 else a), False
+
+    def path_free(self, waypoints: np.ndarray) -> bool:
+        """경로 전체를 한 번에 검사"""
+        waypoints = np.asarray(waypoints, dtype=np.float64)[:, :self.joints]
+        samples = [waypoints[:1]] + [self._samples(a, b) for a, b in zip(waypoints[:-1], waypoints[1:])]
+        return not self.checker.collides(np.concatenate(samples)).any()
+
+    # ----------------------------------------------------------------------------------------------------
+    # Planning
+    # ----------------------------------------------------------------------------------------------------
+
+    def plan(self, start, goal) -> Optional[PlanResult]:
+        """start -> goal 충돌 없는 경로 (실패 시 None)
+
+        start / goal: tick 배열 (Hand 포함 7개 가능, 체인 관절만 계획)
+        """
+        started = time.perf_counter()
+        start = np.asarray(start, dtype=np.float64)
+        goal = np.asarray(goal, dtype=np.float64)
+        q_start, q_goal = start[:self.joints], goal[:self.joints]
+        if not self.valid(q_start) or not self.valid(q_goal):
+            return None
+
+        if self.segment_free(q_start, q_goal):
+            path = np.stack([q_start, q_goal])
+            return self._result(path, start, goal, started, 0, 2, 2, direct=True)
+
+        cached = self._cache_lookup(q_start, q_goal)
+        if cached is not None:
+            return self._result(cached, start, goal, started, 0, 0, len(cached), cached=True)
+
+        deadline = started + self.time_limit
+        path, iterations, nodes = self._rrt_connect(q_start, q_goal, deadline)
+        if path is None:
+            return None
+        raw = len(path)
+        path = self.shortcut(path, deadline)
+        self._cache_store(q_start, q_goal, path)
+        return self._result(path, start, goal, started, iterations, nodes, raw)
+
+    def _result(self, path: np.ndarray, start: np.ndarray, goal: np.ndarray, started: float, iterations: int,
+                nodes: int, raw: int, direct: bool = False, cached: bool = False) -> PlanResult:
+        """체인 경로에 체인 밖 관절(Hand)을 경로 길이 비율로 보간해 붙이기"""
+        waypoints = np.empty((len(path), len(start)))
+        waypoints[:, :self.joints] = path
+        if len(start) > self.joints:
+            lengths = np.concatenate([[0.0], np.cumsum(np.linalg.norm(np.diff(path, axis=0), axis=1))])
+            fractions = lengths / lengths[-1] if lengths[-1] > 0 else np.linspace(0.0, 1.0, len(path))
+            extra_start, extra_goal = start[self.joints:], goal[self.joints:]
+            waypoints[:, self.joints:] = extra_start + fractions[:, None] * (extra_goal - extra_start)
+        return PlanResult(waypoints, time.perf_counter() - started, iterations, nodes, raw, direct, cached)
+
+    def _rrt_connect(self, q_start: np.ndarray, q_goal: np.ndarray, deadline: float):
+        """RRT-Connect -> (경유점 (K, J) 또는 None, 반복 수, 노드 수)"""
+        trees = [(IncrementalKDTree(self.joints, 256), [-1]), (IncrementalKDTree(self.joints, 256), [-1])]
+        trees[0][0].add(q_start)
+        trees[1][0].add(q_goal)
+        lower, upper = self.chain.min_ticks, self.chain.max_ticks
+
+        for iteration in range(1, self.max_iterations + 1):
+            if time.perf_counter() > deadline:
+                break
+            (tree, parents), (other, other_parents) = trees
+
+            # 확장: 무작위 샘플 쪽으로 최대 step
+            sample = self.rng.uniform(lower, upper)
+            distance, near = tree.nearest(sample)
+            q_near = tree.points[near]
+            if distance > self.step:
+                sample = q_near + (sample - q_near) * (self.step / distance)
+            q_new, _ = self._advance(q_near, sample)
+            if np.array_equal(q_new, q_near):
+                trees.reverse()
+                continue
+            new = tree.add(q_new)
+            parents.append(near)
+
+            # 연결: 다른 트리에서 q_new까지 충돌 직전까지 한 번에
+            _, other_near = other.nearest(q_new)
+            q_reached, connected = self._advance(other.points[other_near], q_new)
+            if connected:
+                path = self._trace(tree, parents, new)[::-1] + self._trace(other, other_parents, other_near)
+                path = np.array(path)
+                if not np.array_equal(path[0], q_start):
+                    path = path[::-1]
+                return path, iteration, len(tree) + len(other)
+            if not np.array_equal(q_reached, other.points[other_near]):
+                other.add(q_reached)
+                other_parents.append(other_near)
+            trees.reverse()
+        return None, self.max_iterations, len(trees[0][0]) + len(trees[1][0])
+
+    @staticmethod
+    def _trace(tree: IncrementalKDTree, parents: List[int], node: int) -> List[np.ndarray]:
+        """node -> 루트 경로"""
+        path = []
+        while node >= 0:
+            path.append(tree.points[node].copy())
+            node = parents[node]
+        return path
+
+    # ----------------------------------------------------------------------------------------------------
+    # Shortcut
+    # ----------------------------------------------------------------------------------------------------
+
+    def shortcut(self, path: np.ndarray, deadline: Optional[float] = None) -> np.ndarray:
+        """경유점 단축
+
+        1. greedy: 각 경유점에서 직선으로 이을 수 있는 가장 먼 경유점으로 건너뜀
+        2. 무작위: 경로 위 임의의 두 점(경유점 사이 포함)을 직선으로 이을 수 있으면 교체 (경로 길이 단축)
+        3. greedy를 다시 적용해 무작위 단축이 남긴 경유점 정리
+        """
+        path = self._greedy_shortcut(np.asarray(path, dtype=np.float64))
+        if len(path) < 3:
+            return path
+
+        for _ in range(self.shortcut_iterations):
+            if len(path) < 3 or (deadline is not None and time.perf_counter() > deadline):
+                break
+            lengths = np.concatenate([[0.0], np.cumsum(np.linalg.norm(np.diff(path, axis=0), axis=1))])
+            u, v = np.sort(self.rng.uniform(0.0, lengths[-1], 2))
+            i, j = np.minimum(np.searchsorted(lengths, (u, v), side='right') - 1, len(path) - 2)
+            if i == j:
+                continue
+            a = self._point_at(path, lengths, i, u)
+            b = self._point_at(path, lengths, j, v)
+            # 잘린 구간도 샘플 위치가 바뀌므로 함께 다시 검사
+            if self.path_free(np.stack([path[i], a, b, path[j + 1]])):
+                path = np.concatenate([path[:i + 1], [a, b], path[j + 1:]])
+                # 길이 0 구간 제거
+                keep = np.concatenate([[True], np.abs(np.diff(path, axis=0)).max(axis=1) > 1e-6])
+                path = path[keep]
+        return self._greedy_shortcut(path)
+
+    def _greedy_shortcut(self, path: np.ndarray) -> np.ndarray:
+        reduced = [path[0]]
+        i = 0
+        while i < len(path) - 1:
+            j = len(path) - 1
+            while j > i + 1 and not self.segment_free(path[i], path[j]):
+                j -= 1
+            reduced.append(path[j])
+            i = j
+        return np.array(reduced)
+
+    @staticmethod
+    def _point_at(path: np.ndarray, lengths: np.ndarray, segment: int, distance: float) -> np.ndarray:
+        span = lengths[segment + 1] - lengths[segment]
+        t = (distance - lengths[segment]) / span if span > 0 else 0.0
+        return path[segment] + t * (path[segment + 1] - path[segment])
+
+    # ----------------------------------------------------------------------------------------------------
+    # Plan Cache
+    # ----------------------------------------------------------------------------------------------------
+
+    def _key(self, q: np.ndarray) -> tuple:
+        return tuple(np.rint(q / self.cache_resolution).astype(np.int64).tolist())
+
+    def _cache_lookup(self, q_start: np.ndarray, q_goal: np.ndarray) -> Optional[np.ndarray]:
+        """캐시된 경로 (역방향 포함), 끝점을 실제 출발/목표로 바꿔 다시 검사"""
+        key = (self._key(q_start), self._key(q_goal))
+        path = self._cache.get(key)
+        reverse = False
+        if path is None:
+            path = self._cache.get(key[::-1])
+            reverse = path is not None
+        if path is None:
+            self.cache_misses += 1
+            return None
+
+        path = path[::-1].copy() if reverse else path.copy()
+        path[0], path[-1] = q_start, q_goal
+        if not self.path_free(path):
+            self._cache.pop(key[::-1] if reverse else key, None)
+            self.cache_misses += 1
+            return None
+        self._cache.move_to_end(key[::-1] if reverse else key)
+        self.cache_hits += 1
+        return path
+
+    def _cache_store(self, q_start: np.ndarray, q_goal: np.ndarray, path: np.ndarray):
+        self._cache[(self._key(q_start), self._key(q_goal))] = path.copy()
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    def clear_cache(self):
+        """캐시 비우기 (충돌 모델이나 링크 길이를 바꾼 경우)"""
+        self._cache.clear()
@@ -0,0 +1,264 @@
+import os
+import sys
+import json
+import time
+import argparse
+import threading
+import numpy as np
+from queue import Queue
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from kdtree import KDTree
+
+# ========================================================================================================
+# Pose Library
+# ========================================================================================================
+
+POSE_LIBRARY_FILE = 'poses.jsonl'
+LEGACY_PRESET_FILE = 'custom_presets.json'
+
+@dataclass
+class Pose:
+    """저장된 관절 자세"""
+    name: str
+    ticks: List[int]
+    tags: List[str] = field(default_factory=list)
+    created: float = 0.0  # time.time()
+
+class PoseLibrary:
+    """개수 제한 없는 자세 라이브러리 (JSON Lines 추가 전용 로그 + KD-트리 최근접 탐색)
+
+    - 저장: 자세 1개 저장/삭제마다 로그 한 줄만 추가합니다. 같은 이름은 마지막 기록이 유효합니다.
+    - 압축: 무효 기록이 유효 자세 수보다 많아지면 임시 파일에 다시 쓴 뒤 os.replace로 교체합니다.
+    - 탐색: 관절 벡터 (N, J) 배열과 KD-트리를 메모리에 두고, 변경 후 첫 조회에서 트리를 다시 빌드합니다.
+    - 호환: 로그가 없고 custom_presets.json이 있으면 'slot' 태그로 가져옵니다.
+    - background=True: 메모리 갱신은 호출 스레드에서 바로 하고, 파일 쓰기(추가/압축 fsync)는 쓰기 스레드가
+      순서대로 처리합니다. 쓰기 오류는 on_error(예외)로 알립니다. 종료 시 close()로 남은 쓰기를 마칩니다.
+    """
+
+    def __init__(self, path: str = POSE_LIBRARY_FILE, legacy_path: Optional[str] = LEGACY_PRESET_FILE,
+                 background: bool = False, on_error: Optional[Callable[[Exception], None]] = None):
+        self.path = path
+        self.on_error = on_error
+        self._poses: Dict[str, Pose] = {}
+        self._records = 0  # 로그 기록 수 (압축 판단)
+        self._names: List[str] = []
+        self._matrix = np.zeros((0, 0))
+        self._tree: Optional[KDTree] = None
+        self._io_queue: Optional[Queue] = None
+        self.errors = 0
+
+        if os.path.exists(path):
+            self._replay()
+        elif legacy_path and os.path.exists(legacy_path):
+            self._import_legacy(legacy_path)
+
+        if background:
+            self._io_queue = Queue()
+            self._io_thread = threading.Thread(target=self._io_loop, name="pose-library", daemon=True)
+            self._io_thread.start()
+
+    # ----------------------------------------------------------------------------------------------------
+    # Storage
+    # ----------------------------------------------------------------------------------------------------
+
+    def _replay(self):
+        torn = False  # 줄바꿈 없는 마지막 줄 / 읽을 수 없는 줄
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                torn |= not line.endswith('\n')
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    torn = True  # 기록 중 종료된 마지막 줄
+                    continue
+                self._records += 1
+                if record.get('op') == 'delete':
+                    self._poses.pop(record['name'], None)
+                else:
+                    self._poses[record['name']] = Pose(record['name'], list(record['ticks']),
+                                                       list(record.get('tags', [])), record.get('created', 0.0))
+        self._invalidate()
+
+        # 다음 기록이 잘린 조각 뒤에 이어 붙어 함께 버려지지 않도록 유효 기록만 남겨 다시 씀
+        if torn:
+            self.compact()
+
+    def _import_legacy(self, legacy_path: str):
+        with open(legacy_path, 'r') as f:
+            presets = json.load(f)
+        for name, ticks in presets.items():
+            self._poses[name] = Pose(name, [int(t) for t in ticks], ['slot'], time.time())
+        self.compact()
+
+    def _append(self, record: dict):
+        self._write(self._append_lines, [self._line(record)])
+        self._records += 1
+        if self._records > 2 * len(self._poses) + 64:
+            self.compact()
+
+    def compact(self):
+        """유효 자세만 새 파일에 쓰고 원자적으로 교체"""
+        self._write(self._replace_lines, [self._line(self._record(pose)) for pose in self._poses.values()])
+        self._records = len(self._poses)
+
+    def _write(self, fn, lines: List[str]):
+        """파일 쓰기 (background이면 쓰기 스레드에 넘기고 바로 반환)"""
+        if self._io_queue is None:
+            fn(lines)
+        else:
+            self._io_queue.put((fn, lines))
+
+    def _append_lines(self, lines: List[str]):
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.writelines(lines)
+
+    def _replace_lines(self, lines: List[str]):
+        temp_path = self.path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            f.writelines(lines)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, self.path)
+
+    def _io_loop(self):
+        """쓰기 루프 (백그라운드 스레드)"""
+        while True:
+            item = self._io_queue.get()
+            if item is None:
+                return
+            fn, lines = item
+            try:
+                fn(lines)
+            except Exception as e:
+                self.errors += 1
+                if self.on_error is not None:
+                    self.on_error(e)
+
+    def close(self, timeout: float = 5.0):
+        """대기 중인 파일 쓰기를 마치고 쓰기 스레드 종료 (이후 쓰기는 호출 스레드에서 수행)"""
+        if self._io_queue is None:
+            return
+        self._io_queue.put(None)
+        self._io_thread.join(timeout=timeout)
+        self._io_queue = None
+
+    @staticmethod
+    def _line(record: dict) -> str:
+        return json.dumps(record, separators=(',', ':')) + '\n'
+
+    @staticmethod
+    def _record(pose: Pose) -> dict:
+        return {'op': 'put', 'name': pose.name, 'ticks': pose.ticks, 'tags': pose.tags, 'created': pose.created}
+
+    # ----------------------------------------------------------------------------------------------------
+    # Poses
+    # ----------------------------------------------------------------------------------------------------
+
+    def __len__(self) -> int:
+        return len(self._poses)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._poses
+
+    def __getitem__(self, name: str) -> List[int]:
+        """자세 tick 목록 (custom_presets dict와 같은 조회 방식)"""
+        return self._poses[name].ticks
+
+    def get(self, name: str) -> Optional[Pose]:
+        return self._poses.get(name)
+
+    def put(self, name: str, ticks: Iterable[int], tags: Iterable[str] = ()) -> Pose:
+        """자세 저장 (같은 이름은 덮어씀)"""
+        pose = Pose(name, [int(t) for t in ticks], sorted(set(tags)), time.time())
+        self._poses[name] = pose
+        self._append(self._record(pose))
+        self._invalidate()
+        return pose
+
+    def delete(self, name: str) -> bool:
+        if name not in self._poses:
+            return False
+        del self._poses[name]
+        self._append({'op': 'delete', 'name': name})
+        self._invalidate()
+        return True
+
+    def tag(self, name: str, *tags: str) -> Pose:
+        """태그 추가"""
+        pose = self._poses[name]
+        return self.put(name, pose.ticks, set(pose.tags) | set(tags))
+
+    def poses(self, tag: Optional[str] = None) -> List[Pose]:
+        """저장 순서대로 자세 목록 (tag 지정 시 해당 태그만)"""
+        return [pose for pose in self._poses.values() if tag is None or tag in pose.tags]
+
+    def next_name(self, prefix: str = "Pose") -> str:
+        """사용되지 않은 '<prefix> NNN' 이름"""
+        index = len(self._poses) + 1
+        while f"{prefix} {index:03d}" in self._poses:
+            index += 1
+        return f"{prefix} {index:03d}"
+
+    # ----------------------------------------------------------------------------------------------------
+    # Nearest Pose Search
+    # ----------------------------------------------------------------------------------------------------
+
+    def _invalidate(self):
+        self._tree = None
+
+    def _index(self):
+        if self._tree is None:
+            self._names = list(self._poses)
+            self._matrix = np.array([self._poses[name].ticks for name in self._names], dtype=np.float64)
+            self._tree = KDTree(self._matrix) if len(self._names) else None
+
+    def nearest(self, ticks, k: int = 1, tag: Optional[str] = None) -> List[Tuple[Pose, float]]:
+        """현재 자세에서 가장 가까운 저장 자세 k개 -> [(Pose, 거리 ticks)], 가까운 순
+
+        ticks 길이가 저장된 자세와 다르면 (예: Hand 제외) 앞 부분 관절만 비교합니다.
+        """
+        self._index()
+        if self._tree is None:
+            return []
+        ticks = np.asarray(ticks, dtype=np.float64)
+        joints = min(len(ticks), self._matrix.shape[1])
+        if tag is not None or joints != self._matrix.shape[1]:
+            # 태그 / 부분 관절 조회는 후보만 전수 비교
+            rows = np.array([i for i, name in enumerate(self._names)
+                             if tag is None or tag in self._poses[name].tags], dtype=np.int64)
+            if not len(rows):
+                return []
+            distances = np.linalg.norm(self._matrix[rows, :joints] - ticks[:joints], axis=1)
+            order = np.argsort(distances)[:k]
+            return [(self._poses[self._names[rows[i]]], float(distances[i])) for i in order]
+        distances, indices = self._tree.query(ticks, k)
+        return [(self._poses[self._names[i]], float(d)) for d, i in zip(distances, indices)]
+
+# ========================================================================================================
+# Command Line
+# ========================================================================================================
+
+def main():
+    parser = argparse.ArgumentParser(description="Pose library")
+    parser.add_argument("--file", default=POSE_LIBRARY_FILE, help="pose library file")
+    parser.add_argument("--tag", default=None, help="filter by tag")
+    parser.add_argument("--nearest", type=int, nargs='+', metavar="TICK", help="closest stored poses to these ticks")
+    parser.add_argument("-k", type=int, default=5, help="number of nearest poses")
+    args = parser.parse_args()
+
+    library = PoseLibrary(args.file)
+    if args.nearest:
+        for pose, distance in library.nearest(args.nearest, args.k, args.tag):
+            print(f"{distance:8.1f}  {pose.name:<24} {pose.ticks}  {','.join(pose.tags)}")
+        return
+    for pose in library.poses(args.tag):
+        print(f"{pose.name:<24} {pose.ticks}  {','.join(pose.tags)}")
+    print(f"{len(library.poses(args.tag))} poses")
+
+if __name__ == "__main__":
+    sys.exit(main())
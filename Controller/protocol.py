@@ -0,0 +1,449 @@
+import time
+import struct
+from collections import namedtuple
+from typing import List, Optional, Tuple, Union
+
+# ========================================================================================================
+# Protocol Constants
+# ========================================================================================================
+#
+# ASCII 방언 (기존 robot.ino)
+#   PC -> Arduino : "0,512,512,380,800,700,512,512*"        (~35 bytes)
+#   Arduino -> PC : "Feedback:512,512,380,800,700,512,512\n"
+#
+# Binary 방언
+#   [0xAA][0x55][OPCODE][7 x uint16 LE][CRC16 LE]           (19 bytes)
+#   CRC16 = CRC-16/CCITT-FALSE (poly 0x1021, init 0xFFFF), OPCODE ~ 마지막 값까지 계산
+#   Arduino -> PC 응답은 OPCODE | 0x80 (Feedback: 0x82, Positions: 0x83)
+#
+# Bus 프레임 (한 버스의 여러 팔, 가변 길이)
+#   [0xAA][0x5A][OPCODE][COUNT][COUNT x ([ARM][7 x uint16 LE])][CRC16 LE]   (6 + 15 x COUNT bytes)
+#   ARM = 팔 번호, Dynamixel ID = ARM x 10 + 1~7 (Leader-follower.ino: 0 -> ID 1~7, 1 -> ID 11~17)
+#   OPCODE는 단일 팔 명령과 동일 (0: 위치, 1: 토크, 2: 피드백 스트림, 3: 위치 요청), 응답은 OPCODE | 0x80
+#   6: 호스트 제어 해제. Leader-follower.ino는 위치 명령을 받으면 리더 -> 팔로워 미러링을 멈추고,
+#      opcode 6 또는 호스트 프레임이 3 s 동안 없을 때 재개 (ArmBus가 마지막 목표를 keepalive로 재전송)
+#
+# Delta 위치 명령 (변경된 관절만 전송, 주기적으로 opcode 0 전체 Keyframe)
+#   ASCII  : "5,MASK,v,v,...*"                             (예: "5,1,517*" = 8 bytes)
+#   Binary : [0xAA][0x5D][MASK][k x uint16 LE][CRC16 LE]   (5 + 2k bytes)
+#   MASK bit i = 관절 i (M1 = bit 0), 값은 관절 순서대로. 7개 모두 바뀌면 opcode 0으로 전송
+#   펌웨어가 opcode 4 응답 "Protocol:<방언>,<CAPS>"에서 CAP_DELTA를 확인한 경우에만 전송
+#   (구버전 펌웨어는 CAPS 없이 응답하거나 opcode 4 자체에 응답하지 않음 -> 전체 위치만 전송)
+
+PROTOCOL_ASCII = "ascii"
+PROTOCOL_BINARY = "binary"
+
+OP_MOVE = 0        # 위치 제어
+OP_TORQUE = 1      # 토크 ON/OFF
+OP_FEEDBACK = 2    # Passivity 피드백 스트림 ON/OFF
+OP_QUERY = 3       # 현재 위치 1회 요청
+OP_PROTOCOL = 4    # 응답 방언 전환 (1: binary, 0: ascii) + 기능 확인
+OP_MOVE_DELTA = 5  # 변경된 관절만 위치 제어 (MASK + 값)
+OP_RELEASE = 6     # Bus: 호스트 제어 해제 (리더 -> 팔로워 미러링 재개)
+
+REPLY_FLAG = 0x80
+
+CAP_DELTA = 0x01  # opcode 4 응답의 CAPS 비트: Delta 위치 명령(opcode 5) 지원
+
+NUM_VALUES = 7
+
+# 관절별 위치 리밋 (robot.ino handleCommand / Leader-follower.ino 버스 opcode 0의 constrain)
+POSITION_LIMITS = [(0, 1023), (180, 845), (165, 1023), (512, 1023), (512, 1023), (0, 1023), (370, 695)]
+
+FRAME_SYNC1 = 0xAA
+FRAME_SYNC2 = 0x55
+_FRAME_STRUCT = struct.Struct(f"<BBB{NUM_VALUES}H")
+_CRC_STRUCT = struct.Struct("<H")
+FRAME_SIZE = _FRAME_STRUCT.size + _CRC_STRUCT.size
+
+FRAME_SYNC_BUS = 0x5A
+MAX_BUS_ARMS = 16
+_BUS_HEADER_STRUCT = struct.Struct("<BBBB")
+_BUS_ENTRY_STRUCT = struct.Struct(f"<B{NUM_VALUES}H")
+BUS_HEADER_SIZE = _BUS_HEADER_STRUCT.size
+BUS_ENTRY_SIZE = _BUS_ENTRY_STRUCT.size
+
+FRAME_SYNC_DELTA = 0x5D
+DELTA_MAX_VALUES = NUM_VALUES - 1  # MASK + 값이 ASCII 명령의 7개 슬롯에 들어가도록 제한
+
+# 응답 OPCODE <-> ASCII 접두어
+REPLY_PREFIXES = {
+    REPLY_FLAG | OP_FEEDBACK: "Feedback",
+    REPLY_FLAG | OP_QUERY: "Positions",
+}
+
+# 파싱된 수신 레코드 종류
+REPLY_FEEDBACK = "Feedback"
+REPLY_POSITIONS = "Positions"
+REPLY_PROTOCOL = "Protocol"
+REPLY_TEXT = "Text"
+REPLY_BUS_FEEDBACK = "BusFeedback"
+REPLY_BUS_POSITIONS = "BusPositions"
+
+BUS_REPLY_KINDS = {
+    REPLY_FLAG | OP_FEEDBACK: REPLY_BUS_FEEDBACK,
+    REPLY_FLAG | OP_QUERY: REPLY_BUS_POSITIONS,
+}
+
+# setup() 완료 시 펌웨어가 출력하는 배너 (항상 ASCII)
+READY_BANNER = "Ready"
+
+_VALUE_REPLIES = (REPLY_FEEDBACK, REPLY_POSITIONS, REPLY_PROTOCOL)
+
+Frame = namedtuple("Frame", ["opcode", "values"])
+BusFrame = namedtuple("BusFrame", ["opcode", "arms"])  # arms: [(arm, values), ...]
+Reply = namedtuple("Reply", ["kind", "values", "text", "timestamp"])
+
+# ========================================================================================================
+# CRC
+# ========================================================================================================
+
+def _build_crc_table() -> List[int]:
+    """CRC-16/CCITT 룩업 테이블 생성"""
+    table = []
+    for byte in range(256):
+        crc = byte << 8
+        for _ in range(8):
+            crc = ((crc << 1) ^ 0x1021) if crc & 0x8000 else (crc << 1)
+        table.append(crc & 0xFFFF)
+    return table
+
+_CRC_TABLE = _build_crc_table()
+
+def crc16_ccitt(data, crc: int = 0xFFFF) -> int:
+    """CRC-16/CCITT-FALSE 계산 (robot.ino의 crc16Update와 동일)"""
+    for byte in data:
+        crc = ((crc << 8) & 0xFFFF) ^ _CRC_TABLE[((crc >> 8) ^ byte) & 0xFF]
+    return crc
+
+# ========================================================================================================
+# Encoders
+# ========================================================================================================
+
+def _pad_values(values) -> List[int]:
+    """값 목록을 7개로 맞추고 uint16 범위로 제한"""
+    values = [max(0, min(0xFFFF, int(v))) for v in list(values)[:NUM_VALUES]]
+    return values + [0] * (NUM_VALUES - len(values))
+
+def encode_ascii(opcode: int, values) -> str:
+    """ASCII 방언 명령 생성 (예: "0,512,512,380,800,700,512,512*")"""
+    return f"{opcode},{','.join(map(str, _pad_values(values)))}*"
+
+def encode_binary(opcode: int, values) -> bytes:
+    """Binary 방언 프레임 생성 (19 bytes)"""
+    body = _FRAME_STRUCT.pack(FRAME_SYNC1, FRAME_SYNC2, opcode, *_pad_values(values))
+    return body + _CRC_STRUCT.pack(crc16_ccitt(memoryview(body)[2:]))
+
+def bus_frame_size(count: int) -> int:
+    """팔 COUNT개를 담은 Bus 프레임 크기 (bytes)"""
+    return BUS_HEADER_SIZE + count * BUS_ENTRY_SIZE + _CRC_STRUCT.size
+
+def encode_bus_frame(opcode: int, arms) -> bytes:
+    """Bus 프레임 생성 (arms: [(arm, values), ...], 팔마다 7개 값)"""
+    arms = list(arms)
+    if len(arms) > MAX_BUS_ARMS:
+        raise ValueError(f"Too many arms in one bus frame: {len(arms)} > {MAX_BUS_ARMS}")
+    body = bytearray(_BUS_HEADER_STRUCT.pack(FRAME_SYNC1, FRAME_SYNC_BUS, opcode, len(arms)))
+    for arm, values in arms:
+        body += _BUS_ENTRY_STRUCT.pack(arm, *_pad_values(values))
+    return bytes(body) + _CRC_STRUCT.pack(crc16_ccitt(memoryview(body)[2:]))
+
+def delta_mask(previous, current) -> Tuple[int, List[int]]:
+    """이전 위치 대비 변경된 관절의 MASK와 값"""
+    mask = 0
+    values = []
+    for i, (old, new) in enumerate(zip(previous, current)):
+        if old != new:
+            mask |= 1 << i
+            values.append(new)
+    return mask, values
+
+def encode_delta(mask: int, values, dialect: str = PROTOCOL_ASCII) -> bytes:
+    """Delta 위치 명령 생성 (값은 MASK의 관절 순서)"""
+    values = [max(0, min(0xFFFF, int(v))) for v in values]
+    if not 0 < len(values) <= DELTA_MAX_VALUES or bin(mask).count('1') != len(values) or mask >> NUM_VALUES:
+        raise ValueError(f"Invalid delta command: mask={mask:#x}, {len(values)} values")
+    if dialect == PROTOCOL_BINARY:
+        body = struct.pack(f"<BBB{len(values)}H", FRAME_SYNC1, FRAME_SYNC_DELTA, mask, *values)
+        return body + _CRC_STRUCT.pack(crc16_ccitt(memoryview(body)[2:]))
+    return f"{OP_MOVE_DELTA},{mask},{','.join(map(str, values))}*".encode('utf-8')
+
+def encode_command(opcode: int, values, dialect: str = PROTOCOL_ASCII) -> bytes:
+    """방언에 맞춰 명령을 바이트로 인코딩"""
+    if dialect == PROTOCOL_BINARY:
+        return encode_binary(opcode, values)
+    return encode_ascii(opcode, values).encode('utf-8')
+
+class CommandText:
+    """명령의 ASCII 방언 표기 (로그용) - 문자열은 str() 호출 시(로그 싱크 스레드)에만 생성"""
+    __slots__ = ("opcode", "values")
+
+    def __init__(self, opcode: int, values):
+        self.opcode = opcode
+        self.values = tuple(values)
+
+    def __str__(self) -> str:
+        if self.opcode == OP_MOVE_DELTA:
+            return f"{OP_MOVE_DELTA},{','.join(map(str, self.values))}*"
+        return encode_ascii(self.opcode, self.values)
+
+def format_reply(frame: Frame) -> str:
+    """Binary 응답 프레임을 ASCII 방언 문자열로 변환 (예: "Feedback:512,...")"""
+    prefix = REPLY_PREFIXES.get(frame.opcode, f"Op{frame.opcode}")
+    return f"{prefix}:{','.join(map(str, frame.values))}"
+
+# ========================================================================================================
+# Delta Encoder
+# ========================================================================================================
+
+class DeltaEncoder:
+    """위치 명령을 변경된 관절만 담은 Delta 명령으로 변환
+
+    첫 명령, reset() 이후, keyframe_interval이 지난 뒤, 관절 7개가 모두 바뀐 경우에는
+    전체 위치(opcode 0) Keyframe을 보내 Delta 유실 시에도 장치 상태가 복구되도록 합니다.
+    Delta가 전체 위치 명령보다 짧지 않으면 (ASCII에서 값 자릿수가 많은 경우 등) Keyframe을 보냅니다.
+    """
+
+    def __init__(self, keyframe_interval: float = 1.0):
+        self.keyframe_interval = keyframe_interval
+        self.last = None
+        self.last_keyframe = float('-inf')
+
+        # 통계 카운터
+        self.keyframes = 0
+        self.deltas = 0
+        self.unchanged = 0
+        self.bytes = 0
+
+    def encode(self, positions, dialect: str = PROTOCOL_ASCII,
+               now: Optional[float] = None) -> Tuple[Optional[bytes], Union[CommandText, str]]:
+        """(packet, 설명) 반환 - 변경된 관절이 없으면 packet은 None (설명은 로그 출력 시 문자열로 변환)"""
+        positions = [int(p) for p in positions]
+        now = time.monotonic() if now is None else now
+
+        packet = None
+        if self.last is not None and now - self.last_keyframe < self.keyframe_interval:
+            mask, values = delta_mask(self.last, positions)
+            if not values:
+                self.unchanged += 1
+                return None, ""
+            if len(values) <= DELTA_MAX_VALUES:
+                packet = encode_delta(mask, values, dialect)
+
+        full = encode_command(OP_MOVE, positions, dialect)
+        if packet is None or len(packet) >= len(full):
+            packet = full
+            description = CommandText(OP_MOVE, positions)
+            self.last_keyframe = now
+            self.keyframes += 1
+        else:
+            description = CommandText(OP_MOVE_DELTA, [mask, *values])
+            self.deltas += 1
+
+        self.last = positions
+        self.bytes += len(packet)
+        return packet, description
+
+    def reset(self):
+        """다음 명령을 Keyframe으로 전송 (전송 실패 / 재연결 후)"""
+        self.last = None
+
+# ========================================================================================================
+# Stream Decoder
+# ========================================================================================================
+
+# FrameDecoder._frame_at() 결과 (끝 위치 대신)
+_NEED_MORE = 0
+_BAD = -1
+_BAD_CRC = -2
+
+class FrameDecoder:
+    """바이트 스트림을 ASCII 라인, Binary 프레임, Bus 프레임으로 분리하는 디코더
+
+    PC 측에서는 terminator=b'\\n' (Arduino 응답), 에뮬레이터/펌웨어 측에서는
+    terminator=b'*' (PC 명령)로 사용합니다.
+    CRC/길이 검사에 실패한 프레임 후보는 다음 SYNC1 바이트로 건너뜁니다. ASCII 라인은
+    ascii_lines=True일 때만 파싱하며 CRC까지 맞는 프레임이 시작되는 SYNC1 앞에서 끊으므로, 손상된
+    프레임 뒤의 정상 프레임을 라인으로 삼키지 않고 라인 속의 0xAA 바이트로 라인을 버리지도 않습니다.
+    (Binary 방언 협상 후에는 ascii_lines=False)
+    """
+
+    def __init__(self, terminator: bytes = b'\n', max_buffer: int = 4096, ascii_lines: bool = True):
+        self.terminator = terminator
+        self.max_buffer = max_buffer
+        self.ascii_lines = ascii_lines
+        self.buffer = bytearray()
+        self.crc_errors = 0
+        self.overflows = 0
+
+    def feed(self, data: bytes) -> List[Union[str, Frame, BusFrame]]:
+        """수신 데이터를 누적하고 완성된 메시지 목록 반환"""
+        buf = self.buffer
+        buf += data
+        messages = []
+        pos = 0
+        size = len(buf)
+
+        while pos < size:
+            if buf[pos] == FRAME_SYNC1:
+                end, message = self._frame_at(buf, pos, size)
+                if end == _NEED_MORE:
+                    break
+                if end < 0:
+                    if end == _BAD_CRC:
+                        self.crc_errors += 1
+                    pos = self._resync(buf, pos, size)
+                    continue
+                messages.append(message)
+                pos = end
+            elif self.ascii_lines:
+                # ASCII 라인 - 라인 중간의 SYNC1은 그 자리에서 CRC까지 맞는 프레임이 시작될 때만
+                # 앞 조각을 버리고 프레임으로 처리 (문자열 속 0xAA 바이트는 라인의 일부)
+                end = buf.find(self.terminator, pos)
+                limit = end if end >= 0 else size
+                sync = buf.find(FRAME_SYNC1, pos, limit)
+                while sync >= 0:
+                    frame_end, _ = self._frame_at(buf, sync, size)
+                    if frame_end >= 0:
+                        break
+                    sync = buf.find(FRAME_SYNC1, sync + 1, limit)
+                if sync >= 0:
+                    if frame_end == _NEED_MORE:
+                        break  # 프레임인지 판단할 수 있을 때까지 대기
+                    pos = sync
+                    continue
+                if end < 0:
+                    break
+                line = buf[pos:end].decode('utf-8', errors='replace').strip()
+                if line:
+                    messages.append(line)
+                pos = end + len(self.terminator)
+            else:
+                # Binary 전용: 다음 SYNC1까지 건너뜀
+                pos = self._resync(buf, pos, size)
+
+        del buf[:pos]
+
+        # 종결 문자 없이 쌓이는 쓰레기 데이터 방지
+        if len(buf) > self.max_buffer:
+            buf.clear()
+            self.overflows += 1
+
+        return messages
+
+    @staticmethod
+    def _frame_at(buf: bytearray, pos: int, size: int) -> Tuple[int, Optional[Union[Frame, BusFrame]]]:
+        """buf[pos]의 SYNC1에서 시작하는 프레임 -> (끝 위치, 메시지)
+
+        끝 위치 대신 _NEED_MORE (데이터 부족), _BAD (헤더/길이 불일치), _BAD_CRC를 반환할 수 있습니다.
+        """
+        if pos + 1 < size and buf[pos + 1] == FRAME_SYNC_BUS:
+            # Bus 프레임 후보 (COUNT 확인 후 길이 결정)
+            if size - pos < BUS_HEADER_SIZE:
+                return _NEED_MORE, None
+            count = buf[pos + 3]
+            if count > MAX_BUS_ARMS:
+                return _BAD, None
+            end = pos + bus_frame_size(count)
+            if size < end:
+                return _NEED_MORE, None
+            crc = crc16_ccitt(memoryview(buf)[pos + 2:end - 2])
+            if crc != (buf[end - 2] | (buf[end - 1] << 8)):
+                return _BAD_CRC, None
+            arms = []
+            for offset in range(pos + BUS_HEADER_SIZE, end - 2, BUS_ENTRY_SIZE):
+                fields = _BUS_ENTRY_STRUCT.unpack_from(buf, offset)
+                arms.append((fields[0], list(fields[1:])))
+            return end, BusFrame(buf[pos + 2], arms)
+
+        if pos + 1 < size and buf[pos + 1] == FRAME_SYNC_DELTA:
+            # Delta 프레임 후보 (MASK 비트 수로 길이 결정)
+            if size - pos < 3:
+                return _NEED_MORE, None
+            mask = buf[pos + 2]
+            count = bin(mask).count('1')
+            if mask >> NUM_VALUES or not 0 < count <= DELTA_MAX_VALUES:
+                return _BAD, None
+            end = pos + 3 + 2 * count + _CRC_STRUCT.size
+            if size < end:
+                return _NEED_MORE, None
+            crc = crc16_ccitt(memoryview(buf)[pos + 2:end - 2])
+            if crc != (buf[end - 2] | (buf[end - 1] << 8)):
+                return _BAD_CRC, None
+            values = struct.unpack_from(f"<{count}H", buf, pos + 3)
+            return end, Frame(OP_MOVE_DELTA, [mask, *values])
+
+        # Binary 프레임 후보
+        if pos + 1 < size and buf[pos + 1] != FRAME_SYNC2:
+            return _BAD, None
+        if size - pos < FRAME_SIZE:
+            return _NEED_MORE, None
+        end = pos + FRAME_SIZE
+        crc = crc16_ccitt(memoryview(buf)[pos + 2:end - 2])
+        if crc != (buf[end - 2] | (buf[end - 1] << 8)):
+            return _BAD_CRC, None
+        fields = _FRAME_STRUCT.unpack_from(buf, pos)
+        return end, Frame(fields[2], list(fields[3:]))
+
+    def _resync(self, buf: bytearray, pos: int, size: int) -> int:
+        """다음 SYNC1 위치 (없으면 ASCII 모드는 다음 바이트부터 라인 파싱, Binary 모드는 모두 버림)"""
+        sync = buf.find(FRAME_SYNC1, pos + 1)
+        if sync >= 0:
+            return sync
+        return pos + 1 if self.ascii_lines else size
+
+def parse_reply(message: Union[str, Frame, BusFrame], timestamp: float = 0.0) -> Reply:
+    """디코더 출력(ASCII 라인 / Binary 프레임 / Bus 프레임)을 Reply 레코드로 변환
+    
+    Bus 응답의 values는 [(arm, values), ...] 입니다.
+    """
+    if isinstance(message, BusFrame):
+        kind = BUS_REPLY_KINDS.get(message.opcode)
+        if kind is None:
+            return Reply(REPLY_TEXT, [], f"Bus{message.opcode}:{message.arms}", timestamp)
+        return Reply(kind, message.arms, None, timestamp)
+    
+    if isinstance(message, Frame):
+        kind = REPLY_PREFIXES.get(message.opcode)
+        if kind is None:
+            return Reply(REPLY_TEXT, [], format_reply(message), timestamp)
+        return Reply(kind, message.values, None, timestamp)
+
+    prefix, sep, body = message.partition(':')
+    if sep and prefix in _VALUE_REPLIES:
+        try:
+            return Reply(prefix, [int(p) for p in body.split(',')], message, timestamp)
+        except ValueError:
+            pass
+    return Reply(REPLY_TEXT, [], message, timestamp)
+
+def reply_capabilities(values) -> int:
+    """Protocol 응답 값([방언, CAPS])의 기능 비트 (CAPS가 없는 구버전 펌웨어는 0)"""
+    return values[1] if len(values) > 1 else 0
+
+def query_capabilities(port, timeout: float = 1.0) -> int:
+    """ASCII 방언 유지 요청("4,0*")으로 펌웨어 기능 비트 확인 (응답이 없으면 0)
+
+    수신 스레드 없이 pyserial 포트를 직접 쓰는 스크립트용입니다. 응답 전에 도착한 다른 데이터는 버립니다.
+    """
+    port.write(encode_ascii(OP_PROTOCOL, [0]).encode('utf-8'))
+    decoder = FrameDecoder(terminator=b'\n')
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        for message in decoder.feed(port.read(max(1, port.in_waiting))):
+            reply = parse_reply(message)
+            if reply.kind == REPLY_PROTOCOL:
+                return reply_capabilities(reply.values)
+    return 0
+
+def apply_delta(positions, values) -> List[int]:
+    """Delta 명령 값([MASK, v, ...])을 현재 위치에 적용"""
+    mask, changed = values[0], iter(values[1:])
+    return [next(changed) if mask & (1 << i) else p for i, p in enumerate(positions)]
+
+def parse_ascii_command(packet: str) -> Frame:
+    """ASCII 방언 명령 파싱 ("0,512,...,512" -> Frame), 실패 시 ValueError"""
+    parts = packet.strip().rstrip('*').split(',')
+    opcode = int(parts[0])
+    values = [int(p) for p in parts[1:1 + NUM_VALUES]]
+    return Frame(opcode, _pad_values(values))
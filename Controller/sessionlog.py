@@ -0,0 +1,451 @@
+import os
+import sys
+import csv
+import json
+import mmap
+import time
+import struct
+import argparse
+import threading
+import numpy as np
+from dataclasses import dataclass
+from queue import Queue, Empty, Full
+from typing import Dict, List, Optional, Tuple
+
+# ========================================================================================================
+# File Format
+# ========================================================================================================
+#
+# robot_log_*.rlog (리틀 엔디언, 모든 구간 8바이트 정렬)
+#
+#   파일 헤더 (32 B)   'RLOG', version u16, joints u16, chunk_rows u32, 시작 벽시계 ns i64, 시작 monotonic ns i64
+#   청크 * N           'CHNK', rows u32, t_min i64, t_max i64, names_len u32, 새 이벤트 이름 JSON {id: name}
+#                      + 열 단위 데이터 (청크 안에서 시각 순 정렬)
+#                        time   i64[rows]          monotonic ns
+#                        target i16[rows, joints]  목표 위치 (ticks)
+#                        feedback i16[rows, joints] 마지막 수신 피드백 위치 (ticks, 받은 적 없으면 NO_FEEDBACK)
+#                        event  u16[rows]          이벤트 id (0: 없음)
+#   시간 인덱스        'RIDX', count u32, 청크마다 (t_min i64, t_max i64, offset u64, rows u32, pad u32)
+#   트레일러 (12 B)    인덱스 offset u64, 'REND'
+#
+# 정상 종료하지 못한 파일(트레일러 없음)은 청크 헤더를 차례로 읽어 인덱스를 다시 만듭니다.
+
+FILE_MAGIC = b'RLOG'
+CHUNK_MAGIC = b'CHNK'
+INDEX_MAGIC = b'RIDX'
+END_MAGIC = b'REND'
+VERSION = 1
+
+NO_FEEDBACK = -1  # 피드백 열 값: 피드백을 받지 않은 행 (Normal 모드, 피드백 꺼짐)
+
+FILE_HEADER = struct.Struct('<4sHHIqq4x')
+CHUNK_HEADER = struct.Struct('<4sIqqI')
+INDEX_HEADER = struct.Struct('<4sI')
+INDEX_ENTRY = struct.Struct('<qqQI4x')
+TRAILER = struct.Struct('<Q4s')
+
+# DataLogger CSV와 같은 열 (변환기 출력)
+CSV_HEADER = ['Timestamp:  ', 'M1_Pos', 'M2_Pos', 'M3_Pos', 'M4_Pos', 'M5_Pos', 'M6_Pos', 'Event']
+
+def _align(size: int) -> int:
+    return (size + 7) & ~7
+
+def _column_sizes(rows: int, joints: int) -> Tuple[int, int, int, int]:
+    """청크 열 크기 (time, target, feedback, event) bytes"""
+    return 8 * rows, 2 * rows * joints, 2 * rows * joints, 2 * rows
+
+@dataclass
+class ChunkInfo:
+    """시간 인덱스 항목"""
+    t_min: int
+    t_max: int
+    offset: int  # 청크 헤더 위치
+    rows: int
+
+@dataclass
+class SessionRecords:
+    """세션 로그 행 묶음 (열 배열, 시각 순)"""
+    times: np.ndarray     # (N,) int64 monotonic ns
+    targets: np.ndarray   # (N, J) int16
+    feedback: np.ndarray  # (N, J) int16
+    events: np.ndarray    # (N,) uint16
+
+    def __len__(self) -> int:
+        return len(self.times)
+
+# ========================================================================================================
+# Writer
+# ========================================================================================================
+
+class SessionLogWriter:
+    """고정 폭 행을 열 단위 청크로 기록하는 세션 로그 기록기
+
+    append()는 미리 할당한 청크 배열에 한 행을 채우기만 합니다. 청크가 chunk_rows행으로 차거나
+    flush_interval초가 지나면 봉인된 청크를 쓰기 스레드가 정렬/직렬화해 한 번의 write로 추가합니다.
+    쓰기 대기 청크가 max_pending개를 넘으면 새 청크를 버리고 dropped로 집계합니다. (호출 측을 막지 않음)
+    이벤트 문자열은 쓰기 스레드에서 id로 바꾸며, 처음 나온 이름만 해당 청크 헤더에 기록합니다.
+    """
+
+    def __init__(self, path: str, joints: int = 7, chunk_rows: int = 4096, flush_interval: float = 1.0,
+                 max_pending: int = 8):
+        self.path = path
+        self.joints = joints
+        self.chunk_rows = max(1, chunk_rows)
+        self.flush_interval = flush_interval
+
+        self.start_wall_ns = time.time_ns()
+        self.start_ns = time.monotonic_ns()
+        self._file = open(path, 'wb')
+        self._file.write(FILE_HEADER.pack(FILE_MAGIC, VERSION, joints, self.chunk_rows,
+                                          self.start_wall_ns, self.start_ns))
+        self._offset = FILE_HEADER.size
+
+        self._lock = threading.Lock()
+        self._new_chunk()
+        self._pending = Queue(maxsize=max_pending)
+        self._event_ids: Dict[str, int] = {"": 0}
+        self.index: List[ChunkInfo] = []
+
+        # 통계 카운터
+        self.appended = 0
+        self.written = 0
+        self.dropped = 0
+        self.errors = 0
+        self.bytes = FILE_HEADER.size
+
+        self.running = True
+        self.thread = threading.Thread(target=self._write_loop, name="session-log", daemon=True)
+        self.thread.start()
+
+    # ----------------------------------------------------------------------------------------------------
+    # Hot Path
+    # ----------------------------------------------------------------------------------------------------
+
+    def _new_chunk(self):
+        self._times = np.empty(self.chunk_rows, dtype=np.int64)
+        self._targets = np.empty((self.chunk_rows, self.joints), dtype=np.int16)
+        self._feedback = np.empty((self.chunk_rows, self.joints), dtype=np.int16)
+        self._events: List[Optional[str]] = []
+        self._count = 0
+        self._chunk_start = time.monotonic()
+
+    def append(self, timestamp_ns: int, targets, feedback, event: str = ""):
+        """한 행 추가 (timestamp_ns: time.monotonic_ns() 기준)"""
+        with self._lock:
+            i = self._count
+            self._times[i] = timestamp_ns
+            self._targets[i] = targets[:self.joints]
+            self._feedback[i] = feedback[:self.joints]
+            self._events.append(event)
+            self._count = i + 1
+            self.appended += 1
+            if self._count == self.chunk_rows:
+                self._seal()
+
+    def _seal(self):
+        """현재 청크를 쓰기 대기열로 넘기고 새 청크 시작 (잠금 안에서 호출)"""
+        if not self._count:
+            return
+        count = self._count
+        chunk = (self._times[:count], self._targets[:count], self._feedback[:count], self._events)
+        self._new_chunk()
+        try:
+            self._pending.put_nowait(chunk)
+        except Full:
+            self.dropped += count
+
+    # ----------------------------------------------------------------------------------------------------
+    # Writer Thread
+    # ----------------------------------------------------------------------------------------------------
+
+    def _write_loop(self):
+        """쓰기 루프 (백그라운드 스레드) - flush_interval마다 채우는 중인 청크도 봉인"""
+        while True:
+            try:
+                chunk = self._pending.get(timeout=self.flush_interval)
+            except Empty:
+                with self._lock:
+                    if self._count and time.monotonic() - self._chunk_start >= self.flush_interval:
+                        self._seal()
+                continue
+            if chunk is None:
+                return
+            try:
+                self._write_chunk(*chunk)
+            except Exception:
+                self.errors += 1
+                self.dropped += len(chunk[0])
+
+    def _write_chunk(self, times: np.ndarray, targets: np.ndarray, feedback: np.ndarray, events: List[str]):
+        order = np.argsort(times, kind='stable')
+        times, targets, feedback = times[order], targets[order], feedback[order]
+
+        event_ids = np.empty(len(times), dtype=np.uint16)
+        new_names = {}
+        for row, k in enumerate(order):
+            name = events[k] or ""
+            event_id = self._event_ids.get(name)
+            if event_id is None:
+                event_id = len(self._event_ids)
+                self._event_ids[name] = event_id
+                new_names[str(event_id)] = name
+            event_ids[row] = event_id
+
+        names = json.dumps(new_names, separators=(',', ':')).encode('utf-8') if new_names else b''
+        rows = len(times)
+        header = CHUNK_HEADER.pack(CHUNK_MAGIC, rows, int(times[0]), int(times[-1]), len(names)) + names
+        header += b'\0' * (_align(len(header)) - len(header))
+        body = b''.join((times.tobytes(), targets.tobytes(), feedback.tobytes(), event_ids.tobytes()))
+        body += b'\0' * (_align(len(body)) - len(body))
+
+        self._file.write(header + body)
+        self.index.append(ChunkInfo(int(times[0]), int(times[-1]), self._offset, rows))
+        self._offset += len(header) + len(body)
+        self.written += rows
+        self.bytes = self._offset
+
+    def flush(self):
+        """채우는 중인 청크를 봉인해 쓰기 대기열로 넘김"""
+        with self._lock:
+            self._seal()
+
+    def close(self):
+        """남은 행과 시간 인덱스를 쓰고 파일 닫기"""
+        if not self.running:
+            return
+        self.running = False
+        self.flush()
+        self._pending.put(None)
+        self.thread.join()
+
+        index_offset = self._offset
+        entries = b''.join(INDEX_ENTRY.pack(c.t_min, c.t_max, c.offset, c.rows) for c in self.index)
+        self._file.write(INDEX_HEADER.pack(INDEX_MAGIC, len(self.index)) + entries +
+                         TRAILER.pack(index_offset, END_MAGIC))
+        self._file.close()
+        self.bytes = os.path.getsize(self.path)
+
+    def get_stats(self) -> dict:
+        """기록 통계 반환"""
+        return {'appended': self.appended, 'written': self.written, 'dropped': self.dropped, 'errors': self.errors,
+                'chunks': len(self.index), 'bytes': self.bytes}
+
+# ========================================================================================================
+# Reader
+# ========================================================================================================
+
+class SessionLog:
+    """세션 로그 읽기 (mmap, 청크 열은 복사 없는 NumPy 뷰)
+
+    시간 범위 조회는 청크 단위 희소 인덱스에서 이분 탐색으로 후보 청크를 찾은 뒤, 청크 안의
+    정렬된 time 열에서 다시 이분 탐색합니다. (O(log n) + 결과 행 수)
+    청크 간 시각이 조금 겹칠 수 있으므로 (피드백 샘플은 수신 시각으로 기록) 인덱스는
+    t_max 누적 최댓값 / t_min 역방향 누적 최솟값으로 단조 배열을 만들어 탐색합니다.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, 'rb')
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, self.joints, self.chunk_rows, self.start_wall_ns, self.start_ns = \
+            FILE_HEADER.unpack_from(self._mmap, 0)
+        if magic != FILE_MAGIC:
+            raise ValueError(f"{path}: not a session log")
+        if version != VERSION:
+            raise ValueError(f"{path}: unsupported version {version}")
+
+        self.event_names: Dict[int, str] = {0: ""}
+        self.chunks = self._read_index()
+        self.recovered = self.chunks is None
+        if self.recovered:
+            self.chunks = self._scan()
+        else:
+            for chunk in self.chunks:
+                self._read_names(chunk)
+
+        t_min = np.array([c.t_min for c in self.chunks], dtype=np.int64)
+        t_max = np.array([c.t_max for c in self.chunks], dtype=np.int64)
+        self._max_prefix = np.maximum.accumulate(t_max) if len(t_max) else t_max
+        self._min_suffix = np.minimum.accumulate(t_min[::-1])[::-1] if len(t_min) else t_min
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self) -> int:
+        return sum(c.rows for c in self.chunks)
+
+    # ----------------------------------------------------------------------------------------------------
+    # Index
+    # ----------------------------------------------------------------------------------------------------
+
+    def _read_index(self) -> Optional[List[ChunkInfo]]:
+        size = len(self._mmap)
+        if size < FILE_HEADER.size + TRAILER.size:
+            return None
+        index_offset, magic = TRAILER.unpack_from(self._mmap, size - TRAILER.size)
+        if magic != END_MAGIC or index_offset + INDEX_HEADER.size > size:
+            return None
+        magic, count = INDEX_HEADER.unpack_from(self._mmap, index_offset)
+        if magic != INDEX_MAGIC:
+            return None
+        base = index_offset + INDEX_HEADER.size
+        return [ChunkInfo(*INDEX_ENTRY.unpack_from(self._mmap, base + k * INDEX_ENTRY.size)) for k in range(count)]
+
+    def _scan(self) -> List[ChunkInfo]:
+        """트레일러가 없는 파일: 청크 헤더를 차례로 읽어 인덱스 복구 (잘린 마지막 청크는 버림)"""
+        chunks = []
+        offset = FILE_HEADER.size
+        size = len(self._mmap)
+        while offset + CHUNK_HEADER.size <= size:
+            magic, rows, t_min, t_max, names_len = CHUNK_HEADER.unpack_from(self._mmap, offset)
+            if magic != CHUNK_MAGIC:
+                break
+            end = self._data_offset(offset, names_len) + _align(sum(_column_sizes(rows, self.joints)))
+            if end > size:
+                break
+            chunk = ChunkInfo(t_min, t_max, offset, rows)
+            self._read_names(chunk)
+            chunks.append(chunk)
+            offset = end
+        return chunks
+
+    @staticmethod
+    def _data_offset(offset: int, names_len: int) -> int:
+        return offset + _align(CHUNK_HEADER.size + names_len)
+
+    def _read_names(self, chunk: ChunkInfo):
+        names_len = CHUNK_HEADER.unpack_from(self._mmap, chunk.offset)[4]
+        if names_len:
+            start = chunk.offset + CHUNK_HEADER.size
+            names = json.loads(bytes(self._mmap[start:start + names_len]).decode('utf-8'))
+            self.event_names.update({int(k): v for k, v in names.items()})
+
+    # ----------------------------------------------------------------------------------------------------
+    # Records
+    # ----------------------------------------------------------------------------------------------------
+
+    def chunk(self, index: int) -> SessionRecords:
+        """청크 1개 (mmap 위의 읽기 전용 뷰)"""
+        info = self.chunks[index]
+        names_len = CHUNK_HEADER.unpack_from(self._mmap, info.offset)[4]
+        offset = self._data_offset(info.offset, names_len)
+        rows, joints = info.rows, self.joints
+        time_size, target_size, feedback_size, _ = _column_sizes(rows, joints)
+
+        times = np.frombuffer(self._mmap, np.int64, rows, offset)
+        offset += time_size
+        targets = np.frombuffer(self._mmap, np.int16, rows * joints, offset).reshape(rows, joints)
+        offset += target_size
+        feedback = np.frombuffer(self._mmap, np.int16, rows * joints, offset).reshape(rows, joints)
+        offset += feedback_size
+        events = np.frombuffer(self._mmap, np.uint16, rows, offset)
+        return SessionRecords(times, targets, feedback, events)
+
+    def range(self, start_ns: Optional[int] = None, end_ns: Optional[int] = None) -> SessionRecords:
+        """start_ns <= time < end_ns 행 (monotonic ns, None: 처음/끝까지) -> 시각 순 복사본"""
+        start_ns = np.iinfo(np.int64).min if start_ns is None else start_ns
+        end_ns = np.iinfo(np.int64).max if end_ns is None else end_ns
+        first = int(np.searchsorted(self._max_prefix, start_ns, 'left'))
+        last = int(np.searchsorted(self._min_suffix, end_ns, 'left'))
+
+        parts = []
+        for k in range(first, last):
+            records = self.chunk(k)
+            lo = int(np.searchsorted(records.times, start_ns, 'left'))
+            hi = int(np.searchsorted(records.times, end_ns, 'left'))
+            if lo < hi:
+                parts.append((records.times[lo:hi], records.targets[lo:hi], records.feedback[lo:hi],
+                              records.events[lo:hi]))
+        if not parts:
+            return SessionRecords(np.zeros(0, np.int64), np.zeros((0, self.joints), np.int16),
+                                  np.zeros((0, self.joints), np.int16), np.zeros(0, np.uint16))
+
+        times, targets, feedback, events = (np.concatenate(column) for column in zip(*parts))
+        if len(parts) > 1 and np.any(np.diff(times) < 0):
+            order = np.argsort(times, kind='stable')
+            times, targets, feedback, events = times[order], targets[order], feedback[order], events[order]
+        return SessionRecords(times, targets, feedback, events)
+
+    def read_all(self) -> SessionRecords:
+        return self.range()
+
+    def seconds(self, seconds: float) -> int:
+        """세션 시작 기준 초 -> monotonic ns"""
+        return self.start_ns + int(round(seconds * 1e9))
+
+    def wall_times(self, times: np.ndarray) -> np.ndarray:
+        """monotonic ns -> 현지 벽시계 시각 (datetime64[ms])"""
+        wall = self.start_wall_ns + (times - self.start_ns)
+        utc_offset = time.localtime(self.start_wall_ns / 1e9).tm_gmtoff
+        return (wall // 1_000_000 + utc_offset * 1000).astype('datetime64[ms]')
+
+    # ----------------------------------------------------------------------------------------------------
+    # CSV
+    # ----------------------------------------------------------------------------------------------------
+
+    def to_csv(self, path: str, start_ns: Optional[int] = None, end_ns: Optional[int] = None,
+               targets: bool = False) -> int:
+        """DataLogger CSV 형식으로 변환 -> 행 수
+        
+        위치 열 = 피드백 (NO_FEEDBACK 행은 목표 위치), targets=True면 목표 위치 열 추가
+        """
+        records = self.range(start_ns, end_ns)
+        stamps = np.datetime_as_string(self.wall_times(records.times), unit='ms')
+        names = [self.event_names.get(k, f"event {k}") for k in range(max(self.event_names) + 1)]
+        header = CSV_HEADER + [f"M{j + 1}_Target" for j in range(self.joints)] if targets else CSV_HEADER
+        feedback = np.where(records.feedback == NO_FEEDBACK, records.targets, records.feedback).tolist()
+        target_rows = records.targets.tolist() if targets else None
+        events = records.events.tolist()
+
+        with open(path, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(header)
+            for k in range(len(records)):
+                row = [stamps[k][11:]] + feedback[k] + [names[events[k]]]
+                if targets:
+                    row += target_rows[k]
+                writer.writerow(row)
+        return len(records)
+
+    def close(self):
+        self._mmap.close()
+        self._file.close()
+
+# ========================================================================================================
+# Command Line
+# ========================================================================================================
+
+def main():
+    parser = argparse.ArgumentParser(description="Session log (.rlog) info and CSV conversion")
+    parser.add_argument("path", help="session log file")
+    parser.add_argument("--csv", metavar="OUT", help="convert to CSV (DataLogger columns)")
+    parser.add_argument("--start", type=float, default=None, help="range start (s from session start)")
+    parser.add_argument("--end", type=float, default=None, help="range end (s from session start)")
+    parser.add_argument("--targets", action="store_true", help="append target position columns")
+    args = parser.parse_args()
+
+    with SessionLog(args.path) as session:
+        start = None if args.start is None else session.seconds(args.start)
+        end = None if args.end is None else session.seconds(args.end)
+        if args.csv:
+            rows = session.to_csv(args.csv, start, end, args.targets)
+            print(f"{rows} rows -> {args.csv}")
+            return
+
+        records = session.range(start, end)
+        print(f"{args.path}: {len(session)} rows, {len(session.chunks)} chunks, {session.joints} joints"
+              f"{' (index recovered)' if session.recovered else ''}")
+        if len(records):
+            first, last = ((t - session.start_ns) / 1e9 for t in (records.times[0], records.times[-1]))
+            print(f"range: {len(records)} rows, {first:.3f} s .. {last:.3f} s")
+            counts = np.bincount(records.events, minlength=len(session.event_names))
+            for event_id, count in enumerate(counts):
+                if count and event_id:
+                    print(f"  {count:>8}  {session.event_names.get(event_id, event_id)}")
+
+if __name__ == "__main__":
+    sys.exit(main())
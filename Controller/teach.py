@@ -0,0 +1,234 @@
+import math
+import threading
+import numpy as np
+from typing import Iterable, List, Optional, Tuple
+
+from trajectory import Trajectory, PROFILE_MIN_JERK, plan_trajectory
+
+# ========================================================================================================
+# Recording
+# ========================================================================================================
+
+class Recording:
+    """기록된 관절 궤적 (수신 시각 순)
+
+    times: monotonic 수신 시각 (s, float64), ticks: (N, J) int16
+    """
+
+    def __init__(self, times: np.ndarray, ticks: np.ndarray):
+        self.times = times
+        self.ticks = ticks
+
+    def __len__(self) -> int:
+        return len(self.times)
+
+    @property
+    def duration(self) -> float:
+        return float(self.times[-1] - self.times[0]) if len(self.times) > 1 else 0.0
+
+    @property
+    def sample_rate(self) -> float:
+        return (len(self.times) - 1) / self.duration if self.duration > 0 else 0.0
+
+    def save(self, path: str):
+        """npz 파일 저장 (시각은 첫 샘플 기준)"""
+        np.savez_compressed(path, times=self.times - self.times[0], ticks=self.ticks)
+
+    @classmethod
+    def load(cls, path: str) -> 'Recording':
+        with np.load(path) as data:
+            return cls(data['times'].astype(np.float64), data['ticks'].astype(np.int16))
+
+# ========================================================================================================
+# Trajectory Recorder
+# ========================================================================================================
+
+FEEDBACK_INTERVAL = 0.020  # robot.ino loop()의 delay(20) (읽기 1회에 샘플이 하나뿐일 때의 간격)
+
+def spread_batch_times(times: np.ndarray) -> np.ndarray:
+    """같은 수신 시각을 공유하는 샘플(읽기 1회에 함께 파싱된 응답)을 직전 시각 ~ 수신 시각 사이에 고르게 배치
+
+    마지막 샘플은 수신 시각을 유지하므로 결과는 순증가합니다. (보간/압축/time_warp의 dτ > 0)
+    """
+    count = len(times)
+    if count < 2:
+        return times.copy()
+    first = np.r_[True, times[1:] != times[:-1]]
+    starts = np.flatnonzero(first)
+    if len(starts) == count:
+        return times.copy()
+    lengths = np.diff(np.r_[starts, count])
+    run_times = times[starts]
+    previous = np.empty(len(starts))
+    previous[1:] = run_times[:-1]
+    if len(starts) > 1:
+        step = float(np.median(np.diff(run_times) / lengths[1:]))
+    else:
+        step = FEEDBACK_INTERVAL
+    previous[0] = run_times[0] - lengths[0] * step
+    run = np.cumsum(first) - 1
+    position = np.arange(count) - starts[run] + 1
+    return previous[run] + (run_times[run] - previous[run]) * position / lengths[run]
+
+class TrajectoryRecorder:
+    """Passivity 모드 피드백 샘플을 모두 기록하는 Teach Pendant 레코더
+
+    미리 할당한 배열에 (수신 시각, tick)을 그대로 채우며, 용량이 차면 두 배로 늘립니다.
+    (샘플당 비용은 배열 행 쓰기 1회, 20 ms 피드백 기준 기본 용량 30000개 = 10분)
+    읽기 1회에 함께 도착한 샘플은 수신 시각이 같으므로 모두 기록하고, stop()에서
+    spread_batch_times()로 시각을 나눕니다. 시각이 역행한 샘플만 건너뜁니다.
+    """
+
+    def __init__(self, num_joints: int = 7, capacity: int = 30000):
+        self.num_joints = num_joints
+        self.capacity = capacity
+        self._lock = threading.Lock()
+        self._times = np.empty(capacity, dtype=np.float64)
+        self._ticks = np.empty((capacity, num_joints), dtype=np.int16)
+        self._count = 0
+        self.recording = False
+        self.dropped = 0  # 관절 수가 맞지 않거나 시각이 역행한 샘플
+
+    def __len__(self) -> int:
+        return self._count
+
+    def start(self):
+        """새 기록 시작 (이전 기록은 버림)"""
+        with self._lock:
+            self._count = 0
+            self.dropped = 0
+            self.recording = True
+
+    def stop(self) -> Optional[Recording]:
+        """기록 종료 -> Recording (샘플이 2개 미만이면 None)"""
+        with self._lock:
+            self.recording = False
+            if self._count < 2:
+                return None
+            return Recording(spread_batch_times(self._times[:self._count]), self._ticks[:self._count].copy())
+
+    def append(self, timestamp: float, values: List[int]):
+        """피드백 샘플 1개 추가 (기록 중이 아니면 무시)"""
+        with self._lock:
+            if self.recording:
+                self._append(timestamp, values)
+
+    def extend(self, samples: Iterable[Tuple[float, List[int]]]):
+        """피드백 샘플 일괄 추가 [(timestamp, values)]"""
+        with self._lock:
+            if self.recording:
+                for timestamp, values in samples:
+                    self._append(timestamp, values)
+
+    def _append(self, timestamp: float, values: List[int]):
+        count = self._count
+        if len(values) < self.num_joints or (count and timestamp < self._times[count - 1]):
+            self.dropped += 1
+            return
+        if count == len(self._times):
+            self._grow()
+        self._times[count] = timestamp
+        self._ticks[count] = values[:self.num_joints]
+        self._count = count + 1
+
+    def _grow(self):
+        size = 2 * len(self._times)
+        times = np.empty(size, dtype=np.float64)
+        ticks = np.empty((size, self.num_joints), dtype=np.int16)
+        times[:self._count] = self._times[:self._count]
+        ticks[:self._count] = self._ticks[:self._count]
+        self._times, self._ticks = times, ticks
+
+# ========================================================================================================
+# Replay (Time Warping)
+# ========================================================================================================
+
+MIN_REPLAY_SPEED = 0.25
+MAX_REPLAY_SPEED = 4.0
+
+def time_warp(recording: Recording, speed: float, max_velocity: Optional[float] = None,
+              smoothing: float = 0.1) -> np.ndarray:
+    """기록 시각 -> 재생 시각 누적 함수 (N,) (재생 시각 0에서 시작)
+
+    기본 배속은 speed이고, max_velocity가 주어지면 관절 속도가 이를 넘는 구간만 배속을 낮춥니다.
+    (배속 r(τ) = min(speed, max_velocity / 기록 속도(τ)), 재생 시간 dt = dτ / r(τ))
+    기록 속도는 smoothing초 구간 최댓값을 사용해 짧은 속도 피크 주변도 함께 늦춥니다.
+    """
+    speed = min(max(speed, MIN_REPLAY_SPEED), MAX_REPLAY_SPEED)
+    dtau = np.diff(recording.times)
+    rates = np.full(len(dtau), speed)
+    if max_velocity is not None and len(dtau):
+        velocity = np.abs(np.diff(recording.ticks.astype(np.float64), axis=0)).max(axis=1) / np.maximum(dtau, 1e-6)
+        window = max(1, int(round(smoothing * recording.sample_rate)))
+        if window > 1:
+            padded = np.pad(velocity, (window // 2, window - 1 - window // 2), mode='edge')
+            velocity = np.lib.stride_tricks.sliding_window_view(padded, window).max(axis=1)
+        rates = np.minimum(rates, max_velocity / np.maximum(velocity, 1e-6))
+    return np.concatenate([[0.0], np.cumsum(dtau / rates)])
+
+def replay_trajectory(recording: Recording, rate_hz: float, speed: float = 1.0, max_velocity: Optional[float] = None,
+                      start=None, max_acceleration: Optional[float] = None) -> Trajectory:
+    """기록을 재생 주기(rate_hz)로 다시 샘플링한 궤적
+
+    재생 틱마다 time_warp의 역함수로 기록 시각을 구하고 관절별 선형 보간합니다.
+    start가 주어지면 현재 위치 -> 기록 시작 자세 접근 구간(최소 저크)을 앞에 붙입니다.
+    """
+    warp = time_warp(recording, speed, max_velocity)
+    ticks = max(1, math.ceil(warp[-1] * rate_hz - 1e-9))
+    replay_times = np.minimum(np.arange(1, ticks + 1, dtype=np.float64) / rate_hz, warp[-1])
+    relative = recording.times - recording.times[0]
+    source_times = np.interp(replay_times, warp, relative)
+    values = recording.ticks.astype(np.float64)
+    positions = np.stack([np.interp(source_times, relative, values[:, j]) for j in range(values.shape[1])], axis=1)
+
+    first = values[0]
+    if start is None:
+        return Trajectory(first, positions, rate_hz, "replay")
+    start = np.asarray(start, dtype=np.float64)
+    approach = plan_trajectory(start, first, rate_hz, max_velocity or 200.0, max_acceleration or 400.0,
+                               PROFILE_MIN_JERK)
+    return Trajectory(start, np.concatenate([approach.positions, positions]), rate_hz, "replay")
+
+# ========================================================================================================
+# Compression
+# ========================================================================================================
+
+def compress_recording(recording: Recording, tolerance=3.0) -> Recording:
+    """기록을 최소 Keyframe으로 압축 (시간 매개 Ramer-Douglas-Peucker)
+
+    이웃 Keyframe 사이를 시각 기준으로 선형 보간한 값과 원래 샘플의 차이가 모든 관절에서
+    tolerance (ticks, 스칼라 또는 관절별 (J,)) 이하가 될 때까지 오차가 가장 큰 샘플을 Keyframe으로
+    추가합니다. 재생(replay_trajectory)도 같은 선형 보간을 쓰므로 재생 오차가 tolerance로 제한되고,
+    피드백 잡음(±1~2 tick)이 사라져 멈춰 있는 관절은 Delta 명령에서 빠집니다.
+    """
+    count = len(recording)
+    if count < 3:
+        return recording
+    times = recording.times
+    values = recording.ticks.astype(np.float64)
+    scale = 1.0 / np.maximum(np.broadcast_to(np.asarray(tolerance, dtype=np.float64), values.shape[1:]), 1e-9)
+
+    keep = np.zeros(count, dtype=bool)
+    keep[0] = keep[-1] = True
+    stack = [(0, count - 1)]
+    while stack:
+        i, j = stack.pop()
+        if j - i < 2:
+            continue
+        fractions = (times[i + 1:j] - times[i]) / (times[j] - times[i])
+        interpolated = values[i] + fractions[:, None] * (values[j] - values[i])
+        errors = (np.abs(values[i + 1:j] - interpolated) * scale).max(axis=1)
+        k = int(np.argmax(errors))
+        if errors[k] > 1.0:
+            split = i + 1 + k
+            keep[split] = True
+            stack.append((i, split))
+            stack.append((split, j))
+    return Recording(times[keep].copy(), recording.ticks[keep].copy())
+
+def compression_error(original: Recording, compressed: Recording) -> np.ndarray:
+    """원래 샘플 시각에서 압축 기록(선형 보간)과의 관절별 최대 오차 (J,) ticks"""
+    values = original.ticks.astype(np.float64)
+    keyframes = compressed.ticks.astype(np.float64)
+    return np.array([np.abs(np.interp(original.times, compressed.times, keyframes[:, j]) - values[:, j]).max()
+                     for j in range(values.shape[1])])
@@ -0,0 +1,227 @@
+import json
+import time
+import threading
+from collections import deque
+from typing import List, Optional
+
+# ========================================================================================================
+# Rolling Statistics
+# ========================================================================================================
+
+class LatencyHistogram:
+    """최근 N개 지연 샘플의 롤링 히스토그램 (ms 단위)"""
+
+    BUCKET_EDGES_MS = [0.5, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000]
+
+    def __init__(self, window: int = 2048):
+        self.samples = deque(maxlen=window)
+        self.count = 0
+
+    def add(self, seconds: float):
+        self.samples.append(seconds * 1000.0)
+        self.count += 1
+
+    def percentiles(self, points=(50, 95, 99)) -> dict:
+        """p50/p95/p99 등 백분위수 (샘플이 없으면 None)"""
+        ordered = sorted(self.samples)
+        if not ordered:
+            return {f"p{p}": None for p in points}
+        last = len(ordered) - 1
+        return {f"p{p}": ordered[min(last, int(round(p / 100.0 * last)))] for p in points}
+
+    def buckets(self) -> dict:
+        """버킷별 샘플 수 ("<=1ms": n, ..., ">1000ms": n)"""
+        counts = [0] * (len(self.BUCKET_EDGES_MS) + 1)
+        for sample in self.samples:
+            for i, edge in enumerate(self.BUCKET_EDGES_MS):
+                if sample <= edge:
+                    counts[i] += 1
+                    break
+            else:
+                counts[-1] += 1
+        labels = [f"<={edge:g}ms" for edge in self.BUCKET_EDGES_MS] + [f">{self.BUCKET_EDGES_MS[-1]:g}ms"]
+        return dict(zip(labels, counts))
+
+    def summary(self) -> dict:
+        summary = {'count': self.count, 'window': len(self.samples)}
+        summary.update(self.percentiles())
+        return summary
+
+class RateCounter:
+    """1초 단위 버킷으로 최근 수 초간의 초당 처리량 계산"""
+
+    def __init__(self, window_seconds: int = 5):
+        self.window = window_seconds
+        self.buckets = deque()  # [second, amount]
+        self.total = 0
+
+    def add(self, amount: int, now: float):
+        second = int(now)
+        if self.buckets and self.buckets[-1][0] == second:
+            self.buckets[-1][1] += amount
+        else:
+            self.buckets.append([second, amount])
+            while self.buckets and self.buckets[0][0] <= second - self.window:
+                self.buckets.popleft()
+        self.total += amount
+
+    def rate(self, now: float) -> float:
+        """최근 window초(진행 중인 초 제외)의 평균 초당 처리량"""
+        current = int(now)
+        amount = sum(a for s, a in self.buckets if current - self.window <= s < current)
+        return amount / self.window
+
+# ========================================================================================================
+# Link Telemetry
+# ========================================================================================================
+
+class LinkTelemetry:
+    """시리얼 링크 계측 (TX/RX 타임스탬프, 바이트 처리량, 큐 깊이, 지연 히스토그램)
+
+    - target_latency: 위치 명령 전송 -> Feedback / Positions 응답에서 목표 도달이 확인될 때까지
+      (피드백 스트림이 꺼진 Normal 모드에서는 위치 요청 응답으로만 측정, 샘플이 없으면 n/a)
+    - query_rtt: 위치 요청(opcode 3) -> Positions 응답 수신
+    """
+
+    def __init__(self, target_tolerance: int = 3, target_timeout: float = 5.0):
+        self.lock = threading.Lock()
+        self.target_tolerance = target_tolerance
+        self.target_timeout = target_timeout
+
+        self.tx_bytes = RateCounter()
+        self.rx_bytes = RateCounter()
+        self.tx_packets = 0
+        self.rx_messages = 0
+
+        self.target_latency = LatencyHistogram()
+        self.query_rtt = LatencyHistogram()
+
+        self.queue_depth = 0
+        self.queue_depth_max = 0
+
+        # 피드백 처리 (UI 틱마다 비운 레코드 수, 적용된 샘플의 나이)
+        self.feedback_staleness = LatencyHistogram()
+        self.feedback_backlog = 0
+        self.feedback_backlog_max = 0
+
+        self.last_tx_time = None
+        self.last_rx_time = None
+        self.last_position_time = None
+        self._outstanding_targets = deque(maxlen=64)  # (tx_time, positions)
+
+    # ----------------------------------------------------------------------------------------------------
+    # Hooks (SerialCommunicator)
+    # ----------------------------------------------------------------------------------------------------
+
+    def on_tx(self, nbytes: int, positions: Optional[List[int]] = None):
+        """패킷 송신 기록 (위치 명령이면 목표 도달 지연 측정 대상으로 등록)"""
+        now = time.monotonic()
+        with self.lock:
+            self.tx_bytes.add(nbytes, now)
+            self.tx_packets += 1
+            self.last_tx_time = now
+            if positions is not None:
+                self._outstanding_targets.append((now, list(positions)))
+
+    def on_rx(self, nbytes: int, timestamp: float):
+        """수신 바이트 기록"""
+        with self.lock:
+            self.rx_bytes.add(nbytes, timestamp)
+            self.last_rx_time = timestamp
+
+    def on_position_sample(self, positions: List[int], timestamp: float):
+        """Feedback / Positions 샘플로 목표 도달 여부 확인"""
+        with self.lock:
+            self.rx_messages += 1
+            self.last_position_time = timestamp
+            targets = self._outstanding_targets
+            while targets and timestamp - targets[0][0] > self.target_timeout:
+                targets.popleft()
+
+            # 가장 최근에 도달한 목표를 찾고, 그 이전 목표들은 대체된 것으로 간주
+            reached = -1
+            for index, (_, target) in enumerate(targets):
+                if all(abs(p - t) <= self.target_tolerance for p, t in zip(positions, target)):
+                    reached = index
+            if reached >= 0:
+                tx_time = targets[reached][0]
+                for _ in range(reached + 1):
+                    targets.popleft()
+                self.target_latency.add(timestamp - tx_time)
+
+    def targets_outstanding(self) -> bool:
+        """도달 확인을 기다리는 위치 명령이 있는지 (위치 요청으로 측정할지 판단)"""
+        with self.lock:
+            return bool(self._outstanding_targets)
+
+    def on_query_reply(self, rtt: float):
+        with self.lock:
+            self.query_rtt.add(rtt)
+
+    def on_feedback_applied(self, backlog: int, staleness: float):
+        """피드백 처리 단계에서 최신 샘플 적용 기록"""
+        with self.lock:
+            self.feedback_staleness.add(staleness)
+            self.feedback_backlog = backlog
+            if backlog > self.feedback_backlog_max:
+                self.feedback_backlog_max = backlog
+
+    def set_queue_depth(self, depth: int):
+        self.queue_depth = depth
+        if depth > self.queue_depth_max:
+            self.queue_depth_max = depth
+
+    # ----------------------------------------------------------------------------------------------------
+    # Reporting
+    # ----------------------------------------------------------------------------------------------------
+
+    def snapshot(self) -> dict:
+        """현재 계측 값 (대시보드 / 파일 출력용)"""
+        now = time.monotonic()
+        with self.lock:
+            return {
+                'tx_bytes_per_sec': self.tx_bytes.rate(now),
+                'rx_bytes_per_sec': self.rx_bytes.rate(now),
+                'tx_bytes_total': self.tx_bytes.total,
+                'rx_bytes_total': self.rx_bytes.total,
+                'tx_packets': self.tx_packets,
+                'rx_messages': self.rx_messages,
+                'queue_depth': self.queue_depth,
+                'queue_depth_max': self.queue_depth_max,
+                'target_latency_ms': self.target_latency.summary(),
+                'query_rtt_ms': self.query_rtt.summary(),
+                'feedback_backlog': self.feedback_backlog,
+                'feedback_backlog_max': self.feedback_backlog_max,
+                'feedback_staleness_ms': self.feedback_staleness.summary(),
+            }
+
+    def dump(self, filename: str) -> dict:
+        """계측 값과 히스토그램을 JSON 파일로 저장"""
+        report = self.snapshot()
+        with self.lock:
+            report['target_latency_ms']['buckets'] = self.target_latency.buckets()
+            report['query_rtt_ms']['buckets'] = self.query_rtt.buckets()
+            report['feedback_staleness_ms']['buckets'] = self.feedback_staleness.buckets()
+        with open(filename, 'w') as f:
+            json.dump(report, f, indent=2)
+        return report
+
+    def status_line(self) -> str:
+        """대시보드 한 줄 요약"""
+        snap = self.snapshot()
+        target = snap['target_latency_ms']
+        rtt = snap['query_rtt_ms']
+        stale = snap['feedback_staleness_ms']
+
+        def fmt(value):
+            return "-" if value is None else f"{value:.1f}"
+
+        if target['count']:
+            target_text = f"{fmt(target['p50'])}/{fmt(target['p95'])}/{fmt(target['p99'])} ms"
+        else:
+            target_text = "n/a"  # 위치 샘플(피드백 / 위치 요청 응답)이 아직 없음
+
+        return (f"TX/RX {snap['tx_bytes_per_sec'] / 1000:.1f}/{snap['rx_bytes_per_sec'] / 1000:.1f} kB/s | "
+                f"Target p50/95/99 {target_text} | "
+                f"RTT {fmt(rtt['p50'])} ms | RXQ {snap['queue_depth']} | "
+                f"FB age {fmt(stale['p50'])} ms x{snap['feedback_backlog']}")
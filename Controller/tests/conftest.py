@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Controller/ 모듈은 스크립트와 같이 모듈 이름으로 import (from protocol import ...)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,72 @@
+import pytest
+
+from protocol import (
+    OP_MOVE, OP_MOVE_DELTA, PROTOCOL_ASCII, PROTOCOL_BINARY,
+    DeltaEncoder, Frame, FrameDecoder, apply_delta, delta_mask, parse_ascii_command,
+)
+
+POSITIONS = [512, 512, 380, 800, 700, 512, 512]
+
+def _decode(packet: bytes, dialect: str) -> Frame:
+    """에뮬레이터/펌웨어 측 디코딩 (PC 명령 종결 문자 '*')"""
+    if dialect == PROTOCOL_BINARY:
+        messages = FrameDecoder(terminator=b'*', ascii_lines=False).feed(packet)
+        assert len(messages) == 1
+        return messages[0]
+    return parse_ascii_command(packet.decode('utf-8'))
+
+def test_delta_mask_and_apply_delta():
+    current = list(POSITIONS)
+    current[1], current[6] = 530, 400
+    mask, values = delta_mask(POSITIONS, current)
+    assert mask == 0b1000010
+    assert values == [530, 400]
+    assert apply_delta(POSITIONS, [mask, *values]) == current
+
+def test_first_command_is_keyframe():
+    encoder = DeltaEncoder()
+    packet, description = encoder.encode(POSITIONS, now=0.0)
+    assert packet == b"0,512,512,380,800,700,512,512*"
+    assert str(description) == "0,512,512,380,800,700,512,512*"
+    assert encoder.keyframes == 1
+
+def test_unchanged_positions_send_nothing():
+    encoder = DeltaEncoder()
+    encoder.encode(POSITIONS, now=0.0)
+    assert encoder.encode(POSITIONS, now=0.1) == (None, "")
+    assert encoder.unchanged == 1
+
+@pytest.mark.parametrize("dialect", [PROTOCOL_ASCII, PROTOCOL_BINARY])
+def test_stream_reconstructs_targets(dialect):
+    # 인코더가 보낸 명령을 장치 측에서 적용한 위치가 항상 마지막 목표 위치와 같아야 함
+    encoder = DeltaEncoder(keyframe_interval=0.5)
+    device = [0] * 7
+    targets = list(POSITIONS)
+    for step in range(200):
+        targets[step % 7] += 1 + step % 3
+        if step % 11 == 0:
+            targets[(step + 3) % 7] -= 5
+        packet, _ = encoder.encode(targets, dialect, now=step * 0.02)
+        frame = _decode(packet, dialect)
+        device = apply_delta(device, frame.values) if frame.opcode == OP_MOVE_DELTA else frame.values
+        assert device == targets
+    assert encoder.deltas > 0 and encoder.keyframes > 1
+
+def test_keyframe_after_interval_and_reset():
+    encoder = DeltaEncoder(keyframe_interval=1.0)
+    encoder.encode(POSITIONS, now=0.0)
+    moved = [513] + POSITIONS[1:]
+    assert encoder.encode(moved, now=0.5)[0].startswith(b"5,")
+    assert encoder.encode(POSITIONS, now=1.0)[0].startswith(b"0,")
+    encoder.reset()
+    assert encoder.encode(moved, now=1.1)[0].startswith(b"0,")
+
+def test_keyframe_when_delta_is_not_shorter():
+    # 6개 관절 변경: "5,63,2,3,4,5,6,7*" (17 B) >= "0,2,3,4,5,6,7,7*" (16 B)
+    encoder = DeltaEncoder()
+    encoder.encode([1, 2, 3, 4, 5, 6, 7], now=0.0)
+    packet, description = encoder.encode([2, 3, 4, 5, 6, 7, 7], now=0.1)
+    assert packet == b"0,2,3,4,5,6,7,7*"
+    assert description.opcode == OP_MOVE
+    assert encoder.keyframes == 2 and encoder.deltas == 0
+    assert encoder.last_keyframe == 0.1
@@ -0,0 +1,101 @@
+import struct
+
+import pytest
+
+from protocol import (
+    OP_MOVE, OP_MOVE_DELTA, OP_QUERY, REPLY_FLAG, FRAME_SIZE, MAX_BUS_ARMS,
+    BusFrame, Frame, FrameDecoder, bus_frame_size, crc16_ccitt, encode_ascii, encode_binary, encode_bus_frame,
+    encode_delta, parse_ascii_command,
+)
+
+POSITIONS = [512, 512, 380, 800, 700, 512, 512]
+
+# ========================================================================================================
+# CRC / Encoders
+# ========================================================================================================
+
+def test_crc16_ccitt_false_check_value():
+    # CRC-16/CCITT-FALSE 표준 검사값
+    assert crc16_ccitt(b"123456789") == 0x29B1
+
+def test_encode_binary_layout():
+    frame = encode_binary(OP_MOVE, POSITIONS)
+    assert len(frame) == FRAME_SIZE == 19
+    assert frame[:3] == bytes([0xAA, 0x55, OP_MOVE])
+    assert list(struct.unpack_from("<7H", frame, 3)) == POSITIONS
+    assert struct.unpack_from("<H", frame, 17)[0] == crc16_ccitt(frame[2:17])
+
+def test_encode_pads_and_clamps_values():
+    assert encode_ascii(OP_QUERY, [0]) == "3,0,0,0,0,0,0,0*"
+    assert encode_ascii(OP_MOVE, [-5, 70000, 1, 2, 3, 4, 5, 6]) == "0,0,65535,1,2,3,4,5*"
+
+def test_ascii_command_round_trip():
+    frame = parse_ascii_command(encode_ascii(OP_MOVE, POSITIONS))
+    assert frame == Frame(OP_MOVE, POSITIONS)
+
+def test_encode_delta_rejects_mismatched_mask():
+    with pytest.raises(ValueError):
+        encode_delta(0b11, [1])
+    with pytest.raises(ValueError):
+        encode_delta(1 << 7, [1])
+
+def test_encode_bus_frame_limits_arm_count():
+    assert len(encode_bus_frame(OP_MOVE, [(0, POSITIONS), (1, POSITIONS)])) == bus_frame_size(2)
+    with pytest.raises(ValueError):
+        encode_bus_frame(OP_MOVE, [(arm, POSITIONS) for arm in range(MAX_BUS_ARMS + 1)])
+
+# ========================================================================================================
+# FrameDecoder
+# ========================================================================================================
+
+def test_decode_round_trip_all_frame_types():
+    decoder = FrameDecoder(ascii_lines=False)
+    data = (encode_binary(REPLY_FLAG | OP_QUERY, POSITIONS)
+            + encode_delta(0b101, [600, 400], "binary")
+            + encode_bus_frame(OP_MOVE, [(0, POSITIONS), (1, [1] * 7)]))
+    assert decoder.feed(data) == [
+        Frame(REPLY_FLAG | OP_QUERY, POSITIONS),
+        Frame(OP_MOVE_DELTA, [0b101, 600, 400]),
+        BusFrame(OP_MOVE, [(0, POSITIONS), (1, [1] * 7)]),
+    ]
+    assert decoder.buffer == bytearray()
+
+def test_decode_byte_by_byte():
+    decoder = FrameDecoder()
+    data = b"Ready\n" + encode_binary(REPLY_FLAG | OP_QUERY, POSITIONS) + b"Feedback:1,2,3,4,5,6,7\n"
+    messages = []
+    for byte in data:
+        messages += decoder.feed(bytes([byte]))
+    assert messages == ["Ready", Frame(REPLY_FLAG | OP_QUERY, POSITIONS), "Feedback:1,2,3,4,5,6,7"]
+
+def test_decode_drops_corrupted_frame_and_resyncs():
+    decoder = FrameDecoder()
+    good = encode_binary(REPLY_FLAG | OP_QUERY, POSITIONS)
+    bad = bytearray(good)
+    bad[5] ^= 0xFF
+    assert decoder.feed(bytes(bad) + good) == [Frame(REPLY_FLAG | OP_QUERY, POSITIONS)]
+    assert decoder.crc_errors == 1
+
+def test_decode_frame_after_truncated_line():
+    # 줄 끝 없이 끊긴 ASCII 조각 뒤의 정상 프레임은 라인으로 삼키지 않음
+    frame = encode_binary(REPLY_FLAG | OP_QUERY, POSITIONS)
+    assert FrameDecoder().feed(b"Feedb" + frame + b"Ready\n") == [Frame(REPLY_FLAG | OP_QUERY, POSITIONS), "Ready"]
+
+def test_decode_keeps_stray_sync_byte_in_line():
+    assert FrameDecoder().feed(b"Hello\xaaworld\n") == ["Hello�world"]
+
+def test_decode_waits_for_split_sync_byte():
+    decoder = FrameDecoder()
+    assert decoder.feed(b"Hello\xaa") == []
+    assert decoder.feed(b"world\n") == ["Hello�world"]
+
+def test_decode_binary_mode_skips_text():
+    decoder = FrameDecoder(ascii_lines=False)
+    frame = encode_binary(REPLY_FLAG | OP_QUERY, POSITIONS)
+    assert decoder.feed(b"noise\n" + frame) == [Frame(REPLY_FLAG | OP_QUERY, POSITIONS)]
+
+def test_decode_overflow_clears_buffer():
+    decoder = FrameDecoder(max_buffer=16)
+    assert decoder.feed(b"x" * 32) == []
+    assert decoder.buffer == bytearray()
+    assert decoder.overflows == 1
@@ -0,0 +1,234 @@
+import math
+import time
+import threading
+import numpy as np
+from typing import Callable, List, Optional
+
+# ========================================================================================================
+# Time Scaling Profiles
+# ========================================================================================================
+
+PROFILE_TRAPEZOID = "trapezoid"
+PROFILE_MIN_JERK = "min_jerk"
+PROFILES = (PROFILE_TRAPEZOID, PROFILE_MIN_JERK)
+
+# 최소 저크 s(τ) = 10τ³ - 15τ⁴ + 6τ⁵ 의 최대 속도/가속도 계수 (D/T, D/T² 배)
+MIN_JERK_PEAK_VELOCITY = 1.875
+MIN_JERK_PEAK_ACCELERATION = 10.0 / math.sqrt(3.0)
+
+def _trapezoid_timing(distance: float, max_velocity: float, max_acceleration: float):
+    """사다리꼴 속도 프로파일 -> (가속 시간, 전체 시간, 최고 속도), 거리가 짧으면 삼각형 프로파일"""
+    if distance * max_acceleration >= max_velocity ** 2:
+        accel_time = max_velocity / max_acceleration
+        return accel_time, distance / max_velocity + accel_time, max_velocity
+    accel_time = math.sqrt(distance / max_acceleration)
+    return accel_time, 2.0 * accel_time, max_acceleration * accel_time
+
+def _trapezoid_scaling(t: np.ndarray, distance: float, accel_time: float, duration: float,
+                       peak_velocity: float) -> np.ndarray:
+    """사다리꼴 프로파일의 진행률 s(t) (0 -> 1)"""
+    accel = peak_velocity / accel_time
+    s = np.where(
+        t < accel_time, 0.5 * accel * t ** 2,
+        np.where(t <= duration - accel_time,
+                 0.5 * accel * accel_time ** 2 + peak_velocity * (t - accel_time),
+                 distance - 0.5 * accel * (duration - t) ** 2))
+    return np.clip(s / distance, 0.0, 1.0)
+
+def _min_jerk_scaling(tau: np.ndarray) -> np.ndarray:
+    """최소 저크 프로파일의 진행률 s(τ), τ = t / T"""
+    return tau ** 3 * (10.0 + tau * (-15.0 + 6.0 * tau))
+
+# ========================================================================================================
+# Trajectory
+# ========================================================================================================
+
+class Trajectory:
+    """미리 계산된 관절 궤적 (틱마다 한 행)
+
+    모든 관절이 같은 진행률 s(t)를 공유하므로 같은 시각에 출발하고 같은 시각에 도착합니다.
+    positions[k]는 시각 (k + 1) / rate_hz의 목표 위치이며, 마지막 행은 목표 위치와 같습니다.
+    commands는 전송용 정수 위치로 미리 변환되어 스트리밍 시 틱당 비용은 행 조회 1회입니다.
+    """
+
+    def __init__(self, start: np.ndarray, positions: np.ndarray, rate_hz: float, profile: str):
+        self.start = start
+        self.goal = positions[-1]
+        self.rate_hz = rate_hz
+        self.period = 1.0 / rate_hz
+        self.profile = profile
+        self.positions = positions
+        self.commands = np.rint(self.positions).astype(np.int64).tolist()
+
+    def __len__(self) -> int:
+        return len(self.commands)
+
+    @property
+    def duration(self) -> float:
+        return len(self.commands) * self.period
+
+    def velocities(self) -> np.ndarray:
+        """관절 속도 (ticks/s, 틱 간 차분)"""
+        return np.diff(self.positions, axis=0, prepend=self.start[None, :]) * self.rate_hz
+
+def plan_trajectory(start, goal, rate_hz: float, max_velocity: float, max_acceleration: float,
+                    profile: str = PROFILE_MIN_JERK) -> Trajectory:
+    """start -> goal 동기화 궤적 생성
+
+    이동 거리가 가장 큰 관절이 max_velocity / max_acceleration 안에서 걸리는 시간을 전체 시간으로
+    정하고, 나머지 관절은 같은 진행률로 거리에 비례해 이동합니다. (모든 관절의 속도/가속도 제한 만족)
+    전체 시간은 틱 단위로 올림됩니다.
+    """
+    if profile not in PROFILES:
+        raise ValueError(f"Unknown trajectory profile: {profile}")
+    start = np.asarray(start, dtype=np.float64)
+    goal = np.asarray(goal, dtype=np.float64)
+    distance = float(np.abs(goal - start).max()) if len(start) else 0.0
+
+    if distance < 0.5:
+        return Trajectory(start, goal[None, :], rate_hz, profile)
+
+    if profile == PROFILE_TRAPEZOID:
+        accel_time, duration, peak_velocity = _trapezoid_timing(distance, max_velocity, max_acceleration)
+    else:
+        duration = max(MIN_JERK_PEAK_VELOCITY * distance / max_velocity,
+                       math.sqrt(MIN_JERK_PEAK_ACCELERATION * distance / max_acceleration))
+
+    ticks = max(1, math.ceil(duration * rate_hz - 1e-9))
+    tau = np.arange(1, ticks + 1, dtype=np.float64) / ticks  # 틱 단위 올림 -> 시간 축을 늘려 샘플링
+
+    if profile == PROFILE_TRAPEZOID:
+        scaling = _trapezoid_scaling(tau * duration, distance, accel_time, duration, peak_velocity)
+    else:
+        scaling = _min_jerk_scaling(tau)
+    scaling[-1] = 1.0
+    return Trajectory(start, start + scaling[:, None] * (goal - start), rate_hz, profile)
+
+def plan_path_trajectory(waypoints, rate_hz: float, max_velocity: float, max_acceleration: float,
+                         profile: str = PROFILE_MIN_JERK) -> Trajectory:
+    """경유점 (K, J)을 차례로 지나는 궤적 (MotionPlanner 경로 등)
+
+    구간마다 plan_trajectory로 동기화 궤적을 만들어 이어 붙이므로 각 경유점에서 속도가 0이 되고,
+    샘플은 모두 경유점 사이 직선 위에 있습니다. (직선 구간의 충돌 검사 결과가 그대로 유지됨)
+    """
+    waypoints = np.asarray(waypoints, dtype=np.float64)
+    segments = [plan_trajectory(a, b, rate_hz, max_velocity, max_acceleration, profile)
+                for a, b in zip(waypoints[:-1], waypoints[1:])]
+    if not segments:
+        return plan_trajectory(waypoints[0], waypoints[0], rate_hz, max_velocity, max_acceleration, profile)
+    return Trajectory(waypoints[0], np.concatenate([segment.positions for segment in segments]), rate_hz, profile)
+
+# ========================================================================================================
+# Trajectory Streamer
+# ========================================================================================================
+
+class TrajectoryStreamer:
+    """궤적을 고정 주기로 전송하는 스트리밍 스레드
+
+    틱마다 경과 시간에 해당하는 행을 submit(보통 TransmitScheduler.submit)으로 넘깁니다.
+    틱이 늦어도 행은 시각 기준으로 선택되므로 전체 궤적 시간은 유지됩니다.
+    새 궤적(play)이나 cancel()은 진행 중인 궤적을 즉시 대체합니다.
+    """
+
+    def __init__(self, submit: Callable[[List[int]], None], rate_hz: float = 50.0):
+        self.submit = submit
+        self.period = 1.0 / rate_hz
+
+        self._cond = threading.Condition()
+        self._trajectory: Optional[Trajectory] = None
+        self._start_time = 0.0
+        self._index = -1
+
+        # 통계 카운터
+        self.ticks = 0
+        self.late_ticks = 0  # 예정 시각보다 반 주기 이상 늦은 틱
+        self.max_lateness = 0.0
+        self.completed = 0
+        self.cancelled = 0
+
+        self.running = True
+        self.thread = threading.Thread(target=self._stream_loop, daemon=True)
+        self.thread.start()
+
+    @property
+    def active(self) -> bool:
+        return self._trajectory is not None
+
+    def play(self, trajectory: Trajectory):
+        """궤적 스트리밍 시작 (진행 중인 궤적은 대체)"""
+        with self._cond:
+            if self._trajectory is not None:
+                self.cancelled += 1
+            self._trajectory = trajectory
+            self._start_time = time.monotonic()
+            self._index = -1
+            self._cond.notify()
+
+    def setpoint(self) -> Optional[List[int]]:
+        """마지막으로 전송한 궤적 위치 (진행 중인 궤적이 없으면 None)"""
+        with self._cond:
+            return self._current_setpoint()
+
+    def cancel(self) -> Optional[List[int]]:
+        """진행 중인 궤적 중단 -> 마지막으로 전송한 위치 (진행 중인 궤적이 없으면 None)"""
+        with self._cond:
+            setpoint = self._current_setpoint()
+            if self._trajectory is not None:
+                self._trajectory = None
+                self.cancelled += 1
+                self._cond.notify()
+            return setpoint
+
+    def _current_setpoint(self) -> Optional[List[int]]:
+        trajectory = self._trajectory
+        if trajectory is None:
+            return None
+        if self._index < 0:
+            return np.rint(trajectory.start).astype(np.int64).tolist()
+        return list(trajectory.commands[self._index])
+
+    def _stream_loop(self):
+        """스트리밍 루프 (백그라운드 스레드)"""
+        with self._cond:
+            while self.running:
+                trajectory = self._trajectory
+                if trajectory is None:
+                    self._cond.wait()
+                    continue
+
+                # commands[k]는 시각 (k + 1) / rate_hz의 위치이므로 k + 1 주기가 지난 뒤 전송
+                now = time.monotonic()
+                elapsed = now - self._start_time
+                index = min(int(elapsed * trajectory.rate_hz) - 1, len(trajectory) - 1)
+                if index < 0:
+                    self._cond.wait(max(0.0, self._start_time + trajectory.period - now))
+                    continue
+                lateness = elapsed - (index + 1) * trajectory.period
+                self.ticks += 1
+                self.max_lateness = max(self.max_lateness, lateness)
+                if lateness > 0.5 * trajectory.period:
+                    self.late_ticks += 1
+
+                # cancel() 이후 이전 궤적 위치가 전송되지 않도록 잠금 안에서 전달
+                self._index = index
+                self.submit(trajectory.commands[index])
+                if index == len(trajectory) - 1:
+                    self._trajectory = None
+                    self.completed += 1
+                    continue
+
+                next_time = self._start_time + (index + 2) * trajectory.period
+                self._cond.wait(max(0.0, next_time - time.monotonic()))
+
+    def get_stats(self) -> dict:
+        """스트리밍 통계 반환"""
+        return {'ticks': self.ticks, 'late': self.late_ticks, 'max_lateness': self.max_lateness,
+                'completed': self.completed, 'cancelled': self.cancelled}
+
+    def stop(self):
+        """스트리밍 종료 (진행 중인 궤적은 중단)"""
+        with self._cond:
+            self.running = False
+            self._trajectory = None
+            self._cond.notify()
+        self.thread.join(timeout=1.0)
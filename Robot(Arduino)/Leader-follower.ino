@@ -72,6 +72,34 @@ using namespace ControlTableItem;
 
 bool passivityMode = false;
 
+// Host bus frames (multi-arm, see Controller/protocol.py)
+// [0xAA][0x5A][OPCODE][COUNT][COUNT x ([ARM][7 x uint16 LE])][CRC16 LE]
+// ARM 0 = IDs 1~7 (follower), ARM 1 = IDs 11~17 (leader)
+//
+// Host control: the sketch mirrors the leader onto the follower until the host sends a
+// move (opcode 0). From then on the host owns the follower and mirroring stops until
+//   - the host sends opcode 6 (release) for any arm on this bus, or
+//   - no host bus frame has arrived for HOST_CONTROL_TIMEOUT_MS (host exited or unplugged).
+// A host holding a pose keeps control by re-sending its last targets (Controller/bus.py keepalive).
+const uint8_t FRAME_SYNC1 = 0xAA;
+const uint8_t FRAME_SYNC_BUS = 0x5A;
+const uint8_t REPLY_FLAG = 0x80;
+const uint8_t NUM_ARMS = 2;
+const uint8_t MAX_BUS_ARMS = 16;  // host packs up to 16 arms per frame, entries for other arms are skipped
+const uint8_t BUS_HEADER_SIZE = 4;
+const uint8_t BUS_ENTRY_SIZE = 15;
+const uint8_t BUS_MAX_SIZE = BUS_HEADER_SIZE + NUM_ARMS * BUS_ENTRY_SIZE + 2;
+
+uint8_t busBuffer[BUS_MAX_SIZE];  // header + entries for this bus's arms only
+uint16_t busLength = 0;           // bytes of the current frame received so far
+uint8_t busKept = 0;              // entries stored in busBuffer
+uint16_t busCrc = 0xFFFF;         // running CRC over OPCODE..last entry
+uint8_t busCrcLow = 0;
+bool hostControl = false;  // host move received: stop mirroring leader -> follower
+unsigned long lastHostFrame = 0;  // millis() of the last valid host bus frame
+const unsigned long HOST_CONTROL_TIMEOUT_MS = 3000;
+bool busFeedback = false;  // stream bus feedback frames every loop
+
 int mot1Pos = 512;
 int mot2Pos = 512;
 int mot3Pos = 380;
@@ -229,6 +257,9 @@ void setup() {
   dxl.torqueOff(ID15);
   dxl.torqueOff(ID16);
   dxl.torqueOff(ID17);
+
+  // Readiness banner for the host handshake
+  Serial.println("Ready");
 }
 
 void loop() {
@@ -239,10 +270,148 @@ void loop() {
   //   delay(20);
   // }
   //readMotorPos();
-  readMotorPosLeader();
-  moveFollower();
+  receiveBus();
+  if (hostControl && millis() - lastHostFrame > HOST_CONTROL_TIMEOUT_MS) {
+    hostControl = false; // host went away: resume mirroring
+  }
+  if (!hostControl) {
+    readMotorPosLeader();
+    moveFollower();
+  }
   
-  printSerial2();
+  if (busFeedback) {
+    reportBus(REPLY_FLAG | 2);
+    delay(20);
+  }
+  else {
+    printSerial2();
+  }
+}
+
+uint8_t armId(uint8_t arm, uint8_t joint) {
+  return arm * 10 + joint + 1;
+}
+
+uint16_t crc16Update(uint16_t crc, uint8_t data) {
+  crc ^= (uint16_t)data << 8;
+  for (uint8_t i = 0; i < 8; i++) {
+    crc = (crc & 0x8000) ? (crc << 1) ^ 0x1021 : (crc << 1);
+  }
+  return crc;
+}
+
+// Accumulate host bus frames without blocking the leader -> follower loop
+// The CRC is computed while streaming so frames for more arms than NUM_ARMS fit the buffer:
+// only entries addressed to this bus are stored, the rest are checked and skipped
+void receiveBus() {
+  while (Serial.available()) {
+    uint8_t b = Serial.read();
+    if (busLength == 0) {
+      if (b == FRAME_SYNC1) busLength = 1;
+      continue;
+    }
+    if (busLength == 1) {
+      busLength = (b == FRAME_SYNC_BUS) ? 2 : (b == FRAME_SYNC1) ? 1 : 0;
+      busCrc = 0xFFFF;
+      busKept = 0;
+      continue;
+    }
+
+    uint16_t i = busLength++;
+    if (i < BUS_HEADER_SIZE) {
+      busBuffer[i] = b;
+      busCrc = crc16Update(busCrc, b);
+      if (i == 3 && b > MAX_BUS_ARMS) {
+        busLength = 0; // not a bus frame
+      }
+      continue;
+    }
+
+    uint16_t payloadEnd = BUS_HEADER_SIZE + busBuffer[3] * BUS_ENTRY_SIZE;
+    if (i < payloadEnd) {
+      busCrc = crc16Update(busCrc, b);
+      if (busKept < NUM_ARMS) {
+        uint8_t *entry = busBuffer + BUS_HEADER_SIZE + busKept * BUS_ENTRY_SIZE;
+        uint8_t k = (i - BUS_HEADER_SIZE) % BUS_ENTRY_SIZE;
+        entry[k] = b;
+        if (k == BUS_ENTRY_SIZE - 1 && entry[0] < NUM_ARMS) {
+          busKept++; // keep only arms this bus drives
+        }
+      }
+      continue;
+    }
+    if (i == payloadEnd) {
+      busCrcLow = b;
+      continue;
+    }
+    if (busCrc == (busCrcLow | ((uint16_t)b << 8))) {
+      handleBusFrame();
+    }
+    busLength = 0; // corrupted frames are dropped
+  }
+}
+
+void handleBusFrame() {
+  uint8_t opcode = busBuffer[2];
+  lastHostFrame = millis();
+
+  for (uint8_t e = 0; e < busKept; e++) {
+    uint8_t *entry = busBuffer + BUS_HEADER_SIZE + e * BUS_ENTRY_SIZE;
+    uint8_t arm = entry[0];
+    int first = entry[1] | (entry[2] << 8);
+
+    if (opcode == 0) {
+      // Torque is only changed by opcode 1 (moves to a torque-off arm are stored as goals)
+      // Same joint limits as robot.ino handleCommand
+      const int limits[7][2] = {{0, 1023}, {180, 845}, {165, 1023}, {512, 1023}, {512, 1023}, {0, 1023}, {370, 695}};
+      hostControl = true;
+      for (uint8_t j = 0; j < 7; j++) {
+        int goal = entry[1 + 2 * j] | (entry[2 + 2 * j] << 8);
+        dxl.setGoalPosition(armId(arm, j), constrain(goal, limits[j][0], limits[j][1]));
+      }
+    }
+    else if (opcode == 1 && (first == 0 || first == 1)) {
+      for (uint8_t j = 0; j < 7; j++) {
+        if (first == 1) dxl.torqueOn(armId(arm, j));
+        else dxl.torqueOff(armId(arm, j));
+      }
+    }
+    else if (opcode == 2 && (first == 0 || first == 1)) {
+      busFeedback = (first == 1);
+    }
+    else if (opcode == 6) {
+      hostControl = false; // release: resume leader -> follower mirroring
+    }
+  }
+
+  if (opcode == 3) {
+    reportBus(REPLY_FLAG | 3);
+  }
+}
+
+// Send present positions of all arms in one bus frame
+void reportBus(uint8_t opcode) {
+  uint8_t frame[BUS_MAX_SIZE];
+  uint8_t size = BUS_HEADER_SIZE;
+  frame[0] = FRAME_SYNC1;
+  frame[1] = FRAME_SYNC_BUS;
+  frame[2] = opcode;
+  frame[3] = NUM_ARMS;
+  for (uint8_t arm = 0; arm < NUM_ARMS; arm++) {
+    frame[size++] = arm;
+    for (uint8_t j = 0; j < 7; j++) {
+      int pos = dxl.getPresentPosition(armId(arm, j));
+      frame[size++] = pos & 0xFF;
+      frame[size++] = (pos >> 8) & 0xFF;
+    }
+  }
+  uint16_t crc = 0xFFFF;
+  for (uint8_t i = 2; i < size; i++) {
+    crc = crc16Update(crc, frame[i]);
+  }
+  frame[size++] = crc & 0xFF;
+  frame[size++] = (crc >> 8) & 0xFF;
+  Serial.write(frame, size);
 }
 
 void printSerial(String command) {
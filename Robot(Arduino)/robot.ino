@@ -57,6 +57,28 @@ using namespace ControlTableItem;
 
 bool passivityMode = false;
 
+// Binary protocol frame: [0xAA][0x55][OP][7 x uint16 LE][CRC16 LE] = 19 bytes
+// CRC-16/CCITT-FALSE (poly 0x1021, init 0xFFFF) over OP ~ last value
+const uint8_t FRAME_SYNC1 = 0xAA;
+const uint8_t FRAME_SYNC2 = 0x55;
+const uint8_t FRAME_SIZE = 19;
+// The second sync byte may arrive after 0xAA has been read (USB packet split);
+// wait this long for it. A dropped binary frame is discarded up to the next 0xAA or until
+// the line has been quiet this long, so its remainder never reaches the ASCII parser.
+// ASCII commands always start with a digit; any other byte outside a frame is discarded.
+const unsigned long SYNC_TIMEOUT_MS = 20;
+const uint8_t REPLY_FLAG = 0x80;
+bool binaryReplies = false;
+
+// Delta move (opcode 5): only changed joints, bit i of MASK = joint i
+// ASCII "5,MASK,v,v,...*", binary [0xAA][0x5D][MASK][k x uint16 LE][CRC16 LE]
+const uint8_t FRAME_SYNC_DELTA = 0x5D;
+const uint8_t DELTA_MAX_VALUES = 6;
+
+// Capabilities reported in the opcode 4 reply "Protocol:<dialect>,<CAPS>" (bit 0: delta moves)
+// The host only sends opcode 5 after this firmware confirms it
+const uint8_t CAPABILITIES = 0x01;
+
 int mot1Pos = 512;
 int mot2Pos = 512;
 int mot3Pos = 380;
@@ -132,14 +154,16 @@ void setup() {
   dxl.setGoalPosition(ID6, mot6Pos);
   dxl.setGoalPosition(ID7, mot7Pos);
   delay(2000);
-  
+
+  // Readiness banner for the host handshake (replaces the host-side fixed sleep)
+  Serial.println("Ready");
 }
 
 void loop() {
   receiveSerial();
   if (passivityMode) {
     readMotorPos();
-    printSerial("Feedback");
+    reportPositions("Feedback", 2);
     delay(20);
   }
   
@@ -150,6 +174,43 @@ void printSerial(String command) {
   Serial.println(command+":"+String(mot1PosRead)+","+String(mot2PosRead)+","+String(mot3PosRead)+","+String(mot4PosRead)+","+String(mot5PosRead)+","+String(mot6PosRead)+","+String(mot7PosRead));
 }
 
+// Send positions in the active reply dialect (ASCII line or binary frame)
+void reportPositions(String command, uint8_t opcode) {
+  if (binaryReplies) {
+    int values[7] = {mot1PosRead, mot2PosRead, mot3PosRead, mot4PosRead, mot5PosRead, mot6PosRead, mot7PosRead};
+    writeFrame(REPLY_FLAG | opcode, values);
+  }
+  else {
+    printSerial(command);
+  }
+}
+
+uint16_t crc16Update(uint16_t crc, uint8_t data) {
+  crc ^= (uint16_t)data << 8;
+  for (uint8_t i = 0; i < 8; i++) {
+    crc = (crc & 0x8000) ? (crc << 1) ^ 0x1021 : (crc << 1);
+  }
+  return crc;
+}
+
+void writeFrame(uint8_t opcode, int *values) {
+  uint8_t frame[FRAME_SIZE];
+  frame[0] = FRAME_SYNC1;
+  frame[1] = FRAME_SYNC2;
+  frame[2] = opcode;
+  for (uint8_t i = 0; i < 7; i++) {
+    frame[3 + i * 2] = values[i] & 0xFF;
+    frame[4 + i * 2] = (values[i] >> 8) & 0xFF;
+  }
+  uint16_t crc = 0xFFFF;
+  for (uint8_t i = 2; i < FRAME_SIZE - 2; i++) {
+    crc = crc16Update(crc, frame[i]);
+  }
+  frame[FRAME_SIZE - 2] = crc & 0xFF;
+  frame[FRAME_SIZE - 1] = (crc >> 8) & 0xFF;
+  Serial.write(frame, FRAME_SIZE);
+}
+
 void printSerial2() {
   Serial.println(String(mot1Pos)+","+String(mot2Pos)+","+String(mot3Pos)+","+String(mot4Pos)+","+String(mot5Pos)+","+String(mot6Pos)+","+String(mot7Pos));
 }
@@ -186,62 +247,197 @@ void moveMotor() {
 
 void receiveSerial() {
   if (Serial.available()) {
-    int c, n1, n2, n3, n4, n5, n6, n7;
-
-    String packet = Serial.readStringUntil('*');
-    
-    // int colonIndex = packet.indexOf(':');
-    // if (colonIndex == -1) return; // Invalid format
-    
-    // // Extract command word and data
-    // String command = packet.substring(0, colonIndex);
-    // String data = packet.substring(colonIndex + 1);
-    
-
-    sscanf(packet.c_str(), "%d,%d,%d,%d,%d,%d,%d,%d", &c, &n1, &n2, &n3, &n4, &n5, &n6, &n7); //mot1Pos,mot2Pos,mot3Pos,mot4Pos,mot5Pos,mot6Pos
-    
-    if (c == 0) {
-      mot1Pos = constrain(n1, 0, 1023);
-      mot2Pos = constrain(n2, 180, 845);
-      mot3Pos = constrain(n3, 165, 1023);
-      mot4Pos = constrain(n4, 512, 1023);
-      mot5Pos = constrain(n5, 512, 1023);
-      mot6Pos = constrain(n6, 0, 1023);
-      mot7Pos = constrain(n7, 370, 695);
-      moveMotor();
+    // Dialect is detected per packet: binary frames start with 0xAA, ASCII with a digit
+    int c = Serial.peek();
+    if (c == FRAME_SYNC1) {
+      receiveBinary();
     }
-    else if (c == 1) {
-      if (n1 ==1) {
-        dxl.torqueOn(ID1);
-        dxl.torqueOn(ID2);
-        dxl.torqueOn(ID3);
-        dxl.torqueOn(ID4);
-        dxl.torqueOn(ID5);
-        dxl.torqueOn(ID6);
-        dxl.torqueOn(ID7);
-      }
-      else if (n1 == 0) {
-        dxl.torqueOff(ID1);
-        dxl.torqueOff(ID2);
-        dxl.torqueOff(ID3);
-        dxl.torqueOff(ID4);
-        dxl.torqueOff(ID5);
-        dxl.torqueOff(ID6);
-        dxl.torqueOff(ID7);
-      }
+    else if (c >= '0' && c <= '9') {
+      receiveAscii();
     }
-    else if (c == 3) {
-      readMotorPos();
-      printSerial("Positions");
+    else {
+      Serial.read(); // remainder of a dropped frame or line noise
     }
-    else if (c == 2) {
-      if (n1 ==1) {
-        passivityMode = true;
-      }
-      else if (n1 ==0) {
-        passivityMode = false;
+  }
+}
+
+// Wait for the next byte up to SYNC_TIMEOUT_MS; returns it without consuming, or -1
+int waitByte() {
+  unsigned long start = millis();
+  while (!Serial.available()) {
+    if (millis() - start >= SYNC_TIMEOUT_MS) {
+      return -1;
+    }
+  }
+  return Serial.peek();
+}
+
+// Discard the rest of a dropped binary frame (up to the next 0xAA or a quiet line)
+void dropFrame() {
+  int c;
+  while ((c = waitByte()) >= 0 && c != FRAME_SYNC1) {
+    Serial.read();
+  }
+}
+
+void receiveAscii() {
+  int c = -1;
+  int n[7] = {0, 0, 0, 0, 0, 0, 0};
+
+  String packet = Serial.readStringUntil('*');
+  // Host commands only contain digits, ',' and '-'; anything else is noise, not a command
+  for (unsigned int i = 0; i < packet.length(); i++) {
+    char ch = packet[i];
+    if (!isDigit(ch) && ch != ',' && ch != '-') {
+      return;
+    }
+  }
+  
+  // int colonIndex = packet.indexOf(':');
+  // if (colonIndex == -1) return; // Invalid format
+  
+  // // Extract command word and data
+  // String command = packet.substring(0, colonIndex);
+  // String data = packet.substring(colonIndex + 1);
+  
+
+  sscanf(packet.c_str(), "%d,%d,%d,%d,%d,%d,%d,%d", &c, &n[0], &n[1], &n[2], &n[3], &n[4], &n[5], &n[6]); //mot1Pos,mot2Pos,mot3Pos,mot4Pos,mot5Pos,mot6Pos
+  handleCommand(c, n);
+}
+
+void receiveBinary() {
+  uint8_t frame[FRAME_SIZE];
+
+  Serial.read(); // FRAME_SYNC1
+  int sync2 = waitByte();
+  if (sync2 == FRAME_SYNC_DELTA) {
+    receiveDelta();
+    return;
+  }
+  if (sync2 != FRAME_SYNC2) {
+    dropFrame(); // timeout or not a frame
+    return;
+  }
+  frame[0] = FRAME_SYNC1;
+  if (Serial.readBytes(frame + 1, FRAME_SIZE - 1) != FRAME_SIZE - 1) {
+    dropFrame(); // truncated
+    return;
+  }
+
+  uint16_t crc = 0xFFFF;
+  for (uint8_t i = 2; i < FRAME_SIZE - 2; i++) {
+    crc = crc16Update(crc, frame[i]);
+  }
+  uint16_t rxCrc = frame[FRAME_SIZE - 2] | ((uint16_t)frame[FRAME_SIZE - 1] << 8);
+  if (crc != rxCrc) {
+    dropFrame(); // corrupted
+    return;
+  }
+
+  int n[7];
+  for (uint8_t i = 0; i < 7; i++) {
+    n[i] = frame[3 + i * 2] | ((int)frame[4 + i * 2] << 8);
+  }
+  handleCommand(frame[2], n);
+}
+
+void receiveDelta() {
+  uint8_t frame[3 + DELTA_MAX_VALUES * 2 + 2];
+
+  frame[0] = FRAME_SYNC1;
+  if (Serial.readBytes(frame + 1, 2) != 2) {
+    dropFrame();
+    return;
+  }
+  uint8_t mask = frame[2];
+  uint8_t count = 0;
+  for (uint8_t i = 0; i < 7; i++) {
+    if (mask & (1 << i)) count++;
+  }
+  if ((mask & 0x80) || count == 0 || count > DELTA_MAX_VALUES) {
+    dropFrame();
+    return;
+  }
+  uint8_t size = 3 + count * 2 + 2;
+  if (Serial.readBytes(frame + 3, size - 3) != size - 3) {
+    dropFrame();
+    return;
+  }
+
+  uint16_t crc = 0xFFFF;
+  for (uint8_t i = 2; i < size - 2; i++) {
+    crc = crc16Update(crc, frame[i]);
+  }
+  if (crc != (frame[size - 2] | ((uint16_t)frame[size - 1] << 8))) {
+    dropFrame(); // corrupted
+    return;
+  }
+
+  int n[7] = {mask, 0, 0, 0, 0, 0, 0};
+  for (uint8_t i = 0; i < count; i++) {
+    n[1 + i] = frame[3 + i * 2] | ((int)frame[4 + i * 2] << 8);
+  }
+  handleCommand(5, n);
+}
+
+void handleCommand(int c, int *n) {
+  if (c == 0) {
+    mot1Pos = constrain(n[0], 0, 1023);
+    mot2Pos = constrain(n[1], 180, 845);
+    mot3Pos = constrain(n[2], 165, 1023);
+    mot4Pos = constrain(n[3], 512, 1023);
+    mot5Pos = constrain(n[4], 512, 1023);
+    mot6Pos = constrain(n[5], 0, 1023);
+    mot7Pos = constrain(n[6], 370, 695);
+    moveMotor();
+  }
+  else if (c == 1) {
+    if (n[0] ==1) {
+      dxl.torqueOn(ID1);
+      dxl.torqueOn(ID2);
+      dxl.torqueOn(ID3);
+      dxl.torqueOn(ID4);
+      dxl.torqueOn(ID5);
+      dxl.torqueOn(ID6);
+      dxl.torqueOn(ID7);
+    }
+    else if (n[0] == 0) {
+      dxl.torqueOff(ID1);
+      dxl.torqueOff(ID2);
+      dxl.torqueOff(ID3);
+      dxl.torqueOff(ID4);
+      dxl.torqueOff(ID5);
+      dxl.torqueOff(ID6);
+      dxl.torqueOff(ID7);
+    }
+  }
+  else if (c == 3) {
+    readMotorPos();
+    reportPositions("Positions", 3);
+  }
+  else if (c == 2) {
+    if (n[0] ==1) {
+      passivityMode = true;
+    }
+    else if (n[0] ==0) {
+      passivityMode = false;
+    }
+  }
+  else if (c == 5) {
+    // Delta move: n[0] = joint mask, changed values follow in joint order
+    int *targets[7] = {&mot1Pos, &mot2Pos, &mot3Pos, &mot4Pos, &mot5Pos, &mot6Pos, &mot7Pos};
+    const int limits[7][2] = {{0, 1023}, {180, 845}, {165, 1023}, {512, 1023}, {512, 1023}, {0, 1023}, {370, 695}};
+    uint8_t k = 1;
+    for (uint8_t i = 0; i < 7 && k <= DELTA_MAX_VALUES; i++) {
+      if (n[0] & (1 << i)) {
+        *targets[i] = constrain(n[k++], limits[i][0], limits[i][1]);
       }
     }
-    
+    moveMotor();
+  }
+  else if (c == 4) {
+    // Reply dialect switch + capability report (always acknowledged in ASCII)
+    binaryReplies = (n[0] == 1);
+    Serial.println(String("Protocol:") + (binaryReplies ? 1 : 0) + "," + CAPABILITIES);
   }
 }